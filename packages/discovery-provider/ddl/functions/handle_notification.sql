@@ -0,0 +1,87 @@
+create or replace function handle_notification() returns trigger as $$
+begin
+  -- announcements go to every user and are read from notification
+  if new.type = 'announcement' or new.user_ids is null then
+    return null;
+  end if;
+
+  begin
+    -- count the group as unread for each recipient with counts, unless an
+    -- earlier notification of the group is already unread for them
+    update notification_unread_counts c
+    set counts = jsonb_set(
+      c.counts,
+      array[new.type],
+      to_jsonb(coalesce((c.counts->>new.type)::int, 0) + 1)
+    )
+    where c.user_id = any(new.user_ids)
+      and new.timestamp > c.seen_at
+      and not exists (
+        select 1
+        from notification n
+        where n.group_id = new.group_id
+          and n.timestamp > c.seen_at
+          and n.type = new.type
+          and n.id < new.id
+          and c.user_id = any(n.user_ids)
+      );
+  exception
+    when others then
+      -- drift is repaired by verify_notification_unread_counts
+      raise warning 'An error occurred in %: %', tg_name, sqlerrm;
+  end;
+
+  begin
+    -- add the notification to each recipient's group for its seen interval
+    insert into notification_inbox
+      (user_id, type, group_id, prev_seen_at, seen_at, timestamp, notification_ids, count)
+    select
+      r.user_id,
+      new.type,
+      new.group_id,
+      coalesce(
+        (
+          select max(s.seen_at)
+          from notification_seen s
+          where s.user_id = r.user_id and s.seen_at < new.timestamp
+        ),
+        '-infinity'
+      ),
+      (
+        select min(s.seen_at)
+        from notification_seen s
+        where s.user_id = r.user_id and s.seen_at >= new.timestamp
+      ),
+      new.timestamp,
+      array[new.id],
+      1
+    from (select distinct unnest(new.user_ids) as user_id) r
+    on conflict (user_id, group_id, type, prev_seen_at) do update set
+      timestamp = greatest(notification_inbox.timestamp, excluded.timestamp),
+      notification_ids = notification_inbox.notification_ids || excluded.notification_ids,
+      count = notification_inbox.count + 1;
+  exception
+    when others then
+      raise warning 'An error occurred in %: %', tg_name, sqlerrm;
+      -- read the recipients from notification again until
+      -- backfill_notification_inbox rebuilds their inbox
+      delete from notification_inbox_users where user_id = any(new.user_ids);
+  end;
+
+  return null;
+
+exception
+  when others then
+    raise warning 'An error occurred in %: %', tg_name, sqlerrm;
+    return null;
+end;
+$$ language plpgsql;
+
+
+do $$ begin
+  create trigger on_notification
+  after insert on notification
+  for each row execute procedure handle_notification();
+exception
+  when others then null;
+end $$;
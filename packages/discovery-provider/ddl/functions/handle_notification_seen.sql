@@ -0,0 +1,49 @@
+create or replace function handle_notification_seen() returns trigger as $$
+begin
+  -- everything up to seen_at is read. Notifications can be stamped after
+  -- the block time of seen_at, so the groups unread after it are recounted
+  -- from the user's notification_inbox. verify_notification_unread_counts
+  -- repairs users whose inbox is incomplete
+  update notification_unread_counts
+  set
+    counts = coalesce(
+      (
+        select jsonb_object_agg(unread.type, unread.group_count)
+        from (
+          select i.type, count(distinct i.group_id) as group_count
+          from notification_inbox i
+          where i.user_id = new.user_id
+            and i.timestamp > new.seen_at
+          group by i.type
+        ) unread
+      ),
+      '{}'
+    ),
+    seen_at = new.seen_at
+  where user_id = new.user_id
+    and seen_at < new.seen_at;
+
+  -- close the unseen notification groups
+  update notification_inbox
+  set seen_at = new.seen_at
+  where user_id = new.user_id
+    and seen_at is null
+    and timestamp <= new.seen_at;
+
+  return null;
+
+exception
+  when others then
+    raise warning 'An error occurred in %: %', tg_name, sqlerrm;
+    return null;
+end;
+$$ language plpgsql;
+
+
+do $$ begin
+  create trigger on_notification_seen
+  after insert on notification_seen
+  for each row execute procedure handle_notification_seen();
+exception
+  when others then null;
+end $$;
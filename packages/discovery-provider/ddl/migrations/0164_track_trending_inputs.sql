@@ -0,0 +1,33 @@
+begin;
+
+-- Per-track trending inputs, the columns of trending_params + aggregate_interval_plays
+-- kept current incrementally by index_trending between full refreshes.
+CREATE TABLE IF NOT EXISTS track_trending_inputs (
+    track_id INTEGER PRIMARY KEY,
+    genre VARCHAR,
+    owner_id INTEGER NOT NULL,
+    created_at TIMESTAMP NOT NULL,
+    release_date TIMESTAMP,
+    play_count BIGINT,
+    week_listen_counts BIGINT NOT NULL DEFAULT 0,
+    month_listen_counts BIGINT NOT NULL DEFAULT 0,
+    owner_follower_count BIGINT,
+    repost_count BIGINT NOT NULL DEFAULT 0,
+    save_count BIGINT NOT NULL DEFAULT 0,
+    repost_week_count BIGINT NOT NULL DEFAULT 0,
+    repost_month_count BIGINT NOT NULL DEFAULT 0,
+    save_week_count BIGINT NOT NULL DEFAULT 0,
+    save_month_count BIGINT NOT NULL DEFAULT 0,
+    karma NUMERIC NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+COMMENT ON TABLE track_trending_inputs IS 'Trending score inputs of every trending eligible track, updated from the rows indexed since the last trending run.';
+
+-- Finds tracks whose time decay may have changed since the last run
+CREATE INDEX IF NOT EXISTS track_trending_inputs_decay_idx
+ON track_trending_inputs ((GREATEST(release_date, created_at)));
+
+-- Finds saves entering or leaving the trending windows
+CREATE INDEX IF NOT EXISTS save_created_at_idx ON saves (created_at);
+
+commit;
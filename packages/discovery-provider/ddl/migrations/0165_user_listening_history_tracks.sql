@@ -0,0 +1,26 @@
+begin;
+
+CREATE TABLE IF NOT EXISTS user_listening_history_tracks (
+    user_id INTEGER NOT NULL,
+    track_id INTEGER NOT NULL,
+    last_listened_at TIMESTAMP NOT NULL,
+    play_count INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (user_id, track_id)
+);
+COMMENT ON TABLE user_listening_history_tracks IS 'One row per track a user listened to, replaces the listening_history JSON of user_listening_history.';
+
+CREATE INDEX IF NOT EXISTS user_listening_history_tracks_last_listened_at_idx
+ON user_listening_history_tracks (user_id, last_listened_at DESC, track_id DESC);
+
+-- Backfill from the listening_history JSON, which is no longer written
+INSERT INTO user_listening_history_tracks (user_id, track_id, last_listened_at, play_count)
+SELECT
+    ulh.user_id,
+    (listen->>'track_id')::integer,
+    max((listen->>'timestamp')::timestamp),
+    max(coalesce((listen->>'play_count')::integer, 1))
+FROM user_listening_history ulh, jsonb_array_elements(ulh.listening_history) AS listen
+GROUP BY ulh.user_id, (listen->>'track_id')::integer
+ON CONFLICT DO NOTHING;
+
+commit;
@@ -0,0 +1,6 @@
+begin;
+
+-- Finds the comments indexed since the last update_aggregates run
+CREATE INDEX IF NOT EXISTS comments_blocknumber_idx ON comments (blocknumber);
+
+commit;
@@ -0,0 +1,18 @@
+begin;
+
+-- Plays per track, hour and country, rolled up from plays by index_hourly_play_counts.
+-- The job backfills it from the first play in batches under its own checkpoint.
+CREATE TABLE IF NOT EXISTS track_hourly_play_counts (
+    play_item_id INTEGER NOT NULL,
+    hourly_timestamp TIMESTAMP NOT NULL,
+    country VARCHAR NOT NULL DEFAULT '',
+    play_count INTEGER NOT NULL,
+    PRIMARY KEY (play_item_id, hourly_timestamp, country)
+);
+COMMENT ON TABLE track_hourly_play_counts IS 'Play counts per track, hour and country (empty when unknown), for windowed play counts without scanning plays.';
+
+-- Finds the buckets entering or leaving a window
+CREATE INDEX IF NOT EXISTS track_hourly_play_counts_hourly_timestamp_idx
+ON track_hourly_play_counts (hourly_timestamp);
+
+commit;
@@ -0,0 +1,39 @@
+begin;
+
+-- Text search indexes for the Postgres search engine (src/queries/search_pg.py),
+-- used when elasticsearch is not configured or unavailable.
+-- The indexed expressions must match the ones in the search queries.
+CREATE INDEX IF NOT EXISTS tracks_title_tsv_idx
+ON tracks USING gin (to_tsvector('simple', coalesce(title, '')))
+WHERE NOT is_delete;
+
+CREATE INDEX IF NOT EXISTS tracks_title_trgm_idx
+ON tracks USING gin (lower(title) gin_trgm_ops)
+WHERE NOT is_delete;
+
+CREATE INDEX IF NOT EXISTS tracks_tags_idx
+ON tracks USING gin (string_to_array(replace(lower(tags), ' ', ''), ','))
+WHERE NOT is_delete;
+
+CREATE INDEX IF NOT EXISTS tracks_genre_idx
+ON tracks (genre)
+WHERE NOT is_delete;
+
+CREATE INDEX IF NOT EXISTS users_name_handle_tsv_idx
+ON users USING gin (to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(handle, '')));
+
+CREATE INDEX IF NOT EXISTS users_name_trgm_idx
+ON users USING gin (lower(name) gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS users_handle_lc_trgm_idx
+ON users USING gin (handle_lc gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS playlists_name_tsv_idx
+ON playlists USING gin (to_tsvector('simple', coalesce(playlist_name, '')))
+WHERE NOT is_delete;
+
+CREATE INDEX IF NOT EXISTS playlists_name_trgm_idx
+ON playlists USING gin (lower(playlist_name) gin_trgm_ops)
+WHERE NOT is_delete;
+
+commit;
@@ -0,0 +1,28 @@
+begin;
+
+-- Unread notification groups per user and type, kept up to date by the
+-- handle_notification and handle_notification_seen triggers.
+-- Rows are created by the verify_notification_unread_counts job, which also
+-- repairs drift; users without a row are counted from notification directly.
+CREATE TABLE IF NOT EXISTS notification_unread_counts (
+    user_id INTEGER PRIMARY KEY,
+    counts JSONB NOT NULL DEFAULT '{}',
+    seen_at TIMESTAMP NOT NULL,
+    verified_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+COMMENT ON TABLE notification_unread_counts IS 'Unread notification groups per type for a user since seen_at, the latest notification_seen. Announcements are counted at read time.';
+
+-- Finds the oldest verified counts to repair
+CREATE INDEX IF NOT EXISTS notification_unread_counts_verified_at_idx
+ON notification_unread_counts (verified_at);
+
+-- Finds the unread notifications of a group when a notification is added to it
+CREATE INDEX IF NOT EXISTS notification_group_id_timestamp_idx
+ON notification (group_id, "timestamp");
+
+-- Announcements go to every user and are counted at read time
+CREATE INDEX IF NOT EXISTS notification_announcement_timestamp_idx
+ON notification ("timestamp")
+WHERE type = 'announcement';
+
+commit;
@@ -0,0 +1,33 @@
+begin;
+
+-- Notification groups per recipient, fanned out from notification by the
+-- handle_notification trigger and marked seen by handle_notification_seen.
+-- A row holds the notifications of a group between two notification_seen of
+-- the user: after prev_seen_at ('-infinity' before the first) and up to
+-- seen_at (null until the user sees them).
+-- Announcements go to every user and are read from notification instead.
+CREATE TABLE IF NOT EXISTS notification_inbox (
+    user_id INTEGER NOT NULL,
+    type VARCHAR NOT NULL,
+    group_id VARCHAR NOT NULL,
+    prev_seen_at TIMESTAMP NOT NULL DEFAULT '-infinity',
+    seen_at TIMESTAMP,
+    "timestamp" TIMESTAMP NOT NULL,
+    notification_ids INTEGER[] NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (user_id, group_id, type, prev_seen_at)
+);
+COMMENT ON TABLE notification_inbox IS 'Notification groups per recipient and seen interval, timestamp is the latest notification of the group.';
+
+-- Pages of a user's notifications
+CREATE INDEX IF NOT EXISTS notification_inbox_user_id_timestamp_group_id_idx
+ON notification_inbox (user_id, "timestamp", group_id);
+
+-- Users whose notification_inbox has been backfilled from notification by
+-- the backfill_notification_inbox job; others are read from notification.
+CREATE TABLE IF NOT EXISTS notification_inbox_users (
+    user_id INTEGER PRIMARY KEY,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+commit;
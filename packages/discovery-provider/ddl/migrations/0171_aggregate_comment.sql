@@ -0,0 +1,64 @@
+begin;
+
+-- React and reply counts per comment, kept up to date by the entity manager
+-- as reactions and replies are indexed and repaired by update_aggregates.
+-- Comments without reactions or replies have no row.
+CREATE TABLE IF NOT EXISTS aggregate_comment (
+    comment_id INTEGER PRIMARY KEY,
+    react_count INTEGER NOT NULL DEFAULT 0,
+    reply_count INTEGER NOT NULL DEFAULT 0
+);
+COMMENT ON TABLE aggregate_comment IS 'Active reactions and replies (including deleted replies) per comment.';
+
+INSERT INTO aggregate_comment (comment_id, react_count, reply_count)
+SELECT
+    c.comment_id,
+    COALESCE(r.react_count, 0),
+    COALESCE(t.reply_count, 0)
+FROM comments c
+LEFT JOIN (
+    SELECT comment_id, count(*) AS react_count
+    FROM comment_reactions
+    WHERE is_delete = FALSE
+    GROUP BY comment_id
+) r ON r.comment_id = c.comment_id
+LEFT JOIN (
+    SELECT parent_comment_id, count(*) AS reply_count
+    FROM comment_threads
+    GROUP BY parent_comment_id
+) t ON t.parent_comment_id = c.comment_id
+WHERE r.react_count IS NOT NULL OR t.reply_count IS NOT NULL
+ON CONFLICT (comment_id) DO NOTHING;
+
+-- Pages of a track's comments per sort method. Every key of a sort runs in
+-- the same direction so a page can seek to its cursor with a row comparison.
+-- Tombstones sort after the other comments of the track in every sort.
+-- The top sort reads react_count from aggregate_comment and orders the
+-- track's comments itself.
+CREATE INDEX IF NOT EXISTS comments_entity_id_newest_idx
+ON comments (entity_id, entity_type, (NOT is_delete), created_at, comment_id);
+
+-- Earliest track timestamp first, comments without one last
+CREATE INDEX IF NOT EXISTS comments_entity_id_timestamp_idx
+ON comments (
+    entity_id,
+    entity_type,
+    (NOT is_delete),
+    (-COALESCE(track_timestamp_s, 2147483647)),
+    created_at,
+    comment_id
+);
+
+-- Pages of a user's comments, newest first
+CREATE INDEX IF NOT EXISTS comments_user_id_created_at_idx
+ON comments (user_id, created_at, comment_id);
+
+-- Tells replies apart from top level comments
+CREATE INDEX IF NOT EXISTS comment_threads_comment_id_idx
+ON comment_threads (comment_id);
+
+-- Finds the comment reactions indexed since the last update_aggregates run
+CREATE INDEX IF NOT EXISTS comment_reactions_blocknumber_idx
+ON comment_reactions (blocknumber);
+
+commit;
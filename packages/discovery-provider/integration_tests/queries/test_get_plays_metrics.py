@@ -57,6 +57,46 @@ def test_get_plays_metrics(app):
     assert metrics[1]["count"] == 5
 
 
+def test_get_plays_metrics_for_track(app):
+    """Tests that plays metrics can be queried for a single track"""
+
+    with app.app_context():
+        db = get_db()
+
+    date = datetime(2020, 10, 4).replace(minute=0, second=0, microsecond=0)
+    test_entities = {
+        "tracks": [
+            {"track_id": 1, "title": "track 1"},
+            {"track_id": 2, "title": "track 2"},
+        ],
+        "plays": [
+            {"item_id": 1, "created_at": date + timedelta(hours=-1)},
+            {"item_id": 1, "created_at": date + timedelta(hours=-1), "country": "US"},
+            {"item_id": 1, "created_at": date + timedelta(days=-2)},
+            {"item_id": 2, "created_at": date + timedelta(hours=-1)},
+        ],
+    }
+
+    populate_mock_db(db, test_entities)
+
+    args = GetPlayMetricsArgs(
+        limit=10,
+        start_time=date + timedelta(days=-3),
+        bucket_size="hour",
+        track_id=1,
+    )
+
+    with db.scoped_session() as session:
+        _index_hourly_play_counts(session)
+        metrics = _get_plays_metrics(session, args)
+
+    assert len(metrics) == 2
+    assert metrics[0]["timestamp"] == format_date(date + timedelta(hours=-1))
+    assert metrics[0]["count"] == 2
+    assert metrics[1]["timestamp"] == format_date(date + timedelta(days=-2))
+    assert metrics[1]["count"] == 1
+
+
 def test_get_plays_metrics_with_weekly_buckets(app):
     """Tests that plays metrics can be queried with weekly buckets"""
 
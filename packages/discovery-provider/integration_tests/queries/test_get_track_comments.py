@@ -93,6 +93,82 @@ def test_get_comments_page(app):
             assert 10 <= decode_string_id(comment["id"]) <= 15
 
 
+def test_get_comments_cursor(app):
+    entities = {
+        **test_entities,
+        "comments": test_entities["comments"]
+        + [
+            {  # tombstone
+                "comment_id": 20,
+                "user_id": 1,
+                "entity_id": 1,
+                "entity_type": "Track",
+                "created_at": datetime(2022, 1, 20),
+                "is_delete": True,
+            },
+            {  # reply to the tombstone
+                "comment_id": 111,
+                "user_id": 1,
+                "entity_id": 1,
+                "entity_type": "Track",
+                "created_at": datetime(2024, 1, 11),
+            },
+        ],
+        "comment_threads": test_entities["comment_threads"]
+        + [{"parent_comment_id": 20, "comment_id": 111}],
+        "comment_reactions": [
+            {"comment_id": 5, "user_id": 1},
+            {"comment_id": 7, "user_id": 1},
+            {"comment_id": 7, "user_id": 2},
+        ],
+        "tracks": [{"track_id": 1, "owner_id": 10, "pinned_comment_id": 12}],
+    }
+    with app.app_context():
+        db = get_db()
+        populate_mock_db(db, entities)
+
+        # Paging with the last comment of each page returns the same comments
+        # in the same order as one page
+        for sort_method in ["top", "newest", "timestamp"]:
+            expected = [
+                comment["id"]
+                for comment in get_track_comments(
+                    {"limit": 100, "sort_method": sort_method}, 1
+                )["data"]
+            ]
+            assert len(expected) == 20
+            assert decode_string_id(expected[0]) == 12
+            assert decode_string_id(expected[-1]) == 20
+
+            paged = []
+            cursor = None
+            while True:
+                page = get_track_comments(
+                    {"limit": 3, "sort_method": sort_method, "cursor": cursor}, 1
+                )["data"]
+                if not page:
+                    break
+                paged += [comment["id"] for comment in page]
+                cursor = decode_string_id(page[-1]["id"])
+            assert paged == expected
+
+        # Replies page the same way
+        replies = get_replies({"limit": 4}, 10)["data"]
+        assert [decode_string_id(reply["id"]) for reply in replies] == [
+            101,
+            102,
+            103,
+            104,
+        ]
+        replies = get_replies({"limit": 4, "cursor": 104}, 10)["data"]
+        assert [decode_string_id(reply["id"]) for reply in replies] == [
+            105,
+            106,
+            107,
+            108,
+        ]
+
+
 def test_get_comments_sort(app):
     with app.app_context():
         db = get_db()
@@ -477,7 +553,8 @@ def test_get_tombstone_comments(app):
         response = get_track_comments({"sort_method": "top"}, 1)
         comments = response["data"]
 
-        assert decode_string_id(comments[0]["id"]) == 1  # misc comment should be top
+        # misc comment should be top, the latest id first among ties
+        assert decode_string_id(comments[0]["id"]) == 4
         assert (
             decode_string_id(comments[-1]["id"]) == 0
         )  # deleted comment should be last
@@ -486,7 +563,8 @@ def test_get_tombstone_comments(app):
         # sort by newest
         response = get_track_comments({"sort_method": "newest"}, 1)
         comments = response["data"]
-        assert decode_string_id(comments[0]["id"]) == 1  # misc comment should be top
+        # misc comment should be top, the latest id first among ties
+        assert decode_string_id(comments[0]["id"]) == 4
         assert (
             decode_string_id(comments[-1]["id"]) == 0
         )  # deleted comment should be last
@@ -495,7 +573,8 @@ def test_get_tombstone_comments(app):
         # sort by timestamp
         response = get_track_comments({"sort_method": "timestamp"}, 1)
         comments = response["data"]
-        assert decode_string_id(comments[0]["id"]) == 1  # misc comment should be top
+        # misc comment should be top, the latest id first among ties
+        assert decode_string_id(comments[0]["id"]) == 4
         assert (
             decode_string_id(comments[-1]["id"])
         ) == 0  # deleted comment should be last
@@ -192,6 +192,37 @@ def test_get_user_listening_history_pagination(app):
     )
 
 
+def test_get_user_listening_history_cursor(app):
+    """Tests paging a track history by the last track of the previous page"""
+    with app.app_context():
+        db = get_db()
+
+    populate_mock_db(db, test_entities)
+
+    def get_track_ids(session, cursor, sort_direction=None):
+        args = GetUserListeningHistoryArgs(
+            user_id=1,
+            limit=2,
+            offset=0,
+            query=None,
+            sort_method=None,
+            sort_direction=sort_direction,
+        )
+        args["cursor"] = cursor
+        track_history = _get_user_listening_history(session, args)
+        return [track[response_name_constants.track_id] for track in track_history]
+
+    with db.scoped_session() as session:
+        _index_user_listening_history(session)
+
+        assert get_track_ids(session, None) == [3, 2]
+        assert get_track_ids(session, 2) == [1, 4]
+        assert get_track_ids(session, 4) == []
+        assert get_track_ids(session, 1, SortDirection.desc) == [2, 3]
+        # A track the user never listened to is not a valid cursor
+        assert get_track_ids(session, 5) == []
+
+
 def test_get_user_listening_history_with_query(app):
     """Tests listening history from user with a query"""
     with app.app_context():
@@ -0,0 +1,97 @@
+from integration_tests.utils import populate_mock_db
+from src.queries.search_pg import search_pg_full, search_tags_pg, to_prefix_tsquery
+from src.utils.db_session import get_db
+
+test_entities = {
+    "users": [
+        {"user_id": 1, "handle": "deadmau5", "name": "deadmau5", "is_verified": True},
+        {"user_id": 2, "handle": "strobefan", "name": "Strobe Fan"},
+        {"user_id": 3, "handle": "someone", "name": "Someone Else"},
+    ],
+    "tracks": [
+        {"track_id": 1, "owner_id": 1, "title": "Strobe", "genre": "Electronic"},
+        {"track_id": 2, "owner_id": 3, "title": "Strobe Light", "tags": "rock,pop"},
+        {"track_id": 3, "owner_id": 3, "title": "Unrelated", "tags": "Rock"},
+        {
+            "track_id": 4,
+            "owner_id": 3,
+            "title": "Strobe For Sale",
+            "stream_conditions": {"usdc_purchase": {"price": 100}},
+        },
+        {"track_id": 5, "owner_id": 3, "title": "Deleted Strobe", "is_delete": True},
+    ],
+    "playlists": [
+        {"playlist_id": 1, "playlist_owner_id": 1, "playlist_name": "Strobe Mixes"},
+        {
+            "playlist_id": 2,
+            "playlist_owner_id": 3,
+            "playlist_name": "Rock Album",
+            "is_album": True,
+        },
+    ],
+    "playlist_tracks": [{"playlist_id": 2, "track_id": 3}],
+    "reposts": [
+        {"repost_item_id": 2, "repost_type": "track", "user_id": 1},
+        {"repost_item_id": 2, "repost_type": "track", "user_id": 2},
+        {"repost_item_id": 2, "repost_type": "track", "user_id": 3},
+    ],
+    "follows": [{"follower_user_id": 3, "followee_user_id": 2}],
+}
+
+
+def test_to_prefix_tsquery():
+    assert to_prefix_tsquery("Dead mau") == "dead & mau:*"
+    assert to_prefix_tsquery("strobe!") == "strobe:*"
+    assert to_prefix_tsquery("_ ! ") is None
+
+
+def test_search_pg_full(app):
+    with app.app_context():
+        db = get_db()
+        populate_mock_db(db, test_entities)
+
+        found = search_pg_full({"query": "strob", "kind": "all", "limit": 10})
+
+        track_ids = [track["track_id"] for track in found["tracks"]]
+        # purchaseable and deleted tracks are left out by default
+        assert set(track_ids) == {1, 2}
+        assert all(track["user"]["handle"] for track in found["tracks"])
+        assert [user["handle"] for user in found["users"]] == ["strobefan"]
+        assert [p["playlist_name"] for p in found["playlists"]] == ["Strobe Mixes"]
+        assert found["albums"] == []
+
+        found = search_pg_full(
+            {"query": "strobe", "kind": "tracks", "include_purchaseable": True}
+        )
+        assert {track["track_id"] for track in found["tracks"]} == {1, 2, 4}
+
+        found = search_pg_full(
+            {"query": "strobe", "kind": "tracks", "genres": ["electronic"]}
+        )
+        assert [track["track_id"] for track in found["tracks"]] == [1]
+
+        # Prefix and fuzzy matches on the user name and handle
+        found = search_pg_full({"query": "deadmau", "kind": "users"})
+        assert [user["handle"] for user in found["users"]] == ["deadmau5"]
+        found = search_pg_full({"query": "deadmaus", "kind": "users"})
+        assert [user["handle"] for user in found["users"]] == ["deadmau5"]
+
+        # Followed users rank first for the current user
+        found = search_pg_full({"query": "s", "kind": "users", "current_user_id": 3})
+        assert found["users"][0]["handle"] == "strobefan"
+
+
+def test_search_tags_pg(app):
+    with app.app_context():
+        db = get_db()
+        populate_mock_db(db, test_entities)
+
+        found = search_tags_pg({"query": "rock", "kind": "all", "limit": 10})
+
+        assert {track["track_id"] for track in found["tracks"]} == {2, 3}
+        assert [user["handle"] for user in found["users"]] == ["someone"]
+        assert found["playlists"] == []
+        assert [album["playlist_name"] for album in found["albums"]] == ["Rock Album"]
+
+        found = search_tags_pg({"query": "rock", "kind": "tracks", "limit": 1})
+        assert len(found["tracks"]) == 1
@@ -8,6 +8,7 @@ from web3.datastructures import AttributeDict
 from integration_tests.challenges.index_helpers import UpdateTask
 from integration_tests.utils import populate_mock_db
 from src.challenges.challenge_event_bus import ChallengeEventBus, setup_challenge_bus
+from src.models.comments.aggregate_comment import AggregateComment
 from src.models.comments.comment import Comment
 from src.models.comments.comment_mention import CommentMention
 from src.models.comments.comment_notification_setting import CommentNotificationSetting
@@ -343,6 +344,7 @@ def test_comment_reply(app, mocker):
         assert len(comment_thread) == 2
         assert comment_thread[0].comment_id == 2
         assert comment_thread[0].parent_comment_id == 1
+        assert session.query(AggregateComment).get(1).reply_count == 2
 
         # Assert parent comment user receives comment_thread notification
         thread_notifications = (
@@ -794,6 +796,8 @@ def test_comment_reaction(app, mocker):
     """
     Tests comment reactions are saved to db and notifications are created
     Tests that reacting to you own comment does not create a notification
+    Tests that the comment keeps its react count when it is edited
+    Tests that unreacting twice only removes the reaction once
     """
 
     reaction_entities = {
@@ -830,6 +834,48 @@ def test_comment_reaction(app, mocker):
                 )
             },
         ],
+        "CommentUnreact1": [
+            {
+                "args": AttributeDict(
+                    {
+                        "_entityId": 1,
+                        "_entityType": "Comment",
+                        "_userId": 1,
+                        "_action": "Unreact",
+                        "_metadata": f'{{"cid": "", "data": {json.dumps({"entity_id": 1})}}}',
+                        "_signer": "user1wallet",
+                    }
+                )
+            },
+        ],
+        "CommentUnreact2": [
+            {
+                "args": AttributeDict(
+                    {
+                        "_entityId": 1,
+                        "_entityType": "Comment",
+                        "_userId": 1,
+                        "_action": "Unreact",
+                        "_metadata": f'{{"cid": "", "data": {json.dumps({"entity_id": 1})}}}',
+                        "_signer": "user1wallet",
+                    }
+                )
+            },
+        ],
+        "UpdateComment": [
+            {
+                "args": AttributeDict(
+                    {
+                        "_entityId": 1,
+                        "_entityType": "Comment",
+                        "_userId": 2,
+                        "_action": "Update",
+                        "_metadata": f'{{"cid": "", "data": {json.dumps({**comment_metadata, "body": "edited text"})}}}',
+                        "_signer": "user2wallet",
+                    }
+                )
+            },
+        ],
     }
 
     db, index_transaction = setup_test(app, mocker, reaction_entities, tx_receipts)
@@ -839,6 +885,17 @@ def test_comment_reaction(app, mocker):
 
         all_reactions = session.query(CommentReaction).all()
         assert len(all_reactions) == 2
+        reactions = (
+            session.query(CommentReaction)
+            .filter(CommentReaction.is_delete == False)
+            .all()
+        )
+        assert [reaction.user_id for reaction in reactions] == [2]
+        aggregate_comment = session.query(AggregateComment).get(1)
+        assert aggregate_comment.react_count == 1
+        assert aggregate_comment.reply_count == 0
+        comment = session.query(Comment).one()
+        assert comment.text == "edited text"
         reaction_notifications = (
             session.query(Notification)
             .filter(Notification.type == "comment_reaction")
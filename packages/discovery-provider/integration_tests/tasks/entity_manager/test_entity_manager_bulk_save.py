@@ -0,0 +1,188 @@
+import json
+import logging
+import time
+from functools import partial
+
+import pytest
+from web3 import Web3
+from web3.datastructures import AttributeDict
+
+from integration_tests.challenges.index_helpers import UpdateTask
+from integration_tests.utils import populate_mock_db
+from src.models.indexing.revert_block import RevertBlock
+from src.models.playlists.playlist import Playlist
+from src.models.social.follow import Follow
+from src.models.social.repost import Repost
+from src.models.social.save import Save
+from src.models.tracks.track import Track
+from src.tasks.entity_manager import entity_manager
+from src.tasks.entity_manager.entity_manager import entity_manager_update
+from src.utils.db_session import get_db
+
+logger = logging.getLogger(__name__)
+
+NUM_USERS = 100
+NUM_TRACKS = 250
+NUM_PLAYLISTS = 150
+NUM_SAVES = 300
+NUM_REPOSTS = 200
+NUM_FOLLOWS = 100
+
+
+def make_tx(entity_id, entity_type, user_id, action, metadata=""):
+    return [
+        {
+            "args": AttributeDict(
+                {
+                    "_entityId": entity_id,
+                    "_entityType": entity_type,
+                    "_userId": user_id,
+                    "_action": action,
+                    "_metadata": metadata,
+                    "_signer": f"user{user_id}wallet",
+                }
+            )
+        }
+    ]
+
+
+def make_synthetic_block():
+    """A block of 1,000 mixed track/playlist/social EM transactions"""
+    tx_receipts = {}
+    for track_id in range(1, NUM_TRACKS + 1):
+        owner_id = track_id % NUM_USERS + 1
+        metadata = json.dumps({"title": f"track {track_id} updated"})
+        tx_receipts[f"UpdateTrack{track_id}Tx"] = make_tx(
+            track_id,
+            "Track",
+            owner_id,
+            "Update",
+            f'{{"cid": "QmUpdateTrack{track_id}", "data": {metadata}}}',
+        )
+    for playlist_id in range(1, NUM_PLAYLISTS + 1):
+        owner_id = playlist_id % NUM_USERS + 1
+        metadata = json.dumps(
+            {
+                "playlist_contents": {"track_ids": []},
+                "description": "",
+                "playlist_image_sizes_multihash": "",
+                "playlist_name": f"playlist {playlist_id} updated",
+                "is_private": False,
+            }
+        )
+        tx_receipts[f"UpdatePlaylist{playlist_id}Tx"] = make_tx(
+            playlist_id,
+            "Playlist",
+            owner_id,
+            "Update",
+            f'{{"cid": "QmUpdatePlaylist{playlist_id}", "data": {metadata}}}',
+        )
+    for i in range(NUM_SAVES):
+        tx_receipts[f"SaveTrack{i}Tx"] = make_tx(
+            i % NUM_TRACKS + 1, "Track", i // NUM_TRACKS + 1, "Save"
+        )
+    for i in range(NUM_REPOSTS):
+        tx_receipts[f"RepostPlaylist{i}Tx"] = make_tx(
+            i % NUM_PLAYLISTS + 1, "Playlist", i // NUM_PLAYLISTS + 3, "Repost"
+        )
+    for i in range(NUM_FOLLOWS):
+        follower_id = i + 1
+        followee_id = (i + 1) % NUM_USERS + 1
+        tx_receipts[f"FollowUser{i}Tx"] = make_tx(
+            followee_id, "User", follower_id, "Follow"
+        )
+    return tx_receipts
+
+
+@pytest.mark.parametrize("bulk", [False, True])
+def test_entity_manager_bulk_save_benchmark(app, mocker, bulk):
+    "Replays a synthetic block of 1,000 EM transactions and reports ms per block"
+    bus_mock = mocker.patch(
+        "src.challenges.challenge_event_bus.ChallengeEventBus", autospec=True
+    )
+
+    with app.app_context():
+        db = get_db()
+        web3 = Web3()
+        update_task = UpdateTask(web3, challenge_event_bus=bus_mock)
+
+    tx_receipts = make_synthetic_block()
+    assert len(tx_receipts) == 1000
+
+    entity_manager_txs = [
+        AttributeDict({"transactionHash": update_task.web3.to_bytes(text=tx_receipt)})
+        for tx_receipt in tx_receipts
+    ]
+
+    def get_events_side_effect(_, tx_receipt):
+        return tx_receipts[tx_receipt["transactionHash"].decode("utf-8")]
+
+    mocker.patch(
+        "src.tasks.entity_manager.entity_manager.get_entity_manager_events_tx",
+        side_effect=get_events_side_effect,
+        autospec=True,
+    )
+    mocker.patch(
+        "src.tasks.entity_manager.entity_manager.save_new_records",
+        partial(entity_manager.save_new_records, bulk=bulk),
+    )
+
+    entities = {
+        "users": [
+            {"user_id": i, "handle": f"user-{i}", "wallet": f"user{i}wallet"}
+            for i in range(1, NUM_USERS + 1)
+        ],
+        "tracks": [
+            {"track_id": i, "owner_id": i % NUM_USERS + 1}
+            for i in range(1, NUM_TRACKS + 1)
+        ],
+        "playlists": [
+            {"playlist_id": i, "playlist_owner_id": i % NUM_USERS + 1}
+            for i in range(1, NUM_PLAYLISTS + 1)
+        ],
+    }
+    populate_mock_db(db, entities)
+
+    with db.scoped_session() as session:
+        start_time = time.time()
+        entity_manager_update(
+            update_task,
+            session,
+            entity_manager_txs,
+            block_number=1,
+            block_timestamp=1585336422,
+            block_hash=hex(0),
+        )
+        session.flush()
+        elapsed_ms = (time.time() - start_time) * 1000
+        logger.info(
+            f"test_entity_manager_bulk_save.py | bulk={bulk} {elapsed_ms:.1f} ms per block"
+        )
+
+    with db.scoped_session() as session:
+        assert session.query(Track).count() == NUM_TRACKS
+        assert session.query(Track).filter(Track.is_current == True).count() == (
+            NUM_TRACKS
+        )
+        assert (
+            session.query(Track).filter(Track.title.like("track % updated")).count()
+            == NUM_TRACKS
+        )
+        assert session.query(Playlist).filter(
+            Playlist.playlist_name.like("playlist % updated")
+        ).count() == (NUM_PLAYLISTS)
+        assert session.query(Save).filter(Save.is_current == True).count() == (
+            NUM_SAVES
+        )
+        assert session.query(Repost).filter(Repost.is_current == True).count() == (
+            NUM_REPOSTS
+        )
+        assert session.query(Follow).filter(Follow.is_current == True).count() == (
+            NUM_FOLLOWS
+        )
+
+        revert_block = (
+            session.query(RevertBlock).filter(RevertBlock.blocknumber == 1).one()
+        )
+        assert len(revert_block.prev_records["tracks"]) == NUM_TRACKS
+        assert len(revert_block.prev_records["playlists"]) == NUM_PLAYLISTS
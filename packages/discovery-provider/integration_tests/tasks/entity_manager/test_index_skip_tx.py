@@ -9,6 +9,7 @@ from integration_tests.utils import populate_mock_db_blocks
 from src.challenges.challenge_event_bus import ChallengeEventBus, setup_challenge_bus
 from src.models.indexing.skipped_transaction import SkippedTransaction
 from src.tasks.entity_manager.entity_manager import entity_manager_update
+from src.tasks.entity_manager.utils import Action, EntityType
 from src.utils.db_session import get_db
 from src.utils.redis_connection import get_redis
 
@@ -16,11 +17,15 @@ logger = logging.getLogger(__name__)
 
 
 def test_skip_tx(app, mocker):
-    mocker.patch(
+    create_user_mock = mocker.patch(
         "src.tasks.entity_manager.entity_manager.create_user",
         side_effect=Exception("Skip tx error"),
         autospec=True,
     )
+    mocker.patch.dict(
+        "src.tasks.entity_manager.entity_manager.entity_manager_handlers",
+        {(Action.CREATE.value, EntityType.USER.value): create_user_mock},
+    )
 
     def get_events_side_effect(_, tx_receipt):
         return tx_receipts[tx_receipt["transactionHash"].decode("utf-8")]
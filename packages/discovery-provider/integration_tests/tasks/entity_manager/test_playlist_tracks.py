@@ -11,6 +11,7 @@ from integration_tests.utils import populate_mock_db
 from src.challenges.challenge_event_bus import ChallengeEventBus, setup_challenge_bus
 from src.models.playlists.playlist_track import PlaylistTrack
 from src.models.tracks.track import Track
+from src.queries.get_unpopulated_tracks import get_unpopulated_tracks
 from src.tasks.entity_manager.entity_manager import entity_manager_update
 from src.tasks.entity_manager.utils import PLAYLIST_ID_OFFSET
 from src.utils.db_session import get_db
@@ -804,3 +805,27 @@ def test_add_track_to_multiple_playlists(app, mocker):
             .playlists_containing_track
             == []
         )
+
+
+def test_add_tracks_to_playlist_invalidates_cached_tracks(app, mocker):
+    db, update_task, entity_manager_txs = setup_db(
+        app, mocker, entities, add_tracks_to_playlist_tx_receipts
+    )
+
+    with db.scoped_session() as session:
+        # populate the track cache before the playlist edit
+        tracks = get_unpopulated_tracks(session, [20])
+        assert tracks[0]["playlists_containing_track"] == []
+
+        entity_manager_update(
+            update_task,
+            session,
+            entity_manager_txs,
+            block_number=0,
+            block_timestamp=1585336422,
+            block_hash=hex(0),
+        )
+
+    with db.scoped_session() as session:
+        tracks = get_unpopulated_tracks(session, [20])
+        assert tracks[0]["playlists_containing_track"] == [PLAYLIST_ID_OFFSET]
@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta
+
+from integration_tests.utils import populate_mock_db
+from src.queries.get_notifications import (
+    default_valid_notification_types,
+    get_notification_groups,
+    notification_groups_sql,
+    notification_inbox_groups_sql,
+)
+from src.tasks.backfill_notification_inbox import _backfill_notification_inbox
+from src.utils.db_session import get_db
+from src.utils.redis_connection import get_redis
+
+t1 = datetime(2020, 10, 10, 10, 35, 0)
+t2 = t1 - timedelta(hours=1)
+t3 = t1 - timedelta(hours=2)
+t4 = t1 - timedelta(hours=3)
+
+
+def get_groups(session, sql, user_id, limit=20, timestamp=None, group_id=None):
+    rows = session.execute(
+        sql,
+        {
+            "user_id": user_id,
+            "limit": limit,
+            "timestamp_offset": timestamp,
+            "group_id_offset": group_id,
+            "valid_types": default_valid_notification_types,
+        },
+    )
+    return [(*row[:2], sorted(row[2]), *row[3:]) for row in rows]
+
+
+def assert_inbox_matches(session, user_id):
+    expected = get_groups(session, notification_groups_sql, user_id)
+    assert get_groups(session, notification_inbox_groups_sql, user_id) == expected
+
+    # Paging one group at a time returns the same groups
+    paged = []
+    cursor = {}
+    while True:
+        page = get_groups(
+            session, notification_inbox_groups_sql, user_id, limit=1, **cursor
+        )
+        if not page:
+            break
+        paged.extend(page)
+        group_id, notification_ids = page[0][1], page[0][2]
+        timestamp = session.execute(
+            "SELECT min(timestamp) FROM notification WHERE id = ANY(:ids)",
+            {"ids": notification_ids},
+        ).scalar()
+        cursor = {"timestamp": timestamp, "group_id": group_id}
+    assert paged == expected
+
+
+def test_backfill_notification_inbox(app):
+    with app.app_context():
+        db = get_db()
+        redis = get_redis()
+
+        populate_mock_db(
+            db,
+            {
+                "users": [
+                    {"user_id": i + 1, "created_at": t4 - timedelta(days=1)}
+                    for i in range(6)
+                ],
+                "tracks": [{"track_id": 1, "owner_id": 1}],
+                "notification_seens": [{"user_id": 1, "seen_at": t3}],
+                "notification": [
+                    {
+                        "type": "announcement",
+                        "group_id": "announcement:blocknumber:1",
+                        "specifier": "1",
+                        "timestamp": t2,
+                        "data": {"title": "title", "short_description": "desc"},
+                        "user_ids": [],
+                    }
+                ],
+            },
+        )
+        populate_mock_db(
+            db,
+            {
+                "follows": [
+                    {"follower_user_id": 2, "followee_user_id": 1, "created_at": t1}
+                ],
+                "reposts": [
+                    {
+                        "user_id": 3,
+                        "repost_item_id": 1,
+                        "repost_type": "track",
+                        "created_at": t2,
+                    }
+                ],
+                "saves": [
+                    {
+                        "user_id": 4,
+                        "save_item_id": 1,
+                        "save_type": "track",
+                        "created_at": t4,
+                    }
+                ],
+            },
+        )
+
+        with db.scoped_session() as session:
+            # Users without an inbox are read from notification and queued
+            expected = get_notification_groups(session, {"user_id": 1})
+            assert len(expected) == 4
+            assert _backfill_notification_inbox(session, redis) == 1
+
+        with db.scoped_session() as session:
+            assert len(get_notification_groups(session, {"user_id": 1})) == 4
+            assert_inbox_matches(session, 1)
+
+        # New notifications are fanned out to the inbox, and grouped by the
+        # interval they were seen in
+        populate_mock_db(
+            db,
+            {
+                "follows": [
+                    {"follower_user_id": 5, "followee_user_id": 1, "created_at": t1}
+                ],
+                "notification_seens": [{"user_id": 1, "seen_at": t1}],
+            },
+            block_offset=100,
+        )
+        populate_mock_db(
+            db,
+            {
+                "follows": [
+                    {
+                        "follower_user_id": 6,
+                        "followee_user_id": 1,
+                        "created_at": t1 + timedelta(hours=1),
+                    }
+                ]
+            },
+            block_offset=200,
+        )
+        with db.scoped_session() as session:
+            assert_inbox_matches(session, 1)
+            groups = get_notification_groups(session, {"user_id": 1})
+            assert [(g["group_id"], g["is_seen"], g["count"]) for g in groups[:2]] == [
+                ("follow:1", False, 1),
+                ("follow:1", True, 2),
+            ]
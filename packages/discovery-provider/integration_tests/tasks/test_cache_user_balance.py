@@ -0,0 +1,218 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from eth_typing import ChecksumAddress
+from solders.pubkey import Pubkey
+from web3 import Web3
+
+from integration_tests.utils import populate_mock_db
+from src.models.users.user_balance import UserBalance
+from src.models.users.user_balance_change import UserBalanceChange
+from src.queries.get_balances import (
+    IMMEDIATE_REFRESH_REDIS_PREFIX,
+    LAZY_REFRESH_REDIS_PREFIX,
+    LEGACY_LAZY_REFRESH_REDIS_PREFIX,
+    enqueue_immediate_balance_refresh,
+    enqueue_lazy_balance_refresh,
+)
+from src.tasks.cache_user_balance import (
+    drain_legacy_lazy_refresh_queue,
+    get_associated_token_account,
+    refresh_user_ids,
+)
+from src.utils.db_session import get_db
+from src.utils.redis_connection import get_redis
+
+BLOCKNUMBER = 1000
+
+
+def _wallet(i: int) -> ChecksumAddress:
+    return Web3.to_checksum_address(f"0x{i:040x}")
+
+
+def _uint256_abi(name: str):
+    return [
+        {
+            "name": name,
+            "type": "function",
+            "stateMutability": "view",
+            "inputs": [{"name": "account", "type": "address"}],
+            "outputs": [{"name": "", "type": "uint256"}],
+        }
+    ]
+
+
+token_contract = Web3().eth.contract(
+    address=_wallet(101), abi=_uint256_abi("balanceOf")
+)
+delegate_manager_contract = Web3().eth.contract(
+    address=_wallet(102), abi=_uint256_abi("getTotalDelegatorStake")
+)
+staking_contract = Web3().eth.contract(
+    address=_wallet(103), abi=_uint256_abi("totalStakedFor")
+)
+
+
+class MockEthProvider:
+    def __init__(self, values):
+        self.values = values
+        self.batches = []
+
+    def make_batch_request(self, calls):
+        self.batches.append(calls)
+        responses = []
+        for method, (call, block) in calls:
+            assert method == "eth_call"
+            assert block == hex(BLOCKNUMBER)
+            value = self.values.get((call["to"], call["data"]), 0)
+            responses.append({"result": hex(value)})
+        return responses
+
+
+def test_refresh_user_ids_batches_reads(app):
+    with app.app_context():
+        db = get_db()
+        redis = get_redis()
+
+    bank_account = Pubkey.from_string("Ewkv3JahEFRKkcJmpoKB7pXbnUHwjAyXiwEo4ZY2rezQ")
+    sol_wallet = "FbfwE8ZmVdwUbbEXdq4ofhuUEiAxeSk5kaoYrJJekpnZ"
+    sol_token_account = get_associated_token_account(sol_wallet)
+
+    populate_mock_db(
+        db,
+        {
+            "users": [
+                {"user_id": 1, "wallet": _wallet(1).lower()},
+                {"user_id": 2, "wallet": _wallet(2).lower()},
+                {"user_id": 3, "wallet": _wallet(3).lower()},
+                {"user_id": 4, "wallet": _wallet(4).lower()},
+            ],
+            "associated_wallets": [
+                {"user_id": 1, "wallet": _wallet(11), "chain": "eth"},
+                {"user_id": 3, "wallet": sol_wallet, "chain": "sol"},
+            ],
+            "user_bank_accounts": [
+                {
+                    "ethereum_address": _wallet(2).lower(),
+                    "bank_account": str(bank_account),
+                }
+            ],
+        },
+    )
+    with db.scoped_session() as session:
+        # User 4 was refreshed recently so is dropped from the lazy queue
+        session.add(
+            UserBalance(
+                user_id=4,
+                balance="4",
+                associated_wallets_balance="0",
+                associated_sol_wallets_balance="0",
+                created_at=datetime.now() - timedelta(minutes=10),
+                updated_at=datetime.now(),
+            )
+        )
+
+    enqueue_immediate_balance_refresh(redis, [1, 2])
+    enqueue_lazy_balance_refresh(redis, [3, 4])
+    enqueue_lazy_balance_refresh(redis, [3])
+    assert redis.zscore(LAZY_REFRESH_REDIS_PREFIX, 3) == 2
+
+    eth_values = {
+        (
+            token_contract.address,
+            token_contract.encodeABI("balanceOf", [_wallet(1)]),
+        ): 1,
+        (
+            token_contract.address,
+            token_contract.encodeABI("balanceOf", [_wallet(11)]),
+        ): 10,
+        (
+            delegate_manager_contract.address,
+            delegate_manager_contract.encodeABI(
+                "getTotalDelegatorStake", [_wallet(11)]
+            ),
+        ): 20,
+        (
+            staking_contract.address,
+            staking_contract.encodeABI("totalStakedFor", [_wallet(11)]),
+        ): 30,
+        (
+            token_contract.address,
+            token_contract.encodeABI("balanceOf", [_wallet(2)]),
+        ): 2,
+    }
+    eth_web3 = SimpleNamespace(
+        provider=MockEthProvider(eth_values),
+        eth=SimpleNamespace(block_number=BLOCKNUMBER),
+    )
+
+    # getMultipleAccounts returns None for accounts that do not exist
+    solana_client = MagicMock()
+    solana_client.get_multiple_accounts.side_effect = lambda accounts, **kwargs: (
+        SimpleNamespace(
+            value=[
+                (
+                    SimpleNamespace(data=(500).to_bytes(8, "little"))
+                    if account == bank_account
+                    else (
+                        SimpleNamespace(data=(300).to_bytes(8, "little"))
+                        if account == sol_token_account
+                        else None
+                    )
+                )
+                for account in accounts
+            ]
+        )
+    )
+
+    refresh_user_ids(
+        redis,
+        db,
+        token_contract,
+        delegate_manager_contract,
+        staking_contract,
+        eth_web3,
+        solana_client,
+    )
+
+    # All eth reads share one batch and all token accounts one page
+    assert len(eth_web3.provider.batches) == 1
+    assert len(eth_web3.provider.batches[0]) == 6
+    assert solana_client.get_multiple_accounts.call_count == 1
+
+    with db.scoped_session() as session:
+        balances = {
+            balance.user_id: balance for balance in session.query(UserBalance).all()
+        }
+        assert balances[1].balance == "1"
+        assert balances[1].associated_wallets_balance == "60"
+        assert balances[2].balance == "2"
+        assert balances[2].waudio == "500"
+        assert balances[3].balance == "0"
+        assert balances[3].associated_sol_wallets_balance == "300"
+        assert balances[4].balance == "4"
+
+        changes = {
+            change.user_id: change for change in session.query(UserBalanceChange).all()
+        }
+        assert set(changes.keys()) == {1, 2, 3}
+        assert changes[1].blocknumber == BLOCKNUMBER
+        assert changes[1].current_balance == "61"
+
+    assert redis.scard(IMMEDIATE_REFRESH_REDIS_PREFIX) == 0
+    assert redis.zcard(LAZY_REFRESH_REDIS_PREFIX) == 0
+
+
+def test_drain_legacy_lazy_refresh_queue(app):
+    with app.app_context():
+        redis = get_redis()
+
+    enqueue_lazy_balance_refresh(redis, [1])
+    redis.sadd(LEGACY_LAZY_REFRESH_REDIS_PREFIX, 1, 2)
+
+    drain_legacy_lazy_refresh_queue(redis)
+
+    assert not redis.exists(LEGACY_LAZY_REFRESH_REDIS_PREFIX)
+    assert redis.zscore(LAZY_REFRESH_REDIS_PREFIX, 1) == 2
+    assert redis.zscore(LAZY_REFRESH_REDIS_PREFIX, 2) == 1
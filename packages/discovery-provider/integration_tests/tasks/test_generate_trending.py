@@ -5,6 +5,7 @@ from src.models.indexing.block import Block
 from src.models.social.play import Play
 from src.models.tracks.track import Track
 from src.tasks.generate_trending import get_listen_counts
+from src.tasks.index_hourly_play_counts import _index_hourly_play_counts
 from src.utils.db_session import get_db
 
 logger = logging.getLogger(__name__)
@@ -79,13 +80,17 @@ def setup_trending(db, date):
             session.flush()
             session.add(track)
 
-        # seed plays
-        for i, play_meta in enumerate(test_plays):
+        # seed plays, with ids after the rollup's initial checkpoint of 0
+        for i, play_meta in enumerate(test_plays, start=1):
             item_id = play_meta.get("item_id")
             play = Play(
                 id=i, play_item_id=item_id, created_at=play_meta.get("created_at", date)
             )
             session.add(play)
+        session.flush()
+
+        # windowed listen counts are read from the hourly play rollup
+        _index_hourly_play_counts(session)
 
 
 # Helper to sort results before validating
@@ -0,0 +1,110 @@
+import logging
+from datetime import datetime
+from unittest import mock
+
+from integration_tests.utils import populate_mock_db
+from src.challenges.challenge_event import ChallengeEvent
+from src.models.social.play import Play
+from src.tasks.core.gen.protocol_pb2 import BlockResponse
+from src.tasks.index_core_plays import index_core_plays
+from src.utils.db_session import get_db
+
+logger = logging.getLogger(__name__)
+
+
+def add_plays_tx(block: BlockResponse, plays):
+    tx = block.transaction_responses.add()
+    for user_id, track_id, timestamp in plays:
+        play = tx.transaction.plays.plays.add()
+        play.user_id = user_id
+        play.track_id = str(track_id)
+        play.timestamp.FromDatetime(timestamp)
+        play.signature = f"{user_id}:{track_id}:{timestamp.timestamp()}"
+
+
+@mock.patch("src.challenges.challenge_event_bus.ChallengeEventBus", autospec=True)
+def test_index_core_plays(bus_mock: mock.MagicMock, app):
+    with app.app_context():
+        db = get_db()
+
+    populate_mock_db(
+        db,
+        {
+            "users": [{"user_id": 1}, {"user_id": 2}, {"user_id": 3}],
+            "tracks": [{"track_id": 1, "owner_id": 3}],
+        },
+    )
+
+    first_listen = datetime(2025, 1, 1, 10)
+    last_listen = datetime(2025, 1, 1, 11)
+    block = BlockResponse(height=10)
+    add_plays_tx(block, [("1", 1, first_listen), ("1", 1, last_listen)])
+    add_plays_tx(block, [("1", 1, first_listen), ("anonymous", 1, first_listen)])
+    add_plays_tx(block, [("2", 1, first_listen)])
+
+    with db.scoped_session() as session:
+        indexed_slot = index_core_plays(
+            logger=mock.MagicMock(),
+            session=session,
+            challenge_bus=bus_mock,
+            latest_indexed_slot=4,
+            block=block,
+        )
+        assert indexed_slot == 5
+
+        plays = session.query(Play).all()
+        assert len(plays) == 5
+        assert {play.slot for play in plays} == {5}
+        assert len([play for play in plays if play.user_id is None]) == 1
+
+    # One event per (user, track) in the block, at the latest listen
+    bus_mock.dispatch.assert_has_calls(
+        [
+            mock.call(
+                ChallengeEvent.track_listen,
+                5,
+                last_listen,
+                1,
+                {"created_at": last_listen.timestamp()},
+            ),
+            mock.call(
+                ChallengeEvent.track_played,
+                5,
+                last_listen,
+                3,
+                {"created_at": last_listen.timestamp(), "listener_id": 1},
+            ),
+            mock.call(
+                ChallengeEvent.track_listen,
+                5,
+                first_listen,
+                2,
+                {"created_at": first_listen.timestamp()},
+            ),
+            mock.call(
+                ChallengeEvent.track_played,
+                5,
+                first_listen,
+                3,
+                {"created_at": first_listen.timestamp(), "listener_id": 2},
+            ),
+        ]
+    )
+    assert bus_mock.dispatch.call_count == 4
+
+
+def test_index_core_plays_without_plays(app):
+    with app.app_context():
+        db = get_db()
+
+    block = BlockResponse(height=10)
+    with db.scoped_session() as session:
+        indexed_slot = index_core_plays(
+            logger=mock.MagicMock(),
+            session=session,
+            challenge_bus=mock.MagicMock(),
+            latest_indexed_slot=4,
+            block=block,
+        )
+        assert indexed_slot is None
+        assert session.query(Play).count() == 0
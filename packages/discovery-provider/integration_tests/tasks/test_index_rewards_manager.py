@@ -14,10 +14,11 @@ from src.models.users.audio_transactions_history import (
 )
 from src.solana.solana_client_manager import SolanaClientManager
 from src.tasks.index_rewards_manager import (
-    fetch_and_parse_sol_rewards_transfer_instruction,
+    parse_sol_rewards_transfer_instruction,
     parse_transfer_instruction_data,
     parse_transfer_instruction_id,
     process_batch_sol_reward_manager_txs,
+    process_transaction_signatures,
 )
 from src.utils.config import shared_config
 from src.utils.db_session import get_db
@@ -255,13 +256,13 @@ def test_fetch_and_parse_sol_rewards_transfer_instruction(app):  # pylint: disab
         redis = get_redis()
 
     solana_client_manager_mock = create_autospec(SolanaClientManager)
-    solana_client_manager_mock.get_sol_tx_info.return_value = mock_tx_info
+    solana_client_manager_mock.get_sol_tx_infos.side_effect = lambda tx_sigs, redis: {
+        tx_sig: mock_tx_info for tx_sig in tx_sigs
+    }
 
     first_tx_sig = "tx_sig_one"
     second_tx_sig = "tx_sig_two"
-    parsed_tx = fetch_and_parse_sol_rewards_transfer_instruction(
-        solana_client_manager_mock, first_tx_sig, redis
-    )
+    parsed_tx = parse_sol_rewards_transfer_instruction(mock_tx_info, first_tx_sig)
     assert (
         parsed_tx["transfer_instruction"]["amount"]  # pylint: disable=E1136
         == 10000000000
@@ -293,8 +294,15 @@ def test_fetch_and_parse_sol_rewards_transfer_instruction(app):  # pylint: disab
         ],
     }
 
+    # Fetched in a batch through the solana client manager and saved
+    last_tx_sig = process_transaction_signatures(
+        solana_client_manager_mock, db, redis, [[first_tx_sig]]
+    )
+    assert last_tx_sig == first_tx_sig
+    solana_client_manager_mock.get_sol_tx_infos.assert_called_once_with(
+        [first_tx_sig], redis
+    )
     with db.scoped_session() as session:
-        process_batch_sol_reward_manager_txs(session, [parsed_tx], redis)
         disbursments = session.query(ChallengeDisbursement).all()
         assert len(disbursments) == 1
         disbursement = disbursments[0]
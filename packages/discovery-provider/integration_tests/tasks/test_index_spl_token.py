@@ -20,7 +20,7 @@ from src.tasks.index_spl_token import (
     decode_memo_and_extract_vendor,
     parse_memo_instruction,
     parse_sol_tx_batch,
-    parse_spl_token_transaction,
+    parse_spl_token_transaction_info,
 )
 from src.utils.config import shared_config
 from src.utils.db_session import get_db
@@ -186,12 +186,8 @@ mock_confirmed_signature_for_address = Signature.from_string(
 
 
 def test_parse_spl_token_transaction_no_results():
-    solana_client_manager_mock = create_autospec(SolanaClientManager)
-    solana_client_manager_mock.get_sol_tx_info.return_value = (
-        mock_create_account_tx_info
-    )
-    tx_infos = parse_spl_token_transaction(
-        solana_client_manager_mock, mock_confirmed_signature_for_address
+    tx_infos = parse_spl_token_transaction_info(
+        mock_create_account_tx_info, mock_confirmed_signature_for_address
     )
     assert tx_infos == None
 
@@ -306,10 +302,8 @@ mock_transfer_tx_info = GetTransactionResp.from_json(
 
 
 def test_parse_spl_token_transaction():
-    solana_client_manager_mock = create_autospec(SolanaClientManager)
-    solana_client_manager_mock.get_sol_tx_info.return_value = mock_transfer_tx_info
-    tx_infos = parse_spl_token_transaction(
-        solana_client_manager_mock, mock_confirmed_signature_for_address
+    tx_infos = parse_spl_token_transaction_info(
+        mock_transfer_tx_info, mock_confirmed_signature_for_address
     )
     assert tx_infos[0]["user_bank"] == "7CyoHxibpPrTVc2AsmoSq7gRoDwnwN7LRnHDcR4yWVf9"
     assert tx_infos[0]["root_accounts"] == [
@@ -1616,10 +1610,8 @@ def test_parse_memo_instruction():
 
 
 def test_parse_spl_token_purchase_transactions():
-    solana_client_manager_mock = create_autospec(SolanaClientManager)
-    solana_client_manager_mock.get_sol_tx_info.return_value = mock_purchase_tx_info_1
-    tx_infos = parse_spl_token_transaction(
-        solana_client_manager_mock, mock_confirmed_signature_for_address
+    tx_infos = parse_spl_token_transaction_info(
+        mock_purchase_tx_info_1, mock_confirmed_signature_for_address
     )
     assert tx_infos[0]["user_bank"] == "7dw7W4Yv7F1uWb9dVH1CFPm39mePyypuCji2zxcFA556"
     assert tx_infos[0]["root_accounts"] == [
@@ -1630,9 +1622,8 @@ def test_parse_spl_token_purchase_transactions():
         "C4qrWm6kkLwUNExA2Ldt6uXLroRfcTGXJLx1zGvEt5DB",
         "7dw7W4Yv7F1uWb9dVH1CFPm39mePyypuCji2zxcFA556",
     ]
-    solana_client_manager_mock.get_sol_tx_info.return_value = mock_purchase_tx_info_2
-    tx_infos = parse_spl_token_transaction(
-        solana_client_manager_mock, mock_confirmed_signature_for_address
+    tx_infos = parse_spl_token_transaction_info(
+        mock_purchase_tx_info_2, mock_confirmed_signature_for_address
     )
     assert tx_infos[0]["user_bank"] == "HTmKqU5T3uhzz6heG47awyVuzcbWu9o4rE1HtrXv5ACg"
     assert tx_infos[0]["root_accounts"] == [
@@ -1650,10 +1641,8 @@ def test_parse_spl_token_purchase_transactions():
     "9LzCMqDgTKYz9Drzqnpgee3SGa89up3a247ypMj2xrqM",
 )
 def test_parse_spl_token_v0_transaction():
-    solana_client_manager_mock = create_autospec(SolanaClientManager)
-    solana_client_manager_mock.get_sol_tx_info.return_value = mock_spl_tx_info_v0
-    tx_infos = parse_spl_token_transaction(
-        solana_client_manager_mock, mock_confirmed_signature_spl_tx_info_v0
+    tx_infos = parse_spl_token_transaction_info(
+        mock_spl_tx_info_v0, mock_confirmed_signature_spl_tx_info_v0
     )
     assert tx_infos[0]["user_bank"] == "CmMV3U4QYsykzM1fEYi3zoZh6A3ktmTKQpJxgignK1YR"
     assert tx_infos[0]["root_accounts"] == [
@@ -1667,13 +1656,19 @@ def test_parse_spl_token_v0_transaction():
     assert tx_infos[0]["sender_wallet"] == None
 
 
+def mock_get_sol_tx_infos(solana_client_manager_mock, tx_info):
+    solana_client_manager_mock.get_sol_tx_infos.side_effect = lambda tx_sigs, redis: {
+        tx_sig: tx_info for tx_sig in tx_sigs
+    }
+
+
 def test_fetch_and_parse_sol_rewards_transfer_instruction(app):  # pylint: disable=W0621
     with app.app_context():
         db = get_db()
         redis = get_redis()
 
     solana_client_manager_mock = create_autospec(SolanaClientManager)
-    solana_client_manager_mock.get_sol_tx_info.return_value = mock_transfer_tx_info
+    mock_get_sol_tx_infos(solana_client_manager_mock, mock_transfer_tx_info)
 
     test_entries = {
         "users": [
@@ -1760,7 +1755,7 @@ def test_fetch_and_parse_sol_rewards_transfer_instruction(app):  # pylint: disab
             }
         )
     )
-    solana_client_manager_mock.get_sol_tx_info.return_value = mock_purchase_tx_info_1
+    mock_get_sol_tx_infos(solana_client_manager_mock, mock_purchase_tx_info_1)
     parse_sol_tx_batch(
         db,
         solana_client_manager_mock,
@@ -1806,9 +1801,7 @@ def test_fetch_and_parse_sol_rewards_transfer_instruction(app):  # pylint: disab
             }
         )
     )
-    solana_client_manager_mock.get_sol_tx_info.return_value = (
-        mock_purchase_tx_info_invalid
-    )
+    mock_get_sol_tx_infos(solana_client_manager_mock, mock_purchase_tx_info_invalid)
     parse_sol_tx_batch(
         db,
         solana_client_manager_mock,
@@ -6,6 +6,9 @@ from integration_tests.utils import populate_mock_db
 from src.challenges.challenge_event_bus import ChallengeEventBus, setup_challenge_bus
 from src.models.notifications.notification import Notification
 from src.models.playlists.playlist_trending_score import PlaylistTrendingScore
+from src.queries.generate_unpopulated_trending_tracks import (
+    get_materialized_trending_track_ids,
+)
 from src.tasks.core.gen.protocol_pb2 import BlockResponse, NodeInfoResponse
 from src.tasks.index_trending import (
     find_min_block_above_timestamp,
@@ -14,6 +17,8 @@ from src.tasks.index_trending import (
     index_trending,
     set_last_trending_datetime,
 )
+from src.trending_strategies.trending_strategy_factory import TrendingStrategyFactory
+from src.trending_strategies.trending_type_and_version import TrendingType
 from src.utils.config import shared_config
 from src.utils.db_session import get_db
 from src.utils.redis_connection import get_redis
@@ -282,3 +287,10 @@ def test_index_trending(app, mocker):
                 )
 
             assert len(playlist_scores) == 2
+
+            # ordered trending ids are materialized for reads to slice
+            strategy = TrendingStrategyFactory().get_strategy(TrendingType.TRACKS)
+            track_ids = get_materialized_trending_track_ids(
+                strategy, None, "week", exclude_gated=False
+            )
+            assert track_ids[:5] == [9, 8, 7, 6, 5]
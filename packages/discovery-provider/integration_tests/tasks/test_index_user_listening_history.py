@@ -1,10 +1,10 @@
 import logging
 from datetime import datetime, timedelta
-from typing import List
+from types import SimpleNamespace
 
 from integration_tests.utils import populate_mock_db
 from src.models.indexing.indexing_checkpoints import IndexingCheckpoint
-from src.models.users.user_listening_history import UserListeningHistory
+from src.models.users.user_listening_history_track import UserListeningHistoryTrack
 from src.tasks.user_listening_history.index_user_listening_history import (
     USER_LISTENING_HISTORY_TABLE_NAME,
     _index_user_listening_history,
@@ -23,6 +23,33 @@ TIMESTAMP_4 = datetime(2014, 4, 4)
 TIMESTAMP_5 = datetime(2015, 5, 5)
 
 
+def get_user_listening_histories(session):
+    """Groups the listening history rows by user, most recent listen first"""
+    listens = (
+        session.query(UserListeningHistoryTrack)
+        .order_by(
+            UserListeningHistoryTrack.user_id,
+            UserListeningHistoryTrack.last_listened_at.desc(),
+            UserListeningHistoryTrack.track_id.desc(),
+        )
+        .all()
+    )
+    results = []
+    for listen in listens:
+        if not results or results[-1].user_id != listen.user_id:
+            results.append(
+                SimpleNamespace(user_id=listen.user_id, listening_history=[])
+            )
+        results[-1].listening_history.append(
+            {
+                "track_id": listen.track_id,
+                "timestamp": str(listen.last_listened_at),
+                "play_count": listen.play_count,
+            }
+        )
+    return results
+
+
 # Tests
 def test_index_user_listening_history_populate_play_count(app):
     """Tests populating user_listening_history from empty"""
@@ -64,11 +91,7 @@ def test_index_user_listening_history_populate_play_count(app):
     with db.scoped_session() as session:
         _index_user_listening_history(session)
 
-        results: List[UserListeningHistory] = (
-            session.query(UserListeningHistory)
-            .order_by(UserListeningHistory.user_id)
-            .all()
-        )
+        results = get_user_listening_histories(session)
 
         assert len(results) == 3
 
@@ -152,11 +175,7 @@ def test_index_user_listening_history_update_play_count(app):
         _index_user_listening_history(session)
 
     with db.scoped_session() as session:
-        results: List[UserListeningHistory] = (
-            session.query(UserListeningHistory)
-            .order_by(UserListeningHistory.user_id)
-            .all()
-        )
+        results = get_user_listening_histories(session)
 
         assert len(results) == 2
 
@@ -218,11 +237,7 @@ def test_index_user_listening_history_populate(app):
     with db.scoped_session() as session:
         _index_user_listening_history(session)
 
-        results: List[UserListeningHistory] = (
-            session.query(UserListeningHistory)
-            .order_by(UserListeningHistory.user_id)
-            .all()
-        )
+        results = get_user_listening_histories(session)
 
         assert len(results) == 3
 
@@ -338,11 +353,7 @@ def test_index_user_listening_history_update(app):
         _index_user_listening_history(session)
 
     with db.scoped_session() as session:
-        results: List[UserListeningHistory] = (
-            session.query(UserListeningHistory)
-            .order_by(UserListeningHistory.user_id)
-            .all()
-        )
+        results = get_user_listening_histories(session)
 
         assert len(results) == 4
 
@@ -370,8 +381,8 @@ def test_index_user_listening_history_update(app):
         assert results[2].listening_history[2]["timestamp"] == str(TIMESTAMP_1)
 
         assert results[3].user_id == 4
-        assert len(results[3].listening_history) == 1000
-        for i in range(1000):
+        assert len(results[3].listening_history) == 2000
+        for i in range(2000):
             assert results[3].listening_history[i]["track_id"] == 2000 - i
             assert results[3].listening_history[i]["timestamp"] == str(
                 datetime.fromisoformat("2014-06-26 07:00:00") - timedelta(hours=i)
@@ -451,11 +462,7 @@ def test_index_user_listening_history_no_update(app):
     with db.scoped_session() as session:
         _index_user_listening_history(session)
 
-        results: List[UserListeningHistory] = (
-            session.query(UserListeningHistory)
-            .order_by(UserListeningHistory.user_id)
-            .all()
-        )
+        results = get_user_listening_histories(session)
 
         assert len(results) == 3
 
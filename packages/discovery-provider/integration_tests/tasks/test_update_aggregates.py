@@ -2,6 +2,7 @@ import logging
 from typing import List
 
 from integration_tests.utils import populate_mock_db
+from src.models.comments.aggregate_comment import AggregateComment
 from src.models.playlists.aggregate_playlist import AggregatePlaylist
 from src.models.tracks.aggregate_track import AggregateTrack
 from src.models.users.aggregate_user import AggregateUser
@@ -221,3 +222,97 @@ def test_update_aggregate_user(app):
         assert aggregate_user2.track_save_count == 0
         assert aggregate_user2.dominant_genre == "Pop"
         assert aggregate_user2.dominant_genre_count == 2
+
+
+def test_update_aggregates_delta_and_verification(app):
+    # setup
+    with app.app_context():
+        db = get_db()
+
+    entities = {
+        "tracks": [
+            {"track_id": 1, "owner_id": 1},
+            {"track_id": 2, "owner_id": 1},
+        ],
+        "user": [{"user_id": 1}, {"user_id": 2}],
+        "saves": [
+            {"user_id": 2, "save_item_id": 1},
+            {"user_id": 2, "save_item_id": 2},
+        ],
+    }
+    populate_mock_db(db, entities)
+
+    with db.scoped_session() as session:
+        _update_aggregates(session, verification_batch_size=0)
+
+    with db.scoped_session() as session:
+        for aggregate_track in session.query(AggregateTrack).all():
+            aggregate_track.save_count = 0
+
+    # Only track 1 has rows indexed since the last run
+    populate_mock_db(db, {"reposts": [{"user_id": 2, "repost_item_id": 1}]})
+
+    with db.scoped_session() as session:
+        _update_aggregates(session, verification_batch_size=0)
+
+        aggregate_track_1 = session.query(AggregateTrack).filter_by(track_id=1).first()
+        assert aggregate_track_1.save_count == 1
+        assert aggregate_track_1.repost_count == 1
+        aggregate_track_2 = session.query(AggregateTrack).filter_by(track_id=2).first()
+        assert aggregate_track_2.save_count == 0
+
+    # Verification walks one track per run and repairs track 2
+    with db.scoped_session() as session:
+        _update_aggregates(session, verification_batch_size=1)
+
+        aggregate_track_2 = session.query(AggregateTrack).filter_by(track_id=2).first()
+        assert aggregate_track_2.save_count == 0
+
+    with db.scoped_session() as session:
+        _update_aggregates(session, verification_batch_size=1)
+
+        aggregate_track_2 = session.query(AggregateTrack).filter_by(track_id=2).first()
+        assert aggregate_track_2.save_count == 1
+
+
+def test_update_aggregates_comment(app):
+    # setup
+    with app.app_context():
+        db = get_db()
+
+    entities = {
+        "tracks": [{"track_id": 1, "owner_id": 1}],
+        "comments": [
+            {"comment_id": 1, "user_id": 1, "entity_id": 1},
+            {"comment_id": 2, "user_id": 2, "entity_id": 1},
+            {"comment_id": 3, "user_id": 2, "entity_id": 1},
+        ],
+        "comment_threads": [
+            {"parent_comment_id": 1, "comment_id": 2},
+            {"parent_comment_id": 1, "comment_id": 3},
+        ],
+        "comment_reactions": [
+            {"comment_id": 1, "user_id": 2},
+            {"comment_id": 1, "user_id": 3, "is_delete": True},
+            {"comment_id": 2, "user_id": 1},
+        ],
+    }
+    populate_mock_db(db, entities)
+
+    with db.scoped_session() as session:
+        for aggregate_comment in session.query(AggregateComment).all():
+            aggregate_comment.react_count = 5
+            aggregate_comment.reply_count = 5
+
+    # Verification repairs drifted counts
+    with db.scoped_session() as session:
+        _update_aggregates(session, verification_batch_size=10)
+
+        aggregate_comments = {
+            aggregate_comment.comment_id: (
+                aggregate_comment.react_count,
+                aggregate_comment.reply_count,
+            )
+            for aggregate_comment in session.query(AggregateComment).all()
+        }
+        assert aggregate_comments == {1: (1, 2), 2: (1, 0)}
@@ -1,13 +1,22 @@
 import logging
 from datetime import datetime, timedelta
 
+import pytest
+
 from integration_tests.utils import populate_mock_db
+from src.models.indexing.block import Block
 from src.models.social.aggregate_interval_plays import t_aggregate_interval_plays
+from src.models.tracks.track import Track
 from src.models.tracks.track_trending_score import TrackTrendingScore
 from src.models.tracks.trending_param import t_trending_params
+from src.tasks.index_hourly_play_counts import _index_hourly_play_counts
 from src.trending_strategies.pnagD_trending_tracks_strategy import (
     TrendingTracksStrategypnagD,
 )
+from src.trending_strategies.track_trending_inputs import (
+    rebuild_track_trending_inputs,
+    update_track_trending_inputs,
+)
 from src.utils.db_session import get_db
 
 logger = logging.getLogger(__name__)
@@ -376,3 +385,74 @@ def test_update_track_score_query(app):
         for score in scores:
             assert score.type == updated_strategy.trending_type.name
             assert score.version == updated_strategy.version.name
+
+
+def get_scores(session):
+    return {
+        (score.track_id, score.time_range): score.score
+        for score in session.query(TrackTrendingScore).all()
+    }
+
+
+def test_update_track_score_query_incremental(app):
+    """Test that rescoring changed tracks gives the same scores as a full refresh"""
+    with app.app_context():
+        db = get_db()
+
+    setup_trending(db)
+    strategy = TrendingTracksStrategypnagD()
+
+    with db.scoped_session() as session:
+        _index_hourly_play_counts(session)
+        session.execute("REFRESH MATERIALIZED VIEW aggregate_interval_plays")
+        session.execute("REFRESH MATERIALIZED VIEW trending_params")
+        rebuild_track_trending_inputs(session)
+        strategy.update_track_score_query(session)
+
+    # Activity indexed after the checkpoints
+    populate_mock_db(
+        db,
+        {
+            "plays": [
+                *[{"id": 1000 + i, "item_id": 3} for i in range(30)],
+                # either side of the week window start, which is mid-hour
+                {
+                    "id": 1030,
+                    "item_id": 5,
+                    "created_at": datetime.now() - timedelta(days=7, minutes=-10),
+                },
+                {
+                    "id": 1031,
+                    "item_id": 5,
+                    "created_at": datetime.now() - timedelta(days=7, minutes=10),
+                },
+            ],
+            "reposts": [{"repost_item_id": 4, "user_id": 40}],
+            # user 3 reaches 3 followers so its tracks are scored
+            "follows": [{"follower_user_id": 5, "followee_user_id": 3}],
+        },
+    )
+    with db.scoped_session() as session:
+        block = session.query(Block.number).filter(Block.is_current == True).scalar()
+        session.query(Track).filter(Track.track_id == 6).update(
+            {"is_delete": True, "blocknumber": block}
+        )
+
+    with db.scoped_session() as session:
+        _index_hourly_play_counts(session)
+        changed_track_ids = update_track_trending_inputs(session)
+        strategy.update_track_score_query_incremental(session, changed_track_ids)
+        incremental_scores = get_scores(session)
+
+    assert {3, 4, 5, 6, 7}.issubset(changed_track_ids)
+    assert not any(track_id == 6 for track_id, _ in incremental_scores)
+
+    with db.scoped_session() as session:
+        session.execute("REFRESH MATERIALIZED VIEW aggregate_interval_plays")
+        session.execute("REFRESH MATERIALIZED VIEW trending_params")
+        strategy.update_track_score_query(session)
+        full_scores = get_scores(session)
+
+    assert incremental_scores.keys() == full_scores.keys()
+    for key, score in full_scores.items():
+        assert incremental_scores[key] == pytest.approx(score)
@@ -0,0 +1,167 @@
+import logging
+import os
+import time
+
+import pytest
+
+from src.tasks.index_hourly_play_counts import _index_hourly_play_counts
+from src.trending_strategies.pnagD_trending_tracks_strategy import (
+    TrendingTracksStrategypnagD,
+)
+from src.trending_strategies.track_trending_inputs import (
+    rebuild_track_trending_inputs,
+    update_track_trending_inputs,
+)
+from src.utils.db_session import get_db
+
+logger = logging.getLogger(__name__)
+
+NUM_TRACKS = 1000000
+NUM_USERS = 100000
+NUM_PLAYS = 2000000
+NUM_REPOSTS = 200000
+NUM_SAVES = 200000
+
+# Activity indexed between two trending runs
+NUM_NEW_PLAYS = 20000
+NUM_NEW_REPOSTS = 2000
+
+# Triggers are skipped while generating the dataset, aggregates are filled after
+GENERATE_DATASET_QUERY = """
+    SET session_replication_role = replica;
+    INSERT INTO blocks (blockhash, number, parenthash, is_current)
+    VALUES ('0x1', 1, '0x0', false), ('0x2', 2, '0x1', true);
+    INSERT INTO users (
+        blockhash, blocknumber, user_id, is_current, handle, wallet, bio,
+        profile_picture, cover_photo, created_at, updated_at, txhash
+    )
+    SELECT
+        '0x1', 1, i, true, 'user' || i, 'wallet' || i, 'bio',
+        'Qm0123456789abcdef0123456789abcdef0123456789ab',
+        'Qm0123456789abcdef0123456789abcdef0123456789ab',
+        now(), now(), 'user' || i
+    FROM generate_series(1, :num_users) AS i;
+    INSERT INTO tracks (
+        blockhash, blocknumber, track_id, is_current, is_delete, owner_id,
+        genre, track_segments, created_at, updated_at, txhash
+    )
+    SELECT
+        '0x1', 1, i, true, false, 1 + i % :num_users,
+        'Electronic', '[]',
+        now() - random() * '365 days'::interval, now(), 'track' || i
+    FROM generate_series(1, :num_tracks) AS i;
+    INSERT INTO plays (id, user_id, play_item_id, created_at, updated_at)
+    SELECT
+        i, 1 + i % :num_users, 1 + (random() * (:num_tracks - 1))::integer,
+        now() - random() * '60 days'::interval, now()
+    FROM generate_series(1, :num_plays) AS i;
+    INSERT INTO reposts (
+        blockhash, blocknumber, user_id, repost_item_id, repost_type,
+        is_current, is_delete, created_at, txhash
+    )
+    SELECT
+        '0x1', 1, 1 + i % :num_users, 1 + (random() * (:num_tracks - 1))::integer,
+        'track', true, false, now() - random() * '60 days'::interval, 'repost' || i
+    FROM generate_series(1, :num_reposts) AS i;
+    INSERT INTO saves (
+        blockhash, blocknumber, user_id, save_item_id, save_type,
+        is_current, is_delete, created_at, txhash
+    )
+    SELECT
+        '0x1', 1, 1 + i % :num_users, 1 + (random() * (:num_tracks - 1))::integer,
+        'track', true, false, now() - random() * '60 days'::interval, 'save' || i
+    FROM generate_series(1, :num_saves) AS i;
+    SET session_replication_role = DEFAULT;
+
+    INSERT INTO aggregate_plays (play_item_id, count)
+    SELECT play_item_id, count(*) FROM plays GROUP BY play_item_id;
+    INSERT INTO aggregate_track (track_id, repost_count, save_count)
+    SELECT t.track_id, coalesce(r.count, 0), coalesce(s.count, 0)
+    FROM tracks t
+    LEFT JOIN (
+        SELECT repost_item_id, count(*) FROM reposts GROUP BY repost_item_id
+    ) r ON r.repost_item_id = t.track_id
+    LEFT JOIN (
+        SELECT save_item_id, count(*) FROM saves GROUP BY save_item_id
+    ) s ON s.save_item_id = t.track_id;
+    INSERT INTO aggregate_user (user_id, follower_count)
+    SELECT i, i % 100 FROM generate_series(1, :num_users) AS i;
+    INSERT INTO track_hourly_play_counts (play_item_id, hourly_timestamp, play_count)
+    SELECT play_item_id, date_trunc('hour', created_at), count(*)
+    FROM plays GROUP BY play_item_id, date_trunc('hour', created_at);
+    INSERT INTO indexing_checkpoints (tablename, last_checkpoint)
+    VALUES ('track_hourly_play_counts', :num_plays);
+    ANALYZE;
+"""
+
+NEW_ACTIVITY_QUERY = """
+    UPDATE blocks SET is_current = false;
+    INSERT INTO blocks (blockhash, number, parenthash, is_current)
+    VALUES ('0x3', 3, '0x2', true);
+    INSERT INTO plays (id, user_id, play_item_id, created_at, updated_at)
+    SELECT
+        :num_plays + i, 1 + i % :num_users,
+        1 + (random() * (:num_tracks - 1))::integer, now(), now()
+    FROM generate_series(1, :num_new_plays) AS i;
+    INSERT INTO reposts (
+        blockhash, blocknumber, user_id, repost_item_id, repost_type,
+        is_current, is_delete, created_at, txhash
+    )
+    SELECT
+        '0x3', 3, 1 + i % :num_users, 1 + (random() * (:num_tracks - 1))::integer,
+        'track', true, false, now(), 'new-repost' || i
+    FROM generate_series(1, :num_new_reposts) AS i;
+"""
+
+
+@pytest.mark.skipif(
+    not os.environ.get("audius_run_benchmarks"),
+    reason="set audius_run_benchmarks to generate the 1M track dataset",
+)
+def test_update_trending_benchmark(app):
+    "Compares a full trending refresh with an incremental update on 1M tracks"
+    with app.app_context():
+        db = get_db()
+
+    strategy = TrendingTracksStrategypnagD()
+    dataset = {
+        "num_tracks": NUM_TRACKS,
+        "num_users": NUM_USERS,
+        "num_plays": NUM_PLAYS,
+        "num_reposts": NUM_REPOSTS,
+        "num_saves": NUM_SAVES,
+        "num_new_plays": NUM_NEW_PLAYS,
+        "num_new_reposts": NUM_NEW_REPOSTS,
+    }
+    with db.scoped_session() as session:
+        session.execute(GENERATE_DATASET_QUERY, dataset)
+
+    with db.scoped_session() as session:
+        start_time = time.time()
+        session.execute("REFRESH MATERIALIZED VIEW aggregate_interval_plays")
+        session.execute("REFRESH MATERIALIZED VIEW trending_params")
+        strategy.update_track_score_query(session)
+        full_refresh_sec = time.time() - start_time
+
+    with db.scoped_session() as session:
+        session.execute("REFRESH MATERIALIZED VIEW aggregate_interval_plays")
+        session.execute("REFRESH MATERIALIZED VIEW trending_params")
+        rebuild_track_trending_inputs(session)
+
+    with db.scoped_session() as session:
+        session.execute(NEW_ACTIVITY_QUERY, dataset)
+        _index_hourly_play_counts(session)
+
+    with db.scoped_session() as session:
+        start_time = time.time()
+        changed_track_ids = update_track_trending_inputs(session)
+        strategy.update_track_score_query_incremental(session, changed_track_ids)
+        incremental_sec = time.time() - start_time
+
+    logger.info(
+        f"test_update_trending_benchmark.py | {NUM_TRACKS} tracks | "
+        f"full refresh {full_refresh_sec:.1f} sec, "
+        f"incremental update of {len(changed_track_ids)} tracks {incremental_sec:.1f} sec"
+    )
+
+    assert len(changed_track_ids) <= NUM_NEW_PLAYS + NUM_NEW_REPOSTS + NUM_TRACKS // 10
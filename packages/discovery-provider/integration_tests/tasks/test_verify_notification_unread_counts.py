@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from integration_tests.utils import populate_mock_db
+from src.models.notifications.notification import NotificationUnreadCount
+from src.queries.get_notifications import get_unread_notification_count
+from src.tasks.verify_notification_unread_counts import (
+    _create_unread_counts,
+    _verify_unread_counts,
+    compute_unread_counts,
+)
+from src.utils.db_session import get_db
+from src.utils.redis_connection import get_redis
+
+t1 = datetime(2020, 10, 10, 10, 35, 0)
+t2 = t1 - timedelta(hours=1)
+t3 = t1 - timedelta(hours=2)
+
+
+def get_counts(session, user_id):
+    return (
+        session.query(NotificationUnreadCount.counts)
+        .filter(NotificationUnreadCount.user_id == user_id)
+        .scalar()
+    )
+
+
+def test_notification_unread_counts(app):
+    with app.app_context():
+        db = get_db()
+        redis = get_redis()
+
+        populate_mock_db(
+            db,
+            {
+                "users": [{"user_id": i + 1} for i in range(5)],
+                "tracks": [{"track_id": 1, "owner_id": 1}],
+                "notification_seens": [{"user_id": 1, "seen_at": t3}],
+            },
+        )
+        populate_mock_db(
+            db,
+            {
+                "follows": [
+                    {"follower_user_id": 2, "followee_user_id": 1, "created_at": t1}
+                ],
+                "reposts": [
+                    {
+                        "user_id": 3,
+                        "repost_item_id": 1,
+                        "repost_type": "track",
+                        "created_at": t2,
+                    }
+                ],
+            },
+        )
+
+        with db.scoped_session() as session:
+            # Users without counts are counted from notification and queued
+            assert get_unread_notification_count(session, {"user_id": 1}) == 2
+            assert _create_unread_counts(session, redis) == 1
+            assert get_counts(session, 1) == {"follow": 1, "repost": 1}
+            assert get_unread_notification_count(session, {"user_id": 1}) == 2
+
+        # Another follow joins the unread follow group, a save is a new group
+        populate_mock_db(
+            db,
+            {
+                "follows": [
+                    {"follower_user_id": 4, "followee_user_id": 1, "created_at": t1}
+                ],
+                "saves": [
+                    {
+                        "user_id": 5,
+                        "save_item_id": 1,
+                        "save_type": "track",
+                        "created_at": t1,
+                    }
+                ],
+            },
+            block_offset=100,
+        )
+        with db.scoped_session() as session:
+            assert get_counts(session, 1) == {"follow": 1, "repost": 1, "save": 1}
+            assert get_unread_notification_count(session, {"user_id": 1}) == 3
+
+        # Groups with notifications after seen_at stay unread
+        populate_mock_db(
+            db,
+            {"notification_seens": [{"user_id": 1, "seen_at": t2}]},
+            block_offset=200,
+        )
+        with db.scoped_session() as session:
+            assert get_counts(session, 1) == {"follow": 1, "save": 1}
+            assert get_unread_notification_count(session, {"user_id": 1}) == 2
+
+        populate_mock_db(
+            db,
+            {"notification_seens": [{"user_id": 1, "seen_at": t1}]},
+            block_offset=300,
+        )
+        with db.scoped_session() as session:
+            assert get_counts(session, 1) == {}
+            assert get_unread_notification_count(session, {"user_id": 1}) == 0
+
+            # Drift is repaired
+            session.execute(
+                text(
+                    """UPDATE notification_unread_counts SET counts = '{"follow": 5}'"""
+                )
+            )
+            assert get_unread_notification_count(session, {"user_id": 1}) == 5
+            assert _verify_unread_counts(session) == 1
+            assert get_counts(session, 1) == {}
+            assert compute_unread_counts(session, 1) == {}
@@ -1,13 +1,16 @@
 import logging
 from datetime import datetime, timedelta
 from typing import List
+from unittest import mock
 
 from sqlalchemy import desc
 
 from src.models.indexing.indexing_checkpoints import IndexingCheckpoint
 from src.models.social.hourly_play_counts import HourlyPlayCount
+from src.models.social.track_hourly_play_count import TrackHourlyPlayCount
 from src.tasks.index_hourly_play_counts import (
     HOURLY_PLAY_COUNTS_TABLE_NAME,
+    TRACK_HOURLY_PLAY_COUNTS_TABLE_NAME,
     _index_hourly_play_counts,
 )
 from src.utils.config import shared_config
@@ -340,3 +343,97 @@ def test_index_hourly_play_counts_empty_plays(app):
     # run
     with db.scoped_session() as session:
         _index_hourly_play_counts(session)
+
+
+def get_track_hourly_play_counts(session):
+    return {
+        (row.play_item_id, row.hourly_timestamp, row.country): row.play_count
+        for row in session.query(TrackHourlyPlayCount).all()
+    }
+
+
+def test_index_track_hourly_play_counts(app):
+    """Test that plays are rolled up per track, hour and country"""
+
+    # setup
+    with app.app_context():
+        db = get_db()
+
+    entities = {
+        "tracks": [
+            {"track_id": 1, "title": "track 1"},
+            {"track_id": 2, "title": "track 2"},
+        ],
+        "plays": [
+            {"item_id": 1, "created_at": TIMESTAMP - timedelta(hours=1)},
+            {"item_id": 1, "created_at": TIMESTAMP - timedelta(minutes=30)},
+            {"item_id": 1, "created_at": TIMESTAMP, "country": "US"},
+            {"item_id": 1, "created_at": TIMESTAMP, "country": "US"},
+            {"item_id": 2, "created_at": TIMESTAMP, "country": "FR"},
+        ],
+    }
+
+    populate_mock_db(db, entities)
+
+    # run
+    with db.scoped_session() as session:
+        _index_hourly_play_counts(session)
+
+        assert get_track_hourly_play_counts(session) == {
+            (1, TIMESTAMP - timedelta(hours=1), ""): 2,
+            (1, TIMESTAMP, "US"): 2,
+            (2, TIMESTAMP, "FR"): 1,
+        }
+
+    populate_mock_db(
+        db,
+        {"plays": [{"id": 6, "item_id": 2, "created_at": TIMESTAMP, "country": "FR"}]},
+    )
+
+    with db.scoped_session() as session:
+        _index_hourly_play_counts(session)
+        _index_hourly_play_counts(session)
+
+        assert get_track_hourly_play_counts(session) == {
+            (1, TIMESTAMP - timedelta(hours=1), ""): 2,
+            (1, TIMESTAMP, "US"): 2,
+            (2, TIMESTAMP, "FR"): 2,
+        }
+
+        new_checkpoint = (
+            session.query(IndexingCheckpoint.last_checkpoint)
+            .filter(IndexingCheckpoint.tablename == TRACK_HOURLY_PLAY_COUNTS_TABLE_NAME)
+            .scalar()
+        )
+        assert new_checkpoint == 6
+
+
+@mock.patch("src.tasks.index_hourly_play_counts.TRACK_HOURLY_PLAY_COUNTS_BATCH_SIZE", 2)
+def test_index_track_hourly_play_counts_backfill(app):
+    """Test that the per track rollup catches up in batches"""
+
+    # setup
+    with app.app_context():
+        db = get_db()
+
+    entities = {
+        "tracks": [{"track_id": 1, "title": "track 1"}],
+        "plays": [{"item_id": 1, "created_at": TIMESTAMP} for _ in range(5)],
+        "indexing_checkpoints": [
+            {"tablename": HOURLY_PLAY_COUNTS_TABLE_NAME, "last_checkpoint": 5}
+        ],
+    }
+
+    populate_mock_db(db, entities)
+
+    # run
+    with db.scoped_session() as session:
+        _index_hourly_play_counts(session)
+        assert get_track_hourly_play_counts(session) == {(1, TIMESTAMP, ""): 2}
+
+        _index_hourly_play_counts(session)
+        _index_hourly_play_counts(session)
+        assert get_track_hourly_play_counts(session) == {(1, TIMESTAMP, ""): 5}
+
+        # the global rollup was already up to date
+        assert session.query(HourlyPlayCount).count() == 0
@@ -1,5 +1,7 @@
 from datetime import datetime
 
+from sqlalchemy import text
+
 from src.models.comments.comment import Comment
 from src.models.comments.comment_mention import CommentMention
 from src.models.comments.comment_notification_setting import CommentNotificationSetting
@@ -61,9 +63,11 @@ from src.models.users.user import User
 from src.models.users.user_balance_change import UserBalanceChange
 from src.models.users.user_bank import USDCUserBankAccount, UserBankAccount, UserBankTx
 from src.models.users.user_listening_history import UserListeningHistory
+from src.models.users.user_listening_history_track import UserListeningHistoryTrack
 from src.models.users.user_payout_wallet_history import UserPayoutWalletHistory
 from src.models.users.user_tip import UserTip
 from src.tasks.aggregates import get_latest_blocknumber
+from src.tasks.update_aggregates import update_aggregate_comment_query
 from src.trending_strategies.pnagD_trending_playlists_strategy import (
     TrendingType,
     TrendingVersion,
@@ -533,6 +537,7 @@ def populate_mock_db(db, entities, block_offset=None):
                 play_item_id=play_meta.get("item_id", i + 1),
                 slot=play_meta.get("slot", i + 1),
                 signature=play_meta.get("signature", None),
+                country=play_meta.get("country", None),
                 created_at=play_meta.get("created_at", datetime.now()),
                 updated_at=play_meta.get("updated_at", datetime.now()),
             )
@@ -570,6 +575,16 @@ def populate_mock_db(db, entities, block_offset=None):
                 ),
             )
             session.add(user_listening_history)
+            # listening history as backfilled into user_listening_history_tracks
+            for listen in user_listening_history.listening_history or []:
+                session.add(
+                    UserListeningHistoryTrack(
+                        user_id=user_listening_history.user_id,
+                        track_id=listen["track_id"],
+                        last_listened_at=datetime.fromisoformat(listen["timestamp"]),
+                        play_count=listen.get("play_count", 1),
+                    )
+                )
 
         for i, hourly_play_count_meta in enumerate(hourly_play_counts):
             hourly_play_count = HourlyPlayCount(
@@ -895,6 +910,21 @@ def populate_mock_db(db, entities, block_offset=None):
                 ),
             )
             session.add(comment_reactions_record)
+        if comment_threads or comment_reactions:
+            # The entity manager keeps aggregate_comment up to date as it
+            # indexes reactions and replies
+            session.flush()
+            aggregate_comment_ids = {
+                comment_thread.get("parent_comment_id", i)
+                for i, comment_thread in enumerate(comment_threads)
+            } | {
+                comment_reaction.get("comment_id", i)
+                for i, comment_reaction in enumerate(comment_reactions)
+            }
+            session.execute(
+                text(update_aggregate_comment_query),
+                {"ids": list(aggregate_comment_ids)},
+            )
         for i, comment_mentions_meta in enumerate(comment_mentions):
             comment_mention_record = CommentMention(
                 comment_id=comment_mentions_meta.get("comment_id", i),
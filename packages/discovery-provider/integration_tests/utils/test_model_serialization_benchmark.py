@@ -0,0 +1,81 @@
+import logging
+import os
+import time
+
+import pytest
+
+from integration_tests.utils import populate_mock_db
+from src.models.tracks.track import Track
+from src.utils import helpers
+from src.utils.db_session import get_db
+
+logger = logging.getLogger(__name__)
+
+NUM_TRACKS = 10000
+
+
+def serialize_tracks(app, num_tracks):
+    """
+    Seeds `num_tracks` tracks and serializes them as ORM objects and as column
+    tuples. Returns both lists and the time each took in ms
+    """
+    with app.app_context():
+        db = get_db()
+
+    entities = {
+        "users": [{"user_id": i, "handle": f"user-{i}"} for i in range(1, 101)],
+        "tracks": [
+            {"track_id": i, "owner_id": i % 100 + 1} for i in range(1, num_tracks + 1)
+        ],
+    }
+    populate_mock_db(db, entities)
+
+    with db.scoped_session() as session:
+        start_time = time.time()
+        orm_tracks = helpers.query_result_to_list(
+            session.query(Track).filter(Track.is_current == True).all()
+        )
+        orm_ms = (time.time() - start_time) * 1000
+
+        start_time = time.time()
+        column_tracks = helpers.query_result_rows_to_list(
+            session.query(*helpers.get_model_columns(Track))
+            .filter(Track.is_current == True)
+            .all()
+        )
+        column_ms = (time.time() - start_time) * 1000
+
+    return orm_tracks, column_tracks, orm_ms, column_ms
+
+
+def assert_same_tracks(orm_tracks, column_tracks):
+    assert len(orm_tracks) == len(column_tracks)
+    columns, _, _ = helpers.get_model_keys(Track)
+    orm_tracks_by_id = {track["track_id"]: track for track in orm_tracks}
+    for track in column_tracks:
+        orm_track = orm_tracks_by_id[track["track_id"]]
+        assert track == {key: orm_track[key] for key in columns}
+
+
+def test_query_result_rows_to_list(app):
+    "Column tuples serialize to the same dicts as ORM objects"
+    orm_tracks, column_tracks, _, _ = serialize_tracks(app, 10)
+    assert len(column_tracks) == 10
+    assert_same_tracks(orm_tracks, column_tracks)
+
+
+@pytest.mark.skipif(
+    not os.environ.get("audius_run_benchmarks"),
+    reason="set audius_run_benchmarks to serialize the 10k track dataset",
+)
+def test_model_serialization_benchmark(app):
+    "Serializes 10k Track rows as ORM objects and as column tuples and reports ms"
+    orm_tracks, column_tracks, orm_ms, column_ms = serialize_tracks(app, NUM_TRACKS)
+
+    logger.info(
+        f"test_model_serialization_benchmark.py | {NUM_TRACKS} tracks | "
+        f"model_to_dictionary {orm_ms:.1f} ms, column tuples {column_ms:.1f} ms"
+    )
+
+    assert len(column_tracks) == NUM_TRACKS
+    assert_same_tracks(orm_tracks, column_tracks)
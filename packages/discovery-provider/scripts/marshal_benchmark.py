@@ -0,0 +1,85 @@
+"""
+
+Compares flask-restx `marshal` with the compiled marshallers in
+src/api/v1/models/extensions/marshalling.py on the full track, user and
+playlist models, as a page of 100 items would be marshalled by an endpoint.
+
+    PYTHONPATH=. python scripts/marshal_benchmark.py --runs 50
+
+"""
+
+import argparse
+import time
+from datetime import datetime
+
+from flask_restx import fields
+from flask_restx import marshal as restx_marshal
+
+from src.api.v1.models.extensions.fields import NestedOneOf
+from src.api.v1.models.extensions.marshalling import marshal
+from src.api.v1.models.playlist_library import PlaylistLibraryIdentifier
+from src.api.v1.models.playlists import full_playlist_model
+from src.api.v1.models.tracks import track_full
+from src.api.v1.models.users import user_model_full
+
+
+def fill(model, depth=0):
+    """Fills in every field of a model, with lists of two items"""
+    data = {}
+    for key, field in getattr(model, "resolved", model).items():
+        if isinstance(field, fields.Wildcard):
+            key = "0x1"
+        data[key] = fill_value(field, depth)
+    return data
+
+
+def fill_value(field, depth):
+    if isinstance(field, dict):
+        return fill(field, depth + 1)
+    if isinstance(field, type):
+        field = field()
+    if isinstance(field, NestedOneOf):
+        return fill(field.model.models[0], depth + 1)
+    if isinstance(field, fields.Nested):
+        return fill(field.nested, depth + 1) if depth < 3 else None
+    if isinstance(field, fields.List):
+        return [fill_value(field.container, depth + 1) for _ in range(2)]
+    if isinstance(field, fields.Wildcard):
+        return fill_value(field.container, depth + 1)
+    if isinstance(field, PlaylistLibraryIdentifier):
+        return {"type": "explore_playlist", "playlist_id": "Heavy Rotation"}
+    if isinstance(field, fields.Boolean):
+        return True
+    if isinstance(field, fields.Integer):
+        return 7
+    if isinstance(field, fields.Float):
+        return 0.5
+    if isinstance(field, fields.DateTime):
+        return datetime(2024, 1, 1)
+    return "value"
+
+
+def benchmark(name, model, runs):
+    page = [fill(model) for _ in range(100)]
+    assert marshal(page, model) == restx_marshal(page, model)
+
+    timings = {}
+    for label, marshal_fn in [("restx", restx_marshal), ("compiled", marshal)]:
+        start = time.perf_counter()
+        for _ in range(runs):
+            marshal_fn(page, model)
+        timings[label] = (time.perf_counter() - start) * 1000 / runs
+    print(
+        f"{name:<10} restx={timings['restx']:7.2f}ms "
+        f"compiled={timings['compiled']:7.2f}ms "
+        f"speedup={timings['restx'] / timings['compiled']:5.2f}x"
+    )
+
+
+parser = argparse.ArgumentParser(description="Benchmark response marshalling.")
+parser.add_argument("--runs", type=int, default=20, help="Marshals of each page")
+args = parser.parse_args()
+
+benchmark("tracks", track_full, args.runs)
+benchmark("users", user_model_full, args.runs)
+benchmark("playlists", full_playlist_model, args.runs)
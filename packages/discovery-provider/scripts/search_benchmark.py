@@ -0,0 +1,122 @@
+"""
+
+Measures p50 / p99 search latency of the postgres search engine, and of
+elasticsearch when `audius_elasticsearch_url` is set, on the same queries.
+
+Run it against a local stack whose database has the 0168_search_pg_indexes migration:
+
+    PYTHONPATH=. python scripts/search_benchmark.py --seed 20000
+
+--seed adds that many generated users, with one track and playlist each, before
+measuring. Leave it out to benchmark the data already in the database.
+
+"""
+
+import argparse
+import random
+import time
+
+from integration_tests.utils import populate_mock_db
+from src.app import create_app
+from src.queries.search_es import search_es_full, search_tags_es
+from src.queries.search_pg import search_pg_full, search_tags_pg
+from src.utils.db_session import get_db
+from src.utils.elasticdsl import get_esclient
+
+WORDS = [
+    "deep",
+    "house",
+    "night",
+    "drive",
+    "summer",
+    "strobe",
+    "lofi",
+    "beats",
+    "dream",
+    "echo",
+    "neon",
+    "river",
+    "static",
+    "velvet",
+    "golden",
+    "midnight",
+]
+GENRES = ["Electronic", "Hip-Hop/Rap", "Pop", "Rock", "Lo-Fi", "House"]
+QUERIES = ["strobe", "deep house", "midn", "neon rive", "velvet echo", "goldn"]
+TAGS = ["house", "lofi", "rock"]
+SEED_USER_ID_OFFSET = 1_000_000
+
+
+def seed(count: int):
+    rng = random.Random(count)
+    users, tracks, playlists = [], [], []
+    for i in range(count):
+        user_id = SEED_USER_ID_OFFSET + i
+        name = " ".join(rng.sample(WORDS, 2))
+        users.append(
+            {
+                "user_id": user_id,
+                "handle": f"{name.replace(' ', '')}{i}",
+                "name": name.title(),
+                "is_verified": rng.random() < 0.01,
+            }
+        )
+        tracks.append(
+            {
+                "track_id": user_id,
+                "owner_id": user_id,
+                "title": " ".join(rng.sample(WORDS, 3)).title(),
+                "genre": rng.choice(GENRES),
+                "tags": ",".join(rng.sample(TAGS, 2)),
+            }
+        )
+        playlists.append(
+            {
+                "playlist_id": user_id,
+                "playlist_owner_id": user_id,
+                "playlist_name": " ".join(rng.sample(WORDS, 2)).title(),
+                "is_album": rng.random() < 0.3,
+            }
+        )
+    print(f"seeding {count} users, tracks and playlists...")
+    populate_mock_db(
+        get_db(),
+        {"users": users, "tracks": tracks, "playlists": playlists},
+        block_offset=SEED_USER_ID_OFFSET,
+    )
+
+
+def percentile(latencies, p):
+    latencies = sorted(latencies)
+    return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+
+def benchmark(name, search, queries, runs):
+    latencies = []
+    for _ in range(runs):
+        for query in queries:
+            start = time.perf_counter()
+            search({"query": query, "kind": "all", "limit": 10, "offset": 0})
+            latencies.append((time.perf_counter() - start) * 1000)
+    print(
+        f"{name:<20} n={len(latencies):<5} "
+        f"p50={percentile(latencies, 0.5):8.1f}ms "
+        f"p99={percentile(latencies, 0.99):8.1f}ms"
+    )
+
+
+parser = argparse.ArgumentParser(description="Benchmark search latency.")
+parser.add_argument("--seed", type=int, default=0, help="Number of users to seed")
+parser.add_argument("--runs", type=int, default=20, help="Runs of each query")
+args = parser.parse_args()
+
+app = create_app()
+with app.app_context():
+    if args.seed:
+        seed(args.seed)
+
+    benchmark("postgres", search_pg_full, QUERIES, args.runs)
+    benchmark("postgres tags", search_tags_pg, TAGS, args.runs)
+    if get_esclient():
+        benchmark("elasticsearch", search_es_full, QUERIES, args.runs)
+        benchmark("elasticsearch tags", search_tags_es, TAGS, args.runs)
@@ -1,7 +1,7 @@
 import logging
 from datetime import datetime
 
-from flask_restx import Namespace, Resource, abort, fields, reqparse
+from flask_restx import Resource, abort, fields, reqparse
 
 from src.api.v1.helpers import (
     DescriptiveArgument,
@@ -19,6 +19,7 @@ from src.api.v1.models.challenges import (
     create_sender_attestation,
     undisbursed_challenge,
 )
+from src.api.v1.models.extensions.namespace import Namespace
 from src.models.rewards.challenge import Challenge
 from src.queries.get_attestation import (
     AttestationError,
@@ -1,8 +1,9 @@
 import logging
 
-from flask_restx import Namespace, Resource, fields
+from flask_restx import Resource, fields
 
 from src.api.v1.helpers import make_response, success_response
+from src.api.v1.models.extensions.namespace import Namespace
 from src.queries.get_cid_type_data import get_cid_type_data
 from src.utils.redis_cache import cache
 from src.utils.redis_metrics import record_metrics
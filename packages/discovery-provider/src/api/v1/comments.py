@@ -1,17 +1,18 @@
 import logging
 
-from flask_restx import Namespace, Resource, fields
+from flask_restx import Resource, fields
 
 from src.api.v1.helpers import (
+    comments_pagination_parser,
     decode_with_abort,
     extend_related,
     make_full_response_with_related,
     make_response,
-    pagination_with_current_user_parser,
     success_response,
     success_response_with_related,
 )
 from src.api.v1.models.comments import reply_comment_model
+from src.api.v1.models.extensions.namespace import Namespace
 from src.queries.comments import get_replies
 from src.queries.get_unclaimed_id import get_unclaimed_id
 from src.utils.redis_cache import cache
@@ -36,12 +37,14 @@ class CommentReplies(Resource):
         params={"comment_id": "A Comment ID"},
         responses={200: "Success", 400: "Bad request", 500: "Server error"},
     )
-    @ns.expect(pagination_with_current_user_parser)
+    @ns.expect(comments_pagination_parser)
     @ns.marshal_with(reply_response)
     @cache(ttl_sec=5)
     def get(self, comment_id):
-        args = pagination_with_current_user_parser.parse_args()
+        args = comments_pagination_parser.parse_args()
         decoded_id = decode_with_abort(comment_id, ns)
+        if args.get("cursor"):
+            args["cursor"] = decode_with_abort(args["cursor"], ns)
         current_user_id = args.get("user_id")
         comment_replies = get_replies(
             args, decoded_id, current_user_id, include_related=False
@@ -65,12 +68,14 @@ class FullCommentReplies(Resource):
         params={"comment_id": "A Comment ID"},
         responses={200: "Success", 400: "Bad request", 500: "Server error"},
     )
-    @full_ns.expect(pagination_with_current_user_parser)
+    @full_ns.expect(comments_pagination_parser)
     @full_ns.marshal_with(full_reply_response)
     @cache(ttl_sec=5)
     def get(self, comment_id):
-        args = pagination_with_current_user_parser.parse_args()
+        args = comments_pagination_parser.parse_args()
         decoded_id = decode_with_abort(comment_id, full_ns)
+        if args.get("cursor"):
+            args["cursor"] = decode_with_abort(args["cursor"], full_ns)
         current_user_id = args.get("user_id")
         comment_replies = get_replies(
             args, decoded_id, current_user_id, include_related=True
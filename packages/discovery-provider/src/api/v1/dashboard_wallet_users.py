@@ -1,4 +1,4 @@
-from flask_restx import Namespace, Resource, fields, reqparse
+from flask_restx import Resource, fields, reqparse
 
 from src.api.v1.helpers import (
     DescriptiveArgument,
@@ -7,6 +7,7 @@ from src.api.v1.helpers import (
     success_response,
 )
 from src.api.v1.models.dashboard_wallet_user import dashboard_wallet_user
+from src.api.v1.models.extensions.namespace import Namespace
 from src.queries.get_dashboard_wallet_users import get_bulk_dashboard_wallet_users
 from src.utils.redis_cache import cache
 from src.utils.redis_metrics import record_metrics
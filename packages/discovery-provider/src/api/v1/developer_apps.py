@@ -1,4 +1,4 @@
-from flask_restx import Namespace, Resource, fields
+from flask_restx import Resource, fields
 
 from src.api.v1.helpers import (
     abort_not_found,
@@ -8,6 +8,7 @@ from src.api.v1.helpers import (
     success_response,
 )
 from src.api.v1.models.developer_apps import developer_app
+from src.api.v1.models.extensions.namespace import Namespace
 from src.queries.get_developer_apps import get_developer_app_by_address
 from src.utils.redis_metrics import record_metrics
 
@@ -1,4 +1,4 @@
-from flask_restx import Namespace, Resource, fields
+from flask_restx import Resource, fields
 
 from src.api.v1.helpers import (
     abort_not_found,
@@ -11,6 +11,7 @@ from src.api.v1.helpers import (
     success_response,
 )
 from src.api.v1.models.events import event_model
+from src.api.v1.models.extensions.namespace import Namespace
 from src.models.events.event import EventEntityType, EventType
 from src.queries.get_events import get_events, get_events_by_ids
 from src.queries.get_unclaimed_id import get_unclaimed_id
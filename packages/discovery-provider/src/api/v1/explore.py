@@ -1,4 +1,4 @@
-from flask_restx import Namespace, Resource, fields
+from flask_restx import Resource, fields
 
 from src.api.v1.helpers import (
     abort_not_found,
@@ -7,6 +7,7 @@ from src.api.v1.helpers import (
     pagination_with_current_user_parser,
 )
 from src.api.v1.models.explore import best_selling_item_model
+from src.api.v1.models.extensions.namespace import Namespace
 
 ns = Namespace("explore", description="Explore related operations")
 full_ns = Namespace("explore", description="Full explore operations")
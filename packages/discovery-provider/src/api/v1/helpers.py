@@ -804,6 +804,14 @@ pagination_with_current_user_parser.add_argument(
     "user_id", required=False, description="The user ID of the user making the request"
 )
 
+comments_pagination_parser = pagination_with_current_user_parser.copy()
+comments_pagination_parser.add_argument(
+    "cursor",
+    required=False,
+    type=str,
+    description="The ID of the last comment of the previous page. Fetches the comments after it instead of skipping offset comments",
+)
+
 remixes_parser = pagination_with_current_user_parser.copy()
 remixes_parser.add_argument(
     "sort_method",
@@ -944,6 +952,12 @@ track_history_parser.add_argument(
     type=str,
     choices=SortDirection._member_names_,
 )
+track_history_parser.add_argument(
+    "cursor",
+    required=False,
+    type=str,
+    description="The ID of the last track of the previous page. When sorting by listen date, fetches the tracks listened to after it instead of skipping offset tracks",
+)
 
 user_favorited_tracks_parser = pagination_with_current_user_parser.copy()
 user_favorited_tracks_parser.add_argument(
@@ -1,6 +1,6 @@
 import logging
 
-from flask_restx import Namespace, Resource, fields, reqparse
+from flask_restx import Resource, fields, reqparse
 
 from src.api.v1.helpers import (
     DescriptiveArgument,
@@ -12,6 +12,7 @@ from src.api.v1.helpers import (
     parse_unix_epoch_param_non_utc,
     success_response,
 )
+from src.api.v1.models.extensions.namespace import Namespace
 from src.queries.get_aggregate_route_metrics import get_aggregate_route_metrics
 from src.queries.get_app_name_metrics import (
     get_aggregate_app_metrics,
@@ -252,6 +253,7 @@ metrics_plays_parser = reqparse.RequestParser()
 metrics_plays_parser.add_argument("start_time", required=False, type=int)
 metrics_plays_parser.add_argument("limit", required=False, type=int)
 metrics_plays_parser.add_argument("bucket_size", required=False)
+metrics_plays_parser.add_argument("track_id", required=False, type=int)
 
 
 @ns.route("/plays", doc=False)
@@ -262,6 +264,7 @@ class PlaysMetrics(Resource):
             "start_time": "Start Time in Unix Epoch",
             "limit": "Limit",
             "bucket_size": "Bucket Size",
+            "track_id": "Only count plays of this track",
         },
         responses={200: "Success", 400: "Bad request", 500: "Server error"},
     )
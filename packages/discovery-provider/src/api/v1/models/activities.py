@@ -1,5 +1,7 @@
 from flask_restx import fields
-from flask_restx.fields import MarshallingError, marshal
+from flask_restx.fields import MarshallingError
+
+from src.api.v1.models.extensions.marshalling import marshal
 
 from .common import ns
 from .playlists import (
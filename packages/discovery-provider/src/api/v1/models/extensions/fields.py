@@ -1,6 +1,8 @@
 import logging
 
-from flask_restx import fields, marshal
+from flask_restx import fields
+
+from src.api.v1.models.extensions.marshalling import marshal
 
 from .models import OneOfModel
 
@@ -0,0 +1,291 @@
+"""
+Compiled marshalling for flask-restx models.
+
+flask-restx `marshal` walks the fields of a model for every object it
+serializes, resolving each field's class, attribute lookup and formatting on
+the way. The marshallers here walk each model once, turning it into a tuple of
+(key, accessor) pairs specialized for the field types, and reuse them for
+every object afterwards. The output is the same as `flask_restx.marshal`; the
+accessors only skip the generic lookups and fall back to the field's own
+`output` for anything they do not specialize. Masks and wildcard models are
+left to flask-restx.
+"""
+
+import threading
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from flask import current_app, has_app_context, request
+from flask_restx import fields
+from flask_restx import marshal as restx_marshal
+from flask_restx import marshal_with as restx_marshal_with
+from flask_restx.fields import MarshallingError, get_value
+from flask_restx.marshalling import make
+from flask_restx.model import RawModel
+from flask_restx.utils import unpack
+
+_MISSING = object()
+
+Accessor = Callable[[Any], Any]
+
+
+class CompiledModel:
+    """Marshals objects to a model with the accessors compiled for its fields"""
+
+    __slots__ = ("name", "accessors", "skip_none", "ordered")
+
+    def __init__(self, name: str, skip_none: bool, ordered: bool):
+        self.name = name
+        self.accessors: Tuple[Tuple[str, Accessor], ...] = ()
+        self.skip_none = skip_none
+        self.ordered = ordered
+
+    def __call__(self, data):
+        if isinstance(data, (list, tuple)):
+            return [self(d) for d in data]
+        items = [(key, accessor(data)) for key, accessor in self.accessors]
+        if self.skip_none:
+            items = [
+                (k, v)
+                for k, v in items
+                if v is not None and v != OrderedDict() and v != {}
+            ]
+        return OrderedDict(items) if self.ordered else dict(items)
+
+
+class _FallbackModel:
+    """Marshals with flask-restx, for models the accessors do not cover"""
+
+    __slots__ = ("fields", "skip_none", "ordered")
+
+    def __init__(self, model, skip_none: bool, ordered: bool):
+        self.fields = model
+        self.skip_none = skip_none
+        self.ordered = ordered
+
+    def __call__(self, data):
+        return restx_marshal(
+            data, self.fields, skip_none=self.skip_none, ordered=self.ordered
+        )
+
+
+_compiled: Dict[Tuple[int, bool, bool], Tuple[Any, Callable]] = {}
+_compile_lock = threading.Lock()
+
+
+def get_marshaller(model, skip_none=False, ordered=False) -> Callable[[Any], Any]:
+    """Returns the compiled marshaller of a model, compiling it on first use"""
+    key = (id(model), skip_none, ordered)
+    found = _compiled.get(key)
+    if found is not None:
+        return found[1]
+    with _compile_lock:
+        found = _compiled.get(key)
+        if found is not None:
+            return found[1]
+        # Models compiled in this pass are published once all are complete
+        pending: Dict[Tuple[int, bool, bool], Tuple[Any, Callable]] = {}
+        marshaller = _compile_model(model, skip_none, ordered, pending)
+        _compiled.update(pending)
+        return marshaller
+
+
+def marshal(data, model, envelope=None, skip_none=False, mask=None, ordered=False):
+    """Drop-in replacement for `flask_restx.marshal` using compiled models"""
+    if mask or not isinstance(model, RawModel) or getattr(model, "__mask__", None):
+        return restx_marshal(data, model, envelope, skip_none, mask, ordered)
+    out = get_marshaller(model, skip_none, ordered)(data)
+    if envelope:
+        out = OrderedDict([(envelope, out)]) if ordered else {envelope: out}
+    return out
+
+
+class marshal_with(restx_marshal_with):
+    """`flask_restx.marshal_with` using compiled models"""
+
+    def __call__(self, f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            resp = f(*args, **kwargs)
+            mask = self.mask
+            if has_app_context():
+                mask_header = current_app.config["RESTX_MASK_HEADER"]
+                mask = request.headers.get(mask_header) or mask
+            if isinstance(resp, tuple):
+                data, code, headers = unpack(resp)
+                return (
+                    marshal(
+                        data,
+                        self.fields,
+                        self.envelope,
+                        self.skip_none,
+                        mask,
+                        self.ordered,
+                    ),
+                    code,
+                    headers,
+                )
+            return marshal(
+                resp, self.fields, self.envelope, self.skip_none, mask, self.ordered
+            )
+
+        return wrapper
+
+
+def _compile_model(model, skip_none: bool, ordered: bool, pending: Dict):
+    key = (id(model), skip_none, ordered)
+    for compiled in (_compiled, pending):
+        if key in compiled:
+            return compiled[key][1]
+
+    resolved = getattr(model, "resolved", model)
+    marshaller: Callable
+    if (
+        getattr(model, "__mask__", None)
+        or not isinstance(resolved, dict)
+        or any(
+            isinstance(make(field), fields.Wildcard)
+            for field in resolved.values()
+            if not isinstance(field, dict)
+        )
+    ):
+        marshaller = _FallbackModel(model, skip_none, ordered)
+        pending[key] = (model, marshaller)
+        return marshaller
+
+    compiled_model = CompiledModel(
+        getattr(model, "name", ""), skip_none=skip_none, ordered=ordered
+    )
+    # Registered before compiling the fields so self-referencing models resolve
+    pending[key] = (model, compiled_model)
+    compiled_model.accessors = tuple(
+        (name, _compile_field(name, field, skip_none, ordered, pending))
+        for name, field in resolved.items()
+    )
+    return compiled_model
+
+
+def _compile_getter(key) -> Callable[[Any], Any]:
+    """Returns a lookup equivalent to flask-restx get_value"""
+    if not isinstance(key, str) or "." in key:
+        return lambda data: get_value(key, data)
+
+    def getter(data):
+        if type(data) is dict:
+            value = data.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            return getattr(data, key, None)
+        return get_value(key, data)
+
+    return getter
+
+
+def _compile_format(field) -> Callable[[Any, Any], Any]:
+    """Formats a looked up value like fields.Raw.output"""
+    default = field.default
+    format = field.format
+    mask = field.mask
+
+    def format_value(key, value):
+        if value is None:
+            value = default() if callable(default) else default
+            return format(value) if value else value
+        try:
+            data = format(value)
+        except MarshallingError as e:
+            msg = 'Unable to marshal field "{0}" value "{1}": {2}'.format(
+                key, value, str(e)
+            )
+            raise MarshallingError(msg)
+        return mask.apply(data) if mask else data
+
+    if type(field) is fields.Raw and not mask and not callable(default):
+
+        def format_raw(key, value):
+            if value is None:
+                return default
+            return value
+
+        return format_raw
+    return format_value
+
+
+def _compile_nested(field, pending: Dict, ordered: bool) -> Callable[[Any], Any]:
+    """Marshals a looked up value like fields.Nested.output"""
+    nested = _compile_model(field.nested, field.skip_none, ordered, pending)
+    allow_null = field.allow_null
+    default = field.default
+
+    def nested_value(value):
+        if value is None:
+            if allow_null:
+                return None
+            elif default is not None:
+                return default
+        return nested(value)
+
+    return nested_value
+
+
+def _compile_list(field, pending: Dict) -> Optional[Callable[[List], Any]]:
+    """Formats a looked up list like fields.List.format"""
+    container = field.container
+    if container.attribute is not None:
+        return None
+    if type(container).output is fields.Nested.output:
+        # List.format does not pass on ordered
+        nested_element = _compile_nested(container, pending, ordered=False)
+        return lambda value: [nested_element(val) for val in value]
+    if type(container) is fields.Raw or type(container).output is fields.Raw.output:
+        format_element = _compile_format(container)
+        is_raw = type(container) is fields.Raw
+        output = container.output
+
+        def list_value(value):
+            return [
+                (
+                    format_element(idx, val)
+                    if is_raw or not isinstance(val, dict)
+                    else output(idx, val)
+                )
+                for idx, val in enumerate(value)
+            ]
+
+        return list_value
+    return None
+
+
+def _compile_field(name, field, skip_none, ordered, pending: Dict) -> Accessor:
+    if isinstance(field, dict):
+        nested_model = _compile_model(field, skip_none, ordered, pending)
+        return nested_model
+
+    field = make(field)
+    output = field.output
+    getter = _compile_getter(name if field.attribute is None else field.attribute)
+
+    field_output = type(field).output
+    if field_output is fields.Raw.output:
+        format_value = _compile_format(field)
+        return lambda data: format_value(name, getter(data))
+
+    if field_output is fields.Nested.output:
+        nested_value = _compile_nested(field, pending, ordered)
+        return lambda data: nested_value(getter(data))
+
+    if field_output is fields.List.output:
+        list_value = _compile_list(field, pending)
+        if list_value is not None:
+            compiled_list_value = list_value
+
+            def list_output(data):
+                value = getter(data)
+                if type(value) is list or type(value) is tuple:
+                    return compiled_list_value(value)
+                return output(name, data, ordered=ordered)
+
+            return list_output
+
+    return lambda data: output(name, data, ordered=ordered)
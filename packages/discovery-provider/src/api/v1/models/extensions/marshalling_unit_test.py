@@ -0,0 +1,138 @@
+import random
+from datetime import datetime
+
+import pytest
+from flask import Flask
+from flask_restx import fields
+from flask_restx import marshal as restx_marshal
+
+from src.api.v1.models.common import ns
+from src.api.v1.models.extensions.fields import NestedOneOf
+from src.api.v1.models.extensions.marshalling import marshal, marshal_with
+from src.api.v1.models.playlist_library import PlaylistLibraryIdentifier
+from src.api.v1.models.playlists import full_playlist_model, playlist_model
+from src.api.v1.models.tracks import track, track_full
+from src.api.v1.models.users import user_model, user_model_full
+
+
+def generate(model, rng, depth=0):
+    """Generates data for a model, leaving values out or null at random"""
+    data = {}
+    for key, field in getattr(model, "resolved", model).items():
+        roll = rng.random()
+        if roll < 0.1:
+            continue
+        if roll < 0.2:
+            data[key] = None
+            continue
+        if isinstance(field, fields.Wildcard):
+            key = "0x1"
+        data[key] = generate_value(field, rng, depth)
+    return data
+
+
+def generate_value(field, rng, depth):
+    if isinstance(field, dict):
+        return generate(field, rng, depth + 1)
+    if isinstance(field, type):
+        field = field()
+    if isinstance(field, NestedOneOf):
+        return generate(rng.choice(field.model.models), rng, depth + 1)
+    if isinstance(field, fields.Nested):
+        if depth > 3:
+            return None
+        return generate(field.nested, rng, depth + 1)
+    if isinstance(field, fields.List):
+        if depth > 3:
+            return []
+        return [generate_value(field.container, rng, depth + 1) for _ in range(2)]
+    if isinstance(field, fields.Wildcard):
+        return generate_value(field.container, rng, depth + 1)
+    if isinstance(field, PlaylistLibraryIdentifier):
+        return {"type": "explore_playlist", "playlist_id": "Heavy Rotation"}
+    if isinstance(field, fields.Boolean):
+        return rng.random() < 0.5
+    if isinstance(field, fields.Integer):
+        return rng.randint(0, 1000)
+    if isinstance(field, fields.Float):
+        return rng.random()
+    if isinstance(field, fields.DateTime):
+        return datetime(2024, 1, rng.randint(1, 28))
+    return f"value{rng.randint(0, 1000)}"
+
+
+@pytest.mark.parametrize(
+    "model",
+    [
+        track,
+        track_full,
+        user_model,
+        user_model_full,
+        playlist_model,
+        full_playlist_model,
+    ],
+)
+def test_marshal_matches_restx(model):
+    rng = random.Random(model.name)
+    for _ in range(20):
+        data = generate(model, rng)
+        for kwargs in [{}, {"ordered": True}, {"skip_none": True}]:
+            assert marshal(data, model, **kwargs) == restx_marshal(
+                data, model, **kwargs
+            )
+
+    items = [generate(model, rng) for _ in range(5)]
+    assert marshal(items, model, envelope="data") == restx_marshal(
+        items, model, envelope="data"
+    )
+
+
+def test_marshal_nested_fields():
+    item = ns.model(
+        "marshalling_test_item",
+        {"id": fields.String(attribute="item_id"), "n": fields.Integer(default=3)},
+    )
+    model = ns.model(
+        "marshalling_test_model",
+        {
+            "raw": fields.Raw(default="default"),
+            "items": fields.List(fields.Nested(item, skip_none=True)),
+            "ids": fields.List(fields.Integer),
+            "item": fields.Nested(item, allow_null=True),
+            "dotted": fields.String(attribute="item.item_id"),
+            "constant": fields.FormattedString("item"),
+            "inline": {"n": fields.Integer},
+        },
+    )
+    for data in [
+        {},
+        {"raw": None, "items": None, "ids": None, "item": None},
+        {"items": {"item_id": "a"}, "ids": (1, "2"), "n": 4},
+        {"items": [{"item_id": "a"}, {}], "ids": [1, 2], "item": {"n": 5}},
+    ]:
+        assert marshal(data, model) == restx_marshal(data, model)
+
+    with pytest.raises(fields.MarshallingError) as e:
+        marshal({"ids": ["a"]}, model)
+    with pytest.raises(fields.MarshallingError) as restx_e:
+        restx_marshal({"ids": ["a"]}, model)
+    assert str(e.value) == str(restx_e.value)
+
+
+def test_marshal_with_mask_header():
+    app = Flask(__name__)
+    app.config["RESTX_MASK_HEADER"] = "X-Fields"
+
+    @marshal_with(user_model)
+    def get_user():
+        return {"handle": "handle", "name": "name"}, 200
+
+    with app.test_request_context(headers={"X-Fields": "handle"}):
+        assert get_user() == ({"handle": "handle"}, 200, {})
+
+    with app.test_request_context():
+        assert get_user() == (
+            restx_marshal({"handle": "handle", "name": "name"}, user_model),
+            200,
+            {},
+        )
@@ -0,0 +1,35 @@
+from flask_restx import Namespace as RestxNamespace
+from flask_restx._http import HTTPStatus
+from flask_restx.utils import merge
+
+from src.api.v1.models.extensions.marshalling import marshal, marshal_with
+
+
+class Namespace(RestxNamespace):
+    """
+    flask-restx Namespace whose marshal_with and marshal use the compiled
+    marshallers in `marshalling`, which produce the same responses.
+    """
+
+    def marshal_with(
+        self, fields, as_list=False, code=HTTPStatus.OK, description=None, **kwargs
+    ):
+        def wrapper(func):
+            doc = {
+                "responses": {
+                    str(code): (
+                        (description, [fields], kwargs)
+                        if as_list
+                        else (description, fields, kwargs)
+                    )
+                },
+                # Mask values can't be determined outside app context
+                "__mask__": kwargs.get("mask", True),
+            }
+            func.__apidoc__ = merge(getattr(func, "__apidoc__", {}), doc)
+            return marshal_with(fields, ordered=self.ordered, **kwargs)(func)
+
+        return wrapper
+
+    def marshal(self, *args, **kwargs):
+        return marshal(*args, **kwargs)
@@ -1,6 +1,7 @@
 from flask_restx import fields
 from flask_restx.fields import MarshallingError
-from flask_restx.marshalling import marshal
+
+from src.api.v1.models.extensions.marshalling import marshal
 
 from .common import ns
 
@@ -1,7 +1,7 @@
 import logging
 from datetime import datetime
 
-from flask_restx import Namespace, Resource, fields
+from flask_restx import Resource, fields
 
 from src.api.v1.helpers import (
     decode_with_abort,
@@ -9,6 +9,7 @@ from src.api.v1.helpers import (
     notifications_parser,
     success_response,
 )
+from src.api.v1.models.extensions.namespace import Namespace
 from src.api.v1.models.notifications import notifications, playlist_updates
 from src.api.v1.utils.extend_notification import extend_notification
 from src.queries.get_notifications import (
@@ -2,7 +2,7 @@ import logging
 
 from flask import Blueprint, Response
 from flask.globals import request
-from flask_restx import Namespace, Resource, fields, inputs
+from flask_restx import Resource, fields, inputs
 
 from src.api.v1.helpers import (
     abort_bad_path_param,
@@ -28,6 +28,7 @@ from src.api.v1.helpers import (
     success_response,
     trending_parser,
 )
+from src.api.v1.models.extensions.namespace import Namespace
 from src.api.v1.models.playlists import (
     album_access_info,
     full_playlist_model,
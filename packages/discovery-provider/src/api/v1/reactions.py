@@ -1,4 +1,4 @@
-from flask_restx import Namespace, Resource, fields, reqparse
+from flask_restx import Resource, fields, reqparse
 
 from src.api.v1.helpers import (
     DescriptiveArgument,
@@ -7,6 +7,7 @@ from src.api.v1.helpers import (
     make_response,
     success_response,
 )
+from src.api.v1.models.extensions.namespace import Namespace
 from src.api.v1.models.reactions import reaction
 from src.queries.reactions import get_reactions
 from src.utils.db_session import get_db_read_replica
@@ -1,13 +1,14 @@
 import logging
 
 from flask import redirect
-from flask_restx import Namespace, Resource, reqparse
+from flask_restx import Resource, reqparse
 
 from src.api.v1.helpers import (
     DescriptiveArgument,
     abort_bad_request_param,
     abort_not_found,
 )
+from src.api.v1.models.extensions.namespace import Namespace
 from src.api.v1.utils.resolve_url import resolve_url
 from src.utils import db_session
 
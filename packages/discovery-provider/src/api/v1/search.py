@@ -1,6 +1,6 @@
 import logging
 
-from flask_restx import Namespace, Resource, fields
+from flask_restx import Resource, fields
 
 from src.api.v1.helpers import (
     format_limit,
@@ -10,6 +10,7 @@ from src.api.v1.helpers import (
     make_full_response,
     success_response,
 )
+from src.api.v1.models.extensions.namespace import Namespace
 from src.api.v1.models.search import search_model
 from src.queries.search_queries import search, search_tags
 from src.utils.redis_cache import cache
@@ -37,7 +38,7 @@ class FullSearch(Resource):
     )
     @full_ns.expect(full_search_parser)
     @full_ns.marshal_with(search_full_response)
-    @cache(ttl_sec=5)
+    @cache(ttl_sec=5, stale_ttl_sec=30)
     def get(self):
         args = full_search_parser.parse_args()
         offset = format_offset(args)
@@ -141,7 +142,7 @@ class FullSearchAutocomplete(Resource):
     )
     @full_ns.expect(full_search_parser)
     @full_ns.marshal_with(search_autocomplete_response)
-    @cache(ttl_sec=5)
+    @cache(ttl_sec=5, stale_ttl_sec=30)
     def get(self):
         """
         Get Users/Tracks/Playlists/Albums that best match the search query
@@ -1,4 +1,4 @@
-from flask_restx import Namespace, Resource, fields
+from flask_restx import Resource, fields
 
 from src.api.v1.helpers import (
     abort_bad_request_param,
@@ -9,6 +9,7 @@ from src.api.v1.helpers import (
     pagination_with_current_user_parser,
     success_response,
 )
+from src.api.v1.models.extensions.namespace import Namespace
 from src.api.v1.models.tips import tip_model, tip_model_full
 from src.queries.get_tips import get_tips
 from src.utils.config import shared_config
@@ -8,13 +8,14 @@ from urllib.parse import parse_qs, urlencode, urljoin, urlparse
 import requests
 from flask import redirect
 from flask.globals import request
-from flask_restx import Namespace, Resource, fields, inputs, marshal, reqparse
+from flask_restx import Resource, fields, inputs, reqparse
 
 from src.api.v1.helpers import (
     DescriptiveArgument,
     abort_bad_path_param,
     abort_bad_request_param,
     abort_not_found,
+    comments_pagination_parser,
     current_user_parser,
     decode_ids_array,
     decode_with_abort,
@@ -43,6 +44,8 @@ from src.api.v1.helpers import (
     trending_parser_paginated,
 )
 from src.api.v1.models.comments import comment_model, comment_notification_setting_model
+from src.api.v1.models.extensions.marshalling import marshal
+from src.api.v1.models.extensions.namespace import Namespace
 from src.api.v1.models.users import user_model, user_model_full
 from src.queries.comments import get_track_comments
 from src.queries.generate_unpopulated_trending_tracks import TRENDING_TRACKS_LIMIT
@@ -527,7 +530,7 @@ class BulkTrackInspect(Resource):
 
 # Comments
 
-track_comments_parser = pagination_with_current_user_parser.copy()
+track_comments_parser = comments_pagination_parser.copy()
 track_comments_parser.add_argument(
     "sort_method",
     required=False,
@@ -562,6 +565,8 @@ class TrackComments(Resource):
     def get(self, track_id):
         args = track_comments_parser.parse_args()
         decoded_id = decode_with_abort(track_id, ns)
+        if args.get("cursor"):
+            args["cursor"] = decode_with_abort(args["cursor"], ns)
         current_user_id = args.get("user_id")
         track_comments = get_track_comments(
             args, decoded_id, current_user_id, include_related=False
@@ -594,6 +599,8 @@ class FullTrackComments(Resource):
     def get(self, track_id):
         args = track_comments_parser.parse_args()
         decoded_id = decode_with_abort(track_id, full_ns)
+        if args.get("cursor"):
+            args["cursor"] = decode_with_abort(args["cursor"], full_ns)
         current_user_id = args.get("user_id")
         track_comments = get_track_comments(
             args, decoded_id, current_user_id, include_related=True
@@ -1201,7 +1208,7 @@ class RecommendedTrack(Resource):
     @record_metrics
     @ns.expect(recommended_track_parser)
     @ns.marshal_with(tracks_response)
-    @cache(ttl_sec=RECOMMENDED_TRACKS_TTL_SEC)
+    @cache(ttl_sec=RECOMMENDED_TRACKS_TTL_SEC, stale_ttl_sec=30)
     def get(self, version):
         trending_track_versions = trending_strategy_factory.get_versions_for_type(
             TrendingType.TRACKS
@@ -1,6 +1,6 @@
 import logging
 
-from flask_restx import Namespace, Resource, fields, reqparse
+from flask_restx import Resource, fields, reqparse
 
 from src.api.v1.helpers import (
     DescriptiveArgument,
@@ -10,6 +10,7 @@ from src.api.v1.helpers import (
     pagination_parser,
     success_response,
 )
+from src.api.v1.models.extensions.namespace import Namespace
 from src.api.v1.users import full_ns as full_user_ns
 from src.models.users.usdc_transactions_history import (
     USDCTransactionMethod,
@@ -4,8 +4,8 @@ from typing import Optional
 
 from eth_account import Account
 from eth_account.messages import encode_defunct
-from flask import Response, request
-from flask_restx import Namespace, Resource, fields, inputs, reqparse
+from flask import Response, request, stream_with_context
+from flask_restx import Resource, fields, inputs, reqparse
 from flask_restx.errors import abort
 
 from src.api.v1.helpers import (
@@ -13,6 +13,7 @@ from src.api.v1.helpers import (
     abort_bad_request_param,
     abort_forbidden,
     abort_not_found,
+    comments_pagination_parser,
     current_user_parser,
     decode_ids_array,
     decode_with_abort,
@@ -73,6 +74,7 @@ from src.api.v1.models.common import favorite
 from src.api.v1.models.developer_apps import authorized_app, developer_app
 from src.api.v1.models.extensions.fields import NestedOneOf
 from src.api.v1.models.extensions.models import WildcardModel
+from src.api.v1.models.extensions.namespace import Namespace
 from src.api.v1.models.feed import user_feed_item
 from src.api.v1.models.grants import managed_user, user_manager
 from src.api.v1.models.playlists import (
@@ -1286,6 +1288,8 @@ class TrackHistoryFull(Resource):
             sort_method=sort_method,
             sort_direction=sort_direction,
         )
+        if args.get("cursor"):
+            get_tracks_args["cursor"] = decode_with_abort(args["cursor"], full_ns)
         track_history = get_user_listening_history(get_tracks_args)
         tracks = list(map(extend_activity, track_history))
         return success_response(tracks)
@@ -2704,7 +2708,7 @@ class PurchasesDownload(Resource):
         check_authorized(decoded_id, authed_user_id)
         args = DownloadPurchasesArgs(buyer_user_id=decoded_id)
         purchases = download_purchases(args)
-        response = Response(purchases, content_type="text/csv")
+        response = Response(stream_with_context(purchases), content_type="text/csv")
         response.headers["Content-Disposition"] = "attachment; filename=purchases.csv"
         return response
 
@@ -2729,7 +2733,7 @@ class SalesDownload(Resource):
         download_args = DownloadSalesArgs(seller_user_id=decoded_id)
         sales = download_sales(download_args, return_json=False)
 
-        response = Response(sales, content_type="text/csv")
+        response = Response(stream_with_context(sales), content_type="text/csv")
         response.headers["Content-Disposition"] = "attachment; filename=sales.csv"
         return response
 
@@ -2794,7 +2798,7 @@ class WithdrawalsDownload(Resource):
         check_authorized(decoded_id, authed_user_id)
         args = DownloadWithdrawalsArgs(user_id=decoded_id)
         withdrawals = download_withdrawals(args)
-        response = Response(withdrawals, content_type="text/csv")
+        response = Response(stream_with_context(withdrawals), content_type="text/csv")
         response.headers["Content-Disposition"] = "attachment; filename=withdrawals.csv"
         return response
 
@@ -3219,17 +3223,20 @@ class UserComments(Resource):
             500: "Server error",
         },
     )
-    @ns.expect(pagination_with_current_user_parser)
+    @ns.expect(comments_pagination_parser)
     @ns.marshal_with(user_comments_response)
     @cache(ttl_sec=5)
     def get(self, id):
-        args = pagination_with_current_user_parser.parse_args()
+        args = comments_pagination_parser.parse_args()
         user_id = decode_with_abort(id, ns)
         current_user_id = get_current_user_id(args)
         args = {
             **args,
             "user_id": user_id,
             "current_user_id": current_user_id,
+            "cursor": (
+                decode_with_abort(args["cursor"], ns) if args.get("cursor") else None
+            ),
         }
         user_comments = get_user_comments(args, include_related=False)
 
@@ -3254,17 +3261,22 @@ class FullUserComments(Resource):
             500: "Server error",
         },
     )
-    @full_ns.expect(pagination_with_current_user_parser)
+    @full_ns.expect(comments_pagination_parser)
     @full_ns.marshal_with(user_comments_response_full)
     @cache(ttl_sec=5)
     def get(self, id):
-        args = pagination_with_current_user_parser.parse_args()
+        args = comments_pagination_parser.parse_args()
         user_id = decode_with_abort(id, full_ns)
         current_user_id = get_current_user_id(args)
         args = {
             **args,
             "user_id": user_id,
             "current_user_id": current_user_id,
+            "cursor": (
+                decode_with_abort(args["cursor"], full_ns)
+                if args.get("cursor")
+                else None
+            ),
         }
         user_comments = get_user_comments(args, include_related=True)
         user_comments["related"] = extend_related(
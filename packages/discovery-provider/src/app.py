@@ -20,7 +20,7 @@ from werkzeug.middleware.proxy_fix import ProxyFix
 from src import api_helpers, exceptions, tracer
 from src.api.v1 import api as api_v1
 from src.api.v1.playlists import playlist_stream_bp
-from src.challenges.challenge_event_bus import setup_challenge_bus
+from src.challenges.challenge_event_bus import ChallengeEventBus, setup_challenge_bus
 from src.challenges.create_new_challenges import create_new_challenges
 from src.database_task import DatabaseTask
 from src.eth_indexing.event_scanner import eth_indexing_last_scanned_block_key
@@ -36,9 +36,17 @@ from src.queries import (
 )
 from src.solana.solana_client_manager import SolanaClientManager
 from src.tasks import celery_app
+from src.tasks.backfill_notification_inbox import BACKFILL_NOTIFICATION_INBOX_LOCK
+from src.tasks.index_challenges import (
+    NUM_CHALLENGE_EVENT_CONSUMERS,
+    get_index_challenges_lock_key,
+)
 from src.tasks.index_core import index_core_lock_key
 from src.tasks.repair_audio_analyses import REPAIR_AUDIO_ANALYSES_LOCK
 from src.tasks.update_delist_statuses import UPDATE_DELIST_STATUSES_LOCK
+from src.tasks.verify_notification_unread_counts import (
+    VERIFY_NOTIFICATION_UNREAD_COUNTS_LOCK,
+)
 from src.utils import helpers, web3_provider
 from src.utils.config import ConfigIni, config_files, shared_config
 from src.utils.constants import CONTRACT_NAMES_ON_CHAIN, CONTRACT_TYPES
@@ -306,6 +314,8 @@ def configure_celery(celery, test_config=None):
             "src.tasks.create_listen_streak_reminder_notifications",
             "src.tasks.create_remix_contest_notifications",
             "src.tasks.index_core",
+            "src.tasks.verify_notification_unread_counts",
+            "src.tasks.backfill_notification_inbox",
         ],
         beat_schedule={
             "aggregate_metrics": {
@@ -400,6 +410,14 @@ def configure_celery(celery, test_config=None):
                 "task": "repair_audio_analyses",
                 "schedule": timedelta(minutes=3),
             },
+            "verify_notification_unread_counts": {
+                "task": "verify_notification_unread_counts",
+                "schedule": timedelta(minutes=1),
+            },
+            "backfill_notification_inbox": {
+                "task": "backfill_notification_inbox",
+                "schedule": timedelta(seconds=30),
+            },
         },
         task_serializer="json",
         accept_content=["json"],
@@ -435,7 +453,10 @@ def configure_celery(celery, test_config=None):
     redis_inst.delete("aggregate_metrics_lock")
     redis_inst.delete("synchronize_metrics_lock")
     redis_inst.delete("solana_plays_lock")
-    redis_inst.delete("index_challenges_lock")
+    for consumer in range(NUM_CHALLENGE_EVENT_CONSUMERS):
+        redis_inst.delete(get_index_challenges_lock_key(consumer))
+    # challenge_event_consumers may have changed, move events to their new consumer
+    ChallengeEventBus(redis_inst).repartition_events()
     redis_inst.delete("user_bank_lock")
     redis_inst.delete("payment_router_lock")
     redis_inst.delete("index_eth_lock")
@@ -449,6 +470,8 @@ def configure_celery(celery, test_config=None):
     redis_inst.delete("index_trending_lock")
     redis_inst.delete(UPDATE_DELIST_STATUSES_LOCK)
     redis_inst.delete(REPAIR_AUDIO_ANALYSES_LOCK)
+    redis_inst.delete(VERIFY_NOTIFICATION_UNREAD_COUNTS_LOCK)
+    redis_inst.delete(BACKFILL_NOTIFICATION_INBOX_LOCK)
     redis_inst.delete("update_aggregates_lock")
     redis_inst.delete("publish_scheduled_releases_lock")
     redis_inst.delete("create_engagement_notifications")
@@ -1,9 +1,11 @@
 import json
+import re
 from collections import defaultdict
 from contextlib import contextmanager
 from datetime import datetime
-from typing import Any, DefaultDict, Dict, List, Optional, Tuple, TypedDict
+from typing import Any, DefaultDict, Dict, List, Optional, Set, Tuple, TypedDict
 
+from redis.exceptions import WatchError
 from sqlalchemy.orm.session import Session
 
 from src.challenges.audio_matching_challenge import (
@@ -50,11 +52,38 @@ from src.challenges.trending_challenge import (
     trending_track_challenge_manager,
     trending_underground_track_challenge_manager,
 )
+from src.utils.config import shared_config
 from src.utils.redis_connection import get_redis
 from src.utils.structured_logger import StructuredLogger
 
 logger = StructuredLogger(__name__)
 REDIS_QUEUE_PREFIX = "challenges-event-queue"
+# max events sent per RPUSH when flushing
+FLUSH_BATCH_SIZE = 1000
+# events are partitioned by user id across this many queues, one per consumer
+NUM_CHALLENGE_EVENT_CONSUMERS = int(
+    shared_config["discprov"]["challenge_event_consumers"]
+)
+
+
+# matches get_event_queue_key and get_processing_queue_key
+QUEUE_KEY_PATTERN = re.compile(
+    rf"^{re.escape(REDIS_QUEUE_PREFIX)}(?::(\d+)|:processing:(\d+))?$"
+)
+
+
+def get_event_queue_key(consumer: int):
+    """Key of the queue holding the events of the users partitioned to `consumer`"""
+    # the first partition keeps the unpartitioned key so a single consumer
+    # reads the same queue as before
+    if consumer == 0:
+        return REDIS_QUEUE_PREFIX
+    return f"{REDIS_QUEUE_PREFIX}:{consumer}"
+
+
+def get_processing_queue_key(consumer: int):
+    """Key of the list holding the events `consumer` dequeued but has not acked"""
+    return f"{REDIS_QUEUE_PREFIX}:processing:{consumer}"
 
 
 class InternalEvent(TypedDict):
@@ -71,16 +100,24 @@ class ChallengeEventBus:
     - registering challenge managers to listen to the events.
     - consuming items from the Redis queue
     - fetching the manager for a given challenge
+
+    Events are partitioned by user id into one queue per consumer, so the
+    events of a user are processed in order by a single consumer.
+    Consumers move events atomically from their queue into their own processing
+    list and ack them once processed, so events dequeued by a consumer that
+    dies are requeued instead of lost.
     """
 
     _listeners: DefaultDict[ChallengeEvent, List[ChallengeManager]]
     _redis: Any
     _managers: Dict[str, ChallengeManager]
     _in_memory_queue: List[InternalEvent]
+    _num_consumers: int
 
-    def __init__(self, redis):
+    def __init__(self, redis, num_consumers: int = NUM_CHALLENGE_EVENT_CONSUMERS):
         self._listeners = defaultdict(lambda: [])
         self._redis = redis
+        self._num_consumers = max(num_consumers, 1)
         self._managers = {}
         self._in_memory_queue: List[Dict] = []
 
@@ -158,6 +195,7 @@ class ChallengeEventBus:
             logger.debug(
                 f"ChallengeEventBus: Flushing {len(self._in_memory_queue)} events from in-memory queue"
             )
+        events_json: DefaultDict[str, List[str]] = defaultdict(list)
         for event in self._in_memory_queue:
             try:
                 event_json = self._event_to_json(
@@ -168,23 +206,47 @@ class ChallengeEventBus:
                     event.get("extra", {}),
                 )
                 logger.debug(f"ChallengeEventBus: dispatch {event_json}")
-                self._redis.rpush(REDIS_QUEUE_PREFIX, event_json)
+                consumer = event["user_id"] % self._num_consumers
+                events_json[get_event_queue_key(consumer)].append(event_json)
             except Exception as e:
-                logger.warning(f"ChallengeEventBus: error enqueuing to Redis: {e}")
+                logger.warning(f"ChallengeEventBus: error serializing event: {e}")
         self._in_memory_queue.clear()
+        if not events_json:
+            return
+        try:
+            pipe = self._redis.pipeline()
+            for queue_key, queue_events_json in events_json.items():
+                for i in range(0, len(queue_events_json), FLUSH_BATCH_SIZE):
+                    pipe.rpush(queue_key, *queue_events_json[i : i + FLUSH_BATCH_SIZE])
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"ChallengeEventBus: error enqueuing to Redis: {e}")
 
-    def process_events(self, session: Session, max_events=1) -> Tuple[int, bool]:
+    def process_events(
+        self, session: Session, max_events=1, consumer: int = 0
+    ) -> Tuple[int, bool]:
         """Dequeues `max_events` from Redis queue and processes them, forwarding to listening ChallengeManagers.
         Returns (num_processed_events, did_error).
         Will return -1 as num_processed_events if an error prevented any events from
         being processed (i.e. some error deserializing from Redis)
+
+        Only the queue of the users partitioned to `consumer` is read. Dequeued
+        events stay in the processing list of `consumer` until `ack_events`.
         """
+        events_json: List[Any] = []
         try:
-            # get the first max_events elements.
-            events_json = self._redis.lrange(REDIS_QUEUE_PREFIX, 0, max_events)
+            # move the first events into this consumer's processing list in one
+            # transaction. Like the LRANGE this replaced, max_events is inclusive.
+            pipe = self._redis.pipeline()
+            for _ in range(max_events + 1):
+                pipe.lmove(
+                    get_event_queue_key(consumer),
+                    get_processing_queue_key(consumer),
+                    "LEFT",
+                    "RIGHT",
+                )
+            events_json = [event for event in pipe.execute() if event is not None]
             # logger.debug(f"ChallengeEventBus: dequeued {len(events_json)} events")
-            # trim the first from the front of the list
-            self._redis.ltrim(REDIS_QUEUE_PREFIX, len(events_json), -1)
             events_dicts = list(map(self._json_to_event, events_json))
             # Consolidate event types for processing
             # map of {"event_type": [{ user_id: number, block_number: number, extra: {} }]}}
@@ -205,6 +267,8 @@ class ChallengeEventBus:
                 )
         except Exception as e:
             logger.warning(f"ChallengeEventBus: error processing from Redis: {e}")
+            # drop the malformed batch rather than requeue it forever
+            self._drop_events(consumer, events_json)
             return (-1, True)
 
         did_error = False
@@ -223,8 +287,103 @@ class ChallengeEventBus:
 
         return (len(events_json), did_error)
 
+    def ack_events(self, consumer: int = 0):
+        """Acks the events `consumer` has processed, call once their effects are committed"""
+        self._redis.delete(get_processing_queue_key(consumer))
+
+    def requeue_unacked_events(self, consumer: int = 0) -> int:
+        """Moves events left unacked by a previous run of `consumer` back to the
+        front of its queue, in order. Returns the number of events requeued.
+        """
+        num_requeued = 0
+        while self._redis.lmove(
+            get_processing_queue_key(consumer),
+            get_event_queue_key(consumer),
+            "RIGHT",
+            "LEFT",
+        ):
+            num_requeued += 1
+        if num_requeued:
+            logger.info(
+                f"ChallengeEventBus: requeued {num_requeued} unacked events of consumer {consumer}"
+            )
+        return num_requeued
+
+    def repartition_events(self) -> int:
+        """Moves events queued while a different number of consumers was
+        configured to the queue of their user's consumer, so events in the
+        partitions of removed consumers are still processed. Call while no
+        consumer is running. Returns the number of events moved.
+        """
+        consumers: Set[int] = set()
+        for key in self._redis.scan_iter(f"{REDIS_QUEUE_PREFIX}*"):
+            consumer = self._get_queue_consumer(key)
+            if consumer is not None:
+                consumers.add(consumer)
+        num_moved = 0
+        for consumer in sorted(consumers):
+            self.requeue_unacked_events(consumer)
+            while True:
+                try:
+                    num_moved += self._repartition_queue(consumer)
+                    break
+                except WatchError:
+                    # events were flushed to the queue meanwhile, read it again
+                    continue
+        if num_moved:
+            logger.info(
+                f"ChallengeEventBus: moved {num_moved} events to the queues of {self._num_consumers} consumers"
+            )
+        return num_moved
+
     # Helpers
 
+    def _get_queue_consumer(self, key) -> Optional[int]:
+        """Consumer of an event queue or processing list key, None for other keys"""
+        match = QUEUE_KEY_PATTERN.match(key.decode() if isinstance(key, bytes) else key)
+        if not match:
+            return None
+        return int(match.group(1) or match.group(2) or 0)
+
+    def _repartition_queue(self, consumer: int) -> int:
+        queue_key = get_event_queue_key(consumer)
+        with self._redis.pipeline() as pipe:
+            pipe.watch(queue_key)
+            kept_events: List[Any] = []
+            moved_events: DefaultDict[str, List[Any]] = defaultdict(list)
+            for event_json in pipe.lrange(queue_key, 0, -1):
+                try:
+                    user_id = json.loads(event_json)["user_id"]
+                    target = user_id % self._num_consumers
+                except Exception:
+                    # process_events of the first consumer drops malformed events
+                    target = 0
+                if target == consumer:
+                    kept_events.append(event_json)
+                else:
+                    moved_events[get_event_queue_key(target)].append(event_json)
+            if not moved_events:
+                return 0
+
+            pipe.multi()
+            pipe.delete(queue_key)
+            if kept_events:
+                pipe.rpush(queue_key, *kept_events)
+            # a user's moved events are older than any it has in the target queue
+            for target_key, target_events in moved_events.items():
+                pipe.lpush(target_key, *reversed(target_events))
+            pipe.execute()
+        return sum(len(target_events) for target_events in moved_events.values())
+
+    def _drop_events(self, consumer: int, events_json: List[Any]):
+        try:
+            pipe = self._redis.pipeline()
+            for event_json in events_json:
+                pipe.lrem(get_processing_queue_key(consumer), 1, event_json)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"ChallengeEventBus: error dropping events: {e}")
+
     def _event_to_json(
         self,
         event: str,
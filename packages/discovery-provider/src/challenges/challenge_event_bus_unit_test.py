@@ -0,0 +1,103 @@
+import json
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from src.challenges.challenge_event_bus import (
+    REDIS_QUEUE_PREFIX,
+    ChallengeEventBus,
+    get_event_queue_key,
+    get_processing_queue_key,
+)
+
+BLOCK_DATETIME = datetime(2024, 1, 1)
+
+
+def make_bus(redis_mock):
+    bus = ChallengeEventBus(redis_mock)
+    listener = MagicMock()
+    listener.challenge_id = "test_challenge"
+    bus.register_listener("test_event", listener)
+    return bus, listener
+
+
+def test_flush_enqueues_all_events(redis_mock):
+    bus, _ = make_bus(redis_mock)
+    with bus.use_scoped_dispatch_queue():
+        for user_id in range(2500):
+            bus.dispatch("test_event", 1, BLOCK_DATETIME, user_id)
+    assert redis_mock.llen(REDIS_QUEUE_PREFIX) == 2500
+
+
+def test_flush_partitions_events_by_user(redis_mock):
+    bus = ChallengeEventBus(redis_mock, num_consumers=3)
+    listener = MagicMock()
+    listener.challenge_id = "test_challenge"
+    bus.register_listener("test_event", listener)
+    with bus.use_scoped_dispatch_queue():
+        for user_id in [1, 2, 3, 4, 1]:
+            bus.dispatch("test_event", 1, BLOCK_DATETIME, user_id)
+    assert get_event_queue_key(0) == REDIS_QUEUE_PREFIX
+    assert [redis_mock.llen(get_event_queue_key(i)) for i in range(3)] == [1, 3, 1]
+
+    # each consumer only processes the events of its own users, in order
+    assert bus.process_events(MagicMock(), 9, consumer=1) == (3, False)
+    processed = listener.process.call_args.args[2]
+    assert [event["user_id"] for event in processed] == [1, 4, 1]
+    assert redis_mock.llen(get_event_queue_key(0)) == 1
+
+
+def test_process_events_acks_and_requeues(redis_mock):
+    bus, listener = make_bus(redis_mock)
+    with bus.use_scoped_dispatch_queue():
+        for user_id in range(5):
+            bus.dispatch("test_event", 1, BLOCK_DATETIME, user_id)
+
+    assert bus.process_events(MagicMock(), 1) == (2, False)
+    processed = listener.process.call_args.args[2]
+    assert [event["user_id"] for event in processed] == [0, 1]
+    assert redis_mock.llen(REDIS_QUEUE_PREFIX) == 3
+    assert redis_mock.llen(get_processing_queue_key(0)) == 2
+
+    # a consumer that died before acking gets its events back in order
+    assert bus.requeue_unacked_events() == 2
+    assert bus.process_events(MagicMock(), 9) == (5, False)
+    processed = listener.process.call_args.args[2]
+    assert [event["user_id"] for event in processed] == [0, 1, 2, 3, 4]
+
+    bus.ack_events()
+    assert bus.requeue_unacked_events() == 0
+    assert redis_mock.llen(REDIS_QUEUE_PREFIX) == 0
+
+
+def test_process_events_drops_malformed_events(redis_mock):
+    bus, listener = make_bus(redis_mock)
+    redis_mock.rpush(REDIS_QUEUE_PREFIX, "not json")
+
+    assert bus.process_events(MagicMock()) == (-1, True)
+    assert listener.process.call_count == 0
+    assert redis_mock.llen(get_processing_queue_key(0)) == 0
+
+
+def test_repartition_events_after_consumers_change(redis_mock):
+    bus = ChallengeEventBus(redis_mock, num_consumers=3)
+    with bus.use_scoped_dispatch_queue():
+        for user_id in [1, 2, 4, 5]:
+            bus.dispatch("test_event", 1, BLOCK_DATETIME, user_id)
+    # user 2's event is left unacked by the consumer of the third partition
+    assert bus.process_events(MagicMock(), 0, consumer=2) == (1, False)
+
+    # the third partition has no consumer once the count shrinks to two
+    bus = ChallengeEventBus(redis_mock, num_consumers=2)
+    assert bus.repartition_events() == 3
+
+    def queued_user_ids(consumer):
+        return [
+            json.loads(event)["user_id"]
+            for event in redis_mock.lrange(get_event_queue_key(consumer), 0, -1)
+        ]
+
+    assert sorted(queued_user_ids(0)) == [2, 4]
+    assert sorted(queued_user_ids(1)) == [1, 5]
+    assert redis_mock.llen(get_event_queue_key(2)) == 0
+    assert redis_mock.llen(get_processing_queue_key(2)) == 0
+    assert bus.repartition_events() == 0
@@ -54,18 +54,6 @@ def esclient_mock(monkeypatch):
     return esclient
 
 
-# Test fixture that mocks getting monitor values
-@pytest.fixture()
-def get_monitors_mock(monkeypatch):
-    mock_get_monitors = MagicMock()
-
-    def get_monitors(monitors):
-        return mock_get_monitors()
-
-    monkeypatch.setattr(src.monitors.monitors, "get_monitors", get_monitors)
-    return mock_get_monitors
-
-
 @pytest.fixture
 def mock_requests(monkeypatch):
     real_get = requests.get
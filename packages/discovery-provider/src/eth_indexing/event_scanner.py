@@ -1,7 +1,10 @@
 import datetime
 import logging
+import threading
 import time
-from typing import List, Tuple, Type, Union
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Type, Union
 
 from eth_abi.codec import ABICodec
 from web3 import Web3
@@ -43,6 +46,8 @@ ETH_BLOCK_TAIL_OFFSET = 1
 # the block number to start with if first time scanning
 # this should be the first block during and after which $AUDIO transfer events started occurring
 MIN_SCAN_START_BLOCK = 11103292
+# how many block timestamps are kept in memory across chunks
+BLOCK_TIMESTAMP_CACHE_SIZE = 4096
 
 
 class EventScanner:
@@ -64,6 +69,7 @@ class EventScanner:
         contract: Type[Contract],
         event_type: Type[BaseContractEvent],
         filters: dict,
+        max_workers: int = 1,
     ):
         """
         :param db: database handle
@@ -73,6 +79,7 @@ class EventScanner:
         :param state: state manager to keep tracks of last scanned block and persisting events to db
         :param event_type: web3 Event we scan
         :param filters: Filters passed to get_logs e.g. { "address": <token-address> }
+        :param max_workers: How many chunks are fetched over `eth_get_logs` in parallel
         """
 
         self.logger = logger
@@ -82,8 +89,12 @@ class EventScanner:
         self.web3 = web3
         self.event_type = event_type
         self.filters = filters
+        self.max_workers = max(1, max_workers)
         self.last_scanned_block = MIN_SCAN_START_BLOCK
         self.latest_chain_block = self.web3.eth.block_number
+        # LRU of block timestamps shared by all chunks of this scanner
+        self.block_timestamps: OrderedDict[int, datetime.datetime] = OrderedDict()
+        self.block_timestamps_lock = threading.Lock()
 
     def restore(self):
         """Restore the last scan state from redis.
@@ -128,6 +139,25 @@ class EventScanner:
         last_time = block_info["timestamp"]
         return datetime.datetime.utcfromtimestamp(last_time)
 
+    def get_block_mined_timestamp(self, block_num) -> Union[datetime.datetime, None]:
+        """Get Ethereum block timestamp through the shared in-memory LRU"""
+        with self.block_timestamps_lock:
+            if block_num in self.block_timestamps:
+                self.block_timestamps.move_to_end(block_num)
+                return self.block_timestamps[block_num]
+
+        block_timestamp = self.get_block_timestamp(block_num)
+        # Blocks that are not mined yet are looked up again next time
+        if block_timestamp is None:
+            return None
+
+        with self.block_timestamps_lock:
+            self.block_timestamps[block_num] = block_timestamp
+            self.block_timestamps.move_to_end(block_num)
+            while len(self.block_timestamps) > BLOCK_TIMESTAMP_CACHE_SIZE:
+                self.block_timestamps.popitem(last=False)
+        return block_timestamp
+
     def get_suggested_scan_end_block(self):
         """Get the last mined block on Ethereum chain we are following."""
 
@@ -140,9 +170,12 @@ class EventScanner:
         return self.last_scanned_block
 
     def process_event(
-        self, block_timestamp: datetime.datetime, event: EventData
-    ) -> str:
-        """Record a ERC-20 transfer in our database."""
+        self, block_timestamp: Union[datetime.datetime, None], event: EventData
+    ) -> Tuple[str, List[str]]:
+        """Convert a ERC-20 transfer to our internal format.
+
+        :return: tuple(pointer to the event, wallets whose balance changed)
+        """
         # Events are keyed by their transaction hash and log index
         # One transaction may contain multiple events
         # and each one of those gets their own log index
@@ -168,7 +201,6 @@ class EventScanner:
             "timestamp": block_timestamp,
         }
 
-        # Add user ids from the transfer event into the balance refresh queue.
         # Depending on the wallet connection, we may have the address stored as
         # lower cased, so to be safe, we refresh check-summed and lower-cased adddresses.
         transfer_event_wallets = [
@@ -177,52 +209,72 @@ class EventScanner:
             transfer["from"].lower(),
             transfer["to"].lower(),
         ]
+
+        # Return a pointer that allows us to look up this event later if needed
+        return f"{block_number}-{txhash_hex}-{log_index}", transfer_event_wallets
+
+    def get_wallet_user_ids(self, wallets: List[str]) -> List[int]:
+        """Find the users owning or associated with any of the wallets"""
         with self.db.scoped_session() as session:
-            user_result = (
+            user_query = (
                 session.query(User.user_id)
                 .filter(User.is_current == True)
-                .filter(User.wallet.in_(transfer_event_wallets))
-            ).all()
-            user_set = {user_id for [user_id] in user_result}
-
-            associated_wallet_result = (
+                .filter(User.wallet.in_(wallets))
+            )
+            associated_wallet_query = (
                 session.query(AssociatedWallet.user_id)
                 .filter(AssociatedWallet.is_current == True)
                 .filter(AssociatedWallet.is_delete == False)
-                .filter(AssociatedWallet.wallet.in_(transfer_event_wallets))
-            ).all()
-            associated_wallet_set = {user_id for [user_id] in associated_wallet_result}
+                .filter(AssociatedWallet.wallet.in_(wallets))
+            )
+            user_result = user_query.union(associated_wallet_query).all()
+            return [user_id for [user_id] in user_result]
+
+    def process_events(self, events: List[EventData]) -> List[str]:
+        """Record the ERC-20 transfers of a chunk, looking up all their users at once"""
+        all_processed = []
+        wallets = set()
+        for evt in events:
+            idx = evt.get(
+                "logIndex"
+            )  # Integer of the log index position in the block, null when its pending
 
-            user_ids = list(user_set.union(associated_wallet_set))
+            # We cannot avoid minor chain reorganisations, but
+            # at least we must avoid blocks that are not mined yet
+            assert idx is not None, "Somehow tried to scan a pending block"
+
+            block_number = evt.get("blockNumber")
+
+            # Get UTC time when this event happened (block mined timestamp)
+            # from our in-memory cache
+            block_timestamp = self.get_block_mined_timestamp(block_number)
+
+            logger.debug(
+                f"event_scanner.py | Processing event {evt.get('event')}, block:{evt.get('blockNumber')}"
+            )
+            processed, transfer_event_wallets = self.process_event(block_timestamp, evt)
+            all_processed.append(processed)
+            wallets.update(transfer_event_wallets)
+
+        # Add user ids from the transfer events into the balance refresh queue.
+        if wallets:
+            user_ids = self.get_wallet_user_ids(list(wallets))
             if user_ids:
                 logger.debug(
                     f"event_scanner.py | Enqueueing user ids {user_ids} to immediate balance refresh queue"
                 )
                 enqueue_immediate_balance_refresh(self.redis, user_ids)
 
-        # Return a pointer that allows us to look up this event later if needed
-        return f"{block_number}-{txhash_hex}-{log_index}"
+        return all_processed
 
-    def scan_chunk(self, start_block, end_block) -> Tuple[int, list]:
-        """Read and process events between to block numbers.
+    def fetch_chunk(self, start_block, end_block) -> Tuple[int, List[EventData]]:
+        """Fetch the events between two block numbers.
 
         Dynamically decrease the size of the chunk in case the JSON-RPC server pukes out.
 
-        :return: tuple(actual end block number, when this block was mined, processed events)
+        :return: tuple(actual end block number, events)
         """
 
-        block_timestamps = {}
-        get_block_timestamp = self.get_block_timestamp
-
-        # Cache block timestamps to reduce some RPC overhead
-        # Real solution might include smarter models around block
-        def get_block_mined_timestamp(block_num):
-            if block_num not in block_timestamps:
-                block_timestamps[block_num] = get_block_timestamp(block_num)
-            return block_timestamps[block_num]
-
-        all_processed = []
-
         # Callable that takes care of the underlying web3 call
         def _fetch_events(from_block, to_block):
             return _fetch_events_for_all_contracts(
@@ -235,32 +287,17 @@ class EventScanner:
 
         # Do `n` retries on `eth_get_logs`,
         # throttle down block range if needed
-        end_block, events = _retry_web3_call(
+        return _retry_web3_call(
             _fetch_events, start_block=start_block, end_block=end_block
         )
 
-        for evt in events:
-            idx = evt.get(
-                "logIndex"
-            )  # Integer of the log index position in the block, null when its pending
-
-            # We cannot avoid minor chain reorganisations, but
-            # at least we must avoid blocks that are not mined yet
-            assert idx is not None, "Somehow tried to scan a pending block"
-
-            block_number = evt.get("blockNumber")
-
-            # Get UTC time when this event happened (block mined timestamp)
-            # from our in-memory cache
-            block_timestamp = get_block_mined_timestamp(block_number)
-
-            logger.debug(
-                f"event_scanner.py | Processing event {evt.get('event')}, block:{evt.get('blockNumber')}"
-            )
-            processed = self.process_event(block_timestamp, evt)
-            all_processed.append(processed)
+    def scan_chunk(self, start_block, end_block) -> Tuple[int, list]:
+        """Read and process events between to block numbers.
 
-        return end_block, all_processed
+        :return: tuple(actual end block number, processed events)
+        """
+        end_block, events = self.fetch_chunk(start_block, end_block)
+        return end_block, self.process_events(events)
 
     def estimate_next_chunk_size(self, current_chuck_size: int, event_found_count: int):
         """Try to figure out optimal chunk size
@@ -297,6 +334,10 @@ class EventScanner:
     ) -> Tuple[list, int]:
         """Perform a token events scan.
 
+        Up to max_workers consecutive chunks are fetched in parallel. Their events are
+        processed in block order and the last scanned block only advances over
+        chunks that completed without a gap before them.
+
         :param start_block: The first block included in the scan
         :param end_block: The last block included in the scan
         :param start_chunk_size: How many blocks we try to fetch over JSON-RPC on the first attempt
@@ -314,38 +355,77 @@ class EventScanner:
         # All processed entries we got on this scan cycle
         all_processed = []
 
-        while current_block <= end_block:
-            # Print some diagnostics to logs to try to fiddle with real world JSON-RPC API performance
-            estimated_end_block = min(
-                current_block + chunk_size, self.get_suggested_scan_end_block()
-            )
-            logger.debug(
-                "event_scanner.py | Scanning token transfers for blocks: %d - %d, chunk size %d, last chunk scan took %f, last logs found %d",
-                current_block,
-                estimated_end_block,
-                chunk_size,
-                last_scan_duration,
-                last_logs_found,
-            )
-
-            start = time.time()
-            actual_end_block, new_entries = self.scan_chunk(
-                current_block, estimated_end_block
+        executor: Optional[ThreadPoolExecutor] = (
+            ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="event_scanner"
             )
+            if self.max_workers > 1
+            else None
+        )
+        try:
+            while current_block <= end_block:
+                # Plan the non-overlapping ranges fetched in this round
+                ranges: List[Tuple[int, int]] = []
+                range_start = current_block
+                while len(ranges) < self.max_workers and range_start <= end_block:
+                    range_end = min(
+                        range_start + chunk_size, self.get_suggested_scan_end_block()
+                    )
+                    ranges.append((range_start, range_end))
+                    range_start = range_end + 1
+
+                # Print some diagnostics to logs to try to fiddle with real world JSON-RPC API performance
+                logger.debug(
+                    "event_scanner.py | Scanning token transfers for blocks: %d - %d, %d chunks of size %d, last round took %f, last logs found %d",
+                    ranges[0][0],
+                    ranges[-1][1],
+                    len(ranges),
+                    chunk_size,
+                    last_scan_duration,
+                    last_logs_found,
+                )
 
-            # Where does our current chunk scan ends - are we out of chain yet?
-            current_end = actual_end_block
-
-            last_scan_duration = int(time.time() - start)
-            all_processed += new_entries
-
-            # Try to guess how many blocks to fetch over `eth_get_logs` API next time
-            chunk_size = self.estimate_next_chunk_size(chunk_size, len(new_entries))
-
-            # Set where the next chunk starts
-            current_block = current_end + 1
-            total_chunks_scanned += 1
-            self.save(min(current_end, self.get_suggested_scan_end_block()))
+                start = time.time()
+                futures: Dict[Tuple[int, int], Future] = {}
+                if executor:
+                    for range_start, range_end in ranges:
+                        futures[(range_start, range_end)] = executor.submit(
+                            self.fetch_chunk, range_start, range_end
+                        )
+
+                last_logs_found = 0
+                for range_start, range_end in ranges:
+                    if executor:
+                        actual_end_block, events = futures[
+                            (range_start, range_end)
+                        ].result()
+                    else:
+                        actual_end_block, events = self.fetch_chunk(
+                            range_start, range_end
+                        )
+                    all_processed += self.process_events(events)
+                    last_logs_found += len(events)
+                    total_chunks_scanned += 1
+
+                    # Set where the next chunk starts
+                    current_block = actual_end_block + 1
+                    self.save(
+                        min(actual_end_block, self.get_suggested_scan_end_block())
+                    )
+
+                    # The range was throttled down, later chunks are fetched again
+                    # from the end of this one so no blocks are skipped
+                    if actual_end_block < range_end:
+                        break
+
+                last_scan_duration = int(time.time() - start)
+
+                # Try to guess how many blocks to fetch over `eth_get_logs` API next time
+                chunk_size = self.estimate_next_chunk_size(chunk_size, last_logs_found)
+        finally:
+            if executor:
+                # Drop the chunks not started yet when one of them failed
+                executor.shutdown(wait=True, cancel_futures=True)
 
         return all_processed, total_chunks_scanned
 
@@ -0,0 +1,116 @@
+import threading
+from types import SimpleNamespace
+
+import fakeredis
+
+from src.eth_indexing import event_scanner
+from src.eth_indexing.event_scanner import EventScanner
+from src.queries.get_balances import IMMEDIATE_REFRESH_REDIS_PREFIX
+
+LATEST_BLOCK = 1000
+# Every other block has a transfer
+EVENT_BLOCKS = list(range(100, 200, 2))
+
+
+def make_event(block_number):
+    return {
+        "event": "Transfer",
+        "blockNumber": block_number,
+        "logIndex": 0,
+        "transactionHash": bytes.fromhex(f"{block_number:064x}"),
+        "args": {"from": "0xAbC", "to": "0xDeF", "value": 1},
+    }
+
+
+def make_scanner(monkeypatch, max_workers, throttled_block=None):
+    get_block_calls = []
+    web3 = SimpleNamespace(
+        eth=SimpleNamespace(
+            block_number=LATEST_BLOCK,
+            get_block=lambda n: get_block_calls.append(n) or {"timestamp": n},
+        )
+    )
+    scanner = EventScanner(
+        db=None,
+        redis=fakeredis.FakeStrictRedis(),
+        web3=web3,  # type: ignore
+        contract=None,  # type: ignore
+        event_type=None,  # type: ignore
+        filters={},
+        max_workers=max_workers,
+    )
+
+    fetched_ranges = []
+    lock = threading.Lock()
+    throttled = set()
+
+    def fetch_events(web3, event_type, filters, from_block, to_block):
+        # The node fails once on the range holding throttled_block
+        if (
+            throttled_block is not None
+            and from_block <= throttled_block <= to_block
+            and from_block != to_block
+            and from_block not in throttled
+        ):
+            throttled.add(from_block)
+            raise Exception("context was cancelled")
+        with lock:
+            fetched_ranges.append((from_block, to_block))
+        return [make_event(b) for b in EVENT_BLOCKS if from_block <= b <= to_block]
+
+    saved = []
+    monkeypatch.setattr(event_scanner, "_fetch_events_for_all_contracts", fetch_events)
+    monkeypatch.setattr(event_scanner.time, "sleep", lambda _: None)
+    monkeypatch.setattr(scanner, "save", saved.append)
+    monkeypatch.setattr(scanner, "get_wallet_user_ids", lambda wallets: [1])
+    return scanner, fetched_ranges, saved, get_block_calls
+
+
+def test_scan_parallel_chunks(monkeypatch):
+    scanner, fetched_ranges, saved, get_block_calls = make_scanner(
+        monkeypatch, max_workers=4
+    )
+
+    processed, total_chunks = scanner.scan(50, 400)
+
+    assert [int(p.split("-")[0]) for p in processed] == EVENT_BLOCKS
+    assert total_chunks == len(saved)
+    assert saved == sorted(saved)
+    assert saved[-1] >= 400
+    # Each block timestamp is fetched once across chunks
+    assert sorted(get_block_calls) == EVENT_BLOCKS
+    assert scanner.redis.smembers(IMMEDIATE_REFRESH_REDIS_PREFIX) == {b"1"}
+
+    # Accepted chunks cover the blocks contiguously
+    accepted = sorted(fetched_ranges)
+    assert accepted[0][0] == 50
+    for (_, prev_end), (next_start, _) in zip(accepted, accepted[1:]):
+        assert next_start == prev_end + 1
+
+
+def test_scan_parallel_throttled_chunk(monkeypatch):
+    scanner, fetched_ranges, saved, _ = make_scanner(
+        monkeypatch, max_workers=4, throttled_block=130
+    )
+
+    processed, _ = scanner.scan(50, 400)
+
+    # Chunks after a throttled one are fetched again, events are not duplicated
+    assert [int(p.split("-")[0]) for p in processed] == EVENT_BLOCKS
+    assert saved == sorted(saved)
+    assert saved[-1] >= 400
+
+    # Checkpoints only land on ends of contiguously processed ranges
+    starts = {start for start, _ in fetched_ranges}
+    for checkpoint in saved[:-1]:
+        assert checkpoint + 1 in starts
+
+
+def test_scan_sequential(monkeypatch):
+    scanner, fetched_ranges, saved, _ = make_scanner(monkeypatch, max_workers=1)
+
+    processed, total_chunks = scanner.scan(50, 400)
+
+    assert [int(p.split("-")[0]) for p in processed] == EVENT_BLOCKS
+    assert total_chunks == len(fetched_ranges) == len(saved)
+    assert [end for _, end in fetched_ranges] == saved
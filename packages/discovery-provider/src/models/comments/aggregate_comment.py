@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, text
+
+from src.models.base import Base
+from src.models.model_utils import RepresentableMixin
+
+
+class AggregateComment(Base, RepresentableMixin):
+    __tablename__ = "aggregate_comment"
+
+    comment_id = Column(Integer, primary_key=True)
+    react_count = Column(Integer, nullable=False, server_default=text("0"))
+    reply_count = Column(Integer, nullable=False, server_default=text("0"))
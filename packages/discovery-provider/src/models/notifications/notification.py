@@ -51,6 +51,40 @@ class NotificationSeen(Base, RepresentableMixin):
     PrimaryKeyConstraint(user_id, seen_at)
 
 
+class NotificationUnreadCount(Base, RepresentableMixin):
+    __tablename__ = "notification_unread_counts"
+
+    user_id = Column(Integer, primary_key=True)
+    # Unread notification groups per type since seen_at, except announcements
+    counts = Column(postgresql.JSONB(), nullable=False, server_default=text("'{}'"))  # type: ignore
+    seen_at = Column(DateTime, nullable=False)
+    verified_at = Column(DateTime, nullable=False, server_default=text("now()"))
+
+
+class NotificationInbox(Base, RepresentableMixin):
+    __tablename__ = "notification_inbox"
+
+    user_id = Column(Integer, primary_key=True)
+    type = Column(String, primary_key=True)
+    group_id = Column(String, primary_key=True)
+    # Seen interval of the group, '-infinity' before the first notification_seen
+    prev_seen_at = Column(
+        DateTime, primary_key=True, server_default=text("'-infinity'")
+    )
+    seen_at = Column(DateTime)
+    # Latest notification of the group
+    timestamp = Column(DateTime, nullable=False)
+    notification_ids = Column(postgresql.ARRAY(Integer()), nullable=False)
+    count = Column(Integer, nullable=False)
+
+
+class NotificationInboxUser(Base, RepresentableMixin):
+    __tablename__ = "notification_inbox_users"
+
+    user_id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, nullable=False, server_default=text("now()"))
+
+
 class PlaylistSeen(Base, RepresentableMixin):
     __tablename__ = "playlist_seen"
 
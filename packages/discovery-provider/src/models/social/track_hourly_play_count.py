@@ -0,0 +1,14 @@
+from sqlalchemy import Column, DateTime, Integer, String, text
+
+from src.models.base import Base
+from src.models.model_utils import RepresentableMixin
+
+
+class TrackHourlyPlayCount(Base, RepresentableMixin):
+    __tablename__ = "track_hourly_play_counts"
+
+    play_item_id = Column(Integer, primary_key=True)
+    hourly_timestamp = Column(DateTime, primary_key=True)
+    # Empty when the play has no country
+    country = Column(String, primary_key=True, server_default=text("''"))
+    play_count = Column(Integer, nullable=False)
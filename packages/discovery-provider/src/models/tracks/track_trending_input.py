@@ -0,0 +1,33 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer, Numeric, String, text
+
+from src.models.base import Base
+from src.models.model_utils import RepresentableMixin
+
+
+class TrackTrendingInput(Base, RepresentableMixin):
+    """
+    Trending score inputs of a trending eligible track, kept up to date
+    incrementally by index_trending
+    """
+
+    __tablename__ = "track_trending_inputs"
+
+    track_id = Column(Integer, primary_key=True)
+    genre = Column(String)
+    owner_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    release_date = Column(DateTime)
+    play_count = Column(BigInteger)
+    week_listen_counts = Column(BigInteger, nullable=False, server_default=text("0"))
+    month_listen_counts = Column(BigInteger, nullable=False, server_default=text("0"))
+    owner_follower_count = Column(BigInteger)
+    repost_count = Column(BigInteger, nullable=False, server_default=text("0"))
+    save_count = Column(BigInteger, nullable=False, server_default=text("0"))
+    repost_week_count = Column(BigInteger, nullable=False, server_default=text("0"))
+    repost_month_count = Column(BigInteger, nullable=False, server_default=text("0"))
+    save_week_count = Column(BigInteger, nullable=False, server_default=text("0"))
+    save_month_count = Column(BigInteger, nullable=False, server_default=text("0"))
+    karma = Column(Numeric, nullable=False, server_default=text("0"))
+    updated_at = Column(
+        DateTime, nullable=False, server_default=text("CURRENT_TIMESTAMP")
+    )
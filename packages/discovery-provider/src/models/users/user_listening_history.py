@@ -6,6 +6,11 @@ from src.models.model_utils import RepresentableMixin
 
 
 class UserListeningHistory(Base, RepresentableMixin):
+    """
+    Legacy listening history, no longer written. Listens are indexed into
+    user_listening_history_tracks, which was backfilled from this table.
+    """
+
     __tablename__ = "user_listening_history"
 
     user_id = Column(
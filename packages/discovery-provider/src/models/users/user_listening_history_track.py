@@ -0,0 +1,18 @@
+from sqlalchemy import Column, DateTime, Integer, text
+
+from src.models.base import Base
+from src.models.model_utils import RepresentableMixin
+
+
+class UserListeningHistoryTrack(Base, RepresentableMixin):
+    """
+    A track in a user's listening history with the time of their latest play
+    and how many times they played it
+    """
+
+    __tablename__ = "user_listening_history_tracks"
+
+    user_id = Column(Integer, primary_key=True)
+    track_id = Column(Integer, primary_key=True)
+    last_listened_at = Column(DateTime, nullable=False)
+    play_count = Column(Integer, nullable=False, server_default=text("1"))
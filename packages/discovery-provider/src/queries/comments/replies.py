@@ -17,6 +17,8 @@ def get_replies(args, comment_id, current_user_id=None, include_related=False):
         args: Dictionary containing query parameters
             - offset: Pagination offset
             - limit: Pagination limit
+            - cursor: ID of the last reply of the previous page, to page from
+              instead of offset
         comment_id: ID of the comment to get replies for
         current_user_id: ID of the user making the request
         include_related: Whether to include related users and tracks in the response
@@ -25,6 +27,7 @@ def get_replies(args, comment_id, current_user_id=None, include_related=False):
         Dictionary with replies list and related users and tracks
     """
     offset, limit = format_offset(args), format_limit(args)
+    cursor = args.get("cursor")
     db = get_db_read_replica()
 
     with db.scoped_session() as session:
@@ -43,8 +46,9 @@ def get_replies(args, comment_id, current_user_id=None, include_related=False):
             parent_comment_ids=comment_id,
             current_user_id=current_user_id,
             artist_id=artist_id,
-            offset=offset,
+            offset=offset if cursor is None else None,
             limit=limit,
+            cursor_comment_id=cursor,
         )
 
         # Prepare the response
@@ -1,6 +1,7 @@
 import logging
 
 from src.api.v1.helpers import format_limit, format_offset
+from src.models.comments.comment import Comment
 from src.models.tracks.track import Track
 from src.queries.comments.utils import (
     COMMENT_ROOT_DEFAULT_LIMIT,
@@ -23,6 +24,8 @@ def get_track_comments(args, track_id, current_user_id=None, include_related=Fal
             - sort_method: How to sort the comments (top, newest, timestamp)
             - offset: Pagination offset
             - limit: Pagination limit
+            - cursor: ID of the last comment of the previous page, to page from
+              instead of offset
         track_id: ID of the track to get comments for
         current_user_id: ID of the user making the request
         include_related: Whether to include related users and tracks in the response
@@ -33,6 +36,7 @@ def get_track_comments(args, track_id, current_user_id=None, include_related=Fal
     offset, limit = format_offset(args), format_limit(
         args, default_limit=COMMENT_ROOT_DEFAULT_LIMIT
     )
+    cursor = args.get("cursor")
 
     db = get_db_read_replica()
 
@@ -41,12 +45,34 @@ def get_track_comments(args, track_id, current_user_id=None, include_related=Fal
         track = session.query(Track).filter(Track.track_id == track_id).first()
         artist_id = track.owner_id if track else None
         pinned_comment_id = track.pinned_comment_id if track else None
+        pinned_comments = []
 
         # Get base query components
         base_query = get_base_comments_query(session, current_user_id)
 
-        # Build the query using the shared utility function
+        # The pinned comment is queried on its own and comes first, so the
+        # other comments can be read in sort order from an index. The page
+        # after the pinned comment starts at the first of the others
         sort_method = args.get("sort_method", "top")
+        if cursor is not None and cursor == pinned_comment_id:
+            cursor = None
+            offset = 0
+        elif cursor is None and pinned_comment_id is not None:
+            pinned_comments = (
+                build_comments_query(
+                    session=session,
+                    query_type="track",
+                    base_query=base_query,
+                    current_user_id=current_user_id,
+                    artist_id=artist_id,
+                    entity_id=track_id,
+                    sort_method=sort_method,
+                )
+                .filter(Comment.comment_id == pinned_comment_id)
+                .all()
+            )
+
+        # Build the query using the shared utility function
         query = build_comments_query(
             session=session,
             query_type="track",
@@ -56,13 +82,16 @@ def get_track_comments(args, track_id, current_user_id=None, include_related=Fal
             entity_id=track_id,
             pinned_comment_id=pinned_comment_id,
             sort_method=sort_method,
+            cursor_comment_id=cursor,
         )
 
-        # Apply pagination
-        query = query.offset(offset).limit(limit)
-
-        # Execute the query
-        track_comments = query.all()
+        # Apply pagination, counting the pinned comment as the first one
+        if offset < len(pinned_comments):
+            track_comments = pinned_comments + query.limit(limit - 1).all()
+        else:
+            if cursor is None:
+                query = query.offset(offset - len(pinned_comments))
+            track_comments = query.limit(limit).all()
 
         # Format comments and collect user/track IDs
         # The optimized format_comments function will fetch all replies in a single query
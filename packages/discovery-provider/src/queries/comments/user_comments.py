@@ -1,5 +1,7 @@
 import logging
-from typing import TypedDict
+from typing import Optional, TypedDict
+
+from typing_extensions import NotRequired
 
 from src.api.v1.helpers import format_limit, format_offset
 from src.queries.comments.utils import (
@@ -20,6 +22,7 @@ class GetUserCommentsArgs(TypedDict):
     limit: int
     user_id: int
     current_user_id: int
+    cursor: NotRequired[Optional[int]]
 
 
 def get_user_comments(args: GetUserCommentsArgs, include_related=False):
@@ -33,6 +36,8 @@ def get_user_comments(args: GetUserCommentsArgs, include_related=False):
             - sort_method: How to sort the comments (defaults to newest)
             - offset: Pagination offset
             - limit: Pagination limit
+            - cursor: ID of the last comment of the previous page, to page from
+              instead of offset
         include_related: Whether to include related users and tracks in the response
 
     Returns:
@@ -41,6 +46,7 @@ def get_user_comments(args: GetUserCommentsArgs, include_related=False):
     offset, limit = format_offset(args), format_limit(
         args, default_limit=COMMENT_ROOT_DEFAULT_LIMIT
     )
+    cursor = args.get("cursor")
 
     user_id = args["user_id"]
     current_user_id = args["current_user_id"]
@@ -59,10 +65,13 @@ def get_user_comments(args: GetUserCommentsArgs, include_related=False):
             current_user_id=current_user_id,
             user_id=user_id,
             sort_method=sort_method,
+            cursor_comment_id=cursor,
         )
 
         # Apply pagination
-        query = query.offset(offset).limit(limit)
+        if cursor is None:
+            query = query.offset(offset)
+        query = query.limit(limit)
 
         # Execute the query
         user_comments = query.all()
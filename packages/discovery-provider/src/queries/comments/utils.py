@@ -1,7 +1,9 @@
 import logging
 
-from sqlalchemy import func
+from sqlalchemy import and_, false, func, literal, not_, or_, tuple_
 
+from src.models.comments.aggregate_comment import AggregateComment
+from src.models.comments.comment import Comment
 from src.models.comments.comment_mention import CommentMention
 from src.models.comments.comment_notification_setting import CommentNotificationSetting
 from src.models.comments.comment_reaction import CommentReaction
@@ -18,6 +20,8 @@ logger = logging.getLogger(__name__)
 # Constants
 COMMENT_ROOT_DEFAULT_LIMIT = 15  # default pagination limit
 COMMENT_REPLIES_DEFAULT_LIMIT = 3  # default replies pagination limit
+# sorts comments without a track timestamp after all others
+NULL_TRACK_TIMESTAMP_S = 2**31 - 1
 
 
 # Returns whether a comment has been reacted to by a particular user
@@ -38,25 +42,25 @@ def get_is_reacted(session, user_id, comment_id):
 
 def get_base_comments_query(session, current_user_id=None):
     """Base query builder for comments with common functionality"""
-    mentioned_users = (
+    # Mentions of each comment as a subquery on the comment, so a page of
+    # comments only reads the mentions of the comments on it
+    mentions = (
         session.query(
-            CommentMention.comment_id,
-            CommentMention.user_id,
-            User.handle,
-            CommentMention.is_delete,
+            func.array_agg(
+                func.json_build_object(
+                    "user_id",
+                    CommentMention.user_id,
+                    "handle",
+                    User.handle,
+                    "is_delete",
+                    CommentMention.is_delete,
+                )
+            )
         )
+        .select_from(CommentMention)
         .join(User, CommentMention.user_id == User.user_id)
-        .subquery()
-    )
-
-    react_count_subquery = (
-        session.query(
-            CommentReaction.comment_id,
-            func.count(CommentReaction.comment_id).label("react_count"),
-        )
-        .filter(CommentReaction.is_delete == False)
-        .group_by(CommentReaction.comment_id)
-        .subquery()
+        .filter(CommentMention.comment_id == Comment.comment_id)
+        .label("mentions")
     )
 
     muted_by_karma = (
@@ -69,8 +73,7 @@ def get_base_comments_query(session, current_user_id=None):
     )
 
     return {
-        "mentioned_users": mentioned_users,
-        "react_count_subquery": react_count_subquery,
+        "mentions": mentions,
         "muted_by_karma": muted_by_karma,
     }
 
@@ -135,7 +138,7 @@ def _format_comment_response(
         "entity_id": encode_int_id(comment.entity_id),
         "entity_type": comment.entity_type,
         "user_id": encode_int_id(comment.user_id) if not comment.is_delete else None,
-        "mentions": list(map(remove_delete, filter(filter_mentions, mentions))),
+        "mentions": list(map(remove_delete, filter(filter_mentions, mentions or []))),
         "message": comment.text if not comment.is_delete else "[Removed]",
         "is_edited": comment.is_edited,
         "track_timestamp_s": comment.track_timestamp_s,
@@ -222,6 +225,37 @@ def get_track_notification_setting(track_id, current_user_id):
         return notification_setting.is_muted if notification_setting else False
 
 
+def get_keyset_filter(session, sort_keys, is_descending, cursor_comment_id):
+    """
+    Build a filter for the comments sorted after a cursor comment
+
+    Args:
+        session: Database session
+        sort_keys: List of expressions the comments are sorted by
+        is_descending: Whether every sort key runs in descending order
+        cursor_comment_id: ID of the last comment of the previous page
+
+    Returns:
+        SQLAlchemy filter expression
+    """
+    cursor_values = (
+        session.query(*sort_keys)
+        .filter(Comment.comment_id == cursor_comment_id)
+        .first()
+    )
+    if cursor_values is None:
+        return false()
+
+    # The sort keys all run in one direction, so the comments after the cursor
+    # are a single row comparison that an index on the keys can seek to.
+    # Booleans only compare with = to python values, so bind them explicitly
+    keys = tuple_(*sort_keys)
+    cursor = tuple_(
+        *[literal(value, key.type) for key, value in zip(sort_keys, cursor_values)]
+    )
+    return keys < cursor if is_descending else keys > cursor
+
+
 # New utility function to share common query logic
 def build_comments_query(
     session,
@@ -235,6 +269,7 @@ def build_comments_query(
     parent_comment_ids=None,  # New parameter for batch fetching replies
     pinned_comment_id=None,
     sort_method="newest",
+    cursor_comment_id=None,
 ):
     """
     Build a query for comments with common filtering and sorting logic
@@ -249,16 +284,17 @@ def build_comments_query(
         user_id: ID of the user whose comments to retrieve (for user comments)
         parent_comment_id: ID of the parent comment (for replies)
         parent_comment_ids: List of parent comment IDs (for batch_replies)
-        pinned_comment_id: ID of the pinned comment (for track comments)
+        pinned_comment_id: ID of the pinned comment, left out of track comments
+            for the caller to put first
         sort_method: How to sort the comments (top, newest, timestamp)
+        cursor_comment_id: ID of the last comment of the previous page, to fetch
+            the comments after it instead of paging by offset
 
     Returns:
         SQLAlchemy query object
     """
-    from sqlalchemy import and_, asc, desc, func, or_
-    from sqlalchemy.orm import aliased
+    from sqlalchemy import asc, desc
 
-    from src.models.comments.comment import Comment
     from src.models.comments.comment_notification_setting import (
         CommentNotificationSetting,
     )
@@ -271,116 +307,80 @@ def build_comments_query(
     from src.models.tracks.track import Track
     from src.models.users.aggregate_user import AggregateUser
 
-    mentioned_users = base_query["mentioned_users"]
-    react_count_subquery = base_query["react_count_subquery"]
-
-    CommentThreadAlias = aliased(CommentThread)
+    # Every check on other tables is a subquery on the comment rather than a
+    # join, so the comments are read in sort order from an index and the
+    # query stops once it has a page
+    mentions = base_query["mentions"]
+    react_count = func.coalesce(
+        session.query(AggregateComment.react_count)
+        .filter(AggregateComment.comment_id == Comment.comment_id)
+        .as_scalar(),
+        0,
+    )
 
-    # Determine sort order
-    if sort_method == "top":
-        sort_method_order_by = desc(
-            func.coalesce(react_count_subquery.c.react_count, 0)
-        )
-    elif sort_method == "newest":
-        sort_method_order_by = desc(Comment.created_at)
-    elif sort_method == "timestamp":
-        sort_method_order_by = asc(Comment.track_timestamp_s).nullslast()
+    # Determine sort order. Every key runs in the same direction, and the keys
+    # end in (created_at, comment_id) so that every comment has a unique
+    # position to page from. Tombstones sort after the other comments of a
+    # track. The comments indexes on (entity_id, entity_type, NOT is_delete)
+    # serve the newest and timestamp sorts of a track, and (user_id,
+    # created_at, comment_id) serves a user's newest comments. The top sort
+    # orders the comments by their react count from aggregate_comment
+    is_descending = query_type not in ["replies", "batch_replies"]
+    if query_type in ["replies", "batch_replies"]:
+        sort_keys = [Comment.created_at, Comment.comment_id]
     else:
-        # Default to newest
-        sort_method_order_by = desc(Comment.created_at)
+        if sort_method == "top":
+            sort_method_keys = [react_count]
+        elif sort_method == "timestamp":
+            # Earliest track timestamp first
+            sort_method_keys = [
+                -func.coalesce(Comment.track_timestamp_s, NULL_TRACK_TIMESTAMP_S)
+            ]
+        else:
+            # Default to newest
+            sort_method_keys = []
+        sort_keys = [
+            *sort_method_keys,
+            Comment.created_at,
+            Comment.comment_id,
+        ]
+        if query_type == "track":
+            sort_keys.insert(0, not_(Comment.is_delete))
 
     # Start building the query
     if query_type == "replies":
         # For replies to a single parent comment
-        query = session.query(
-            Comment,
-            func.count(CommentReaction.comment_id).label("react_count"),
-            func.array_agg(
-                func.json_build_object(
-                    "user_id",
-                    mentioned_users.c.user_id,
-                    "handle",
-                    mentioned_users.c.handle,
-                    "is_delete",
-                    mentioned_users.c.is_delete,
-                )
-            ).label("mentions"),
-        )
+        query = session.query(Comment, react_count.label("react_count"), mentions)
         query = query.join(
             CommentThread, Comment.comment_id == CommentThread.comment_id
         )
-        query = query.outerjoin(
-            CommentReaction, Comment.comment_id == CommentReaction.comment_id
-        )
     elif query_type == "batch_replies":
         # For fetching replies to multiple parent comments at once
         query = session.query(
             Comment,
-            func.count(CommentReaction.comment_id).label("react_count"),
-            func.array_agg(
-                func.json_build_object(
-                    "user_id",
-                    mentioned_users.c.user_id,
-                    "handle",
-                    mentioned_users.c.handle,
-                    "is_delete",
-                    mentioned_users.c.is_delete,
-                )
-            ).label("mentions"),
+            react_count.label("react_count"),
+            mentions,
             CommentThread.parent_comment_id,  # Include parent_comment_id to map replies
         )
         query = query.join(
             CommentThread, Comment.comment_id == CommentThread.comment_id
         )
-        query = query.outerjoin(
-            CommentReaction,
-            and_(
-                Comment.comment_id == CommentReaction.comment_id,
-                CommentReaction.is_delete == False,
-            ),
-        )
     else:
-        # For track and user comments
-        query = session.query(
-            Comment,
-            func.coalesce(react_count_subquery.c.react_count, 0).label("react_count"),
-            CommentNotificationSetting.is_muted,
-            func.array_agg(
-                func.json_build_object(
-                    "user_id",
-                    mentioned_users.c.user_id,
-                    "handle",
-                    mentioned_users.c.handle,
-                    "is_delete",
-                    mentioned_users.c.is_delete,
-                )
-            ).label("mentions"),
-        )
-        query = query.outerjoin(
-            CommentThreadAlias, Comment.comment_id == CommentThreadAlias.comment_id
-        )
-
-    # Common joins for all query types
-    query = query.outerjoin(
-        mentioned_users, Comment.comment_id == mentioned_users.c.comment_id
-    )
-    query = query.outerjoin(
-        CommentReport, Comment.comment_id == CommentReport.comment_id
-    )
-    query = query.outerjoin(
-        AggregateUser, AggregateUser.user_id == CommentReport.user_id
-    )
-
-    # Add query-specific joins
-    if query_type not in ["replies", "batch_replies"]:
-        query = query.outerjoin(
-            react_count_subquery,
-            Comment.comment_id == react_count_subquery.c.comment_id,
+        # For track and user comments, with whether the commenter muted
+        # notifications for the comment
+        is_muted = (
+            session.query(CommentNotificationSetting)
+            .filter(
+                CommentNotificationSetting.user_id == Comment.user_id,
+                CommentNotificationSetting.entity_id == Comment.comment_id,
+                CommentNotificationSetting.entity_type == "Comment",
+                CommentNotificationSetting.is_muted == True,
+            )
+            .exists()
+            .label("is_muted")
         )
-        query = query.outerjoin(
-            CommentNotificationSetting,
-            (Comment.comment_id == CommentNotificationSetting.entity_id)
-            & (CommentNotificationSetting.entity_type == "Comment"),
+        query = session.query(
+            Comment, react_count.label("react_count"), is_muted, mentions
         )
 
     # Create a subquery to find muted users
@@ -405,29 +405,30 @@ def build_comments_query(
     # Add query-specific filters
     if query_type == "track":
         # For track comments
-        query = query.filter(
-            Comment.entity_id == entity_id,
-            Comment.entity_type == "Track",
-            CommentThreadAlias.parent_comment_id
-            == None,  # Check if parent_comment_id is null
-        )
-
-        # Add ReplyCountAlias for track comments to handle tombstone comments
-        ReplyCountAlias = aliased(CommentThread)
-        query = query.outerjoin(
-            ReplyCountAlias, Comment.comment_id == ReplyCountAlias.parent_comment_id
-        )
-        query = query.group_by(
-            Comment.comment_id,
-            react_count_subquery.c.react_count,
-            CommentNotificationSetting.is_muted,
+        is_reply = (
+            session.query(CommentThread)
+            .filter(CommentThread.comment_id == Comment.comment_id)
+            .exists()
         )
-
         # For track comments, we want to include tombstone comments (deleted comments with replies)
         # This is important for maintaining thread context
-        query = query.having(
-            (func.count(ReplyCountAlias.comment_id) > 0) | (Comment.is_delete == False),
+        has_replies = (
+            session.query(AggregateComment)
+            .filter(
+                AggregateComment.comment_id == Comment.comment_id,
+                AggregateComment.reply_count > 0,
+            )
+            .exists()
+        )
+        query = query.filter(
+            Comment.entity_id == entity_id,
+            Comment.entity_type == "Track",
+            ~is_reply,
+            (Comment.is_delete == False) | has_replies,
         )
+        # The pinned comment is left out, get_track_comments puts it first
+        if pinned_comment_id is not None:
+            query = query.filter(Comment.comment_id != pinned_comment_id)
     elif query_type == "user":
         # For user comments
         query = query.filter(
@@ -446,37 +447,38 @@ def build_comments_query(
                 Track.is_delete == False,  # Filter out comments on deleted tracks
             ),
         )
-
-        query = query.group_by(
-            Comment.comment_id,
-            react_count_subquery.c.react_count,
-            CommentNotificationSetting.is_muted,
-        )
     elif query_type == "replies":
         # For replies to a single parent comment
         query = query.filter(
             CommentThread.parent_comment_id == parent_comment_id,
             Comment.is_delete == False,  # Don't show deleted replies
         )
-        query = query.group_by(Comment.comment_id)
     elif query_type == "batch_replies":
         # For fetching replies to multiple parent comments at once
         query = query.filter(
             CommentThread.parent_comment_id.in_(parent_comment_ids),
             Comment.is_delete == False,  # Don't show deleted replies
         )
-        query = query.group_by(Comment.comment_id, CommentThread.parent_comment_id)
 
-    # Common filters for all query types
-    query = query.filter(
-        or_(
-            CommentReport.comment_id == None,
-            and_(
-                CommentReport.user_id != current_user_id,
-                CommentReport.is_delete == True,
-            ),
+    # Hide comments reported by the current user, or by the artist for track
+    # comments and replies
+    reporter_ids = [current_user_id]
+    if query_type != "user":
+        reporter_ids.append(artist_id)
+    reporter_ids = [
+        reporter_id for reporter_id in reporter_ids if reporter_id is not None
+    ]
+    if reporter_ids:
+        is_reported = (
+            session.query(CommentReport)
+            .filter(
+                CommentReport.comment_id == Comment.comment_id,
+                CommentReport.user_id.in_(reporter_ids),
+                CommentReport.is_delete == False,
+            )
+            .exists()
         )
-    )
+        query = query.filter(~is_reported)
 
     # Filter out comments from muted users, but always show comments to their owners
     if muted_users_subquery is not None:
@@ -493,48 +495,30 @@ def build_comments_query(
         else:
             query = query.filter(~Comment.user_id.in_(muted_users_subquery))
 
-    # Add artist_id filter for track comments and replies
-    if artist_id is not None and query_type != "user":
-        query = query.filter(
-            or_(
-                CommentReport.user_id == None,
-                CommentReport.user_id != artist_id,
+    # Add karma threshold for track and user comments, hiding comments whose
+    # reporters together have too many followers
+    if query_type not in ["replies", "batch_replies"]:
+        reporters_karma = (
+            session.query(func.coalesce(func.sum(AggregateUser.follower_count), 0))
+            .select_from(CommentReport)
+            .join(AggregateUser, AggregateUser.user_id == CommentReport.user_id)
+            .filter(
+                CommentReport.comment_id == Comment.comment_id,
+                CommentReport.is_delete == False,
             )
+            .as_scalar()
         )
+        query = query.filter(reporters_karma < COMMENT_KARMA_THRESHOLD)
 
-    # Add karma threshold for track and user comments
-    if query_type not in ["replies", "batch_replies"]:
-        query = query.having(
-            func.coalesce(func.sum(AggregateUser.follower_count), 0)
-            < COMMENT_KARMA_THRESHOLD,
+    # Keyset pagination, each page starts where the previous one ended
+    if cursor_comment_id is not None:
+        query = query.filter(
+            get_keyset_filter(session, sort_keys, is_descending, cursor_comment_id)
         )
 
-    # Add sorting
-    if query_type == "track" and pinned_comment_id is not None:
-        query = query.order_by(
-            # pinned comments at the top, tombstone comments at the bottom, then all others inbetween
-            desc(Comment.comment_id == pinned_comment_id),
-            asc(Comment.is_delete),  # required for tombstone
-            sort_method_order_by,
-            desc(func.sum(AggregateUser.follower_count)),  # karma
-            desc(Comment.created_at),
-        )
-    elif query_type == "track" and sort_method == "timestamp":
-        # For timestamp sorting, we need special handling to ensure tombstone comments appear at the end
-        query = query.order_by(
-            asc(Comment.is_delete),  # Non-deleted comments first
-            sort_method_order_by,  # Then sort by timestamp
-            desc(func.sum(AggregateUser.follower_count)),  # karma
-            desc(Comment.created_at),
-        )
-    elif query_type in ["replies", "batch_replies"]:
-        query = query.order_by(asc(Comment.created_at))
-    else:
-        query = query.order_by(
-            sort_method_order_by,
-            desc(func.sum(AggregateUser.follower_count)),  # karma
-            desc(Comment.created_at),
-        )
+    query = query.order_by(
+        *[desc(key) if is_descending else asc(key) for key in sort_keys]
+    )
 
     return query
 
@@ -754,6 +738,7 @@ def get_comment_replies(
     offset=None,
     limit=None,
     reactions_map=None,
+    cursor_comment_id=None,
 ):
     """
     Fetch replies for one or more parent comments.
@@ -766,6 +751,7 @@ def get_comment_replies(
         offset: Pagination offset (optional)
         limit: Pagination limit (optional)
         reactions_map: Pre-fetched reactions map (optional)
+        cursor_comment_id: ID of the last reply of the previous page (optional)
 
     Returns:
         If parent_comment_ids is a list, returns a dict mapping parent_comment_id to list of formatted replies
@@ -789,6 +775,7 @@ def get_comment_replies(
         current_user_id=current_user_id,
         artist_id=artist_id,
         parent_comment_ids=parent_comment_ids,
+        cursor_comment_id=cursor_comment_id,
     )
 
     # Apply pagination if provided
@@ -831,7 +818,7 @@ def get_comment_replies(
                     lambda m: {k: v for k, v in m.items() if k != "is_delete"},
                     [
                         m
-                        for m in mentions
+                        for m in mentions or []
                         if m["user_id"] is not None and m["is_delete"] is not True
                     ],
                 )
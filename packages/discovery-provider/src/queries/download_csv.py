@@ -1,4 +1,4 @@
-from typing import Optional, TypedDict
+from typing import Dict, Iterator, Optional, Tuple, TypedDict
 
 from sqlalchemy import and_, desc, or_
 
@@ -18,7 +18,7 @@ from src.models.users.user_bank import USDCUserBankAccount
 from src.models.users.user_pubkey import UserPubkey
 from src.solana.constants import USDC_DECIMALS
 from src.utils.config import shared_config
-from src.utils.csv_writer import write_csv_string
+from src.utils.csv_writer import stream_csv
 from src.utils.db_session import get_db_read_replica
 
 env = shared_config["discprov"]["env"]
@@ -27,6 +27,10 @@ staking_bridge_usdc_payout_wallet = shared_config["solana"][
     "staking_bridge_usdc_payout_wallet"
 ]
 
+# Rows are fetched from a server side cursor in batches of this size, so that
+# downloads take the same memory however many rows a user has
+DOWNLOAD_BATCH_SIZE = 1000
+
 
 class DownloadPurchasesArgs(TypedDict):
     buyer_user_id: int
@@ -44,8 +48,8 @@ class DownloadWithdrawalsArgs(TypedDict):
 # Get all purchases or sales for a given artist.
 def get_purchases_or_sales(
     user_id: int, is_purchases: bool, grantee_user_id: Optional[int] = None
-):
-    """Get all purchases or sales for a given artist."""
+) -> Iterator:
+    """Yields all purchases or sales for a given artist, newest first."""
     db = get_db_read_replica()
     with db.scoped_session() as session:
         if is_purchases:
@@ -142,10 +146,10 @@ def get_purchases_or_sales(
             )
         )
 
-        return (
+        yield from (
             playlists_query.union(tracks_query)
             .order_by(desc(USDCPurchase.created_at))
-            .all()
+            .yield_per(DOWNLOAD_BATCH_SIZE)
         )
 
 
@@ -168,58 +172,54 @@ def get_dollar_amount(amount: str):
     return int(amount) / 10**USDC_DECIMALS
 
 
-# Returns USDC purchases for a given user in a CSV format
-def download_purchases(args: DownloadPurchasesArgs):
+# Map the user ids and payout wallets of purchase splits to their amounts,
+# keeping the first split of each
+def get_split_amounts(splits) -> Tuple[Dict, Dict]:
+    amounts_by_user_id: Dict = {}
+    amounts_by_payout_wallet: Dict = {}
+    for split in splits:
+        amounts_by_user_id.setdefault(split.get("user_id"), split["amount"])
+        amounts_by_payout_wallet.setdefault(split.get("payout_wallet"), split["amount"])
+    return amounts_by_user_id, amounts_by_payout_wallet
+
+
+def format_purchase_for_download(result):
+    """Format a purchase result into a CSV-friendly dictionary format."""
+    amounts_by_user_id, amounts_by_payout_wallet = get_split_amounts(result.splits)
+    is_seller_paid = result.seller_user_id in amounts_by_user_id
+    network_fee = amounts_by_payout_wallet.get(staking_bridge_usdc_payout_wallet)
+
+    return {
+        "title": result.content_title,
+        "link": get_link(result.content_type, result.seller_handle, result.slug),
+        "artist": result.seller_name,
+        "date": result.created_at,
+        "paid to artist": (
+            get_dollar_amount(amounts_by_user_id[result.seller_user_id])
+            if is_seller_paid
+            else None
+        ),
+        "network fee": (
+            get_dollar_amount(network_fee) if network_fee is not None else None
+        ),
+        "pay extra": get_dollar_amount(result.extra_amount),
+        "total": (
+            get_dollar_amount(str(int(result.amount) + int(result.extra_amount)))
+            if is_seller_paid
+            else None
+        ),
+    }
+
+
+# Returns USDC purchases for a given user in a CSV format, streamed in chunks
+def download_purchases(args: DownloadPurchasesArgs) -> Iterator[str]:
     buyer_user_id = args["buyer_user_id"]
 
     # Get purchases for user
     results = get_purchases_or_sales(buyer_user_id, is_purchases=True)
 
-    # Build list of dictionary results
-    contents = list(
-        map(
-            lambda result: {
-                "title": result.content_title,
-                "link": get_link(
-                    result.content_type, result.seller_handle, result.slug
-                ),
-                "artist": result.seller_name,
-                "date": result.created_at,
-                "paid to artist": next(
-                    (
-                        get_dollar_amount(item["amount"])
-                        for item in result.splits
-                        if item["user_id"] == result.seller_user_id
-                    ),
-                    None,
-                ),
-                "network fee": next(
-                    (
-                        get_dollar_amount(item["amount"])
-                        for item in result.splits
-                        if item["payout_wallet"] == staking_bridge_usdc_payout_wallet
-                    ),
-                    None,
-                ),
-                "pay extra": get_dollar_amount(result.extra_amount),
-                "total": next(
-                    (
-                        get_dollar_amount(
-                            str(int(result.amount) + int(result.extra_amount))
-                        )
-                        for item in result.splits
-                        if item["user_id"] == result.seller_user_id
-                    ),
-                    None,
-                ),
-            },
-            results,
-        )
-    )
-
     # Get results in CSV format
-    to_download = write_csv_string(contents)
-    return to_download
+    return stream_csv(map(format_purchase_for_download, results))
 
 
 def format_sale_for_download(
@@ -228,6 +228,9 @@ def format_sale_for_download(
     """Format a sale result into a CSV-friendly dictionary format."""
     # Convert datetime to ISO format string
     created_at = result.created_at.isoformat() if result.created_at else None
+    amounts_by_user_id, amounts_by_payout_wallet = get_split_amounts(result.splits)
+    network_fee = amounts_by_payout_wallet.get(staking_bridge_usdc_payout_wallet)
+    seller_amount = amounts_by_user_id.get(seller_user_id)
 
     # Base fields without underscores
     base_fields = {
@@ -236,22 +239,14 @@ def format_sale_for_download(
         "purchased by": result.buyer_name,
         "date": created_at,
         "sale price": get_dollar_amount(result.amount),
-        "network fee": next(
-            (
-                0 - get_dollar_amount(item["amount"])
-                for item in result.splits
-                if item["payout_wallet"] == staking_bridge_usdc_payout_wallet
-            ),
-            None,
+        "network fee": (
+            0 - get_dollar_amount(network_fee) if network_fee is not None else None
         ),
         "pay extra": get_dollar_amount(result.extra_amount),
-        "total": next(
-            (
-                get_dollar_amount(str(int(item["amount"]) + int(result.extra_amount)))
-                for item in result.splits
-                if item["user_id"] == seller_user_id
-            ),
-            None,
+        "total": (
+            get_dollar_amount(str(int(seller_amount) + int(result.extra_amount)))
+            if seller_user_id in amounts_by_user_id
+            else None
         ),
         "country": result.country,
     }
@@ -282,7 +277,10 @@ def format_sale_for_download(
 
 
 def download_sales(args: DownloadSalesArgs, return_json: bool = False):
-    """Returns USDC sales for a given artist in CSV or JSON format."""
+    """
+    Returns USDC sales for a given artist in JSON format, or in CSV format
+    streamed in chunks.
+    """
     seller_user_id = args["seller_user_id"]
     grantee_user_id = args.get("grantee_user_id")
 
@@ -302,31 +300,33 @@ def download_sales(args: DownloadSalesArgs, return_json: bool = False):
         )
         seller_handle = seller.handle if seller else None
 
-    # Build list of results
-    contents = []
-    for result in results:
-        sale_data = format_sale_for_download(
+    contents = (
+        format_sale_for_download(
             result, seller_handle, seller_user_id, is_for_json_response=return_json
         )
-        contents.append(sale_data)
+        for result in results
+    )
 
     # Return JSON if requested
     if return_json:
-        return {"sales": contents}
+        return {"sales": list(contents)}
 
     # Get results in CSV format
-    to_download = write_csv_string(contents)
-    return to_download
+    return stream_csv(contents)
 
 
-def download_withdrawals(args: DownloadWithdrawalsArgs):
+def get_withdrawals(user_id: int) -> Iterator:
+    """Yields the USDC withdrawals of a user, newest first."""
     db = get_db_read_replica()
     with db.scoped_session() as session:
-        # Get USDC withdrawals for user
-        results = (
-            session.query(USDCTransactionsHistory)
+        yield from (
+            session.query(
+                USDCTransactionsHistory.tx_metadata,
+                USDCTransactionsHistory.transaction_created_at,
+                USDCTransactionsHistory.change,
+            )
             .select_from(User)
-            .filter(User.user_id == args["user_id"])
+            .filter(User.user_id == user_id)
             .filter(User.is_current == True)
             .join(
                 USDCUserBankAccount, USDCUserBankAccount.ethereum_address == User.wallet
@@ -340,21 +340,20 @@ def download_withdrawals(args: DownloadWithdrawalsArgs):
             )
             .filter(USDCTransactionsHistory.method == USDCTransactionMethod.send)
             .order_by(desc(USDCTransactionsHistory.transaction_created_at))
-            .all()
+            .yield_per(DOWNLOAD_BATCH_SIZE)
         )
 
-        # Build list of dictionary results
-        contents = list(
-            map(
-                lambda result: {
-                    "destination wallet": result.tx_metadata,
-                    "date": result.transaction_created_at,
-                    "amount": get_dollar_amount(result.change),
-                },
-                results,
-            )
-        )
 
-        # Get results in CSV format
-        to_download = write_csv_string(contents)
-        return to_download
+# Returns USDC withdrawals for a given user in a CSV format, streamed in chunks
+def download_withdrawals(args: DownloadWithdrawalsArgs) -> Iterator[str]:
+    results = get_withdrawals(args["user_id"])
+
+    # Get results in CSV format
+    return stream_csv(
+        {
+            "destination wallet": result.tx_metadata,
+            "date": result.transaction_created_at,
+            "amount": get_dollar_amount(result.change),
+        }
+        for result in results
+    )
@@ -0,0 +1,71 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+from src.models.users.usdc_purchase import PurchaseType
+from src.queries import download_csv
+from src.queries.download_csv import (
+    format_purchase_for_download,
+    format_sale_for_download,
+)
+
+fee_wallet = "fee_wallet"
+
+
+def make_result(splits, **kwargs):
+    return SimpleNamespace(
+        content_type=PurchaseType.track,
+        content_title="title",
+        slug="slug",
+        created_at=datetime(2024, 1, 1),
+        amount="3000000",
+        extra_amount="1000000",
+        splits=splits,
+        **kwargs,
+    )
+
+
+def test_format_purchase_for_download(monkeypatch):
+    monkeypatch.setattr(download_csv, "staking_bridge_usdc_payout_wallet", fee_wallet)
+    result = make_result(
+        [
+            {"user_id": 2, "payout_wallet": "a", "amount": "2500000"},
+            {"user_id": None, "payout_wallet": fee_wallet, "amount": "500000"},
+            # Only the first split of a user counts
+            {"user_id": 2, "payout_wallet": "b", "amount": "100"},
+        ],
+        seller_user_id=2,
+        seller_handle="seller",
+        seller_name="Seller",
+    )
+
+    purchase = format_purchase_for_download(result)
+    assert purchase["paid to artist"] == 2.5
+    assert purchase["network fee"] == 0.5
+    assert purchase["pay extra"] == 1
+    assert purchase["total"] == 4
+
+    result.splits = [{"user_id": 3, "payout_wallet": "a", "amount": "3000000"}]
+    purchase = format_purchase_for_download(result)
+    assert purchase["paid to artist"] is None
+    assert purchase["network fee"] is None
+    assert purchase["total"] is None
+
+
+def test_format_sale_for_download(monkeypatch):
+    monkeypatch.setattr(download_csv, "staking_bridge_usdc_payout_wallet", fee_wallet)
+    result = make_result(
+        [
+            {"user_id": 2, "payout_wallet": "a", "amount": "2500000"},
+            {"user_id": None, "payout_wallet": fee_wallet, "amount": "500000"},
+        ],
+        buyer_name="Buyer",
+        country="US",
+    )
+
+    sale = format_sale_for_download(result, "seller", 2)
+    assert sale["sale price"] == 3
+    assert sale["network fee"] == -0.5
+    assert sale["total"] == 3.5
+    assert sale["date"] == "2024-01-01T00:00:00"
+
+    assert format_sale_for_download(result, "seller", 3)["total"] is None
@@ -1,5 +1,6 @@
+import json
 import logging
-from typing import Optional
+from typing import List, Optional, Sequence
 
 from sqlalchemy import desc, text
 from sqlalchemy.orm.session import Session
@@ -13,10 +14,12 @@ from src.models.tracks.track import Track
 from src.models.tracks.track_trending_score import TrackTrendingScore
 from src.queries.get_unpopulated_tracks import get_unpopulated_tracks
 from src.trending_strategies.base_trending_strategy import BaseTrendingStrategy
+from src.utils import redis_connection
 
 logger = logging.getLogger(__name__)
 
 TRENDING_TRACKS_LIMIT = 100
+TRENDING_TIME_RANGES = ["week", "month", "allTime"]
 
 
 def make_generate_unpopulated_trending(
@@ -33,6 +36,50 @@ def make_generate_unpopulated_trending(
     if time_range == "year":
         time_range = "allTime"
 
+    track_ids = None
+    # index_trending materializes the ordered ids of the default variants
+    if (
+        not usdc_purchase_only
+        and exclude_collectible_gated
+        == SHOULD_TRENDING_EXCLUDE_COLLECTIBLE_GATED_TRACKS
+        and limit <= TRENDING_TRACKS_LIMIT
+    ):
+        track_ids = get_materialized_trending_track_ids(
+            strategy, genre, time_range, exclude_gated
+        )
+    if track_ids is None:
+        track_ids = get_trending_track_ids(
+            session,
+            genre,
+            time_range,
+            strategy,
+            exclude_gated,
+            usdc_purchase_only,
+            exclude_collectible_gated,
+            limit,
+        )
+    track_ids = track_ids[:limit]
+
+    # Get unpopulated metadata, dropping tracks deleted since trending was materialized
+    tracks = get_unpopulated_tracks(
+        session, track_ids, filter_deleted=True, exclude_gated=exclude_gated
+    )
+    track_ids = [track["track_id"] for track in tracks]
+
+    return (tracks, track_ids)
+
+
+def get_trending_track_ids(
+    session: Session,
+    genre: Optional[str],
+    time_range: str,
+    strategy: BaseTrendingStrategy,
+    exclude_gated: bool = SHOULD_TRENDING_EXCLUDE_GATED_TRACKS,
+    usdc_purchase_only: bool = False,
+    exclude_collectible_gated: bool = SHOULD_TRENDING_EXCLUDE_COLLECTIBLE_GATED_TRACKS,
+    limit: int = TRENDING_TRACKS_LIMIT,
+) -> List[int]:
+    """Sorts the trending scores of `strategy` into the ordered trending track ids"""
     trending_scores_query = session.query(
         TrackTrendingScore.track_id, TrackTrendingScore.score
     ).filter(
@@ -95,8 +142,60 @@ def make_generate_unpopulated_trending(
         .all()
     )
 
-    # Get unpopulated metadata
-    track_ids = [track_id[0] for track_id in trending_track_ids]
-    tracks = get_unpopulated_tracks(session, track_ids, exclude_gated=exclude_gated)
+    return [track_id[0] for track_id in trending_track_ids]
 
-    return (tracks, track_ids)
+
+def get_trending_track_ids_key(
+    strategy: BaseTrendingStrategy,
+    genre: Optional[str],
+    time_range: str,
+    exclude_gated: bool,
+):
+    return (
+        f"trending-track-ids:{strategy.trending_type.name}:{strategy.version.name}"
+        f":{time_range}:{genre or 'all'}:{exclude_gated}"
+    )
+
+
+def get_materialized_trending_track_ids(
+    strategy: BaseTrendingStrategy,
+    genre: Optional[str],
+    time_range: str,
+    exclude_gated: bool,
+) -> Optional[List[int]]:
+    """Returns the trending track ids written by index_trending, or None if missing"""
+    key = get_trending_track_ids_key(strategy, genre, time_range, exclude_gated)
+    try:
+        track_ids = redis_connection.get_redis().get(key)
+    except Exception as e:
+        logger.warning(f"Unable to read materialized trending {key}: {e}")
+        return None
+    return json.loads(track_ids) if track_ids is not None else None
+
+
+def materialize_trending_track_ids(
+    session: Session,
+    redis,
+    strategy: BaseTrendingStrategy,
+    genres: Sequence[Optional[str]],
+    ttl_sec: int,
+):
+    """
+    Writes the ordered trending track ids of every genre, time range and
+    exclude_gated variant of `strategy` so reads only slice them.
+    """
+    pipe = redis.pipeline()
+    for genre in genres:
+        for time_range in TRENDING_TIME_RANGES:
+            for exclude_gated in [True, False]:
+                track_ids = get_trending_track_ids(
+                    session, genre, time_range, strategy, exclude_gated
+                )
+                pipe.set(
+                    get_trending_track_ids_key(
+                        strategy, genre, time_range, exclude_gated
+                    ),
+                    json.dumps(track_ids),
+                    ttl_sec,
+                )
+    pipe.execute()
@@ -13,7 +13,11 @@ logger = logging.getLogger(__name__)
 # How stale of a zero user balance we tolerate before refreshing
 BALANCE_REFRESH = 12 * 60 * 60
 
-LAZY_REFRESH_REDIS_PREFIX = "USER_BALANCE_REFRESH_LAZY"
+# Sorted set of user ids scored by how often their balance was requested
+LAZY_REFRESH_REDIS_PREFIX = "USER_BALANCE_REFRESH_LAZY_QUEUE"
+# Set of lazy refresh user ids before they were prioritized, drained into
+# LAZY_REFRESH_REDIS_PREFIX by update_user_balances
+LEGACY_LAZY_REFRESH_REDIS_PREFIX = "USER_BALANCE_REFRESH_LAZY"
 IMMEDIATE_REFRESH_REDIS_PREFIX = "USER_BALANCE_REFRESH_IMMEDIATE"
 
 
@@ -33,10 +37,13 @@ def does_user_balance_need_refresh(user_balance: UserBalance) -> bool:
 
 
 def enqueue_lazy_balance_refresh(redis: Redis, user_ids: List[int]):
-    # unsafe to call redis.sadd w/ empty array
+    """Bumps the refresh priority of each user id by one request"""
     if not user_ids:
         return
-    redis.sadd(LAZY_REFRESH_REDIS_PREFIX, *user_ids)
+    pipe = redis.pipeline(transaction=False)
+    for user_id in user_ids:
+        pipe.zincrby(LAZY_REFRESH_REDIS_PREFIX, 1, user_id)
+    pipe.execute()
 
 
 def enqueue_immediate_balance_refresh(redis: Redis, user_ids: List[int]):
@@ -94,15 +101,15 @@ def get_balances(session: Session, redis: Redis, user_ids: List[int]):
     result.update(no_balance_dict)  # type: ignore
 
     # Get old balances that need refresh
-    # needs_refresh = [
-    #     user_balance.user_id
-    #     for user_balance in query
-    #     if does_user_balance_need_refresh(user_balance)
-    # ]
+    needs_refresh = [
+        user_balance.user_id
+        for user_balance in query
+        if does_user_balance_need_refresh(user_balance)
+    ]
 
     # Enqueue new balances to Redis refresh queue
     # 1. All users who need a new balance
     # 2. All users who need a balance refresh
-    # enqueue_lazy_balance_refresh(redis, list(needs_balance_set) + needs_refresh)
+    enqueue_lazy_balance_refresh(redis, list(needs_balance_set) + needs_refresh)
 
     return result
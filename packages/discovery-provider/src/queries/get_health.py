@@ -3,7 +3,7 @@ import logging
 import os
 import time
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional, Tuple, TypedDict, cast
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypedDict, cast
 
 import requests
 from elasticsearch import Elasticsearch
@@ -12,6 +12,7 @@ from redis import Redis
 from src.eth_indexing.event_scanner import eth_indexing_last_scanned_block_key
 from src.models.indexing.block import Block
 from src.monitors import monitor_names, monitors
+from src.monitors.monitors import get_monitor_redis_key, parse_value
 from src.queries.get_balances import (
     IMMEDIATE_REFRESH_REDIS_PREFIX,
     LAZY_REFRESH_REDIS_PREFIX,
@@ -25,15 +26,15 @@ from src.tasks.index_core import (
     core_health_check_cache_key,
     core_listens_health_check_cache_key,
 )
-from src.utils import (  # elasticdsl,
-    db_session,
-    get_all_nodes,
-    helpers,
-    redis_connection,
-)
+from src.utils import db_session, helpers, redis_connection  # elasticdsl,
 from src.utils.config import shared_config
 from src.utils.elasticdsl import ES_INDEXES
+from src.utils.get_all_nodes import (
+    ALL_DISCOVERY_NODES_CACHE_KEY,
+    ALL_HEALTHY_CONTENT_NODES_CACHE_KEY,
+)
 from src.utils.prometheus_metric import PrometheusMetric, PrometheusMetricNames
+from src.utils.redis_cache import deserialize_cached_value
 from src.utils.redis_constants import (
     SolanaIndexerStatus,
     challenges_last_processed_event_redis_key,
@@ -62,6 +63,9 @@ default_indexing_interval_seconds = int(
     shared_config["discprov"]["block_processing_interval_sec"]
 )
 infra_setup = shared_config["discprov"]["infra_setup"]
+health_check_cache_ttl_sec = float(
+    shared_config["discprov"]["health_check_cache_ttl_sec"]
+)
 environment = shared_config["discprov"]["env"]
 
 # min system requirement values
@@ -71,11 +75,28 @@ min_filesystem_size: int = 240000000000  # 240 GB of file system storage
 
 
 def get_elapsed_time_redis(redis, redis_key):
-    last_seen = redis.get(redis_key)
+    return _get_elapsed_time(redis.get(redis_key))
+
+
+def _get_elapsed_time(last_seen):
     elapsed_time_in_sec = (int(time.time()) - int(last_seen)) if last_seen else None
     return elapsed_time_in_sec
 
 
+def _get_health_redis_values(redis: Redis, keys: List[str]) -> Dict[str, Any]:
+    """Reads every key in one pipelined round trip, keyed by redis key"""
+    pipe = redis.pipeline(transaction=False)
+    for key in keys:
+        pipe.get(key)
+    pipe.zcard(LAZY_REFRESH_REDIS_PREFIX)
+    pipe.scard(IMMEDIATE_REFRESH_REDIS_PREFIX)
+    results = pipe.execute()
+    values = dict(zip(keys, results))
+    values[LAZY_REFRESH_REDIS_PREFIX] = results[-2]
+    values[IMMEDIATE_REFRESH_REDIS_PREFIX] = results[-1]
+    return values
+
+
 # Returns DB block state & diff
 def _get_db_block_state():
     db = db_session.get_db_read_replica()
@@ -86,26 +107,39 @@ def _get_db_block_state():
         return helpers.model_to_dictionary(db_block_query[0])
 
 
+def _get_monitor_values(
+    redis_values: Dict[str, Any], monitor_list: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Parses the monitor values read by _get_health_redis_values"""
+    return {
+        monitor[monitor_names.name]: parse_value(
+            monitor, redis_values[get_monitor_redis_key(monitor)]
+        )
+        for monitor in monitor_list
+    }
+
+
+db_conn_monitors: List[Dict[str, Any]] = [
+    MONITORS[monitor_names.database_connections],
+    MONITORS[monitor_names.database_connection_info],
+]
+query_insights_monitors: List[Dict[str, Any]] = [
+    MONITORS[monitor_names.frequent_queries],
+    MONITORS[monitor_names.slow_queries],
+]
+table_size_monitors: List[Dict[str, Any]] = [MONITORS[monitor_names.table_size_info]]
+
+
 # Returns number of and info on open db connections
-def _get_db_conn_state():
-    conn_state = monitors.get_monitors(
-        [
-            MONITORS[monitor_names.database_connections],
-            MONITORS[monitor_names.database_connection_info],
-        ]
-    )
+def _get_db_conn_state(redis_values: Dict[str, Any]):
+    conn_state = _get_monitor_values(redis_values, db_conn_monitors)
 
     return conn_state, False
 
 
 # Returns query insights
-def _get_query_insights():
-    query_insights = monitors.get_monitors(
-        [
-            MONITORS[monitor_names.frequent_queries],
-            MONITORS[monitor_names.slow_queries],
-        ]
-    )
+def _get_query_insights(redis_values: Dict[str, Any]):
+    query_insights = _get_monitor_values(redis_values, query_insights_monitors)
 
     return query_insights, False
 
@@ -158,6 +192,44 @@ class GetHealthArgs(TypedDict):
     aggregate_tips_max_drift: Optional[int]
 
 
+# Health check results computed by this process by key, with expiry
+_health_cache: Dict[Tuple, Tuple[float, Any]] = {}
+
+
+def get_process_cached(key: Tuple, compute: Callable[[], Any]) -> Any:
+    """
+    Returns this process's result of `compute` for `key`, recomputing it once it
+    is older than health_check_cache_ttl_sec so frequent health probes share one
+    computation
+    """
+    if health_check_cache_ttl_sec <= 0:
+        return compute()
+
+    now = time.monotonic()
+    cached = _health_cache.get(key)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    result = compute()
+    expired_keys = [
+        k for k, (expiry, _) in list(_health_cache.items()) if expiry <= now
+    ]
+    for expired_key in expired_keys:
+        _health_cache.pop(expired_key, None)
+    _health_cache[key] = (now + health_check_cache_ttl_sec, result)
+    return result
+
+
+def get_health_cached(
+    args: GetHealthArgs, use_redis_cache: bool = True
+) -> Tuple[Dict, bool]:
+    """Same as get_health, reusing this process's result for the same args"""
+    return get_process_cached(
+        ("get_health", use_redis_cache, tuple(sorted(args.items()))),
+        lambda: get_health(args, use_redis_cache),
+    )
+
+
 def get_health(args: GetHealthArgs, use_redis_cache: bool = True) -> Tuple[Dict, bool]:
     """
     Gets health status for the service
@@ -192,21 +264,86 @@ def get_health(args: GetHealthArgs, use_redis_cache: bool = True) -> Tuple[Dict,
     latest_indexed_block_num: Optional[int] = None
     latest_indexed_block_hash: Optional[str] = None
 
+    solana_indexers = {
+        "user_bank": (redis_keys.solana.user_bank, user_bank_max_drift),
+        "spl_token": (redis_keys.solana.spl_token, spl_token_max_drift),
+        "reward_manager": (
+            redis_keys.solana.reward_manager,
+            reward_manager_max_drift,
+        ),
+        "payment_router": (
+            redis_keys.solana.payment_router,
+            payment_router_max_drift,
+        ),
+        "aggregate_tips": (
+            redis_keys.solana.aggregate_tips,
+            aggregate_tips_max_drift,
+        ),
+    }
+    sys_info_monitors: List[Dict[str, Any]] = [
+        MONITORS[monitor_names.database_size],
+        MONITORS[monitor_names.database_connections],
+        MONITORS[monitor_names.total_memory],
+        MONITORS[monitor_names.used_memory],
+        MONITORS[monitor_names.filesystem_size],
+        MONITORS[monitor_names.filesystem_used],
+        MONITORS[monitor_names.received_bytes_per_sec],
+        MONITORS[monitor_names.transferred_bytes_per_sec],
+        MONITORS[monitor_names.redis_total_memory],
+    ]
+    verbose_monitors = (
+        db_conn_monitors + query_insights_monitors + table_size_monitors
+        if verbose
+        else []
+    )
+
+    # Collect every key up front so redis is read in a single round trip
+    redis_values = _get_health_redis_values(
+        redis,
+        [
+            most_recent_indexed_block_redis_key,
+            most_recent_indexed_block_hash_redis_key,
+            core_health_check_cache_key,
+            core_listens_health_check_cache_key,
+            latest_block_redis_key,
+            latest_block_hash_redis_key,
+            trending_tracks_last_completion_redis_key,
+            trending_playlists_last_completion_redis_key,
+            challenges_last_processed_event_redis_key,
+            user_balances_refresh_last_completion_redis_key,
+            eth_indexing_last_scanned_block_key,
+            index_eth_last_completion_redis_key,
+            ALL_DISCOVERY_NODES_CACHE_KEY,
+            ALL_HEALTHY_CONTENT_NODES_CACHE_KEY,
+            *[
+                key
+                for indexer_keys, _ in solana_indexers.values()
+                for key in (indexer_keys.last_completed_at, indexer_keys.last_tx)
+            ],
+            *[
+                get_monitor_redis_key(monitor)
+                for monitor in sys_info_monitors + verbose_monitors
+            ],
+        ],
+    )
+
     if use_redis_cache:
         # get latest db state from redis cache
-        latest_indexed_block_num = redis.get(most_recent_indexed_block_redis_key)
+        latest_indexed_block_num = redis_values[most_recent_indexed_block_redis_key]
         if latest_indexed_block_num is not None:
             latest_indexed_block_num = int(latest_indexed_block_num)
 
-        latest_indexed_block_hash_bytes = redis.get(
+        latest_indexed_block_hash_bytes = redis_values[
             most_recent_indexed_block_hash_redis_key
-        )
+        ]
         if latest_indexed_block_hash_bytes is not None:
             latest_indexed_block_hash = latest_indexed_block_hash_bytes.decode("utf-8")
 
-    core_health: CoreHealth = get_core_health(redis=redis)
-    core_listens_health = get_core_listens_health(
-        redis=redis, plays_count_max_drift=plays_count_max_drift
+    core_health: CoreHealth = _parse_core_health(
+        redis_values[core_health_check_cache_key]
+    )
+    core_listens_health = _parse_core_listens_health(
+        redis_values[core_listens_health_check_cache_key], plays_count_max_drift
     )
 
     latest_block_ts = 0
@@ -245,53 +382,51 @@ def get_health(args: GetHealthArgs, use_redis_cache: bool = True) -> Tuple[Dict,
 
     # If plays data doesn't have latest_chain_slot or is None, fallback to old method
     if latest_block_num is None:
-        (latest_block_num, _) = get_latest_chain_block_set_if_nx(redis)
+        stored_latest_block_num = redis_values[latest_block_redis_key]
+        if stored_latest_block_num is not None:
+            latest_block_num = int(stored_latest_block_num)
         # Handle case where redis keys are temporarily unavailable during indexing
         # If latest_block_num is None, try to get it from core_health as fallback
         if latest_block_num is None and core_health:
             latest_block_num = core_health.get("latest_chain_block")
 
-    user_bank_health_info = get_solana_indexer_status(
-        redis, redis_keys.solana.user_bank, user_bank_max_drift
-    )
-    spl_token_health_info = get_solana_indexer_status(
-        redis, redis_keys.solana.spl_token, spl_token_max_drift
-    )
-    reward_manager_health_info = get_solana_indexer_status(
-        redis, redis_keys.solana.reward_manager, reward_manager_max_drift
-    )
-    payment_router_health_info = get_solana_indexer_status(
-        redis, redis_keys.solana.payment_router, payment_router_max_drift
-    )
-    aggregate_tips_health_info = get_solana_indexer_status(
-        redis,
-        redis_keys.solana.aggregate_tips,
-        aggregate_tips_max_drift,
-    )
-
-    trending_tracks_age_sec = get_elapsed_time_redis(
-        redis, trending_tracks_last_completion_redis_key
+    solana_indexers_health = {
+        name: _get_solana_indexer_health(
+            redis_values[indexer_keys.last_completed_at],
+            redis_values[indexer_keys.last_tx],
+            max_drift,
+        )
+        for name, (indexer_keys, max_drift) in solana_indexers.items()
+    }
+    user_bank_health_info = solana_indexers_health["user_bank"]
+    spl_token_health_info = solana_indexers_health["spl_token"]
+    reward_manager_health_info = solana_indexers_health["reward_manager"]
+    payment_router_health_info = solana_indexers_health["payment_router"]
+    aggregate_tips_health_info = solana_indexers_health["aggregate_tips"]
+
+    trending_tracks_age_sec = _get_elapsed_time(
+        redis_values[trending_tracks_last_completion_redis_key]
     )
-    trending_playlists_age_sec = get_elapsed_time_redis(
-        redis, trending_playlists_last_completion_redis_key
+    trending_playlists_age_sec = _get_elapsed_time(
+        redis_values[trending_playlists_last_completion_redis_key]
     )
-    challenge_events_age_sec = get_elapsed_time_redis(
-        redis, challenges_last_processed_event_redis_key
+    challenge_events_age_sec = _get_elapsed_time(
+        redis_values[challenges_last_processed_event_redis_key]
     )
-    user_balances_age_sec = get_elapsed_time_redis(
-        redis, user_balances_refresh_last_completion_redis_key
+    user_balances_age_sec = _get_elapsed_time(
+        redis_values[user_balances_refresh_last_completion_redis_key]
     )
     num_users_in_lazy_balance_refresh_queue = int(
-        redis.scard(LAZY_REFRESH_REDIS_PREFIX)
+        redis_values[LAZY_REFRESH_REDIS_PREFIX]
     )
     num_users_in_immediate_balance_refresh_queue = int(
-        redis.scard(IMMEDIATE_REFRESH_REDIS_PREFIX)
+        redis_values[IMMEDIATE_REFRESH_REDIS_PREFIX]
     )
-    last_scanned_block_for_balance_refresh = redis.get(
+    last_scanned_block_for_balance_refresh = redis_values[
         eth_indexing_last_scanned_block_key
-    )
-    index_eth_age_sec = get_elapsed_time_redis(
-        redis, index_eth_last_completion_redis_key
+    ]
+    index_eth_age_sec = _get_elapsed_time(
+        redis_values[index_eth_last_completion_redis_key]
     )
     last_scanned_block_for_balance_refresh = (
         int(last_scanned_block_for_balance_refresh)
@@ -300,19 +435,7 @@ def get_health(args: GetHealthArgs, use_redis_cache: bool = True) -> Tuple[Dict,
     )
 
     # Get system information monitor values
-    sys_info = monitors.get_monitors(
-        [
-            MONITORS[monitor_names.database_size],
-            MONITORS[monitor_names.database_connections],
-            MONITORS[monitor_names.total_memory],
-            MONITORS[monitor_names.used_memory],
-            MONITORS[monitor_names.filesystem_size],
-            MONITORS[monitor_names.filesystem_used],
-            MONITORS[monitor_names.received_bytes_per_sec],
-            MONITORS[monitor_names.transferred_bytes_per_sec],
-            MONITORS[monitor_names.redis_total_memory],
-        ]
-    )
+    sys_info = _get_monitor_values(redis_values, sys_info_monitors)
 
     url = shared_config["discprov"]["url"]
 
@@ -324,8 +447,16 @@ def get_health(args: GetHealthArgs, use_redis_cache: bool = True) -> Tuple[Dict,
     ) == "postgresql://postgres:postgres@db:5432/audius_discovery" or "localhost" in os.getenv(
         "audius_db_url", ""
     )
-    discovery_nodes = get_all_nodes.get_all_discovery_nodes_cached(redis)
-    content_nodes = get_all_nodes.get_all_healthy_content_nodes_cached(redis)
+    discovery_nodes = deserialize_cached_value(
+        redis,
+        ALL_DISCOVERY_NODES_CACHE_KEY,
+        redis_values[ALL_DISCOVERY_NODES_CACHE_KEY],
+    )
+    content_nodes = deserialize_cached_value(
+        redis,
+        ALL_HEALTHY_CONTENT_NODES_CACHE_KEY,
+        redis_values[ALL_HEALTHY_CONTENT_NODES_CACHE_KEY],
+    )
     final_poa_block = helpers.get_final_poa_block()
     health_results = {
         "web": {
@@ -429,7 +560,7 @@ def get_health(args: GetHealthArgs, use_redis_cache: bool = True) -> Tuple[Dict,
 
     if verbose:
         # DB connections check
-        db_connections_json, db_connections_error = _get_db_conn_state()
+        db_connections_json, db_connections_error = _get_db_conn_state(redis_values)
         health_results["db_connections"] = db_connections_json
         location = get_location()
         health_results.update(location)
@@ -437,17 +568,13 @@ def get_health(args: GetHealthArgs, use_redis_cache: bool = True) -> Tuple[Dict,
         if db_connections_error:
             return health_results, db_connections_error
 
-        query_insights_json, query_insights_error = _get_query_insights()
+        query_insights_json, query_insights_error = _get_query_insights(redis_values)
         health_results["query_insights"] = query_insights_json
 
         if query_insights_error:
             return health_results, query_insights_error
 
-        table_size_info_json = monitors.get_monitors(
-            [
-                MONITORS[monitor_names.table_size_info],
-            ]
-        )
+        table_size_info_json = _get_monitor_values(redis_values, table_size_monitors)
 
         health_results["tables"] = table_size_info_json
 
@@ -533,7 +660,7 @@ def get_elasticsearch_health_info(
 
 
 def health_check_prometheus_exporter():
-    health_results, is_unhealthy = get_health({})
+    health_results, is_unhealthy = get_health_cached({})
 
     # store all top-level keys with numerical values
     for key, value in health_results.items():
@@ -568,7 +695,14 @@ class SolanaIndexerHealth(TypedDict):
 def get_solana_indexer_status(
     redis: Redis, keys: SolanaIndexerStatus, max_drift: Optional[int]
 ) -> SolanaIndexerHealth:
-    last_completed_at = redis.get(keys.last_completed_at)
+    return _get_solana_indexer_health(
+        redis.get(keys.last_completed_at), redis.get(keys.last_tx), max_drift
+    )
+
+
+def _get_solana_indexer_health(
+    last_completed_at, last_tx, max_drift: Optional[int]
+) -> SolanaIndexerHealth:
     last_completed_at = (
         float(last_completed_at) if last_completed_at is not None else None
     )
@@ -576,7 +710,6 @@ def get_solana_indexer_status(
     since_last_completed_at = (
         (now - last_completed_at) if last_completed_at is not None else None
     )
-    last_tx = redis.get(keys.last_tx)
     last_tx = str(last_tx, encoding="utf-8") if last_tx is not None else None
     # Job completed at least once and less than max_drift ago (if applicable)
     is_healthy = since_last_completed_at is not None and (
@@ -667,8 +800,13 @@ def get_play_health_info(
 
 
 def get_core_listens_health(redis: Redis, plays_count_max_drift: Optional[int]):
+    return _parse_core_listens_health(
+        redis.get(core_listens_health_check_cache_key), plays_count_max_drift
+    )
+
+
+def _parse_core_listens_health(core_health, plays_count_max_drift: Optional[int]):
     try:
-        core_health = redis.get(core_listens_health_check_cache_key)
         if core_health:
             res = json.loads(core_health)
 
@@ -685,8 +823,11 @@ def get_core_listens_health(redis: Redis, plays_count_max_drift: Optional[int]):
 
 
 def get_core_health(redis: Redis):
+    return _parse_core_health(redis.get(core_health_check_cache_key))
+
+
+def _parse_core_health(core_health):
     try:
-        core_health = redis.get(core_health_check_cache_key)
         if core_health:
             return json.loads(core_health)
         return None
@@ -5,7 +5,10 @@ from time import time
 
 from src.models.indexing.block import Block
 from src.models.indexing.indexing_checkpoints import IndexingCheckpoint
-from src.queries.get_health import get_health
+from src.monitors import monitor_names
+from src.monitors.monitors import MONITORS, get_monitor_redis_key
+from src.queries import get_health as get_health_module
+from src.queries.get_health import get_health, get_health_cached
 from src.utils.core import (
     CoreHealth,
     core_health_check_cache_key,
@@ -89,6 +92,14 @@ def cache_play_health_vars(redis_mock):
     )
 
 
+def cache_monitor_vars(redis_mock, values):
+    for name, value in values.items():
+        monitor = MONITORS[name]
+        if monitor[monitor_names.type] == "json":
+            value = json.dumps(value)
+        redis_mock.set(get_monitor_redis_key(monitor), value)
+
+
 def cache_trusted_notifier_discrepancies_vars(redis_mock):
     redis_mock.set(
         USER_DELIST_STATUS_CURSOR_CHECK_TIMESTAMP_KEY,
@@ -395,19 +406,20 @@ def test_get_health_unhealthy_block_difference(redis_mock, db_mock, mock_request
     assert "service" in health_results
 
 
-def test_get_health_with_monitors(
-    redis_mock, db_mock, get_monitors_mock, mock_requests
-):
+def test_get_health_with_monitors(redis_mock, db_mock, mock_requests):
     """Tests that the health check returns monitor data"""
-    get_monitors_mock.return_value = {
-        "database_connections": 2,
-        "filesystem_size": 62725623808,
-        "filesystem_used": 50381168640,
-        "received_bytes_per_sec": 7942.038197103973,
-        "total_memory": 6237151232,
-        "used_memory": 3055149056,
-        "transferred_bytes_per_sec": 7340.780857447676,
-    }
+    cache_monitor_vars(
+        redis_mock,
+        {
+            "database_connections": 2,
+            "filesystem_size": 62725623808,
+            "filesystem_used": 50381168640,
+            "received_bytes_per_sec": 7942.038197103973,
+            "total_memory": 6237151232,
+            "used_memory": 3055149056,
+            "transferred_bytes_per_sec": 7340.780857447676,
+        },
+    )
 
     cache_play_health_vars(redis_mock)
     cache_trusted_notifier_discrepancies_vars(redis_mock)
@@ -436,26 +448,29 @@ def test_get_health_with_monitors(
     assert health_results["number_of_cpus"] == os.cpu_count()
 
 
-def test_get_health_verbose(redis_mock, db_mock, get_monitors_mock, mock_requests):
+def test_get_health_verbose(redis_mock, db_mock, mock_requests):
     """Tests that the health check returns verbose db stats"""
-    get_monitors_mock.return_value = {
-        "database_connections": 2,
-        "filesystem_size": 62725623808,
-        "filesystem_used": 50381168640,
-        "received_bytes_per_sec": 7942.038197103973,
-        "total_memory": 6237151232,
-        "used_memory": 3055149056,
-        "transferred_bytes_per_sec": 7340.780857447676,
-        "database_connection_info": [
-            {
-                "datname": "audius_discovery",
-                "state": "idle",
-                "query": "COMMIT",
-                "wait_event_type": "Client",
-                "wait_event": "ClientRead",
-            }
-        ],
-    }
+    cache_monitor_vars(
+        redis_mock,
+        {
+            "database_connections": 2,
+            "filesystem_size": 62725623808,
+            "filesystem_used": 50381168640,
+            "received_bytes_per_sec": 7942.038197103973,
+            "total_memory": 6237151232,
+            "used_memory": 3055149056,
+            "transferred_bytes_per_sec": 7340.780857447676,
+            "database_connection_info": [
+                {
+                    "datname": "audius_discovery",
+                    "state": "idle",
+                    "query": "COMMIT",
+                    "wait_event_type": "Client",
+                    "wait_event": "ClientRead",
+                }
+            ],
+        },
+    )
 
     cache_play_health_vars(redis_mock)
     cache_trusted_notifier_discrepancies_vars(redis_mock)
@@ -605,3 +620,27 @@ def test_get_health_challenge_events_max_drift(redis_mock, db_mock, mock_request
 #     assert_typical_health_results(health_results)
 #     assert health_results["elasticsearch"]["status"] != "green"
 #     assert error == True
+
+
+def test_get_health_cached(monkeypatch):
+    """Tests that health results are reused per args until they expire"""
+    computed = []
+
+    def mock_get_health(args, use_redis_cache=True):
+        computed.append((args, use_redis_cache))
+        return {"computed": len(computed)}, False
+
+    monkeypatch.setattr(get_health_module, "get_health", mock_get_health)
+    monkeypatch.setattr(get_health_module, "_health_cache", {})
+    monkeypatch.setattr(get_health_module, "health_check_cache_ttl_sec", 60)
+
+    assert get_health_cached({"verbose": False}) == ({"computed": 1}, False)
+    assert get_health_cached({"verbose": False}) == ({"computed": 1}, False)
+    assert get_health_cached({"verbose": True}) == ({"computed": 2}, False)
+    assert get_health_cached({"verbose": False}, use_redis_cache=False) == (
+        {"computed": 3},
+        False,
+    )
+
+    monkeypatch.setattr(get_health_module, "health_check_cache_ttl_sec", 0)
+    assert get_health_cached({"verbose": False}) == ({"computed": 4}, False)
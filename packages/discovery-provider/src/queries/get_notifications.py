@@ -8,6 +8,7 @@ from sqlalchemy import bindparam, text
 from sqlalchemy.orm.session import Session
 
 from src.models.tracks.track import Track
+from src.utils.redis_connection import get_redis
 
 logger = logging.getLogger(__name__)
 
@@ -82,6 +83,112 @@ notification_groups_sql = notification_groups_sql.bindparams(
     bindparam("valid_types", expanding=True)
 )
 
+# Same groups as notification_groups_sql, read from the user's inbox. The page
+# cursor is the group row holding the action at :timestamp_offset, so a page
+# starts after the last group of the previous one.
+notification_inbox_groups_sql = text(
+    """
+WITH page_cursor AS (
+  SELECT COALESCE(
+    (
+      SELECT i.timestamp
+      FROM notification_inbox i
+      WHERE i.user_id = :user_id
+        AND i.group_id = :group_id_offset
+        AND (:timestamp_offset is NULL OR i.timestamp >= :timestamp_offset)
+      ORDER BY i.timestamp ASC
+      LIMIT 1
+    ),
+    :timestamp_offset
+  ) AS timestamp
+), groups AS (
+  (
+    SELECT
+      i.type,
+      i.group_id,
+      i.notification_ids,
+      i.prev_seen_at,
+      i.seen_at,
+      i.count,
+      i.timestamp
+    FROM
+      notification_inbox i, page_cursor
+    WHERE
+      i.user_id = :user_id AND
+      i.type in :valid_types AND
+      (
+        page_cursor.timestamp is NULL OR
+        (i.timestamp, i.group_id) < (page_cursor.timestamp, COALESCE(:group_id_offset, ''))
+      )
+    ORDER BY
+      i.timestamp desc,
+      i.group_id desc
+    LIMIT :limit
+  )
+  UNION ALL
+  (
+    SELECT
+      n.type,
+      n.group_id,
+      ARRAY[n.id],
+      COALESCE(prev_seen.seen_at, '-infinity'),
+      next_seen.seen_at,
+      1,
+      n.timestamp
+    FROM
+      notification n
+    CROSS JOIN page_cursor
+    LEFT JOIN LATERAL (
+      SELECT max(seen_at) AS seen_at
+      FROM notification_seen
+      WHERE user_id = :user_id AND seen_at < n.timestamp
+    ) prev_seen ON TRUE
+    LEFT JOIN LATERAL (
+      SELECT min(seen_at) AS seen_at
+      FROM notification_seen
+      WHERE user_id = :user_id AND seen_at >= n.timestamp
+    ) next_seen ON TRUE
+    WHERE
+      n.type = 'announcement' AND
+      'announcement' in :valid_types AND
+      n.timestamp > (SELECT created_at FROM users WHERE user_id = :user_id AND is_current) AND
+      (
+        page_cursor.timestamp is NULL OR
+        (n.timestamp, n.group_id) < (page_cursor.timestamp, COALESCE(:group_id_offset, ''))
+      )
+    ORDER BY
+      n.timestamp desc,
+      n.group_id desc
+    LIMIT :limit
+  )
+)
+SELECT
+  type,
+  group_id,
+  notification_ids,
+  seen_at is not NULL as is_seen,
+  CASE
+    WHEN seen_at is not NULL THEN seen_at
+    WHEN prev_seen_at != '-infinity' THEN now()::timestamp
+    ELSE NULL
+  END as seen_at,
+  NULLIF(prev_seen_at, '-infinity') as prev_seen_at,
+  count
+FROM
+  groups
+ORDER BY
+  timestamp desc,
+  group_id desc
+LIMIT :limit;
+"""
+)
+notification_inbox_groups_sql = notification_inbox_groups_sql.bindparams(
+    bindparam("valid_types", expanding=True)
+)
+
+# Users whose notification_inbox backfill_notification_inbox should create
+NOTIFICATION_INBOX_QUEUE_KEY = "notification_inbox:queue"
+
 unread_notification_count_sql = text(
     """
 --- Create Intervals of user seen
@@ -122,6 +229,31 @@ unread_notification_count_sql = unread_notification_count_sql.bindparams(
     bindparam("valid_types", expanding=True)
 )
 
+# Counts kept by the notification triggers, see notification_unread_counts
+unread_notification_counts_sql = text(
+    """
+SELECT
+  c.counts,
+  (
+    SELECT count(DISTINCT n.group_id)
+    FROM notification n
+    WHERE n.type = 'announcement'
+      AND n.timestamp > c.seen_at
+      AND (
+        n.timestamp > (SELECT created_at FROM users WHERE user_id = :user_id AND is_current)
+        OR ARRAY[:user_id] && n.user_ids
+      )
+  ) AS announcement_count
+FROM
+  notification_unread_counts c
+WHERE
+  c.user_id = :user_id;
+"""
+)
+
+# Users whose unread counts verify_notification_unread_counts should create
+NOTIFICATION_UNREAD_COUNTS_QUEUE_KEY = "notification_unread_counts:queue"
+
 
 MAX_LIMIT = 50
 DEFAULT_LIMIT = 20
@@ -224,8 +356,16 @@ def get_notification_groups(session: Session, args: GetNotificationArgs):
     limit = args.get("limit") or DEFAULT_LIMIT
     limit = min(limit, MAX_LIMIT)  # type: ignore
 
+    has_inbox = session.execute(
+        text("SELECT 1 FROM notification_inbox_users WHERE user_id = :user_id"),
+        {"user_id": args["user_id"]},
+    ).first()
+    if not has_inbox:
+        # Read from notification until the user's inbox is backfilled
+        get_redis().sadd(NOTIFICATION_INBOX_QUEUE_KEY, args["user_id"])
+
     rows = session.execute(
-        notification_groups_sql,
+        notification_inbox_groups_sql if has_inbox else notification_groups_sql,
         {
             "user_id": args["user_id"],
             "limit": limit,
@@ -667,6 +807,23 @@ class GetUnreadNotificationCount(TypedDict):
 
 def get_unread_notification_count(session: Session, args: GetUnreadNotificationCount):
     args["valid_types"] = args.get("valid_types", []) + default_valid_notification_types  # type: ignore
+    counts_row = session.execute(
+        unread_notification_counts_sql, {"user_id": args["user_id"]}
+    ).first()
+    if counts_row is not None:
+        counts, announcement_count = counts_row
+        valid_types = {getattr(t, "value", t) for t in args["valid_types"]}  # type: ignore
+        unread_count = sum(
+            count
+            for notification_type, count in counts.items()
+            if notification_type in valid_types
+        )
+        if NotificationType.ANNOUNCEMENT.value in valid_types:
+            unread_count += announcement_count
+        return unread_count
+
+    # Count from notification until the user has counts
+    get_redis().sadd(NOTIFICATION_UNREAD_COUNTS_QUEUE_KEY, args["user_id"])
     resultproxy = session.execute(
         unread_notification_count_sql,
         {"user_id": args["user_id"], "valid_types": args.get("valid_types", None)},
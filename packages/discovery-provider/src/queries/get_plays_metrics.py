@@ -1,11 +1,12 @@
 import logging
 import time
-from typing import TypedDict
+from typing import NotRequired, TypedDict
 
 from sqlalchemy import desc, func
 from sqlalchemy.orm.session import Session
 
 from src.models.social.hourly_play_counts import HourlyPlayCount
+from src.models.social.track_hourly_play_count import TrackHourlyPlayCount
 from src.utils import db_session
 
 logger = logging.getLogger(__name__)
@@ -21,6 +22,9 @@ class GetPlayMetricsArgs(TypedDict):
     # The max number of responses to return
     limit: int
 
+    # Only count plays of this track
+    track_id: NotRequired[int | None]
+
 
 def get_plays_metrics(args: GetPlayMetricsArgs):
     """
@@ -38,16 +42,24 @@ def get_plays_metrics(args: GetPlayMetricsArgs):
 
 
 def _get_plays_metrics(session: Session, args: GetPlayMetricsArgs):
-    metrics_query = (
-        session.query(
-            func.date_trunc(
-                args.get("bucket_size"), HourlyPlayCount.hourly_timestamp
-            ).label("timestamp"),
-            func.sum(HourlyPlayCount.play_count).label("count"),
+    hourly_timestamp = HourlyPlayCount.hourly_timestamp
+    play_count = HourlyPlayCount.play_count
+    # Per track counts come from the per track rollup of the same job
+    if args.get("track_id"):
+        hourly_timestamp = TrackHourlyPlayCount.hourly_timestamp
+        play_count = TrackHourlyPlayCount.play_count
+
+    metrics_query = session.query(
+        func.date_trunc(args.get("bucket_size"), hourly_timestamp).label("timestamp"),
+        func.sum(play_count).label("count"),
+    ).filter(hourly_timestamp > args.get("start_time"))
+    if args.get("track_id"):
+        metrics_query = metrics_query.filter(
+            TrackHourlyPlayCount.play_item_id == args.get("track_id")
         )
-        .filter(HourlyPlayCount.hourly_timestamp > args.get("start_time"))
-        .group_by(
-            func.date_trunc(args.get("bucket_size"), HourlyPlayCount.hourly_timestamp)
+    metrics_query = (
+        metrics_query.group_by(
+            func.date_trunc(args.get("bucket_size"), hourly_timestamp)
         )
         .order_by(desc("timestamp"))
         .limit(args.get("limit"))
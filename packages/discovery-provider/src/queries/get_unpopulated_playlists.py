@@ -1,13 +1,16 @@
 import logging  # pylint: disable=C0302
 from datetime import datetime
 
+from sqlalchemy import and_
+
 from src.models.playlists.playlist import Playlist
-from src.utils import helpers
+from src.models.playlists.playlist_route import PlaylistRoute
+from src.queries.get_unpopulated_users import get_cached_users
+from src.utils import helpers, redis_connection
+from src.utils.redis_cache import get_cached_entities
 
 logger = logging.getLogger(__name__)
 
-# Cache unpopulated playlists for 5 min
-
 playlist_datetime_fields = []
 for column in Playlist.__table__.c:
     if column.type.python_type == datetime:
@@ -27,21 +30,53 @@ def get_unpopulated_playlists(session, playlist_ids, filter_deleted=False):
         Array of playlists
     """
 
-    playlists_query = (
-        session.query(Playlist)
-        .filter(Playlist.is_current == True)
-        .filter(Playlist.playlist_id.in_(playlist_ids))
-    )
-    if filter_deleted:
-        playlists_query = playlists_query.filter(Playlist.is_delete == False)
+    def fetch_playlists(ids):
+        playlists = (
+            session.query(
+                *helpers.get_model_columns(Playlist),
+                PlaylistRoute.slug.label("route_slug"),
+            )
+            .outerjoin(
+                PlaylistRoute,
+                and_(
+                    PlaylistRoute.playlist_id == Playlist.playlist_id,
+                    PlaylistRoute.is_current == True,
+                ),
+            )
+            .filter(Playlist.is_current == True, Playlist.playlist_id.in_(ids))
+            .all()
+        )
+        return helpers.query_result_rows_to_list(playlists)
 
-    playlists = playlists_query.all()
-    playlists = helpers.query_result_to_list(playlists)
-    queried_playlists = {playlist["playlist_id"]: playlist for playlist in playlists}
+    queried_playlists = get_cached_entities(
+        redis_connection.get_redis(),
+        "Playlist",
+        playlist_ids,
+        playlist_datetime_fields,
+        fetch_playlists,
+    )
 
     playlists_response = []
     for playlist_id in playlist_ids:
-        if playlist_id in queried_playlists:
-            playlists_response.append(queried_playlists[playlist_id])
+        playlist = queried_playlists.get(playlist_id)
+        if playlist and not (filter_deleted and playlist["is_delete"]):
+            playlists_response.append(playlist)
+
+    # owners are cached on their own so profile updates show up on their playlists,
+    # and the permalink is built from the owner so it follows handle changes
+    owners = get_cached_users(
+        session, [playlist["playlist_owner_id"] for playlist in playlists_response]
+    )
+    for playlist in playlists_response:
+        owner = owners.get(playlist["playlist_owner_id"])
+        playlist["user"] = [owner] if owner else []
+        # a repeated playlist id shares its dict, which only needs its permalink once
+        if "route_slug" in playlist:
+            slug = playlist.pop("route_slug")
+            handle = owner["handle"] if owner else None
+            collection_type = "album" if playlist["is_album"] else "playlist"
+            playlist["permalink"] = (
+                f"/{handle}/{collection_type}/{slug}" if handle and slug else ""
+            )
 
     return playlists_response
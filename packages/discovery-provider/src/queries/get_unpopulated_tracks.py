@@ -1,8 +1,13 @@
 import logging
 from datetime import datetime
 
+from sqlalchemy import and_
+
 from src.models.tracks.track import Track
-from src.utils import helpers
+from src.models.tracks.track_route import TrackRoute
+from src.queries.get_unpopulated_users import get_cached_users
+from src.utils import helpers, redis_connection
+from src.utils.redis_cache import get_cached_entities
 
 logger = logging.getLogger(__name__)
 
@@ -35,30 +40,55 @@ def get_unpopulated_tracks(
         Array of tracks
     """
 
-    tracks_query = (
-        session.query(Track)
-        .filter(Track.is_current == True, Track.stem_of == None)
-        .filter(Track.track_id.in_(track_ids))
+    def fetch_tracks(ids):
+        tracks = (
+            session.query(
+                *helpers.get_model_columns(Track),
+                TrackRoute.slug.label("route_slug"),
+            )
+            .outerjoin(
+                TrackRoute,
+                and_(
+                    TrackRoute.track_id == Track.track_id,
+                    TrackRoute.is_current == True,
+                ),
+            )
+            .filter(Track.is_current == True, Track.track_id.in_(ids))
+            .all()
+        )
+        return helpers.query_result_rows_to_list(tracks)
+
+    queried_tracks = get_cached_entities(
+        redis_connection.get_redis(),
+        "Track",
+        track_ids,
+        track_datetime_fields,
+        fetch_tracks,
     )
 
-    if filter_unlisted:
-        tracks_query = tracks_query.filter(Track.is_unlisted == False)
-
-    if filter_deleted:
-        tracks_query = tracks_query.filter(Track.is_delete == False)
-
-    if exclude_gated:
-        tracks_query = tracks_query.filter(Track.is_stream_gated == False)
-
-    tracks = tracks_query.all()
-    tracks = helpers.query_result_to_list(tracks)
-    queried_tracks = {track["track_id"]: track for track in tracks}
-
-    # cache tracks for future use
-
     tracks_response = []
     for track_id in track_ids:
-        if track_id in queried_tracks:
-            tracks_response.append(queried_tracks[track_id])
+        track = queried_tracks.get(track_id)
+        if (
+            not track
+            or track["stem_of"] is not None
+            or (filter_unlisted and track["is_unlisted"])
+            or (filter_deleted and track["is_delete"])
+            or (exclude_gated and track["is_stream_gated"])
+        ):
+            continue
+        tracks_response.append(track)
+
+    # owners are cached on their own so profile updates show up on their tracks,
+    # and the permalink is built from the owner so it follows handle changes
+    owners = get_cached_users(session, [track["owner_id"] for track in tracks_response])
+    for track in tracks_response:
+        owner = owners.get(track["owner_id"])
+        track["user"] = [owner] if owner else []
+        # a repeated track id shares its dict, which only needs its permalink once
+        if "route_slug" in track:
+            slug = track.pop("route_slug")
+            handle = owner["handle"] if owner else None
+            track["permalink"] = f"/{handle}/{slug}" if handle and slug else ""
 
     return tracks_response
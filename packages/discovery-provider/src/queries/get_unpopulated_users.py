@@ -1,8 +1,10 @@
 import logging  # pylint: disable=C0302
 from datetime import datetime
+from typing import Dict
 
 from src.models.users.user import User
-from src.utils import helpers
+from src.utils import helpers, redis_connection
+from src.utils.redis_cache import get_cached_entities
 
 logger = logging.getLogger(__name__)
 
@@ -12,9 +14,39 @@ for column in User.__table__.c:
         user_datetime_fields.append(column.name)
 
 
+def get_cached_users(session, user_ids) -> Dict[int, dict]:
+    """
+    Fetches the current rows of users by id through the redis entity cache
+
+    Args:
+        session: DB session
+        user_ids: array A list of user ids
+
+    Returns:
+        Map of user id to user
+    """
+
+    def fetch_users(ids):
+        users = (
+            session.query(*helpers.get_model_columns(User))
+            .filter(User.is_current == True, User.user_id.in_(ids))
+            .all()
+        )
+        return helpers.query_result_rows_to_list(users)
+
+    return get_cached_entities(
+        redis_connection.get_redis(),
+        "User",
+        user_ids,
+        user_datetime_fields,
+        fetch_users,
+    )
+
+
 def get_unpopulated_users(session, user_ids):
     """
-    Fetches a list of users based on an input array of ids
+    Fetches users by checking the redis cache first then
+    going to DB and writes to cache if not present
 
     Args:
         session: DB session
@@ -24,19 +56,13 @@ def get_unpopulated_users(session, user_ids):
         Array of users
     """
 
-    users = (
-        session.query(User)
-        .filter(User.is_current == True, User.wallet != None, User.handle != None)
-        .filter(User.user_id.in_(user_ids))
-        .all()
-    )
-    users = helpers.query_result_to_list(users)
-    queried_users = {user["user_id"]: user for user in users}
+    queried_users = get_cached_users(session, user_ids)
 
     users_response = []
     for user_id in user_ids:
-        if user_id in queried_users:
-            users_response.append(queried_users[user_id])
+        user = queried_users.get(user_id)
+        if user and user["wallet"] is not None and user["handle"] is not None:
+            users_response.append(user)
 
     return users_response
 
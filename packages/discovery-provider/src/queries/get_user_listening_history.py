@@ -1,14 +1,15 @@
 from typing import Optional, TypedDict
 
-from sqlalchemy import asc, desc, func, or_
+from sqlalchemy import and_, asc, desc, or_, tuple_
 from sqlalchemy.orm.session import Session
 from sqlalchemy.sql.functions import coalesce
+from typing_extensions import NotRequired
 
 from src.models.social.aggregate_plays import AggregatePlay
 from src.models.tracks.aggregate_track import AggregateTrack
 from src.models.tracks.track_with_aggregates import TrackWithAggregates
 from src.models.users.user import User
-from src.models.users.user_listening_history import UserListeningHistory
+from src.models.users.user_listening_history_track import UserListeningHistoryTrack
 from src.queries import response_name_constants
 from src.queries.query_helpers import (
     SortDirection,
@@ -38,6 +39,10 @@ class GetUserListeningHistoryArgs(TypedDict):
     sort_method: Optional[SortMethod]
     sort_direction: Optional[SortDirection]
 
+    # Optional ID of the last track of the previous page, to page from
+    # instead of offset when sorting by listen date
+    cursor: NotRequired[Optional[int]]
+
 
 def get_user_listening_history(args: GetUserListeningHistoryArgs):
     """
@@ -62,34 +67,19 @@ def _get_user_listening_history(session: Session, args: GetUserListeningHistoryA
     query = args["query"]
     sort_method = args["sort_method"]
     sort_direction = args["sort_direction"]
+    cursor = args.get("cursor")
     sort_fn = desc if sort_direction == SortDirection.desc else asc
-
-    listening_history_results = (
-        session.query(UserListeningHistory.listening_history).filter(
-            UserListeningHistory.user_id == user_id
-        )
-    ).scalar()
-
-    if not listening_history_results:
-        return []
-
-    # order listening history entries by their user's play counts so our track ids will be
-    # correct order when querying for track ids
-    if sort_method == SortMethod.most_listens_by_user:
-        listening_history_results = sort_listening_history_results_by_play_count_desc(
-            listening_history_results
-        )
-
-    # Map out all track ids and listen dates
-    track_ids = []
-    listen_dates = {}
-    for listen in listening_history_results:
-        track_ids.append(listen["track_id"])
-        listen_dates[listen["track_id"]] = listen["timestamp"]
+    listen_sort_fn = desc if sort_fn == asc else asc
 
     base_query = (
-        session.query(TrackWithAggregates)
-        .filter(TrackWithAggregates.track_id.in_(track_ids))
+        session.query(TrackWithAggregates, UserListeningHistoryTrack.last_listened_at)
+        .join(
+            UserListeningHistoryTrack,
+            and_(
+                UserListeningHistoryTrack.user_id == user_id,
+                UserListeningHistoryTrack.track_id == TrackWithAggregates.track_id,
+            ),
+        )
         .filter(TrackWithAggregates.is_current == True)
         .filter(TrackWithAggregates.is_delete == False)
         .join(TrackWithAggregates.user)
@@ -104,14 +94,43 @@ def _get_user_listening_history(session: Session, args: GetUserListeningHistoryA
             )
         )
 
-    base_query = sort_by_sort_method(sort_method, sort_fn, track_ids, base_query)
+    base_query = sort_by_sort_method(sort_method, sort_fn, base_query)
 
-    # Add pagination
-    base_query = add_query_pagination(base_query, limit, offset)
+    # Add pagination. Pages sorted by listen date start after the cursor's
+    # (last_listened_at, track_id) in the index instead of skipping offset rows
+    if cursor is not None and sort_method in (None, SortMethod.last_listen_date):
+        cursor_listen = (
+            session.query(
+                UserListeningHistoryTrack.last_listened_at,
+                UserListeningHistoryTrack.track_id,
+            )
+            .filter(
+                UserListeningHistoryTrack.user_id == user_id,
+                UserListeningHistoryTrack.track_id == cursor,
+            )
+            .first()
+        )
+        if cursor_listen is None:
+            return []
+        listen_keys = tuple_(
+            UserListeningHistoryTrack.last_listened_at,
+            UserListeningHistoryTrack.track_id,
+        )
+        base_query = base_query.filter(
+            listen_keys < tuple_(*cursor_listen)
+            if listen_sort_fn == desc
+            else listen_keys > tuple_(*cursor_listen)
+        ).limit(limit)
+    else:
+        base_query = add_query_pagination(base_query, limit, offset)
     query_results = base_query.all()
-    track_ids = track_ids[offset : offset + limit]
 
-    tracks = helpers.query_result_to_list(query_results)
+    tracks = helpers.query_result_to_list([result[0] for result in query_results])
+    track_ids = [track["track_id"] for track in tracks]
+    listen_dates = {
+        track["track_id"]: str(last_listened_at)
+        for track, (_, last_listened_at) in zip(tracks, query_results)
+    }
 
     # bundle peripheral info into track results
     tracks = populate_track_metadata(
@@ -127,18 +146,14 @@ def _get_user_listening_history(session: Session, args: GetUserListeningHistoryA
     return tracks
 
 
-def sort_listening_history_results_by_play_count_desc(listening_history_results):
-    listening_histories_by_plays = [
-        listening_history for listening_history in listening_history_results
-    ]
-    listening_histories_by_plays.sort(
-        key=lambda listen: listen.get("play_count", 1), reverse=True
+def sort_by_sort_method(sort_method, sort_fn, base_query):
+    # Ascending listening history starts from the most recent listen, read
+    # straight off the (user_id, last_listened_at, track_id) index
+    listen_sort_fn = desc if sort_fn == asc else asc
+    last_listen_order = (
+        listen_sort_fn(UserListeningHistoryTrack.last_listened_at),
+        listen_sort_fn(UserListeningHistoryTrack.track_id),
     )
-    listening_history_results = listening_histories_by_plays
-    return listening_history_results
-
-
-def sort_by_sort_method(sort_method, sort_fn, track_ids, base_query):
     if sort_method == SortMethod.title:
         return base_query.order_by(sort_fn(TrackWithAggregates.title))
     elif sort_method == SortMethod.artist_name:
@@ -154,10 +169,6 @@ def sort_by_sort_method(sort_method, sort_fn, track_ids, base_query):
                 )
             )
         )
-    elif sort_method == SortMethod.last_listen_date:
-        return base_query.order_by(
-            sort_fn(func.array_position(track_ids, TrackWithAggregates.track_id))
-        )
     elif sort_method == SortMethod.plays:
         return base_query.join(TrackWithAggregates.aggregate_play).order_by(
             sort_fn(AggregatePlay.count)
@@ -172,9 +183,9 @@ def sort_by_sort_method(sort_method, sort_fn, track_ids, base_query):
         )
     elif sort_method == SortMethod.most_listens_by_user:
         return base_query.order_by(
-            (func.array_position(track_ids, TrackWithAggregates.track_id))
+            desc(UserListeningHistoryTrack.play_count),
+            desc(UserListeningHistoryTrack.last_listened_at),
+            desc(UserListeningHistoryTrack.track_id),
         )
     else:
-        return base_query.order_by(
-            sort_fn(func.array_position(track_ids, TrackWithAggregates.track_id))
-        )
+        return base_query.order_by(*last_listen_order)
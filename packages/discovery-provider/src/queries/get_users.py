@@ -35,7 +35,7 @@ def get_users(args):
                 return (users, ids)
 
             # Create initial query
-            base_query = session.query(User)
+            base_query = session.query(*helpers.get_model_columns(User))
             # Don't return the user if they have no wallet or handle (user creation did not finish properly on chain)
             if "include_incomplete" not in args or not args["include_incomplete"]:
                 base_query = base_query.filter(
@@ -47,7 +47,7 @@ def get_users(args):
                 wallet = args.get("wallet")
                 wallet = wallet.lower()
                 if len(wallet) == 42:
-                    base_query = base_query.filter_by(wallet=wallet)
+                    base_query = base_query.filter(User.wallet == wallet)
                     base_query = base_query.order_by(
                         desc(User.handle.isnot(None)), asc(User.created_at)
                     )
@@ -55,7 +55,7 @@ def get_users(args):
                     logger.warning("Invalid wallet length")
             if "handle" in args:
                 handle = args.get("handle").lower()
-                base_query = base_query.filter_by(handle_lc=handle)
+                base_query = base_query.filter(User.handle_lc == handle)
 
             # Conditionally process an array of users
             if "id" in args:
@@ -71,7 +71,7 @@ def get_users(args):
                     User.blocknumber >= args.get("min_block_number")
                 )
             users = paginate_query(base_query).all()
-            users = helpers.query_result_to_list(users)
+            users = helpers.query_result_rows_to_list(users)
 
             user_ids = list(map(lambda user: user["user_id"], users))
 
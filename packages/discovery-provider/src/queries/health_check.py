@@ -2,7 +2,7 @@ import logging
 from datetime import datetime, timedelta
 
 import requests
-from flask import Blueprint, request
+from flask import Blueprint, jsonify, request
 
 from src.api_helpers import success_response
 from src.models.users.audio_transactions_history import AudioTransactionsHistory
@@ -12,7 +12,13 @@ from src.models.users.user_tip import UserTip
 from src.queries.get_celery_tasks import convert_epoch_to_datetime, get_celery_tasks
 from src.queries.get_db_seed_restore_status import get_db_seed_restore_status
 from src.queries.get_entities_count_check import get_entities_count_check
-from src.queries.get_health import get_health, get_location
+from src.queries.get_health import (
+    GetHealthArgs,
+    get_health,
+    get_health_cached,
+    get_location,
+    get_process_cached,
+)
 from src.queries.get_latest_play import get_latest_play
 from src.queries.get_sol_plays import get_latest_sol_play_check_info
 from src.queries.get_trusted_notifier_discrepancies import (
@@ -62,6 +68,16 @@ def health_check():
             "aggregate_tips_max_drift", type=int
         ),
     }
+    # cache the whole payload so probes skip the comms request and the
+    # redis reads for the response metadata too
+    (response_dictionary, status) = get_process_cached(
+        ("health_check", tuple(sorted(args.items()))),
+        lambda: get_health_check_response(args),
+    )
+    return jsonify(response_dictionary), status
+
+
+def get_health_check_response(args: GetHealthArgs):
     try:
         comms_health = {"comms": requests.get("http://comms:8925/comms").json()}
     except Exception as e:
@@ -70,7 +86,11 @@ def health_check():
 
     (health_results, error) = get_health(args)
     return success_response(
-        health_results, 500 if error else 200, sign_response=False, extras=comms_health
+        health_results,
+        500 if error else 200,
+        to_json=False,
+        sign_response=False,
+        extras=comms_health,
     )
 
 
@@ -95,7 +115,7 @@ def block_check():
         "enforce_block_diff": True,
     }
 
-    (health_results, error) = get_health(args, use_redis_cache=False)
+    (health_results, error) = get_health_cached(args, use_redis_cache=False)
     return success_response(health_results, 500 if error else 200, sign_response=False)
 
 
@@ -0,0 +1,537 @@
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+
+from src.api.v1.helpers import extend_playlist, extend_track, extend_user
+from src.models.social.repost import RepostType
+from src.models.social.save import SaveType
+from src.queries.get_unpopulated_playlists import get_unpopulated_playlists
+from src.queries.query_helpers import (
+    get_tracks,
+    get_users,
+    get_users_by_id,
+    get_users_ids,
+    populate_playlist_metadata,
+)
+from src.queries.search_es import (
+    format_genres,
+    format_moods,
+    get_capitalized_genre,
+    get_capitalized_mood,
+    reorder_users,
+    sharp_to_flat,
+)
+from src.utils.db_session import get_db_read_replica
+
+logger = logging.getLogger(__name__)
+
+# Tracks of a genre matching the query considered for ranking, by repost count
+GENRE_CANDIDATES_MULTIPLIER = 4
+MIN_GENRE_CANDIDATES = 100
+
+# Matches the expression indexes in 0168_search_pg_indexes.sql
+TRACK_TITLE_VECTOR = "to_tsvector('simple', coalesce(t.title, ''))"
+TRACK_TAGS = "string_to_array(replace(lower(t.tags), ' ', ''), ',')"
+USER_NAME_VECTOR = (
+    "to_tsvector('simple', coalesce(u.name, '') || ' ' || coalesce(u.handle, ''))"
+)
+PLAYLIST_NAME_VECTOR = "to_tsvector('simple', coalesce(p.playlist_name, ''))"
+
+TRACK_PURCHASEABLE = "(t.stream_conditions->>'usdc_purchase') IS NOT NULL"
+TRACK_PURCHASEABLE_DOWNLOAD = "(t.download_conditions->>'usdc_purchase') IS NOT NULL"
+TRACK_HAS_STEMS = (
+    "EXISTS (SELECT 1 FROM stems st WHERE st.parent_track_id = t.track_id)"
+)
+
+# Popular sorts boost content from the last week and month like the ES scripts
+RECENCY_FACTOR = """
+CASE
+    WHEN {created_at} > now() - interval '7 days' THEN 3
+    WHEN {created_at} > now() - interval '30 days' THEN 2
+    ELSE 1
+END
+"""
+
+
+def to_prefix_tsquery(search_str: str) -> Optional[str]:
+    """Matches every word of the query, the last one as a prefix so partial
+    queries match like the ES bool_prefix queries"""
+    words = re.findall(r"[^\W_]+", search_str.lower())
+    if not words:
+        return None
+    return " & ".join(words[:-1] + [f"{words[-1]}:*"])
+
+
+def search_pg_full(args: dict):
+    """Postgres equivalent of search_es_full"""
+    return _search_pg(
+        args, search_str=(args.get("query", "") or "").strip(), tag_search=""
+    )
+
+
+def search_tags_pg(args: dict):
+    """Postgres equivalent of search_tags_es"""
+    return _search_pg(
+        args, search_str="", tag_search=(args.get("query", "") or "").strip()
+    )
+
+
+def _search_pg(args: dict, search_str: str, tag_search: str):
+    current_user_id = args.get("current_user_id")
+    limit = args.get("limit", 10)
+    offset = args.get("offset", 0)
+    search_type = args.get("kind", "all")
+
+    params: Dict[str, Any] = {
+        "limit": limit,
+        "offset": offset,
+        "current_user_id": current_user_id,
+        "query": search_str.lower(),
+        "query_nospace": search_str.lower().replace(" ", ""),
+        "query_len": len(search_str),
+        "tsquery": to_prefix_tsquery(search_str),
+        "query_genre": get_capitalized_genre(search_str) if search_str else None,
+        "query_mood": get_capitalized_mood(search_str) if search_str else None,
+        "tag": tag_search.lower().replace(" ", ""),
+        "genre_candidates": max(
+            MIN_GENRE_CANDIDATES, GENRE_CANDIDATES_MULTIPLIER * (limit + offset)
+        ),
+    }
+    keys = args.get("keys") or []
+    if isinstance(keys, str):
+        keys = [keys]
+    filters = {
+        "genres": [g for g in format_genres(args.get("genres", [])) or [] if g],
+        "moods": [m for m in format_moods(args.get("moods", [])) or [] if m],
+        "bpm_min": args.get("bpm_min"),
+        "bpm_max": args.get("bpm_max"),
+        "keys": [sharp_to_flat(key) for key in keys if key],
+        "only_downloadable": args.get("only_downloadable", False),
+        "include_purchaseable": args.get("include_purchaseable", False),
+        "only_verified": args.get("only_verified", False),
+        "only_with_downloads": args.get("only_with_downloads", False),
+        "only_purchaseable": args.get("only_purchaseable", False),
+        "sort_method": args.get("sort_method", "relevant") or "relevant",
+    }
+    params.update(
+        {key: filters[key] for key in ("genres", "moods", "bpm_min", "bpm_max", "keys")}
+    )
+
+    response: Dict = {
+        "tracks": [],
+        "saved_tracks": [],
+        "users": [],
+        "followed_users": [],
+        "playlists": [],
+        "saved_playlists": [],
+        "albums": [],
+        "saved_albums": [],
+    }
+
+    db = get_db_read_replica()
+    with db.scoped_session() as session:
+        if search_type in ("all", "tracks"):
+            sql = track_search_sql(search_str, tag_search, current_user_id, filters)
+            track_ids = _execute_ids(session, sql, params)
+            response["tracks"] = _get_tracks(session, track_ids, current_user_id)
+
+        if search_type in ("all", "users"):
+            sql = user_search_sql(search_str, tag_search, current_user_id, filters)
+            user_ids = _execute_ids(session, sql, params)
+            response["users"] = _get_users(session, user_ids, current_user_id, limit)
+
+        for kind, is_album in (("playlists", False), ("albums", True)):
+            if search_type not in ("all", kind):
+                continue
+            sql = playlist_search_sql(
+                search_str, tag_search, is_album, current_user_id, filters
+            )
+            playlist_ids = _execute_ids(session, sql, params)
+            response[kind] = _get_playlists(session, playlist_ids, current_user_id)
+
+    return response
+
+
+def _execute_ids(session, sql: str, params: Dict[str, Any]) -> List[int]:
+    return [row[0] for row in session.execute(text(sql), params)]
+
+
+def _get_tracks(session, track_ids: List[int], current_user_id) -> List[dict]:
+    tracks = get_tracks(session, track_ids, current_user_id)
+    tracks_by_id = {track["track_id"]: track for track in tracks}
+    return [
+        extend_track(tracks_by_id[track_id])
+        for track_id in track_ids
+        if track_id in tracks_by_id
+    ]
+
+
+def _get_users(session, user_ids: List[int], current_user_id, limit) -> List[dict]:
+    users = get_users(session, user_ids, current_user_id)
+    users_by_id = {user["user_id"]: user for user in users}
+    users = reorder_users(
+        [users_by_id[user_id] for user_id in user_ids if user_id in users_by_id]
+    )
+    return [extend_user(user) for user in users[:limit]]
+
+
+def _get_playlists(session, playlist_ids: List[int], current_user_id) -> List[dict]:
+    playlists = get_unpopulated_playlists(session, playlist_ids)
+    playlists = populate_playlist_metadata(
+        session,
+        playlist_ids,
+        playlists,
+        [RepostType.playlist, RepostType.album],
+        [SaveType.playlist, SaveType.album],
+        current_user_id,
+    )
+    users = get_users_by_id(session, get_users_ids(playlists), current_user_id)
+    playlists_by_id = {}
+    for playlist in playlists:
+        playlist["user"] = users.get(playlist["playlist_owner_id"], {})
+        playlists_by_id[playlist["playlist_id"]] = playlist
+    return [
+        extend_playlist(playlists_by_id[playlist_id])
+        for playlist_id in playlist_ids
+        if playlist_id in playlists_by_id
+    ]
+
+
+def _matched_users_cte() -> str:
+    return f"""
+    matched_users AS (
+        SELECT u.user_id
+        FROM users u
+        WHERE u.is_current AND NOT u.is_deactivated
+        AND (
+            {_text_match(USER_NAME_VECTOR)}
+            OR lower(u.name) %> :query
+            OR u.handle_lc %> :query_nospace
+        )
+    )
+    """
+
+
+def _text_match(vector: str) -> str:
+    return f"{vector} @@ to_tsquery('simple', :tsquery)"
+
+
+def _order_by(sort_method: str, relevance: str, recent: str, popular: str) -> str:
+    if sort_method == "recent":
+        return f"{recent} DESC"
+    if sort_method == "popular":
+        return f"{popular} DESC"
+    return f"{relevance} DESC"
+
+
+def track_search_sql(
+    search_str: str, tag_search: str, current_user_id, filters: Dict[str, Any]
+) -> str:
+    """Ranks tracks like track_dsl: text match, verified owner and the current
+    user's saves and reposts, scaled by ln(2 + 0.1 * reposts)"""
+    ctes = []
+    where = [
+        "t.is_current",
+        "NOT t.is_delete",
+        "NOT t.is_unlisted",
+        "t.stem_of IS NULL",
+        "NOT u.is_deactivated",
+    ]
+    score = ["1", "CASE WHEN u.is_verified THEN 1 ELSE 0 END"]
+
+    if search_str:
+        ctes.append(_matched_users_cte())
+        ctes.append(
+            f"""
+            candidates AS (
+                SELECT t.track_id FROM tracks t
+                WHERE t.is_current AND NOT t.is_delete
+                AND ({_text_match(TRACK_TITLE_VECTOR)} OR lower(t.title) %> :query)
+                UNION
+                SELECT t.track_id FROM tracks t
+                WHERE t.is_current AND NOT t.is_delete
+                AND t.owner_id IN (SELECT user_id FROM matched_users)
+                UNION
+                (
+                    SELECT t.track_id FROM tracks t
+                    LEFT JOIN aggregate_track agg ON agg.track_id = t.track_id
+                    WHERE t.is_current AND NOT t.is_delete AND t.genre = :query_genre
+                    ORDER BY agg.repost_count DESC NULLS LAST
+                    LIMIT :genre_candidates
+                )
+            )
+            """
+        )
+        where.append("t.track_id IN (SELECT track_id FROM candidates)")
+        score.extend(
+            [
+                # every word matches the title or owner
+                """CASE WHEN to_tsvector('simple', coalesce(t.title, '') || ' '
+                    || coalesce(u.name, '') || ' ' || coalesce(u.handle, ''))
+                    @@ to_tsquery('simple', :tsquery) THEN :query_len ELSE 0 END""",
+                "word_similarity(:query, lower(t.title)) * :query_len * 0.5",
+                """CASE WHEN replace(lower(t.title), ' ', '') = :query_nospace
+                    THEN :query_len * 0.5 ELSE 0 END""",
+                "CASE WHEN t.genre = :query_genre THEN 20 ELSE 0 END",
+                "CASE WHEN t.mood = :query_mood THEN 0.5 ELSE 0 END",
+                f"CASE WHEN {TRACK_TAGS} @> ARRAY[:query_nospace] THEN 0.1 ELSE 0 END",
+            ]
+        )
+
+    if tag_search:
+        where.append(f"{TRACK_TAGS} @> ARRAY[:tag]")
+
+    if current_user_id:
+        score.extend(
+            [
+                """CASE WHEN EXISTS (
+                    SELECT 1 FROM saves s
+                    WHERE s.user_id = :current_user_id AND s.save_item_id = t.track_id
+                    AND s.save_type = 'track' AND s.is_current AND NOT s.is_delete
+                ) THEN 4 ELSE 0 END""",
+                """CASE WHEN EXISTS (
+                    SELECT 1 FROM reposts r
+                    WHERE r.user_id = :current_user_id AND r.repost_item_id = t.track_id
+                    AND r.repost_type = 'track' AND r.is_current AND NOT r.is_delete
+                ) THEN 4 ELSE 0 END""",
+            ]
+        )
+
+    if filters["genres"]:
+        where.append("t.genre = ANY(:genres)")
+    if filters["moods"]:
+        where.append("t.mood = ANY(:moods)")
+    if filters["bpm_min"]:
+        where.append("t.bpm >= CAST(:bpm_min AS float)")
+    if filters["bpm_max"]:
+        where.append("t.bpm <= CAST(:bpm_max AS float)")
+    if filters["keys"]:
+        where.append("t.musical_key = ANY(:keys)")
+    if filters["only_downloadable"]:
+        where.append("t.is_downloadable")
+    if filters["only_with_downloads"]:
+        where.append(f"(t.is_downloadable OR {TRACK_HAS_STEMS})")
+    if filters["only_verified"]:
+        where.append("u.is_verified")
+    if filters["only_purchaseable"]:
+        where.append(
+            f"""({TRACK_PURCHASEABLE} OR ({TRACK_PURCHASEABLE_DOWNLOAD}
+            AND ({TRACK_HAS_STEMS} OR t.is_downloadable)))"""
+        )
+    if not filters["include_purchaseable"]:
+        where.append(f"NOT ({TRACK_PURCHASEABLE})")
+
+    relevance = f"({' + '.join(score)}) * ln(2 + 0.1 * coalesce(agg.repost_count, 0))"
+    popular = f"""(
+        coalesce(ap.count, 0) * 0.4
+        + coalesce(agg.repost_count, 0) * 0.3
+        + coalesce(agg.save_count, 0) * 0.2
+        + coalesce(au.follower_count, 0) * 0.1
+    ) * {RECENCY_FACTOR.format(created_at="t.created_at")}"""
+    order_by = _order_by(filters["sort_method"], relevance, "t.created_at", popular)
+
+    return f"""
+    {"WITH " + ",".join(ctes) if ctes else ""}
+    SELECT t.track_id
+    FROM tracks t
+    JOIN users u ON u.user_id = t.owner_id AND u.is_current
+    LEFT JOIN aggregate_track agg ON agg.track_id = t.track_id
+    LEFT JOIN aggregate_user au ON au.user_id = t.owner_id
+    LEFT JOIN aggregate_plays ap ON ap.play_item_id = t.track_id
+    WHERE {" AND ".join(where)}
+    ORDER BY {order_by}, t.track_id DESC
+    LIMIT :limit OFFSET :offset
+    """
+
+
+def user_search_sql(
+    search_str: str, tag_search: str, current_user_id, filters: Dict[str, Any]
+) -> str:
+    """Ranks users like user_dsl: name and handle matches, verification and
+    follows by the current user, scaled by follower count"""
+    ctes = []
+    where = ["u.is_current", "NOT u.is_deactivated"]
+    score = ["1", "CASE WHEN u.is_verified THEN 5 ELSE 0 END"]
+    multipliers = [
+        """CASE WHEN u.is_verified
+            THEN ln(2 + 10 * coalesce(au.follower_count, 0))
+            ELSE ln(2 + 0.1 * coalesce(au.follower_count, 0))
+        END"""
+    ]
+
+    if search_str:
+        ctes.append(_matched_users_cte())
+        where.append("u.user_id IN (SELECT user_id FROM matched_users)")
+        score.extend(
+            [
+                f"""CASE WHEN {_text_match(USER_NAME_VECTOR)}
+                    THEN :query_len * 24.5 ELSE 0 END""",
+                "word_similarity(:query, lower(u.name)) * :query_len * 0.1",
+                """CASE WHEN replace(lower(u.name), ' ', '') = :query_nospace
+                    OR u.handle_lc = :query_nospace THEN :query_len * 2 ELSE 0 END""",
+                "CASE WHEN lower(u.name) = :query THEN (:query_len * 0.2) ^ 2 ELSE 0 END",
+            ]
+        )
+
+    if tag_search:
+        where.append(
+            f"""u.user_id IN (
+                SELECT t.owner_id FROM tracks t
+                WHERE t.is_current AND NOT t.is_delete AND {TRACK_TAGS} @> ARRAY[:tag]
+            )"""
+        )
+
+    if current_user_id:
+        score.append(
+            """CASE WHEN EXISTS (
+                SELECT 1 FROM follows f
+                WHERE f.follower_user_id = :current_user_id
+                AND f.followee_user_id = u.user_id
+                AND f.is_current AND NOT f.is_delete
+            ) THEN 50 ELSE 0 END"""
+        )
+
+    if filters["genres"]:
+        # Boost profiles with more tracks in the genres
+        matched_tracks = """(
+            SELECT count(*) FROM tracks t
+            WHERE t.owner_id = u.user_id AND t.is_current AND NOT t.is_delete
+            AND t.genre = ANY(:genres)
+        )"""
+        where.append(f"{matched_tracks} > 0")
+        multipliers.append(f"ln(1 + {matched_tracks}) * 2")
+    if filters["only_verified"]:
+        where.append("u.is_verified")
+
+    relevance = f"({' + '.join(score)}) * {' * '.join(multipliers)}"
+    popular = """CASE WHEN u.is_verified THEN 2 ELSE 1 END
+        * coalesce(au.follower_count, 0) * 0.1"""
+    order_by = _order_by(filters["sort_method"], relevance, "u.created_at", popular)
+
+    return f"""
+    {"WITH " + ",".join(ctes) if ctes else ""}
+    SELECT u.user_id
+    FROM users u
+    LEFT JOIN aggregate_user au ON au.user_id = u.user_id
+    WHERE {" AND ".join(where)}
+    ORDER BY {order_by}, u.user_id DESC
+    LIMIT :limit OFFSET :offset
+    """
+
+
+def playlist_search_sql(
+    search_str: str,
+    tag_search: str,
+    is_album: bool,
+    current_user_id,
+    filters: Dict[str, Any],
+) -> str:
+    """Ranks playlists and albums like base_playlist_dsl: name and owner
+    matches, verified owner and the current user's saves and reposts, scaled
+    by ln(2 + 1000 * reposts)"""
+    ctes = []
+    where = [
+        "p.is_current",
+        "NOT p.is_delete",
+        "NOT p.is_private",
+        "p.is_album" if is_album else "NOT p.is_album",
+        "NOT u.is_deactivated",
+    ]
+    score = ["1", "CASE WHEN u.is_verified THEN 3 ELSE 0 END"]
+    multipliers = ["ln(2 + 1000 * coalesce(agg.repost_count, 0))"]
+
+    def playlist_tracks_match(condition):
+        return f"""(
+            SELECT count(*) FROM playlist_tracks pt
+            JOIN tracks t ON t.track_id = pt.track_id
+                AND t.is_current AND NOT t.is_delete
+            WHERE pt.playlist_id = p.playlist_id AND NOT pt.is_removed
+            AND {condition}
+        )"""
+
+    if search_str:
+        ctes.append(_matched_users_cte())
+        ctes.append(
+            f"""
+            candidates AS (
+                SELECT p.playlist_id FROM playlists p
+                WHERE p.is_current AND NOT p.is_delete
+                AND ({_text_match(PLAYLIST_NAME_VECTOR)}
+                    OR lower(p.playlist_name) %> :query)
+                UNION
+                SELECT p.playlist_id FROM playlists p
+                WHERE p.is_current AND NOT p.is_delete
+                AND p.playlist_owner_id IN (SELECT user_id FROM matched_users)
+            )
+            """
+        )
+        where.append("p.playlist_id IN (SELECT playlist_id FROM candidates)")
+        score.extend(
+            [
+                """CASE WHEN to_tsvector('simple', coalesce(p.playlist_name, '')
+                    || ' ' || coalesce(u.name, '') || ' ' || coalesce(u.handle, ''))
+                    @@ to_tsquery('simple', :tsquery) THEN :query_len * 11 ELSE 0 END""",
+                "word_similarity(:query, lower(p.playlist_name)) * :query_len * 0.5",
+            ]
+        )
+
+    if tag_search:
+        where.append(f"{playlist_tracks_match(f'{TRACK_TAGS} @> ARRAY[:tag]')} > 0")
+
+    if current_user_id:
+        score.extend(
+            [
+                """CASE WHEN EXISTS (
+                    SELECT 1 FROM saves s
+                    WHERE s.user_id = :current_user_id
+                    AND s.save_item_id = p.playlist_id
+                    AND s.save_type != 'track' AND s.is_current AND NOT s.is_delete
+                ) THEN 4 ELSE 0 END""",
+                """CASE WHEN EXISTS (
+                    SELECT 1 FROM reposts r
+                    WHERE r.user_id = :current_user_id
+                    AND r.repost_item_id = p.playlist_id
+                    AND r.repost_type != 'track' AND r.is_current AND NOT r.is_delete
+                ) THEN 4 ELSE 0 END""",
+            ]
+        )
+
+    # Boost playlists with more tracks in the genres and moods
+    if filters["genres"]:
+        matched_tracks = playlist_tracks_match("t.genre = ANY(:genres)")
+        where.append(f"{matched_tracks} > 0")
+        multipliers.append(f"ln(1 + {matched_tracks}) * 2")
+    if filters["moods"]:
+        matched_tracks = playlist_tracks_match("t.mood = ANY(:moods)")
+        where.append(f"{matched_tracks} > 0")
+        multipliers.append(f"ln(1 + {matched_tracks}) * 2")
+    if is_album and filters["only_with_downloads"]:
+        where.append(
+            f"{playlist_tracks_match(f'(t.is_downloadable OR {TRACK_HAS_STEMS})')} > 0"
+        )
+    if is_album and filters["only_purchaseable"]:
+        where.append("(p.stream_conditions->>'usdc_purchase') IS NOT NULL")
+    if filters["only_verified"]:
+        where.append("u.is_verified")
+
+    relevance = f"({' + '.join(score)}) * {' * '.join(multipliers)}"
+    popular = f"""(
+        coalesce(agg.repost_count, 0) * 0.3
+        + coalesce(agg.save_count, 0) * 0.2
+        + coalesce(au.follower_count, 0) * 0.1
+    ) * {RECENCY_FACTOR.format(created_at="p.updated_at")}"""
+    order_by = _order_by(filters["sort_method"], relevance, "p.updated_at", popular)
+
+    return f"""
+    {"WITH " + ",".join(ctes) if ctes else ""}
+    SELECT p.playlist_id
+    FROM playlists p
+    JOIN users u ON u.user_id = p.playlist_owner_id AND u.is_current
+    LEFT JOIN aggregate_playlist agg ON agg.playlist_id = p.playlist_id
+    LEFT JOIN aggregate_user au ON au.user_id = p.playlist_owner_id
+    WHERE {" AND ".join(where)}
+    ORDER BY {order_by}, p.playlist_id DESC
+    LIMIT :limit OFFSET :offset
+    """
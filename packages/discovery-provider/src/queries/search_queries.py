@@ -7,6 +7,9 @@ from src import api_helpers, exceptions
 from src.api.v1.helpers import parse_bool_param
 from src.queries.query_helpers import get_current_user_id, get_pagination_vars
 from src.queries.search_es import search_es_full, search_tags_es
+from src.queries.search_pg import search_pg_full, search_tags_pg
+from src.utils.config import shared_config
+from src.utils.elasticdsl import get_esclient
 
 logger = logging.getLogger(__name__)
 bp = Blueprint("search_tags", __name__)
@@ -14,6 +17,9 @@ bp = Blueprint("search_tags", __name__)
 
 # ####### VARS ####### #
 
+# auto, elasticsearch or postgres
+search_engine = shared_config["discprov"]["search_engine"]
+
 
 class SearchKind(Enum):
     all = 1
@@ -90,14 +96,14 @@ def search_tags_legacy():
         "sort_method": sort_method,
     }
 
-    hits = search_tags_es(search_args)
+    hits = search_tags(search_args)
     return api_helpers.success_response(hits)
 
 
 def search_tags(args):
     """Perform a search by tags. `args` are the same as `search` with the exception
     that `is_auto_complete` is not supported"""
-    return search_tags_es(args)
+    return _search_with_fallback(search_tags_es, search_tags_pg, args)
 
 
 def search(args):
@@ -105,4 +111,19 @@ def search(args):
     `query`, `kind`, `current_user_id`, and `only_downloadable`
     """
 
-    return search_es_full(args)
+    return _search_with_fallback(search_es_full, search_pg_full, args)
+
+
+def _search_with_fallback(search_es, search_pg, args):
+    """Searches elasticsearch unless configured for postgres. In auto mode,
+    postgres serves searches when elasticsearch is not configured or fails"""
+    if search_engine == "postgres":
+        return search_pg(args)
+    if search_engine == "elasticsearch" or get_esclient():
+        try:
+            return search_es(args)
+        except Exception as e:
+            if search_engine == "elasticsearch":
+                raise e
+            logger.error(f"search_queries.py | elasticsearch search failed: {e}")
+    return search_pg(args)
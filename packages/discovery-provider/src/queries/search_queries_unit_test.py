@@ -0,0 +1,42 @@
+import pytest
+
+from src.queries import search_queries
+
+
+def es_search(args):
+    raise Exception("index not found")
+
+
+def pg_search(args):
+    return {"engine": "postgres"}
+
+
+def test_search_falls_back_to_postgres(monkeypatch):
+    monkeypatch.setattr(search_queries, "search_engine", "auto")
+
+    monkeypatch.setattr(search_queries, "get_esclient", lambda: None)
+    assert search_queries._search_with_fallback(es_search, pg_search, {}) == {
+        "engine": "postgres"
+    }
+
+    # Elasticsearch is configured but failing
+    monkeypatch.setattr(search_queries, "get_esclient", lambda: object())
+    assert search_queries._search_with_fallback(es_search, pg_search, {}) == {
+        "engine": "postgres"
+    }
+    assert search_queries._search_with_fallback(
+        lambda args: {"engine": "elasticsearch"}, pg_search, {}
+    ) == {"engine": "elasticsearch"}
+
+
+def test_search_engine_config(monkeypatch):
+    monkeypatch.setattr(search_queries, "get_esclient", lambda: object())
+
+    monkeypatch.setattr(search_queries, "search_engine", "postgres")
+    assert search_queries._search_with_fallback(es_search, pg_search, {}) == {
+        "engine": "postgres"
+    }
+
+    monkeypatch.setattr(search_queries, "search_engine", "elasticsearch")
+    with pytest.raises(Exception):
+        search_queries._search_with_fallback(es_search, pg_search, {})
@@ -4,8 +4,9 @@ import random
 import signal
 import time
 from contextlib import contextmanager
-from typing import Optional
+from typing import Dict, List, Optional
 
+from redis import Redis
 from solders.pubkey import Pubkey
 from solders.rpc.responses import GetSignaturesForAddressResp, GetTransactionResp
 from solders.signature import Signature
@@ -14,6 +15,11 @@ from solana.rpc.api import Client, Commitment
 from solana.rpc.types import TokenAccountOpts
 from src.exceptions import SolanaTransactionFetchError
 from src.solana.solana_helpers import SPL_TOKEN_ID_PK
+from src.solana.solana_transaction_fetcher import (
+    SolanaTransactionFetcher,
+    TransactionResult,
+    check_transaction_error,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +33,7 @@ class SolanaClientManager:
     def __init__(self, solana_endpoints) -> None:
         self.endpoints = [_normalize_ep(ep) for ep in solana_endpoints.split(",")]
         self.clients = [Client(endpoint) for endpoint in self.endpoints]
+        self.transaction_fetcher = SolanaTransactionFetcher(self.endpoints)
 
     def get_client(self, randomize=False) -> Client:
         if not self.clients:
@@ -53,7 +60,7 @@ class SolanaClientManager:
                         encoding,
                         max_supported_transaction_version=0,
                     )
-                    _check_error(tx_info, tx_sig)
+                    check_transaction_error(tx_info, tx_sig)
                     if tx_info.value is not None:
                         return tx_info
                 # We currently only support "legacy" solana transactions. If we encounter
@@ -81,6 +88,17 @@ class SolanaClientManager:
             f"solana_client_manager.py | get_sol_tx_info | All requests failed to fetch {tx_sig}",
         )
 
+    def get_sol_tx_infos(
+        self, tx_sigs: List[str], redis: Optional[Redis] = None
+    ) -> Dict[str, TransactionResult]:
+        """
+        Fetches solana transactions by signature in JSON-RPC batches, through the
+        fetcher shared by all indexers, reading and filling the redis transaction
+        cache when redis is given.
+        Returns each signature's transaction, or the exception fetching it raised.
+        """
+        return self.transaction_fetcher.get_transactions(tx_sigs, redis)
+
     def get_signatures_for_address(
         self,
         account: str,
@@ -251,21 +269,6 @@ def raise_timeout(signum, frame):
     raise TimeoutError
 
 
-def _check_error(tx: GetTransactionResp, tx_sig):
-    if (
-        tx
-        and tx.value
-        and tx.value.transaction
-        and tx.value.transaction.meta
-        and tx.value.transaction.meta.err
-    ):
-        err = tx.value.transaction.meta.err
-        logger.error(
-            f"solana_client_manager.py | Error while fetching transaction {tx_sig}: {err}"
-        )
-        raise SolanaTransactionFetchError()
-
-
 def _normalize_ep(ep):
     if ep.startswith("http"):
         return ep
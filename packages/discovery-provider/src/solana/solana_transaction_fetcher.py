@@ -0,0 +1,280 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Union
+
+import aiohttp
+from redis import Redis
+from solders.rpc.responses import GetTransactionResp
+
+from src.exceptions import SolanaTransactionFetchError
+from src.utils.config import shared_config
+from src.utils.redis_cache import get_solana_transaction_key
+
+logger = logging.getLogger(__name__)
+
+# getTransaction calls sent per JSON-RPC batch request
+FETCH_BATCH_SIZE = int(shared_config["solana"]["transaction_fetch_batch_size"])
+# batch requests in flight to each endpoint, shared by all indexers in the process
+MAX_IN_FLIGHT_PER_ENDPOINT = int(
+    shared_config["solana"]["transaction_fetch_max_in_flight"]
+)
+# seconds fetched transactions are kept in redis, 0 disables
+TRANSACTION_CACHE_TTL_SEC = int(shared_config["solana"]["transaction_cache_ttl_sec"])
+
+# maximum number of times a batch is retried across endpoints
+DEFAULT_MAX_RETRIES = 5
+# number of seconds to wait between attempts
+DELAY_SECONDS = 0.2
+# seconds before a batch request is abandoned
+REQUEST_TIMEOUT_SEC = 30
+# latencies kept per endpoint to compute when a request is hedged
+LATENCY_WINDOW = 200
+# latencies needed before requests get hedged
+MIN_LATENCY_SAMPLES = 20
+HEDGE_PERCENTILE = 0.95
+
+TransactionResult = Union[GetTransactionResp, Exception]
+
+
+class SolanaTransactionFetcher:
+    """
+    Fetches solana transactions by signature for all solana indexers.
+
+    Signatures are looked up in the redis transaction cache first, the rest
+    are fetched with getTransaction JSON-RPC batch requests on one event loop
+    shared by every caller in the process. Each endpoint has a bound on the
+    batches in flight, and a batch that is slower than the endpoint's p95
+    latency is also sent to the next endpoint, keeping whichever answers first.
+    """
+
+    def __init__(
+        self,
+        endpoints: List[str],
+        commitment: str = "finalized",
+        batch_size: int = FETCH_BATCH_SIZE,
+        max_in_flight_per_endpoint: int = MAX_IN_FLIGHT_PER_ENDPOINT,
+        retries: int = DEFAULT_MAX_RETRIES,
+        cache_ttl_sec: int = TRANSACTION_CACHE_TTL_SEC,
+    ) -> None:
+        self.endpoints = endpoints
+        self.commitment = commitment
+        self.batch_size = max(1, batch_size)
+        self.max_in_flight_per_endpoint = max(1, max_in_flight_per_endpoint)
+        self.retries = retries
+        self.cache_ttl_sec = cache_ttl_sec
+        self.latencies: Dict[str, Deque[float]] = {
+            endpoint: deque(maxlen=LATENCY_WINDOW) for endpoint in endpoints
+        }
+
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Only touched from the event loop thread
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def get_transactions(
+        self, tx_sigs: List[str], redis: Optional[Redis] = None
+    ) -> Dict[str, TransactionResult]:
+        """
+        Returns each signature's transaction, or the exception fetching it raised.
+        Transactions that failed on chain come back as SolanaTransactionFetchError.
+        """
+        tx_sigs = list(dict.fromkeys(tx_sigs))
+        raw_txs: Dict[str, Union[str, Exception]] = {}
+        if redis is not None and tx_sigs:
+            cached = redis.mget([get_solana_transaction_key(sig) for sig in tx_sigs])
+            for tx_sig, raw_tx in zip(tx_sigs, cached):
+                if raw_tx:
+                    raw_txs[tx_sig] = raw_tx.decode("utf-8")
+            logger.debug(
+                f"solana_transaction_fetcher.py | {len(raw_txs)} of {len(tx_sigs)} transactions cached"
+            )
+
+        missing = [tx_sig for tx_sig in tx_sigs if tx_sig not in raw_txs]
+        if missing:
+            fetched = asyncio.run_coroutine_threadsafe(
+                self._fetch_all(missing), self._get_loop()
+            ).result()
+            raw_txs.update(fetched)
+            if redis is not None and self.cache_ttl_sec > 0:
+                pipe = redis.pipeline(transaction=False)
+                for tx_sig, raw_tx in fetched.items():
+                    if isinstance(raw_tx, str):
+                        pipe.set(
+                            get_solana_transaction_key(tx_sig),
+                            raw_tx,
+                            ex=self.cache_ttl_sec,
+                        )
+                pipe.execute()
+
+        results: Dict[str, TransactionResult] = {}
+        for tx_sig in tx_sigs:
+            raw_tx = raw_txs[tx_sig]
+            if isinstance(raw_tx, Exception):
+                results[tx_sig] = raw_tx
+                continue
+            try:
+                tx_info = GetTransactionResp.from_json(raw_tx)
+                if not isinstance(tx_info, GetTransactionResp):
+                    raise Exception(f"Error response for {tx_sig}: {tx_info}")
+                check_transaction_error(tx_info, tx_sig)
+                results[tx_sig] = tx_info
+            except Exception as e:
+                results[tx_sig] = e
+        return results
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """Starts the shared event loop thread on first use in this process"""
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever,
+                    name="solana_transaction_fetcher",
+                    daemon=True,
+                ).start()
+                self._loop = loop
+                self._pid = os.getpid()
+                self._session = None
+                self._semaphores = {}
+            return self._loop
+
+    async def _fetch_all(self, tx_sigs: List[str]) -> Dict[str, Union[str, Exception]]:
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_SEC)
+            )
+            self._semaphores = {
+                endpoint: asyncio.Semaphore(self.max_in_flight_per_endpoint)
+                for endpoint in self.endpoints
+            }
+        batches = [
+            tx_sigs[i : i + self.batch_size]
+            for i in range(0, len(tx_sigs), self.batch_size)
+        ]
+        results: Dict[str, Union[str, Exception]] = {}
+        for batch_results in await asyncio.gather(
+            *(self._fetch_batch(batch) for batch in batches)
+        ):
+            results.update(batch_results)
+        return results
+
+    async def _fetch_batch(
+        self, tx_sigs: List[str]
+    ) -> Dict[str, Union[str, Exception]]:
+        """Fetches a batch, retrying signatures that are missing on the next endpoint"""
+        results: Dict[str, Union[str, Exception]] = {}
+        remaining = tx_sigs
+        for attempt in range(self.retries):
+            offset = attempt % len(self.endpoints)
+            endpoints = self.endpoints[offset:] + self.endpoints[:offset]
+            try:
+                responses = await self._hedged_request(endpoints, remaining)
+                missing = []
+                for tx_sig, response in zip(remaining, responses):
+                    if response.get("result") is None:
+                        missing.append(tx_sig)
+                    else:
+                        results[tx_sig] = json.dumps(response)
+                remaining = missing
+            except Exception as e:
+                logger.error(
+                    f"solana_transaction_fetcher.py | Error fetching {len(remaining)} transactions from {endpoints[0]}, {e}"
+                )
+            if not remaining:
+                return results
+            await asyncio.sleep(DELAY_SECONDS)
+        for tx_sig in remaining:
+            results[tx_sig] = Exception(
+                f"solana_transaction_fetcher.py | All requests failed to fetch {tx_sig}"
+            )
+        return results
+
+    async def _hedged_request(
+        self, endpoints: List[str], tx_sigs: List[str]
+    ) -> List[Dict[str, Any]]:
+        """Sends the batch to the first endpoint, and to the second one as well
+        once the first is slower than its p95 latency"""
+        primary = asyncio.ensure_future(self._request(endpoints[0], tx_sigs))
+        hedge_after = self._get_hedge_delay(endpoints[0])
+        if len(endpoints) < 2 or hedge_after is None:
+            return await primary
+
+        done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+        if done:
+            return primary.result()
+
+        logger.debug(
+            f"solana_transaction_fetcher.py | Hedging {len(tx_sigs)} transactions to {endpoints[1]}"
+        )
+        pending = {primary, asyncio.ensure_future(self._request(endpoints[1], tx_sigs))}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for request in done:
+                if request.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    return request.result()
+                error = request.exception()
+        raise error  # type: ignore
+
+    async def _request(self, endpoint: str, tx_sigs: List[str]) -> List[Dict[str, Any]]:
+        payload = [
+            {
+                "jsonrpc": "2.0",
+                "id": i,
+                "method": "getTransaction",
+                "params": [
+                    tx_sig,
+                    {
+                        "encoding": "json",
+                        "commitment": self.commitment,
+                        "maxSupportedTransactionVersion": 0,
+                    },
+                ],
+            }
+            for i, tx_sig in enumerate(tx_sigs)
+        ]
+        async with self._semaphores[endpoint]:
+            start_time = time.monotonic()
+            async with self._session.post(endpoint, json=payload) as response:  # type: ignore
+                response.raise_for_status()
+                responses = await response.json(content_type=None)
+            self.latencies[endpoint].append(time.monotonic() - start_time)
+
+        if not isinstance(responses, list):
+            raise Exception(f"Unexpected batch response {responses}")
+        # Nodes may answer a batch out of order
+        by_id = {response.get("id"): response for response in responses}
+        return [by_id.get(i, {}) for i in range(len(tx_sigs))]
+
+    def _get_hedge_delay(self, endpoint: str) -> Optional[float]:
+        latencies = sorted(self.latencies[endpoint])
+        if len(latencies) < MIN_LATENCY_SAMPLES:
+            return None
+        return latencies[int(HEDGE_PERCENTILE * (len(latencies) - 1))]
+
+
+def check_transaction_error(tx: GetTransactionResp, tx_sig: str):
+    """Raises SolanaTransactionFetchError for transactions that failed on chain"""
+    if (
+        tx
+        and tx.value
+        and tx.value.transaction
+        and tx.value.transaction.meta
+        and tx.value.transaction.meta.err
+    ):
+        err = tx.value.transaction.meta.err
+        logger.error(
+            f"solana_transaction_fetcher.py | Error while fetching transaction {tx_sig}: {err}"
+        )
+        raise SolanaTransactionFetchError()
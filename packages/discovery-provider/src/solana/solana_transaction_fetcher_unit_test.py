@@ -0,0 +1,123 @@
+import asyncio
+import json
+import time
+
+import fakeredis
+from solders.rpc.responses import GetTransactionResp
+from solders.signature import Signature
+
+from src.exceptions import SolanaTransactionFetchError
+from src.solana.solana_client_manager_unit_test import example_response
+from src.solana.solana_transaction_fetcher import (
+    MIN_LATENCY_SAMPLES,
+    SolanaTransactionFetcher,
+)
+from src.utils.redis_cache import get_solana_transaction_key
+
+ENDPOINTS = ["https://fake-endpoint.com", "https://fake-endpoint-2.com"]
+
+
+def make_response(tx_sig, err=None):
+    response = json.loads(example_response.to_json())
+    response["result"]["transaction"]["signatures"] = [tx_sig]
+    response["result"]["meta"]["err"] = err
+    return response
+
+
+def make_fetcher(monkeypatch, handler):
+    """Replaces the HTTP call with handler(endpoint, tx_sigs) -> responses"""
+    fetcher = SolanaTransactionFetcher(
+        ENDPOINTS,
+        batch_size=2,
+        max_in_flight_per_endpoint=2,
+        retries=3,
+        cache_ttl_sec=60,
+    )
+    requests = []
+
+    async def request(endpoint, tx_sigs):
+        requests.append((endpoint, list(tx_sigs)))
+        return await handler(endpoint, tx_sigs)
+
+    monkeypatch.setattr(fetcher, "_request", request)
+    monkeypatch.setattr("src.solana.solana_transaction_fetcher.DELAY_SECONDS", 0)
+    return fetcher, requests
+
+
+def test_get_transactions_batches_and_caches(monkeypatch):
+    async def handler(endpoint, tx_sigs):
+        return [make_response(tx_sig) for tx_sig in tx_sigs]
+
+    fetcher, requests = make_fetcher(monkeypatch, handler)
+    redis = fakeredis.FakeStrictRedis()
+    tx_sigs = [str(Signature.new_unique()) for _ in range(5)]
+
+    results = fetcher.get_transactions(tx_sigs, redis)
+
+    assert list(results.keys()) == tx_sigs
+    for tx_sig, tx_info in results.items():
+        assert isinstance(tx_info, GetTransactionResp)
+        assert str(tx_info.value.transaction.transaction.signatures[0]) == tx_sig
+    # 5 signatures in batches of 2
+    assert sorted(len(tx_sigs) for _, tx_sigs in requests) == [1, 2, 2]
+    assert redis.ttl(get_solana_transaction_key(tx_sigs[0])) > 0
+
+    # Served from the redis cache
+    requests.clear()
+    assert fetcher.get_transactions(tx_sigs, redis).keys() == results.keys()
+    assert requests == []
+
+
+def test_get_transactions_retries_on_next_endpoint(monkeypatch):
+    async def handler(endpoint, tx_sigs):
+        if endpoint == ENDPOINTS[0]:
+            # The first endpoint has not seen sig1 yet
+            return [
+                {"result": None} if tx_sig == "sig1" else make_response(tx_sig)
+                for tx_sig in tx_sigs
+            ]
+        return [make_response(tx_sig) for tx_sig in tx_sigs]
+
+    fetcher, requests = make_fetcher(monkeypatch, handler)
+    results = fetcher.get_transactions(["sig0", "sig1"])
+
+    assert all(isinstance(r, GetTransactionResp) for r in results.values())
+    assert requests == [(ENDPOINTS[0], ["sig0", "sig1"]), (ENDPOINTS[1], ["sig1"])]
+
+
+def test_get_transactions_errors(monkeypatch):
+    async def handler(endpoint, tx_sigs):
+        return [
+            (
+                make_response(tx_sig, err={"InstructionError": [0, "InvalidArgument"]})
+                if tx_sig == "failed"
+                else {"result": None}
+            )
+            for tx_sig in tx_sigs
+        ]
+
+    fetcher, requests = make_fetcher(monkeypatch, handler)
+    results = fetcher.get_transactions(["failed", "missing"])
+
+    assert isinstance(results["failed"], SolanaTransactionFetchError)
+    assert isinstance(results["missing"], Exception)
+    assert not isinstance(results["missing"], SolanaTransactionFetchError)
+    # The missing signature is retried up to the retry limit
+    assert len([r for r in requests if "missing" in r[1]]) == 3
+
+
+def test_get_transactions_hedges_slow_requests(monkeypatch):
+    async def handler(endpoint, tx_sigs):
+        if endpoint == ENDPOINTS[0]:
+            await asyncio.sleep(2)
+        return [make_response(tx_sig) for tx_sig in tx_sigs]
+
+    fetcher, requests = make_fetcher(monkeypatch, handler)
+    fetcher.latencies[ENDPOINTS[0]].extend([0.01] * MIN_LATENCY_SAMPLES)
+
+    start = time.time()
+    results = fetcher.get_transactions(["sig0"])
+
+    assert isinstance(results["sig0"], GetTransactionResp)
+    assert time.time() - start < 1
+    assert requests == [(ENDPOINTS[0], ["sig0"]), (ENDPOINTS[1], ["sig0"])]
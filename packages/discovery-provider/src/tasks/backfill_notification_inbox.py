@@ -0,0 +1,132 @@
+import logging
+import time
+
+from redis import Redis
+from sqlalchemy import text
+
+from src.queries.get_notifications import NOTIFICATION_INBOX_QUEUE_KEY
+from src.tasks.celery_app import celery
+from src.utils.prometheus_metric import save_duration_metric
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_NOTIFICATION_INBOX_LOCK = "backfill_notification_inbox_lock"
+
+# Users whose inbox is backfilled per run, from the users that asked for it
+BATCH_SIZE = 200
+
+# Groups the user's notifications by seen interval like notification_groups_sql
+# in get_notifications, without announcements which are read from notification.
+# Rows the handle_notification trigger inserted after this snapshot are merged
+# instead of failing the insert on the primary key.
+BACKFILL_NOTIFICATION_INBOX_QUERY = """
+    DELETE FROM notification_inbox WHERE user_id = :user_id;
+
+    INSERT INTO notification_inbox (
+        user_id,
+        type,
+        group_id,
+        prev_seen_at,
+        seen_at,
+        timestamp,
+        notification_ids,
+        count
+    )
+    SELECT
+        :user_id,
+        n.type,
+        n.group_id,
+        COALESCE(prev_seen.seen_at, '-infinity'),
+        next_seen.seen_at,
+        max(n.timestamp),
+        array_agg(n.id),
+        count(*)
+    FROM notification n
+    LEFT JOIN LATERAL (
+        SELECT max(seen_at) AS seen_at
+        FROM notification_seen
+        WHERE user_id = :user_id AND seen_at < n.timestamp
+    ) prev_seen ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT min(seen_at) AS seen_at
+        FROM notification_seen
+        WHERE user_id = :user_id AND seen_at >= n.timestamp
+    ) next_seen ON TRUE
+    WHERE ARRAY[:user_id] && n.user_ids
+    AND n.type != 'announcement'
+    GROUP BY n.type, n.group_id, prev_seen.seen_at, next_seen.seen_at
+    ON CONFLICT (user_id, group_id, type, prev_seen_at) DO UPDATE SET
+        seen_at = EXCLUDED.seen_at,
+        timestamp = greatest(notification_inbox.timestamp, EXCLUDED.timestamp),
+        notification_ids = ARRAY(
+            SELECT DISTINCT unnest(
+                notification_inbox.notification_ids || EXCLUDED.notification_ids
+            )
+        ),
+        count = cardinality(ARRAY(
+            SELECT DISTINCT unnest(
+                notification_inbox.notification_ids || EXCLUDED.notification_ids
+            )
+        ));
+
+    INSERT INTO notification_inbox_users (user_id)
+    VALUES (:user_id)
+    ON CONFLICT DO NOTHING;
+    """
+
+
+def backfill_user_inbox(session, user_id: int):
+    """Rebuilds the notification_inbox of a user from notification"""
+    session.execute(text(BACKFILL_NOTIFICATION_INBOX_QUERY), {"user_id": user_id})
+
+
+def _backfill_notification_inbox(session, redis: Redis) -> int:
+    user_ids = [
+        int(user_id)
+        for user_id in redis.spop(NOTIFICATION_INBOX_QUEUE_KEY, BATCH_SIZE) or []
+    ]
+    for user_id in user_ids:
+        backfill_user_inbox(session, user_id)
+        # Commit each user so the notification triggers are not held up
+        session.commit()
+    return len(user_ids)
+
+
+# ####### CELERY TASKS ####### #
+@celery.task(name="backfill_notification_inbox", bind=True)
+@save_duration_metric(metric_group="celery_task")
+def backfill_notification_inbox(self):
+    # Cache custom task class properties
+    # Details regarding custom task context can be found in wiki
+    # Custom Task definition can be found in src/app.py
+    db = backfill_notification_inbox.db
+    redis = backfill_notification_inbox.redis
+    # Define lock acquired boolean
+    have_lock = False
+    # Define redis lock object
+    update_lock = redis.lock(BACKFILL_NOTIFICATION_INBOX_LOCK, timeout=60 * 10)
+    try:
+        # Attempt to acquire lock - do not block if unable to acquire
+        have_lock = update_lock.acquire(blocking=False)
+        if have_lock:
+            start_time = time.time()
+
+            with db.scoped_session() as session:
+                backfilled = _backfill_notification_inbox(session, redis)
+
+            logger.debug(
+                f"backfill_notification_inbox.py | Backfilled {backfilled} inboxes in: {time.time()-start_time} sec"
+            )
+        else:
+            logger.debug(
+                f"backfill_notification_inbox.py | Failed to acquire {BACKFILL_NOTIFICATION_INBOX_LOCK}"
+            )
+    except Exception as e:
+        logger.error(
+            "backfill_notification_inbox.py | Fatal error in main loop",
+            exc_info=True,
+        )
+        raise e
+    finally:
+        if have_lock:
+            update_lock.release()
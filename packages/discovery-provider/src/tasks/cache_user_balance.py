@@ -1,16 +1,15 @@
 import logging
 import time
-from typing import Dict, List, Optional, Set, Tuple, TypedDict
+from typing import Dict, List, Optional, Tuple, TypedDict
 
 from redis import Redis
-from solders.keypair import Keypair
 from solders.pubkey import Pubkey
-from spl.token.client import Token
 from sqlalchemy import and_
 from sqlalchemy.orm.session import Session
 from web3 import Web3
 
 from solana.rpc.api import Client
+from solana.rpc.types import DataSliceOpts
 from src.app import get_eth_abi_values
 from src.models.users.associated_wallet import AssociatedWallet
 from src.models.users.user import User
@@ -20,6 +19,7 @@ from src.models.users.user_bank import UserBankAccount
 from src.queries.get_balances import (
     IMMEDIATE_REFRESH_REDIS_PREFIX,
     LAZY_REFRESH_REDIS_PREFIX,
+    LEGACY_LAZY_REFRESH_REDIS_PREFIX,
     does_user_balance_need_refresh,
 )
 from src.solana.solana_helpers import ASSOCIATED_TOKEN_PROGRAM_ID_PK, SPL_TOKEN_ID_PK
@@ -41,7 +41,16 @@ REDIS_ETH_BALANCE_COUNTER_KEY = "USER_BALANCE_REFRESH_COUNT"
 WAUDIO_MINT = shared_config["solana"]["waudio_mint"]
 WAUDIO_MINT_PUBKEY = Pubkey.from_string(WAUDIO_MINT) if WAUDIO_MINT else None
 
-MAX_LAZY_REFRESH_USER_IDS = 100
+MAX_LAZY_REFRESH_USER_IDS = 1000
+# Least requested lazy refreshes past this queue size are dropped
+MAX_LAZY_REFRESH_QUEUE_SIZE = 100000
+# eth_calls sent per JSON-RPC batch request
+ETH_BATCH_SIZE = 500
+# Max accounts per solana getMultipleAccounts request
+SOL_ACCOUNTS_PAGE_SIZE = 100
+# Byte range of the u64 amount in an SPL token account
+SPL_TOKEN_AMOUNT_OFFSET = 64
+SPL_TOKEN_AMOUNT_LENGTH = 8
 
 
 eth_web3 = web3_provider.get_eth_web3()
@@ -58,22 +67,52 @@ class UserWalletMetadata(TypedDict):
     bank_account: Optional[str]
 
 
-def get_lazy_refresh_user_ids(redis: Redis, session: Session) -> List[int]:
-    redis_user_ids = redis.smembers(LAZY_REFRESH_REDIS_PREFIX)
-    user_ids = [int(user_id.decode()) for user_id in redis_user_ids]
+def drain_legacy_lazy_refresh_queue(redis: Redis):
+    """
+    Moves the user ids of the legacy lazy refresh set into the lazy refresh
+    queue and deletes the set
+    """
+    user_ids = redis.smembers(LEGACY_LAZY_REFRESH_REDIS_PREFIX)
+    with redis.pipeline() as pipe:
+        for user_id in user_ids:
+            pipe.zincrby(LAZY_REFRESH_REDIS_PREFIX, 1, user_id)
+        pipe.delete(LEGACY_LAZY_REFRESH_REDIS_PREFIX)
+        pipe.execute()
+    if user_ids:
+        logger.info(
+            f"cache_user_balance.py | Moved {len(user_ids)} users from {LEGACY_LAZY_REFRESH_REDIS_PREFIX}"
+        )
+
 
-    user_balances = (
-        (session.query(UserBalance)).filter(UserBalance.user_id.in_(user_ids)).all()
+def get_lazy_refresh_user_ids(redis: Redis, session: Session) -> List[int]:
+    """
+    Returns the highest priority lazy refresh user ids whose balance is
+    missing or stale. Queued users that are already up to date are dequeued.
+    """
+    redis_user_ids = redis.zrevrange(
+        LAZY_REFRESH_REDIS_PREFIX, 0, MAX_LAZY_REFRESH_USER_IDS - 1
     )
+    user_ids = [int(user_id.decode()) for user_id in redis_user_ids]
 
-    # Filter only user_balances that still need refresh
-    needs_refresh: Set[int] = {
-        user.user_id
-        for user in list(filter(does_user_balance_need_refresh, user_balances))
+    user_balances: Dict[int, UserBalance] = {
+        user_balance.user_id: user_balance
+        for user_balance in session.query(UserBalance)
+        .filter(UserBalance.user_id.in_(user_ids))
+        .all()
     }
 
-    # return user id of needs_refresh
-    return list(needs_refresh)
+    # Users without a balance row have never been fetched
+    needs_refresh = [
+        user_id
+        for user_id in user_ids
+        if user_id not in user_balances
+        or does_user_balance_need_refresh(user_balances[user_id])
+    ]
+    up_to_date = set(user_ids) - set(needs_refresh)
+    if up_to_date:
+        redis.zrem(LAZY_REFRESH_REDIS_PREFIX, *up_to_date)
+
+    return needs_refresh
 
 
 def get_immediate_refresh_user_ids(redis: Redis) -> List[int]:
@@ -81,6 +120,82 @@ def get_immediate_refresh_user_ids(redis: Redis) -> List[int]:
     return [int(user_id.decode()) for user_id in redis_user_ids]
 
 
+def batch_eth_call(
+    eth_web3, calls: List[Tuple[str, str]], block_number: int
+) -> List[Optional[int]]:
+    """
+    Runs (contract address, call data) eth_calls returning a uint256 in
+    JSON-RPC batches, all against the same block.
+    Returns the decoded values in the order of the calls, None where a call failed.
+    """
+    block = hex(block_number)
+    results: List[Optional[int]] = []
+    for i in range(0, len(calls), ETH_BATCH_SIZE):
+        page = calls[i : i + ETH_BATCH_SIZE]
+        try:
+            responses = eth_web3.provider.make_batch_request(
+                [("eth_call", [{"to": to, "data": data}, block]) for to, data in page]
+            )
+        except Exception as e:
+            logger.error(
+                f"cache_user_balance.py | Error in batch of {len(page)} eth calls: {e}"
+            )
+            results.extend([None] * len(page))
+            continue
+        for response in responses:
+            result = response.get("result")
+            if "error" in response or not result or result == "0x":
+                results.append(None)
+            else:
+                results.append(int(result, 16))
+    return results
+
+
+def get_waudio_balances(
+    solana_client: Client, accounts: List[Pubkey]
+) -> Dict[Pubkey, int]:
+    """
+    Fetches the wAUDIO amount of SPL token accounts with getMultipleAccounts.
+    Accounts that do not exist have a balance of 0, accounts in a page that
+    failed to load are left out.
+    """
+    balances: Dict[Pubkey, int] = {}
+    for i in range(0, len(accounts), SOL_ACCOUNTS_PAGE_SIZE):
+        page = accounts[i : i + SOL_ACCOUNTS_PAGE_SIZE]
+        try:
+            resp = solana_client.get_multiple_accounts(
+                page,
+                data_slice=DataSliceOpts(
+                    offset=SPL_TOKEN_AMOUNT_OFFSET, length=SPL_TOKEN_AMOUNT_LENGTH
+                ),
+            )
+        except Exception as e:
+            logger.error(
+                f"cache_user_balance.py | Error fetching {len(page)} token accounts: {e}"
+            )
+            continue
+        for account, account_info in zip(page, resp.value):
+            balances[account] = (
+                int.from_bytes(bytes(account_info.data), "little")
+                if account_info
+                else 0
+            )
+    return balances
+
+
+def get_associated_token_account(wallet: str) -> Pubkey:
+    root_sol_account = Pubkey.from_string(wallet)
+    derived_account, _ = Pubkey.find_program_address(
+        [
+            bytes(root_sol_account),
+            bytes(SPL_TOKEN_ID_PK),
+            bytes(WAUDIO_MINT_PUBKEY),  # type: ignore
+        ],
+        ASSOCIATED_TOKEN_PROGRAM_ID_PK,
+    )
+    return derived_account
+
+
 # *Explanation of user balance caching*
 # In an effort to minimize eth calls, we look up users embedded in track metadata once per user,
 # and current users (logged in dapp users, who might be changing their balance) on an interval.
@@ -95,17 +210,21 @@ def get_immediate_refresh_user_ids(redis: Redis) -> List[int]:
 #       a refresh for both the sender and reciever UserBank addresses
 #
 # In this recurring task:
-#   - Get all enqueued user balance refresh requests. These are stored in a set, so
-#       we don't worry about deduping.
-#   - If a given balance is either
-#        a) new (created_at == updated_at)
+#   - Get all enqueued immediate refresh requests, stored in a set, and the
+#       MAX_LAZY_REFRESH_USER_IDS most requested lazy refreshes, stored in a sorted
+#       set scored by the number of requests.
+#   - If a given lazy balance is either
+#        a) new (no User_Balance row, or created_at == updated_at)
 #        b) not new, but stale: last updated prior to (now - threshold)
 #     we look up said users, adding User_Balance rows, and removing them from Redis.
 #     we check if they have associated_wallets and update those balances as well
 #     we check if they have a user_bank_account and update that balance as well
+#   - All eth reads go out as JSON-RPC batches pinned to one block and all
+#       solana token accounts are read with getMultipleAccounts, so a run costs
+#       a handful of requests instead of several per user.
 #
-#     Enqueued User Ids in Redis that are *not* ready to be refreshed yet are left in the queue
-#     for later.
+#     Lazy refreshes beyond MAX_LAZY_REFRESH_USER_IDS are left in the queue for
+#     later, and the least requested ones are dropped past MAX_LAZY_REFRESH_QUEUE_SIZE.
 def refresh_user_ids(
     redis: Redis,
     db: SessionManager,
@@ -113,15 +232,10 @@ def refresh_user_ids(
     delegate_manager_contract,
     staking_contract,
     eth_web3,
-    waudio_token: Token | None,
+    solana_client: Client | None,
 ):
     with db.scoped_session() as session:
-        # lazy_refresh_user_ids = get_lazy_refresh_user_ids(redis, session)[
-        #     :MAX_LAZY_REFRESH_USER_IDS
-        # ]
-        # Temporarily disabling this to prevent 2 million users getting loaded
-        # at once
-        lazy_refresh_user_ids = []
+        lazy_refresh_user_ids = get_lazy_refresh_user_ids(redis, session)
         immediate_refresh_user_ids = get_immediate_refresh_user_ids(redis)
 
         logger.debug(
@@ -218,76 +332,143 @@ def refresh_user_ids(
             f"cache_user_balance.py | fetching for {len(user_associated_wallet_query)} users: {user_ids}"
         )
 
+        # Collect every on-chain read needed by the users, deduped
+        eth_calls: Dict[Tuple[str, str], Optional[int]] = {}
+        sol_accounts: Dict[Pubkey, Optional[int]] = {}
+
+        def balance_of_call(wallet: str) -> Tuple[str, str]:
+            return (
+                token_contract.address,
+                token_contract.encodeABI(fn_name="balanceOf", args=[wallet]),
+            )
+
+        def delegation_call(wallet: str) -> Tuple[str, str]:
+            return (
+                delegate_manager_contract.address,
+                delegate_manager_contract.encodeABI(
+                    fn_name="getTotalDelegatorStake", args=[wallet]
+                ),
+            )
+
+        def stake_call(wallet: str) -> Tuple[str, str]:
+            return (
+                staking_contract.address,
+                staking_contract.encodeABI(fn_name="totalStakedFor", args=[wallet]),
+            )
+
+        user_eth_wallets: Dict[int, Tuple[str, List[str]]] = {}
+        user_sol_accounts: Dict[int, Tuple[Optional[Pubkey], List[Pubkey]]] = {}
+        for user_id, wallets in user_id_metadata.items():
+            try:
+                owner_wallet: str = Web3.to_checksum_address(wallets["owner_wallet"])
+                associated_eth_wallets: List[str] = [
+                    Web3.to_checksum_address(wallet)
+                    for wallet in wallets["associated_wallets"]["eth"]
+                ]
+                bank_account = (
+                    Pubkey.from_string(wallets["bank_account"])
+                    if wallets["bank_account"] is not None
+                    else None
+                )
+            except Exception as e:
+                logger.error(
+                    f"cache_user_balance.py | Error reading wallets for user {user_id}: {(e)}"
+                )
+                continue
+            user_eth_wallets[user_id] = (owner_wallet, associated_eth_wallets)
+            eth_calls[balance_of_call(owner_wallet)] = None
+            for eth_wallet in associated_eth_wallets:
+                eth_calls[balance_of_call(eth_wallet)] = None
+                eth_calls[delegation_call(eth_wallet)] = None
+                eth_calls[stake_call(eth_wallet)] = None
+
+            if solana_client is None:
+                continue
+            associated_token_accounts = []
+            for wallet in wallets["associated_wallets"]["sol"]:
+                try:
+                    associated_token_accounts.append(
+                        get_associated_token_account(wallet)
+                    )
+                except Exception as e:
+                    logger.error(
+                        " ".join(
+                            [
+                                "cache_user_balance.py | Error deriving associated ",
+                                "wallet token account for user %s, wallet %s: %s",
+                            ]
+                        ),
+                        user_id,
+                        wallet,
+                        e,
+                    )
+            user_sol_accounts[user_id] = (bank_account, associated_token_accounts)
+            for account in associated_token_accounts:
+                sol_accounts[account] = None
+            if bank_account is not None:
+                sol_accounts[bank_account] = None
+
+        blocknumber = eth_web3.eth.block_number
+        eth_call_keys = list(eth_calls.keys())
+        eth_calls.update(
+            zip(eth_call_keys, batch_eth_call(eth_web3, eth_call_keys, blocknumber))
+        )
+        if solana_client is not None:
+            sol_accounts.update(
+                get_waudio_balances(solana_client, list(sol_accounts.keys()))
+            )
+
+        logger.debug(
+            f"cache_user_balance.py | fetched {len(eth_calls)} eth balances and "
+            f"{len(sol_accounts)} token accounts for {len(user_id_metadata)} users"
+        )
+
         # mapping of user_id => balance change
         needs_balance_change_update: Dict[int, Dict] = {}
 
-        # Fetch balances
-        # pylint: disable=too-many-nested-blocks
-        for user_id, wallets in user_id_metadata.items():
+        def read_eth_call(call: Tuple[str, str]) -> int:
+            value = eth_calls[call]
+            if value is None:
+                raise Exception(f"eth_call to {call[0]} failed")
+            return value
+
+        for user_id, (owner_wallet, associated_eth_wallets) in user_eth_wallets.items():
             try:
-                owner_wallet = wallets["owner_wallet"]
-                owner_wallet = Web3.to_checksum_address(owner_wallet)
-                owner_wallet_balance = token_contract.functions.balanceOf(
-                    owner_wallet
-                ).call()
+                owner_wallet_balance = read_eth_call(balance_of_call(owner_wallet))
                 associated_balance = 0
                 waudio_balance: str = "0"
                 associated_sol_balance = 0
 
-                if "associated_wallets" in wallets:
-                    for wallet in wallets["associated_wallets"]["eth"]:
-                        wallet = Web3.to_checksum_address(wallet)
-                        balance = token_contract.functions.balanceOf(wallet).call()
-                        delegation_balance = (
-                            delegate_manager_contract.functions.getTotalDelegatorStake(
-                                wallet
-                            ).call()
-                        )
-                        stake_balance = staking_contract.functions.totalStakedFor(
-                            wallet
-                        ).call()
-                        associated_balance += (
-                            balance + delegation_balance + stake_balance
+                for wallet in associated_eth_wallets:
+                    associated_balance += (
+                        read_eth_call(balance_of_call(wallet))
+                        + read_eth_call(delegation_call(wallet))
+                        + read_eth_call(stake_call(wallet))
+                    )
+
+                bank_account, associated_token_accounts = user_sol_accounts.get(
+                    user_id, (None, [])
+                )
+                for account in associated_token_accounts:
+                    associated_waudio_balance = sol_accounts[account]
+                    if associated_waudio_balance is None:
+                        logger.error(
+                            f"cache_user_balance.py | Error fetching associated wallet "
+                            f"token account {account} for user {user_id}"
                         )
-                    if waudio_token is not None:
-                        for wallet in wallets["associated_wallets"]["sol"]:
-                            try:
-                                root_sol_account = Pubkey.from_string(wallet)
-                                derived_account, _ = Pubkey.find_program_address(
-                                    [
-                                        bytes(root_sol_account),
-                                        bytes(SPL_TOKEN_ID_PK),
-                                        bytes(WAUDIO_MINT_PUBKEY),  # type: ignore
-                                    ],
-                                    ASSOCIATED_TOKEN_PROGRAM_ID_PK,
-                                )
-
-                                bal_info = waudio_token.get_balance(derived_account)
-                                associated_waudio_balance = bal_info.value.amount
-                                associated_sol_balance += int(associated_waudio_balance)
-                            except Exception as e:
-                                logger.error(
-                                    " ".join(
-                                        [
-                                            "cache_user_balance.py | Error fetching associated ",
-                                            "wallet balance for user %s, wallet %s: %s",
-                                        ]
-                                    ),
-                                    user_id,
-                                    wallet,
-                                    e,
-                                )
-
-                if wallets["bank_account"] is not None:
-                    if waudio_token is None:
+                        continue
+                    associated_sol_balance += associated_waudio_balance
+
+                if user_id_metadata[user_id]["bank_account"] is not None:
+                    if solana_client is None:
                         logger.error(
                             "cache_user_balance.py | Missing Required SPL Confirguration"
                         )
                     else:
-                        bal_info = waudio_token.get_balance(
-                            Pubkey.from_string(wallets["bank_account"])
-                        )
-                        waudio_balance = bal_info.value.amount
+                        bank_balance = sol_accounts[bank_account]  # type: ignore
+                        if bank_balance is None:
+                            raise Exception(f"Failed to fetch user bank {bank_account}")
+                        waudio_balance = str(bank_balance)
 
                 # update the balance on the user model
                 user_balance = user_balances[user_id]
@@ -319,7 +500,7 @@ def refresh_user_ids(
                 # Write to user_balance_changes table
                 needs_balance_change_update[user_id] = {
                     "user_id": user_id,
-                    "blocknumber": eth_web3.eth.block_number,
+                    "blocknumber": blocknumber,
                     "current_balance": str(current_total_balance),
                     "previous_balance": str(prev_total_balance),
                 }
@@ -382,7 +563,10 @@ def refresh_user_ids(
             f"cache_user_balance.py | Got balances for {len(user_associated_wallet_query)} users, removing from Redis."
         )
         if lazy_refresh_user_ids:
-            redis.srem(LAZY_REFRESH_REDIS_PREFIX, *lazy_refresh_user_ids)
+            redis.zrem(LAZY_REFRESH_REDIS_PREFIX, *lazy_refresh_user_ids)
+        redis.zremrangebyrank(
+            LAZY_REFRESH_REDIS_PREFIX, 0, -MAX_LAZY_REFRESH_QUEUE_SIZE - 1
+        )
         if immediate_refresh_user_ids:
             redis.srem(IMMEDIATE_REFRESH_REDIS_PREFIX, *immediate_refresh_user_ids)
 
@@ -454,24 +638,6 @@ def get_staking_contract(eth_web3):
     return staking_instance
 
 
-SPL_TOKEN_PROGRAM_ID_PUBKEY = Pubkey.from_string(
-    "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
-)
-
-
-def get_audio_token(solana_client: Client):
-    if WAUDIO_MINT_PUBKEY is None:
-        logger.error("cache_user_balance.py | Missing Required SPL Confirguration")
-        return None
-    waudio_token = Token(
-        conn=solana_client,
-        pubkey=WAUDIO_MINT_PUBKEY,
-        program_id=SPL_TOKEN_PROGRAM_ID_PUBKEY,
-        payer=Keypair(),
-    )
-    return waudio_token
-
-
 @celery.task(name="update_user_balances", bind=True)
 @save_duration_metric(metric_group="celery_task")
 def update_user_balances_task(self):
@@ -484,6 +650,9 @@ def update_user_balances_task(self):
         self.staking_inst = get_staking_contract(eth_web3)
     if not hasattr(self, "token_inst"):
         self.token_inst = get_token_contract(eth_web3)
+    if not hasattr(self, "drained_legacy_lazy_refresh_queue"):
+        drain_legacy_lazy_refresh_queue(redis)
+        self.drained_legacy_lazy_refresh_queue = True
     solana_client_manager = update_user_balances_task.solana_client_manager
 
     have_lock = False
@@ -495,7 +664,13 @@ def update_user_balances_task(self):
         if have_lock:
             start_time = time.time()
 
-            waudio_token = get_audio_token(solana_client_manager.get_client())
+            solana_client = None
+            if WAUDIO_MINT_PUBKEY is None:
+                logger.error(
+                    "cache_user_balance.py | Missing Required SPL Confirguration"
+                )
+            else:
+                solana_client = solana_client_manager.get_client()
             refresh_user_ids(
                 redis,
                 db,
@@ -503,7 +678,7 @@ def update_user_balances_task(self):
                 self.delegate_manager_inst,
                 self.staking_inst,
                 eth_web3,
-                waudio_token,
+                solana_client,
             )
 
             end_time = time.time()
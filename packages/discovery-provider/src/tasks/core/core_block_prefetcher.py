@@ -0,0 +1,78 @@
+import logging
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, Iterator, Optional
+
+from src.tasks.core.gen.protocol_pb2 import BlockResponse
+
+logger = logging.getLogger(__name__)
+
+
+class CoreBlockPrefetcher:
+    """
+    Fetches a contiguous window of core blocks ahead of the indexer.
+
+    Up to `max_in_flight` GetBlock calls are kept outstanding on background
+    threads while the caller indexes the blocks that have already arrived.
+    Blocks are always yielded in height order. Iteration stops at the first
+    block that fails to fetch so the caller never skips a height.
+
+    Usage:
+        with CoreBlockPrefetcher(core.get_block, start, end) as prefetcher:
+            for block in prefetcher:
+                ...
+    """
+
+    def __init__(
+        self,
+        get_block: Callable[[int], BlockResponse],
+        start_height: int,
+        end_height: int,
+        max_in_flight: int = 8,
+    ):
+        self.get_block = get_block
+        self.start_height = start_height
+        self.end_height = end_height
+        self.max_in_flight = max(1, max_in_flight)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._in_flight: Deque[Future] = deque()
+        self._next_height = start_height
+
+    def __enter__(self):
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_in_flight, thread_name_prefix="core_prefetch"
+        )
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        for future in self._in_flight:
+            future.cancel()
+        self._in_flight.clear()
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _fill(self):
+        assert self._executor, "CoreBlockPrefetcher must be used as a context manager"
+        while (
+            len(self._in_flight) < self.max_in_flight
+            and self._next_height <= self.end_height
+        ):
+            self._in_flight.append(
+                self._executor.submit(self.get_block, self._next_height)
+            )
+            self._next_height += 1
+
+    def __iter__(self) -> Iterator[BlockResponse]:
+        self._fill()
+        while self._in_flight:
+            future = self._in_flight.popleft()
+            try:
+                block = future.result()
+            except Exception as e:
+                logger.warning(f"core_block_prefetcher.py | failed to fetch block: {e}")
+                return
+            if not block:
+                return
+            self._fill()
+            yield block
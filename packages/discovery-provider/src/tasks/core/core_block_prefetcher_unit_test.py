@@ -0,0 +1,32 @@
+from src.tasks.core.core_block_prefetcher import CoreBlockPrefetcher
+
+
+class MockBlock:
+    def __init__(self, height):
+        self.height = height
+
+
+def test_prefetcher_yields_blocks_in_order():
+    with CoreBlockPrefetcher(MockBlock, 10, 40, max_in_flight=4) as prefetcher:
+        heights = [block.height for block in prefetcher]
+    assert heights == list(range(10, 41))
+
+
+def test_prefetcher_stops_at_first_failed_block():
+    def get_block(height):
+        if height == 13:
+            raise Exception("block not found")
+        return MockBlock(height)
+
+    with CoreBlockPrefetcher(get_block, 10, 20, max_in_flight=3) as prefetcher:
+        heights = [block.height for block in prefetcher]
+    assert heights == [10, 11, 12]
+
+
+def test_prefetcher_stops_at_missing_block():
+    def get_block(height):
+        return MockBlock(height) if height < 12 else None
+
+    with CoreBlockPrefetcher(get_block, 10, 20) as prefetcher:
+        heights = [block.height for block in prefetcher]
+    assert heights == [10, 11]
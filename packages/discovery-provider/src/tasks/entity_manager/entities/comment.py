@@ -2,6 +2,7 @@ from sqlalchemy import func
 
 from src.challenges.challenge_event import ChallengeEvent
 from src.exceptions import IndexingValidationError
+from src.models.comments.aggregate_comment import AggregateComment
 from src.models.comments.comment import Comment
 from src.models.comments.comment_mention import CommentMention
 from src.models.comments.comment_notification_setting import CommentNotificationSetting
@@ -27,6 +28,20 @@ from src.utils.structured_logger import StructuredLogger
 logger = StructuredLogger(__name__)
 
 
+def update_aggregate_comment(
+    params: ManageEntityParameters, comment_id: int, react_delta=0, reply_delta=0
+):
+    """Adds to the react and reply counts of a comment in aggregate_comment"""
+    aggregate_comment = params.session.query(AggregateComment).get(comment_id)
+    if not aggregate_comment:
+        aggregate_comment = AggregateComment(
+            comment_id=comment_id, react_count=0, reply_count=0
+        )
+        params.session.add(aggregate_comment)
+    aggregate_comment.react_count += react_delta
+    aggregate_comment.reply_count += reply_delta
+
+
 def validate_delete_comment_tx(params: ManageEntityParameters):
     validate_signer(params)
     comment_id = params.entity_id
@@ -271,6 +286,7 @@ def create_comment(params: ManageEntityParameters):
                 comment_id=comment_id,
             )
             params.session.add(comment_thread)
+            update_aggregate_comment(params, parent_comment_id, reply_delta=1)
 
         parent_comment_owner_notifications_off = params.session.query(
             params.session.query(CommentNotificationSetting)
@@ -568,6 +584,7 @@ def react_comment(params: ManageEntityParameters):
     params.add_record(
         (user_id, comment_id), comment_reaction_record, EntityType.COMMENT_REACTION
     )
+    update_aggregate_comment(params, comment_id, react_delta=1)
 
     if entity_id:
         entity_user_id = params.existing_records[EntityType.TRACK.value][
@@ -671,6 +688,9 @@ def unreact_comment(params: ManageEntityParameters):
     params.add_record(
         (user_id, comment_id), deleted_comment_reaction, EntityType.COMMENT_REACTION
     )
+    # Existing records keep deleted reactions, so only a live one is counted
+    if not existing_comment_reaction.is_delete:
+        update_aggregate_comment(params, comment_id, react_delta=-1)
 
 
 def validate_report_comment_tx(params: ManageEntityParameters):
@@ -147,6 +147,8 @@ def update_playlist_tracks(params: ManageEntityParameters, playlist_record: Play
 
     track_records = session.query(Track).filter(Track.track_id.in_(track_ids)).all()
     track_records_dict = {track.track_id: track for track in track_records}
+    # the tracks' playlists_containing_track fields change outside of new_records
+    params.changed_entity_ids[EntityType.TRACK.value].update(track_records_dict.keys())
 
     # delete relations that previously existed but are not in the updated list
     # Note: we are checking the tracks and only touching the models if things
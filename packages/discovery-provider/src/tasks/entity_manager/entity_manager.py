@@ -2,10 +2,13 @@ import json
 import time
 from collections import defaultdict
 from datetime import datetime
-from typing import Dict, List, Set, Tuple, cast
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, cast
 
 from eth_utils import to_hex
-from sqlalchemy import and_, func, literal_column, or_
+from sqlalchemy import and_, func
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy import literal_column, or_, tuple_
+from sqlalchemy.orm import make_transient_to_detached
 from sqlalchemy.orm.session import Session
 from web3.types import TxReceipt
 
@@ -121,10 +124,11 @@ from src.tasks.entity_manager.utils import (
     reset_entity_manager_event_tx_context,
     save_cid_metadata,
 )
-from src.utils import helpers
+from src.utils import helpers, redis_connection
 from src.utils.config import shared_config
 from src.utils.indexing_errors import IndexingError
 from src.utils.prometheus_metric import PrometheusMetric, PrometheusMetricNames
+from src.utils.redis_cache import invalidate_entity_cache_on_transaction_end
 from src.utils.structured_logger import StructuredLogger
 
 logger = StructuredLogger(__name__)
@@ -132,6 +136,155 @@ logger = StructuredLogger(__name__)
 # Please toggle below variable to true for development
 ENABLE_DEVELOPMENT_FEATURES = True
 
+# max rows per bulk DELETE/INSERT statement in save_new_records
+BULK_SAVE_BATCH_SIZE = 1000
+
+# record types other records reference, inserted in this order before the
+# rest and deleted after them
+PARENT_RECORD_TYPES: List[str] = [
+    EntityType.USER,
+    EntityType.TRACK,
+    EntityType.PLAYLIST,
+    EntityType.DEVELOPER_APP,
+    EntityType.COMMENT,
+    EntityType.EVENT,
+]
+
+EntityManagerHandler = Callable[[ManageEntityParameters], None]
+
+# (action, entity_type) -> handler for that transaction type
+entity_manager_handlers: Dict[Tuple[str, str], EntityManagerHandler] = {}
+# action -> handler for actions that apply to any entity type
+entity_manager_action_handlers: Dict[str, EntityManagerHandler] = {}
+
+
+def register_entity_manager_handler(
+    actions: Iterable[Action],
+    entity_types: Optional[Iterable[EntityType]],
+    handler: EntityManagerHandler,
+    enabled: bool = True,
+):
+    """
+    Registers a handler for every (action, entity_type) pair.
+
+    Passing `entity_types=None` registers the handler for the actions on any
+    entity type, used when no handler is registered for the exact pair.
+    """
+    if not enabled:
+        return
+    for action in actions:
+        if entity_types is None:
+            entity_manager_action_handlers[action.value] = handler
+            continue
+        for entity_type in entity_types:
+            entity_manager_handlers[(action.value, entity_type.value)] = handler
+
+
+def get_entity_manager_handler(
+    action: str, entity_type: str
+) -> Optional[EntityManagerHandler]:
+    handler = entity_manager_handlers.get((action, entity_type))
+    if handler:
+        return handler
+    return entity_manager_action_handlers.get(action)
+
+
+register_entity_manager_handler([Action.CREATE], [EntityType.PLAYLIST], create_playlist)
+register_entity_manager_handler([Action.UPDATE], [EntityType.PLAYLIST], update_playlist)
+register_entity_manager_handler([Action.DELETE], [EntityType.PLAYLIST], delete_playlist)
+register_entity_manager_handler(
+    [Action.CREATE], [EntityType.TRACK], create_track, ENABLE_DEVELOPMENT_FEATURES
+)
+register_entity_manager_handler(
+    [Action.UPDATE], [EntityType.TRACK], update_track, ENABLE_DEVELOPMENT_FEATURES
+)
+register_entity_manager_handler(
+    [Action.DELETE], [EntityType.TRACK], delete_track, ENABLE_DEVELOPMENT_FEATURES
+)
+register_entity_manager_handler([Action.DOWNLOAD], [EntityType.TRACK], download_track)
+register_entity_manager_handler(
+    [Action.MUTE, Action.UNMUTE],
+    [EntityType.TRACK, EntityType.COMMENT],
+    update_comment_notification_setting,
+)
+register_entity_manager_handler(create_social_action_types, None, create_social_record)
+register_entity_manager_handler(delete_social_action_types, None, delete_social_record)
+register_entity_manager_handler(
+    [Action.CREATE], [EntityType.USER], create_user, ENABLE_DEVELOPMENT_FEATURES
+)
+register_entity_manager_handler(
+    [Action.UPDATE], [EntityType.USER], update_user, ENABLE_DEVELOPMENT_FEATURES
+)
+register_entity_manager_handler(
+    [Action.VERIFY], [EntityType.USER], verify_user, ENABLE_DEVELOPMENT_FEATURES
+)
+register_entity_manager_handler([Action.MUTE], [EntityType.USER], mute_user)
+register_entity_manager_handler([Action.UNMUTE], [EntityType.USER], unmute_user)
+register_entity_manager_handler(
+    [Action.VIEW],
+    [EntityType.NOTIFICATION],
+    view_notification,
+    ENABLE_DEVELOPMENT_FEATURES,
+)
+register_entity_manager_handler(
+    [Action.CREATE],
+    [EntityType.NOTIFICATION],
+    create_notification,
+    ENABLE_DEVELOPMENT_FEATURES,
+)
+register_entity_manager_handler(
+    [Action.VIEW_PLAYLIST],
+    [EntityType.NOTIFICATION],
+    view_playlist,
+    ENABLE_DEVELOPMENT_FEATURES,
+)
+register_entity_manager_handler(
+    [Action.CREATE], [EntityType.DEVELOPER_APP], create_developer_app
+)
+register_entity_manager_handler(
+    [Action.UPDATE], [EntityType.DEVELOPER_APP], update_developer_app
+)
+register_entity_manager_handler(
+    [Action.DELETE], [EntityType.DEVELOPER_APP], delete_developer_app
+)
+register_entity_manager_handler([Action.CREATE], [EntityType.GRANT], create_grant)
+register_entity_manager_handler([Action.DELETE], [EntityType.GRANT], revoke_grant)
+register_entity_manager_handler([Action.APPROVE], [EntityType.GRANT], approve_grant)
+register_entity_manager_handler([Action.REJECT], [EntityType.GRANT], reject_grant)
+register_entity_manager_handler(
+    [Action.CREATE], [EntityType.DASHBOARD_WALLET_USER], create_dashboard_wallet_user
+)
+register_entity_manager_handler(
+    [Action.DELETE], [EntityType.DASHBOARD_WALLET_USER], delete_dashboard_wallet_user
+)
+register_entity_manager_handler([Action.UPDATE], [EntityType.TIP], tip_reaction)
+register_entity_manager_handler([Action.CREATE], [EntityType.COMMENT], create_comment)
+register_entity_manager_handler([Action.UPDATE], [EntityType.COMMENT], update_comment)
+register_entity_manager_handler([Action.DELETE], [EntityType.COMMENT], delete_comment)
+register_entity_manager_handler([Action.REACT], [EntityType.COMMENT], react_comment)
+register_entity_manager_handler([Action.UNREACT], [EntityType.COMMENT], unreact_comment)
+register_entity_manager_handler([Action.PIN], [EntityType.COMMENT], pin_comment)
+register_entity_manager_handler([Action.UNPIN], [EntityType.COMMENT], unpin_comment)
+register_entity_manager_handler([Action.REPORT], [EntityType.COMMENT], report_comment)
+register_entity_manager_handler(
+    [Action.ADD_EMAIL], [EntityType.ENCRYPTED_EMAIL], create_encrypted_email
+)
+register_entity_manager_handler(
+    [Action.UPDATE], [EntityType.EMAIL_ACCESS], grant_email_access
+)
+register_entity_manager_handler(
+    [Action.CREATE], [EntityType.ASSOCIATED_WALLET], add_associated_wallet
+)
+register_entity_manager_handler(
+    [Action.DELETE], [EntityType.ASSOCIATED_WALLET], remove_associated_wallet
+)
+register_entity_manager_handler(
+    [Action.CREATE, Action.UPDATE], [EntityType.COLLECTIBLES], update_user_collectibles
+)
+register_entity_manager_handler([Action.CREATE], [EntityType.EVENT], create_event)
+register_entity_manager_handler([Action.UPDATE], [EntityType.EVENT], update_event)
+register_entity_manager_handler([Action.DELETE], [EntityType.EVENT], delete_event)
+
 environment = shared_config["discprov"]["env"]
 
 entity_type_table_mapping = {
@@ -202,6 +355,9 @@ def entity_manager_update(
             metric_num_changed = PrometheusMetric(
                 PrometheusMetricNames.ENTITY_MANAGER_UPDATE_CHANGED_LATEST
             )
+            metric_handler_latency = PrometheusMetric(
+                PrometheusMetricNames.ENTITY_MANAGER_HANDLER_DURATION_SECONDS
+            )
 
             # collect events by entity type and action
             entities_to_fetch = collect_entities_to_fetch(
@@ -244,6 +400,7 @@ def entity_manager_update(
                             existing_records,
                             pending_track_routes,
                             pending_playlist_routes,
+                            changed_entity_ids,
                             update_task.eth_manager,
                             update_task.web3,
                             update_task.solana_client_manager,
@@ -257,235 +414,16 @@ def entity_manager_update(
                         # update logger context with this tx event
                         reset_entity_manager_event_tx_context(logger, event["args"])
 
-                        if (
-                            params.action == Action.CREATE
-                            and params.entity_type == EntityType.PLAYLIST
-                        ):
-                            create_playlist(params)
-                        elif (
-                            params.action == Action.UPDATE
-                            and params.entity_type == EntityType.PLAYLIST
-                        ):
-                            update_playlist(params)
-                        elif (
-                            params.action == Action.DELETE
-                            and params.entity_type == EntityType.PLAYLIST
-                        ):
-                            delete_playlist(params)
-                        elif (
-                            params.action == Action.CREATE
-                            and params.entity_type == EntityType.TRACK
-                            and ENABLE_DEVELOPMENT_FEATURES
-                        ):
-                            create_track(params)
-                        elif (
-                            params.action == Action.UPDATE
-                            and params.entity_type == EntityType.TRACK
-                            and ENABLE_DEVELOPMENT_FEATURES
-                        ):
-                            update_track(params)
-
-                        elif (
-                            params.action == Action.DELETE
-                            and params.entity_type == EntityType.TRACK
-                            and ENABLE_DEVELOPMENT_FEATURES
-                        ):
-                            delete_track(params)
-                        elif (
-                            params.action == Action.DOWNLOAD
-                            and params.entity_type == EntityType.TRACK
-                        ):
-                            download_track(params)
-                        elif (
-                            params.action == Action.MUTE
-                            or params.action == Action.UNMUTE
-                        ) and params.entity_type == EntityType.TRACK:
-                            update_comment_notification_setting(params)
-                        elif params.action in create_social_action_types:
-                            create_social_record(params)
-                        elif params.action in delete_social_action_types:
-                            delete_social_record(params)
-                        elif (
-                            params.action == Action.CREATE
-                            and params.entity_type == EntityType.USER
-                            and ENABLE_DEVELOPMENT_FEATURES
-                        ):
-                            create_user(params)
-                        elif (
-                            params.action == Action.UPDATE
-                            and params.entity_type == EntityType.USER
-                            and ENABLE_DEVELOPMENT_FEATURES
-                        ):
-                            update_user(params)
-                        elif (
-                            params.action == Action.VERIFY
-                            and params.entity_type == EntityType.USER
-                            and ENABLE_DEVELOPMENT_FEATURES
-                        ):
-                            verify_user(params)
-                        elif (
-                            params.action == Action.MUTE
-                            and params.entity_type == EntityType.USER
-                        ):
-                            mute_user(params)
-                        elif (
-                            params.action == Action.UNMUTE
-                            and params.entity_type == EntityType.USER
-                        ):
-                            unmute_user(params)
-                        elif (
-                            params.action == Action.VIEW
-                            and params.entity_type == EntityType.NOTIFICATION
-                            and ENABLE_DEVELOPMENT_FEATURES
-                        ):
-                            view_notification(params)
-                        elif (
-                            params.action == Action.CREATE
-                            and params.entity_type == EntityType.NOTIFICATION
-                            and ENABLE_DEVELOPMENT_FEATURES
-                        ):
-                            create_notification(params)
-                        elif (
-                            params.action == Action.VIEW_PLAYLIST
-                            and params.entity_type == EntityType.NOTIFICATION
-                            and ENABLE_DEVELOPMENT_FEATURES
-                        ):
-                            view_playlist(params)
-                        elif (
-                            params.action == Action.CREATE
-                            and params.entity_type == EntityType.DEVELOPER_APP
-                        ):
-                            create_developer_app(params)
-                        elif (
-                            params.action == Action.UPDATE
-                            and params.entity_type == EntityType.DEVELOPER_APP
-                        ):
-                            update_developer_app(params)
-                        elif (
-                            params.action == Action.DELETE
-                            and params.entity_type == EntityType.DEVELOPER_APP
-                        ):
-                            delete_developer_app(params)
-                        elif (
-                            params.action == Action.CREATE
-                            and params.entity_type == EntityType.GRANT
-                        ):
-                            create_grant(params)
-                        elif (
-                            params.action == Action.DELETE
-                            and params.entity_type == EntityType.GRANT
-                        ):
-                            revoke_grant(params)
-                        elif (
-                            params.action == Action.APPROVE
-                            and params.entity_type == EntityType.GRANT
-                        ):
-                            approve_grant(params)
-                        elif (
-                            params.action == Action.REJECT
-                            and params.entity_type == EntityType.GRANT
-                        ):
-                            reject_grant(params)
-                        elif (
-                            params.action == Action.CREATE
-                            and params.entity_type == EntityType.DASHBOARD_WALLET_USER
-                        ):
-                            create_dashboard_wallet_user(params)
-                        elif (
-                            params.action == Action.DELETE
-                            and params.entity_type == EntityType.DASHBOARD_WALLET_USER
-                        ):
-                            delete_dashboard_wallet_user(params)
-                        elif (
-                            params.action == Action.UPDATE
-                            and params.entity_type == EntityType.TIP
-                        ):
-                            tip_reaction(params)
-                        elif (
-                            params.action == Action.CREATE
-                            and params.entity_type == EntityType.COMMENT
-                        ):
-                            create_comment(params)
-                        elif (
-                            params.action == Action.UPDATE
-                            and params.entity_type == EntityType.COMMENT
-                        ):
-                            update_comment(params)
-                        elif (
-                            params.action == Action.DELETE
-                            and params.entity_type == EntityType.COMMENT
-                        ):
-                            delete_comment(params)
-                        elif (
-                            params.action == Action.REACT
-                            and params.entity_type == EntityType.COMMENT
-                        ):
-                            react_comment(params)
-                        elif (
-                            params.action == Action.UNREACT
-                            and params.entity_type == EntityType.COMMENT
-                        ):
-                            unreact_comment(params)
-                        elif (
-                            params.action == Action.PIN
-                            and params.entity_type == EntityType.COMMENT
-                        ):
-                            pin_comment(params)
-                        elif (
-                            params.action == Action.UNPIN
-                            and params.entity_type == EntityType.COMMENT
-                        ):
-                            unpin_comment(params)
-                        elif (
-                            params.action == Action.REPORT
-                            and params.entity_type == EntityType.COMMENT
-                        ):
-                            report_comment(params)
-                        elif (
-                            params.action == Action.MUTE
-                            or params.action == Action.UNMUTE
-                        ) and params.entity_type == EntityType.COMMENT:
-                            update_comment_notification_setting(params)
-                        elif (
-                            params.action == Action.ADD_EMAIL
-                            and params.entity_type == EntityType.ENCRYPTED_EMAIL
-                        ):
-                            create_encrypted_email(params)
-                        elif (
-                            params.action == Action.UPDATE
-                            and params.entity_type == EntityType.EMAIL_ACCESS
-                        ):
-                            grant_email_access(params)
-                        elif (
-                            params.action == Action.CREATE
-                            and params.entity_type == EntityType.ASSOCIATED_WALLET
-                        ):
-                            add_associated_wallet(params)
-                        elif (
-                            params.action == Action.DELETE
-                            and params.entity_type == EntityType.ASSOCIATED_WALLET
-                        ):
-                            remove_associated_wallet(params)
-                        elif (
-                            params.action == Action.CREATE
-                            or params.action == Action.UPDATE
-                        ) and params.entity_type == EntityType.COLLECTIBLES:
-                            update_user_collectibles(params)
-                        elif (
-                            params.action == Action.CREATE
-                            and params.entity_type == EntityType.EVENT
-                        ):
-                            create_event(params)
-                        elif (
-                            params.action == Action.UPDATE
-                            and params.entity_type == EntityType.EVENT
-                        ):
-                            update_event(params)
-                        elif (
-                            params.action == Action.DELETE
-                            and params.entity_type == EntityType.EVENT
-                        ):
-                            delete_event(params)
+                        handler = get_entity_manager_handler(
+                            params.action, params.entity_type
+                        )
+                        if handler:
+                            handler_start_time = time.time()
+                            handler(params)
+                            metric_handler_latency.save_time(
+                                {"handler": getattr(handler, "__name__", "unknown")},
+                                start_time=handler_start_time,
+                            )
 
                         logger.debug("process transaction")  # log event context
                     except IndexingValidationError as e:
@@ -515,6 +453,13 @@ def entity_manager_update(
                 session,
             )
 
+            changed_entity_ids[EntityType.TRACK.value].update(new_records["Track"])
+            changed_entity_ids[EntityType.USER.value].update(new_records["User"])
+            changed_entity_ids[EntityType.PLAYLIST.value].update(
+                new_records["Playlist"]
+            )
+            invalidate_changed_entities(update_task, session, changed_entity_ids)
+
             num_total_changes += len(new_records)
             # update metrics
             metric_latency.save_time(
@@ -549,6 +494,18 @@ def entity_manager_update(
     return num_total_changes, changed_entity_ids
 
 
+def invalidate_changed_entities(
+    update_task: DatabaseTask,
+    session: Session,
+    changed_entity_ids: Dict[str, Set[int]],
+):
+    """Drops changed tracks, users and playlists from the entity cache."""
+    if not any(changed_entity_ids.values()):
+        return
+    redis = update_task.redis or redis_connection.get_redis()
+    invalidate_entity_cache_on_transaction_end(redis, session, changed_entity_ids)
+
+
 def save_new_records(
     block_timestamp: int,
     block_number: int,
@@ -556,12 +513,21 @@ def save_new_records(
     original_records: dict,
     existing_records_in_json: dict[str, dict],
     session: Session,
+    bulk: bool = True,
 ):
+    """
+    Saves the final record of every entity changed in the block.
+
+    Superseded records are deleted and a RevertBlock holding their previous state
+    is written. With `bulk` the deletes and inserts are applied as one statement
+    per table instead of flushing once per entity.
+    """
     prev_records: Dict[str, List] = defaultdict(list)
+    # (record_to_delete, records_to_add) with parent record types first
     records_to_update = []
-    for record_type, record_dict in new_records.items():
+    for record_type in sort_record_types(new_records):
         # This is actually a dict, but python has a hard time inferring.
-        casted_record_dict = cast(dict, record_dict)
+        casted_record_dict = cast(dict, new_records[record_type])
         for entity_id, records in casted_record_dict.items():
             if not records:
                 continue
@@ -604,11 +570,134 @@ def save_new_records(
         revert_block = RevertBlock(blocknumber=block_number, prev_records=prev_records)
         session.add(revert_block)
         session.flush()
-    for record_to_delete, records_to_add in records_to_update:
-        if record_to_delete:
-            session.delete(record_to_delete)
-        session.flush()
-        session.add_all(records_to_add)
+    if not bulk:
+        for record_to_delete, records_to_add in records_to_update:
+            if record_to_delete:
+                session.delete(record_to_delete)
+            session.flush()
+            session.add_all(records_to_add)
+        return
+
+    # flush route invalidations and records added by the handlers so the
+    # bulk statements below run after them, as the per-record flushes did
+    session.flush()
+    # children are deleted before their parents and inserted after them
+    bulk_delete_records(
+        session,
+        [
+            record_to_delete
+            for record_to_delete, _ in reversed(records_to_update)
+            if record_to_delete
+        ],
+    )
+    bulk_insert_records(
+        session,
+        [
+            record
+            for _, records_to_add in records_to_update
+            for record in records_to_add
+        ],
+    )
+
+
+def sort_record_types(record_types: Iterable[str]) -> List[str]:
+    """Orders record types with PARENT_RECORD_TYPES first, in that order"""
+    return sorted(
+        record_types,
+        key=lambda record_type: (
+            PARENT_RECORD_TYPES.index(record_type)
+            if record_type in PARENT_RECORD_TYPES
+            else len(PARENT_RECORD_TYPES)
+        ),
+    )
+
+
+def bulk_delete_records(session: Session, records: List):
+    """
+    Deletes persistent records with one `DELETE ... WHERE (pk) IN (...)` per table,
+    in the order the tables first appear in `records`.
+
+    Deleted records are expunged from the session, leaving them detached like
+    `session.delete` followed by a flush would.
+    """
+    identities_by_mapper: Dict = defaultdict(list)
+    for record in records:
+        state = sa_inspect(record)
+        if not state.persistent or state.identity is None:
+            session.delete(record)
+            continue
+        identities_by_mapper[state.mapper].append(state.identity)
+
+    for mapper, identities in identities_by_mapper.items():
+        table = mapper.local_table
+        pk_columns = [table.c[column.key] for column in mapper.primary_key]
+        for i in range(0, len(identities), BULK_SAVE_BATCH_SIZE):
+            session.execute(
+                table.delete().where(
+                    tuple_(*pk_columns).in_(identities[i : i + BULK_SAVE_BATCH_SIZE])
+                )
+            )
+    for record in records:
+        state = sa_inspect(record)
+        if state.persistent and state.mapper in identities_by_mapper:
+            session.expunge(record)
+
+
+def bulk_insert_records(session: Session, records: List):
+    """
+    Inserts new records with one multi-row `INSERT` per table and column set, in
+    the order the tables first appear in `records`.
+
+    Inserted records are attached to the session as persistent objects. Columns
+    left for the database to default are expired so they load on next access,
+    matching what the ORM does after its own INSERT.
+    """
+    rows_by_statement: Dict[Tuple, List[Dict]] = defaultdict(list)
+    records_to_attach = []
+    for record in records:
+        state = sa_inspect(record)
+        mapper = state.mapper
+        if (
+            not state.transient
+            or len(mapper.tables) > 1
+            or mapper.version_id_col is not None
+        ):
+            session.add(record)
+            continue
+
+        row = {}
+        expired_keys = []
+        for prop in mapper.column_attrs:
+            column = prop.columns[0]
+            if prop.key not in state.dict:
+                continue
+            value = state.dict[prop.key]
+            if value is None and (
+                column.server_default is not None or column.default is not None
+            ):
+                expired_keys.append(prop.key)
+                continue
+            row[column.key] = value
+
+        if any(
+            row.get(column.key) is None for column in mapper.local_table.primary_key
+        ):
+            # the database assigns the primary key, let the ORM fetch it
+            session.add(record)
+            continue
+
+        rows_by_statement[(mapper.local_table, tuple(sorted(row)))].append(row)
+        records_to_attach.append((record, expired_keys))
+
+    for (table, _), rows in rows_by_statement.items():
+        for i in range(0, len(rows), BULK_SAVE_BATCH_SIZE):
+            session.execute(table.insert().values(rows[i : i + BULK_SAVE_BATCH_SIZE]))
+
+    for record, expired_keys in records_to_attach:
+        make_transient_to_detached(record)
+        session.add(record)
+        if expired_keys:
+            session.expire(record, expired_keys)
 
 
 def copy_original_records(existing_records):
@@ -0,0 +1,51 @@
+from src.tasks.entity_manager.entities.comment import (
+    update_comment_notification_setting,
+)
+from src.tasks.entity_manager.entities.muted_user import mute_user
+from src.tasks.entity_manager.entities.social_features import (
+    create_social_record,
+    delete_social_record,
+)
+from src.tasks.entity_manager.entities.track import create_track
+from src.tasks.entity_manager.entity_manager import (
+    get_entity_manager_handler,
+    sort_record_types,
+)
+
+
+def test_get_entity_manager_handler_exact_match():
+    assert get_entity_manager_handler("Create", "Track") == create_track
+    assert get_entity_manager_handler("Mute", "User") == mute_user
+    assert (
+        get_entity_manager_handler("Mute", "Track")
+        == update_comment_notification_setting
+    )
+    assert (
+        get_entity_manager_handler("Unmute", "Comment")
+        == update_comment_notification_setting
+    )
+
+
+def test_get_entity_manager_handler_social_actions():
+    assert get_entity_manager_handler("Save", "Track") == create_social_record
+    assert get_entity_manager_handler("Follow", "User") == create_social_record
+    assert get_entity_manager_handler("Unrepost", "Playlist") == delete_social_record
+    # social actions dispatch for any entity type and validate it in the handler
+    assert get_entity_manager_handler("Save", "Unknown") == create_social_record
+
+
+def test_get_entity_manager_handler_unknown():
+    assert get_entity_manager_handler("Pin", "Track") is None
+    assert get_entity_manager_handler("Unknown", "Track") is None
+
+
+def test_sort_record_types_puts_parents_first():
+    record_types = ["CommentThread", "Save", "Comment", "Playlist", "User", "Track"]
+    assert sort_record_types(record_types) == [
+        "User",
+        "Track",
+        "Playlist",
+        "Comment",
+        "CommentThread",
+        "Save",
+    ]
@@ -259,6 +259,7 @@ class ManageEntityParameters:
         existing_records: ExistingRecordDict,
         pending_track_routes: List[TrackRoute],
         pending_playlist_routes: List[PlaylistRoute],
+        changed_entity_ids: Dict[str, Set[int]],
         eth_manager: EthManager,
         web3: Web3,
         solana_client_manager: SolanaClientManager,
@@ -284,6 +285,8 @@ class ManageEntityParameters:
         self.solana_client_manager = solana_client_manager
         self.pending_track_routes = pending_track_routes
         self.pending_playlist_routes = pending_playlist_routes
+        # ids of entities changed outside of new_records, dropped from the entity cache
+        self.changed_entity_ids = changed_entity_ids
 
         self.event = event
         self.metadata, self.metadata_cid = parse_metadata(
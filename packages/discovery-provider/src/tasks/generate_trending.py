@@ -5,9 +5,9 @@ from urllib.parse import unquote
 from sqlalchemy import desc, func
 
 from src.models.social.aggregate_plays import AggregatePlay
-from src.models.social.play import Play
 from src.models.social.repost import RepostType
 from src.models.social.save import SaveType
+from src.models.social.track_hourly_play_count import TrackHourlyPlayCount
 from src.models.tracks.aggregate_track import AggregateTrack
 from src.models.tracks.track import Track
 from src.models.users.aggregate_user import AggregateUser
@@ -52,7 +52,10 @@ def get_listen_counts(session, time, genre, limit, offset, net_multiplier=1):
         if not delta:
             logger.warning(f"Invalid time passed to get_listen_counts: {time}")
             return base_query
-        return base_query.filter(Play.created_at > datetime.now() - delta)
+        return base_query.filter(
+            TrackHourlyPlayCount.hourly_timestamp
+            >= func.date_trunc("hour", datetime.now() - delta)
+        )
 
     # Adds a genre filter
     # on the base query, if applicable.
@@ -71,10 +74,12 @@ def get_listen_counts(session, time, genre, limit, offset, net_multiplier=1):
 
     # Construct base query
     if time:
-        # If we want to query plays by time, use the plays table directly
+        # If we want to query plays by time, sum the hourly play rollup
         base_query = session.query(
-            Play.play_item_id, func.count(Play.id).label("count"), Track.created_at
-        ).join(Track, Track.track_id == Play.play_item_id)
+            TrackHourlyPlayCount.play_item_id,
+            func.sum(TrackHourlyPlayCount.play_count).label("count"),
+            Track.created_at,
+        ).join(Track, Track.track_id == TrackHourlyPlayCount.play_item_id)
     else:
         # Otherwise, it's safe to just query over the aggregate plays table (all time)
         base_query = session.query(
@@ -91,7 +96,9 @@ def get_listen_counts(session, time, genre, limit, offset, net_multiplier=1):
     )
 
     if time:
-        base_query = base_query.group_by(Play.play_item_id, Track.created_at)
+        base_query = base_query.group_by(
+            TrackHourlyPlayCount.play_item_id, Track.created_at
+        )
 
     # Add filters to query
     base_query = with_time_filter(base_query, time)
@@ -1,6 +1,7 @@
 import logging
 import time
 
+from src.challenges.challenge_event_bus import NUM_CHALLENGE_EVENT_CONSUMERS
 from src.tasks.celery_app import celery
 from src.utils.prometheus_metric import save_duration_metric
 from src.utils.redis_constants import challenges_last_processed_event_redis_key
@@ -9,12 +10,20 @@ logger = logging.getLogger(__name__)
 index_challenges_last_event_key = ""
 
 
-def index_challenges(event_bus, db, redis, num_iterations=1000):
+def index_challenges(event_bus, db, redis, num_iterations=1000, consumer=0):
+    # events left unacked by a previous run of this consumer are processed again
+    event_bus.requeue_unacked_events(consumer)
     with db.scoped_session() as session:
         for i in range(num_iterations):
-            num_processed = event_bus.process_events(session)
+            num_processed = event_bus.process_events(session, consumer=consumer)
             if num_processed:
                 redis.set(challenges_last_processed_event_redis_key, int(time.time()))
+    # ack once the session has committed the effects of the events
+    event_bus.ack_events(consumer)
+
+
+def get_index_challenges_lock_key(consumer: int):
+    return f"index_challenges_lock:{consumer}"
 
 
 @celery.task(name="index_challenges", bind=True, rate_limit="5/s")
@@ -23,27 +32,31 @@ def index_challenges_task(self):
     db = index_challenges_task.db
     redis = index_challenges_task.redis
     event_bus = index_challenges_task.challenge_event_bus
-    have_lock = False
-    update_lock = redis.lock("index_challenges_lock", timeout=7200)
+    update_lock = None
     try:
-        have_lock = update_lock.acquire(blocking=False)
-        if not have_lock:
+        # each consumer slot has its own lock, queue partition and processing list
+        for consumer in range(NUM_CHALLENGE_EVENT_CONSUMERS):
+            lock = redis.lock(get_index_challenges_lock_key(consumer), timeout=7200)
+            if lock.acquire(blocking=False):
+                update_lock = lock
+                break
+        if not update_lock:
             logger.debug(
                 "index_challenges.py | Failed to acquire index challenges lock"
             )
             return
 
-        index_challenges(event_bus, db, redis)
+        # spin up the next consumer, it exits if every slot is taken
+        if consumer + 1 < NUM_CHALLENGE_EVENT_CONSUMERS:
+            celery.send_task("index_challenges", queue="index_challenges")
+
+        index_challenges(event_bus, db, redis, consumer=consumer)
 
     except Exception as e:
         logger.error("index_challenges.py | Fatal error in main loop", exc_info=True)
         raise e
 
     finally:
-        if not have_lock:
-            return
-
-        if have_lock:
+        if update_lock:
             update_lock.release()
-
-        celery.send_task("index_challenges", queue="index_challenges")
+            celery.send_task("index_challenges", queue="index_challenges")
@@ -1,18 +1,23 @@
 import json
 import logging
+import time
+from contextlib import nullcontext
 from datetime import datetime
 from logging import LoggerAdapter
-from typing import Optional, TypedDict, cast
+from typing import ContextManager, Iterable, Optional, Tuple, TypedDict, cast
 
 from celery.exceptions import SoftTimeLimitExceeded
 from redis import Redis
 from sqlalchemy import desc
+from sqlalchemy.orm.session import Session
 from web3 import Web3
 
 from src.challenges.challenge_event_bus import ChallengeEventBus
+from src.database_task import DatabaseTask
 from src.models.core.core_indexed_blocks import CoreIndexedBlocks
 from src.models.social.play import Play
 from src.tasks.celery_app import celery
+from src.tasks.core.core_block_prefetcher import CoreBlockPrefetcher
 from src.tasks.core.core_client import CoreClient, get_core_instance
 from src.tasks.core.gen.protocol_pb2 import BlockResponse
 from src.tasks.index_core_cutovers import get_plays_core_cutover, get_sol_cutover
@@ -25,6 +30,7 @@ from src.utils.core import (
     core_health_check_cache_key,
     core_listens_health_check_cache_key,
 )
+from src.utils.prometheus_metric import PrometheusMetric, PrometheusMetricNames
 from src.utils.redis_constants import (
     latest_block_hash_redis_key,
     latest_block_redis_key,
@@ -41,6 +47,12 @@ environment = shared_config["discprov"]["env"]
 default_indexing_interval_seconds = int(
     shared_config["discprov"]["block_processing_interval_sec"]
 )
+catchup_block_threshold = int(shared_config["discprov"]["core_catchup_block_threshold"])
+catchup_window_size = int(shared_config["discprov"]["core_catchup_window_size"])
+catchup_commit_batch_size = int(
+    shared_config["discprov"]["core_catchup_commit_batch_size"]
+)
+catchup_max_in_flight = int(shared_config["discprov"]["core_catchup_max_in_flight"])
 
 
 class CoreListensTxInfo(TypedDict):
@@ -148,6 +160,107 @@ def update_latest_indexed_block_redis(
         logger.error(f"couldn't update latest redis block: {e}")
 
 
+def index_core_block(
+    logger: LoggerAdapter,
+    update_task: DatabaseTask,
+    web3: Web3,
+    session: Session,
+    core: CoreClient,
+    challenge_bus: ChallengeEventBus,
+    core_chain_id: str,
+    latest_indexed_slot: int,
+    block: BlockResponse,
+) -> Optional[int]:
+    """Indexes a single core block into the session, returns the indexed plays slot."""
+    indexed_slot = index_core_plays(
+        logger=logger,
+        session=session,
+        challenge_bus=challenge_bus,
+        latest_indexed_slot=latest_indexed_slot,
+        block=block,
+    )
+
+    indexed_em_block = index_core_entity_manager(
+        logger=logger,
+        update_task=update_task,
+        web3=web3,
+        session=session,
+        block=block,
+    )
+
+    run_side_effects(
+        logger=logger,
+        block=block,
+        session=session,
+        core=core,
+        challenge_bus=challenge_bus,
+    )
+
+    # get block parenthash, in none case also use None
+    # this would be the case in solana cutover where the previous
+    # block to the cutover isn't indexed either
+    parenthash: Optional[str] = None
+    previous_height = block.height - 1
+    if previous_height > 0:
+        parent_block = (
+            session.query(CoreIndexedBlocks)
+            .filter(CoreIndexedBlocks.chain_id == core_chain_id)
+            .filter(CoreIndexedBlocks.height == previous_height)
+            .one_or_none()
+        )
+        if parent_block:
+            parenthash = parent_block.blockhash
+
+    new_block = CoreIndexedBlocks(
+        chain_id=core_chain_id,
+        height=block.height,
+        blockhash=block.blockhash,
+        parenthash=parenthash,
+        plays_slot=indexed_slot,
+        em_block=indexed_em_block,
+    )
+
+    exists = (
+        session.query(CoreIndexedBlocks)
+        .filter(CoreIndexedBlocks.chain_id == core_chain_id)
+        .filter(CoreIndexedBlocks.height == block.height)
+        .one_or_none()
+    )
+    if not exists:
+        session.add(new_block)
+    if exists:
+        logger.warning(f"block {block.height} already indexed")
+
+    return indexed_slot
+
+
+def get_blocks_to_index(
+    core: CoreClient,
+    next_block: int,
+    latest_core_block_height: int,
+) -> Tuple[str, Iterable[BlockResponse], ContextManager]:
+    """
+    Returns the blocks this task run should index.
+
+    When indexing is within `core_catchup_block_threshold` of the chain head only
+    the next block is fetched. Otherwise a window of blocks is prefetched in the
+    background so the run can index many blocks while paying the task overhead once.
+    """
+    block_gap = latest_core_block_height - next_block + 1
+    if block_gap <= catchup_block_threshold:
+        block = core.get_block(next_block)
+        return "single", [block] if block else [], nullcontext()
+
+    end_block = min(latest_core_block_height, next_block + catchup_window_size - 1)
+    prefetcher = CoreBlockPrefetcher(
+        get_block=core.get_block,
+        start_height=next_block,
+        end_height=end_block,
+        max_in_flight=catchup_max_in_flight,
+    )
+    return "catchup", prefetcher, prefetcher
+
+
 @celery.task(name="index_core", bind=True, soft_time_limit=500)
 def index_core(self):
     redis: Redis = index_core.redis
@@ -222,79 +335,63 @@ def index_core(self):
 
             logger.debug("indexing block")
 
-            block = core.get_block(next_block)
-            if not block:
-                return
-
-            if block.height < 0:
-                return
-
-            if block.chainid != core_chain_id:
-                logger.warning(
-                    f"mismatched chain id {block.chainid} given for block but indexing chain {core_chain_id}"
-                )
-                return
-
-            indexed_slot = index_core_plays(
-                logger=logger,
-                session=session,
-                challenge_bus=challenge_bus,
-                latest_indexed_slot=latest_indexed_slot,
-                block=block,
-            )
-
-            indexed_em_block = index_core_entity_manager(
-                logger=logger,
-                update_task=self,
-                web3=web3,
-                session=session,
-                block=block,
-            )
-
-            run_side_effects(
-                logger=logger,
-                block=block,
-                session=session,
+            mode, blocks, blocks_context = get_blocks_to_index(
                 core=core,
-                challenge_bus=challenge_bus,
+                next_block=next_block,
+                latest_core_block_height=latest_core_block_height,
             )
-
-            # get block parenthash, in none case also use None
-            # this would be the case in solana cutover where the previous
-            # block to the cutover isn't indexed either
-            parenthash: Optional[str] = None
-            previous_height = block.height - 1
-            if previous_height > 0:
-                parent_block = (
-                    session.query(CoreIndexedBlocks)
-                    .filter(CoreIndexedBlocks.chain_id == core_chain_id)
-                    .filter(CoreIndexedBlocks.height == previous_height)
-                    .one_or_none()
+            if mode == "catchup":
+                logger.info(
+                    f"catching up {latest_core_block_height - latest_indexed_block_height} blocks behind"
                 )
-                if parent_block:
-                    parenthash = parent_block.blockhash
-
-            new_block = CoreIndexedBlocks(
-                chain_id=core_chain_id,
-                height=block.height,
-                blockhash=block.blockhash,
-                parenthash=parenthash,
-                plays_slot=indexed_slot,
-                em_block=indexed_em_block,
-            )
 
-            exists = (
-                session.query(CoreIndexedBlocks)
-                .filter(CoreIndexedBlocks.chain_id == core_chain_id)
-                .filter(CoreIndexedBlocks.height == block.height)
-                .one_or_none()
-            )
-            if not exists:
-                session.add(new_block)
-            if exists:
-                logger.warning(f"block {block.height} already indexed")
-
-            block_indexed = block
+            indexing_start = time.time()
+            blocks_indexed_count = 0
+            with blocks_context:
+                for block in blocks:
+                    if block.height < 0:
+                        break
+
+                    if block.chainid != core_chain_id:
+                        logger.warning(
+                            f"mismatched chain id {block.chainid} given for block but indexing chain {core_chain_id}"
+                        )
+                        break
+
+                    indexed_slot = index_core_block(
+                        logger=logger,
+                        update_task=self,
+                        web3=web3,
+                        session=session,
+                        core=core,
+                        challenge_bus=challenge_bus,
+                        core_chain_id=core_chain_id,
+                        latest_indexed_slot=latest_indexed_slot,
+                        block=block,
+                    )
+                    if indexed_slot:
+                        latest_indexed_slot = indexed_slot
+
+                    block_indexed = block
+                    blocks_indexed_count += 1
+
+                    # in catchup mode commit every batch so progress survives
+                    # a failure or soft time limit later in the window
+                    if (
+                        mode == "catchup"
+                        and blocks_indexed_count % catchup_commit_batch_size == 0
+                    ):
+                        session.commit()
+                        logger.debug(f"committed through block {block.height}")
+
+            if blocks_indexed_count:
+                indexing_duration = time.time() - indexing_start
+                PrometheusMetric(
+                    PrometheusMetricNames.INDEX_CORE_BLOCKS_PER_SECOND
+                ).save(
+                    blocks_indexed_count / max(indexing_duration, 1e-6),
+                    {"mode": mode},
+                )
 
         # after session has been committed, update health checks and other things
         if block_indexed:
@@ -1,36 +1,27 @@
 import time
 from datetime import datetime
 from logging import LoggerAdapter
-from typing import List, Optional, TypedDict
+from typing import Dict, List, Optional, Tuple
 
+from psycopg2.extras import execute_values
 from sqlalchemy.orm.session import Session
 
 from src.challenges.challenge_event import ChallengeEvent
 from src.challenges.challenge_event_bus import ChallengeEventBus
-from src.models.social.play import Play
 from src.models.tracks.track import Track
 from src.tasks.core.gen.protocol_pb2 import BlockResponse, SignedTransaction
+from src.utils.prometheus_metric import PrometheusMetric, PrometheusMetricNames
 
+# Column order of the rows built by get_core_plays
+INSERT_PLAYS_QUERY = """
+    INSERT INTO plays (
+        user_id, play_item_id, created_at, updated_at, source,
+        city, region, country, slot, signature
+    )
+    VALUES %s
+"""
 
-class PlayInfo(TypedDict):
-    user_id: int | None
-    play_item_id: int
-    created_at: datetime
-    updated_at: datetime
-    source: str
-    city: str
-    region: str
-    country: str
-    slot: int
-    signature: str
-
-
-class PlayChallengeInfo(TypedDict):
-    slot: int
-    user_id: int
-    created_at: datetime
-    track_id: int
-    listener_id: Optional[int]
+PlayRow = Tuple[Optional[int], int, datetime, datetime, str, str, str, str, int, str]
 
 
 def index_core_plays(
@@ -40,136 +31,119 @@ def index_core_plays(
     latest_indexed_slot: int,
     block: BlockResponse,
 ) -> Optional[int]:
-    indexed_slot: Optional[int] = None
+    """
+    Inserts the plays of every plays transaction in the block with a single
+    statement and dispatches one challenge event per (user, track)
+    """
+    next_slot = latest_indexed_slot + 1
+
+    plays: List[PlayRow] = []
     for tx in block.transaction_responses:
         tx_type = tx.transaction.WhichOneof("transaction")
         if tx_type != "plays":
             continue
+        plays += get_core_plays(logger, tx.transaction, next_slot)
 
-        indexed_slot = index_core_play(
-            logger=logger,
-            session=session,
-            challenge_bus=challenge_bus,
-            latest_indexed_slot=latest_indexed_slot,
-            tx=tx.transaction,
-        )
-    return indexed_slot
+    if not plays:
+        return None
 
+    ingest_start = time.time()
+    with challenge_bus.use_scoped_dispatch_queue():
+        with session.connection().connection.cursor() as cursor:
+            execute_values(cursor, INSERT_PLAYS_QUERY, plays, page_size=len(plays))
 
-def index_core_play(
-    logger: LoggerAdapter,
-    session: Session,
-    challenge_bus: ChallengeEventBus,
-    latest_indexed_slot: int,
-    tx: SignedTransaction,
-) -> Optional[int]:
-    next_slot = latest_indexed_slot + 1
+        logger.debug("index_core_plays.py | Dispatching listen events")
+        listen_dispatch_start = time.time()
+        dispatch_play_challenge_events(session, challenge_bus, next_slot, plays)
+        listen_dispatch_diff = time.time() - listen_dispatch_start
+        logger.debug(f"dispatched listen events in {listen_dispatch_diff}")
 
-    plays: List[PlayInfo] = []
-    challenge_bus_events: List[PlayChallengeInfo] = []
+    PrometheusMetric(PrometheusMetricNames.INDEX_CORE_PLAYS_PER_SECOND).save(
+        len(plays) / max(time.time() - ingest_start, 1e-6)
+    )
+    return next_slot
 
-    tx_plays = tx.plays
 
-    for tx_play in tx_plays.plays:
+def get_core_plays(
+    logger: LoggerAdapter, tx: SignedTransaction, slot: int
+) -> List[PlayRow]:
+    plays: List[PlayRow] = []
+    updated_at = datetime.now()
+    for tx_play in tx.plays.plays:
         user_id = None
         try:
             user_id = int(tx_play.user_id)
         except ValueError:
-            log = ("Recording anonymous listen {!r}".format(tx_play.user_id),)
-            logger.debug(
-                log,
-                exc_info=False,
-            )
-
-        signature = tx_play.signature
-        timestamp = tx_play.timestamp.ToDatetime()
-        track_id = int(tx_play.track_id)
-        user_id = user_id
-        slot = next_slot
-        city = tx_play.city
-        region = tx_play.region
-        country = tx_play.country
+            logger.debug(f"Recording anonymous listen {tx_play.user_id!r}")
 
         plays.append(
-            {
-                "user_id": user_id,
-                "play_item_id": track_id,
-                "updated_at": datetime.now(),
-                "slot": slot,
-                "signature": signature,
-                "created_at": timestamp,
-                "source": "relay",
-                "city": city,
-                "region": region,
-                "country": country,
-            }
-        )
-
-        # Only enqueue a challenge event if it's *not*
-        # an anonymous listen
-        if user_id is not None:
-            challenge_bus_events.append(
-                {
-                    "slot": slot,
-                    "user_id": user_id,
-                    "created_at": timestamp,
-                    "track_id": track_id,
-                    "listener_id": user_id,
-                }
+            (
+                user_id,
+                int(tx_play.track_id),
+                tx_play.timestamp.ToDatetime(),
+                updated_at,
+                "relay",
+                tx_play.city,
+                tx_play.region,
+                tx_play.country,
+                slot,
+                tx_play.signature,
             )
+        )
+    return plays
 
-    if not plays:
-        return None
 
-    with challenge_bus.use_scoped_dispatch_queue():
-        session.execute(Play.__table__.insert().values(plays))
-        logger.debug("index_core_plays.py | Dispatching listen events")
-        listen_dispatch_start = time.time()
-
-        # Process all events - both listener and track owner events
-        for event in challenge_bus_events:
-            created_at = event.get("created_at")
-            if not created_at:
-                logger.error(
-                    f"index_core_plays.py | Skipping event due to created_at for event: {event}"
-                )
-                continue
+def dispatch_play_challenge_events(
+    session: Session,
+    challenge_bus: ChallengeEventBus,
+    slot: int,
+    plays: List[PlayRow],
+):
+    """
+    Dispatches track_listen for the listener and track_played for the track
+    owner once per (user, track) in the block, using the latest listen.
+    Anonymous listens do not dispatch events.
+    """
+    latest_listens: Dict[Tuple[int, int], datetime] = {}
+    for play in plays:
+        user_id, track_id, created_at = play[0], play[1], play[2]
+        if user_id is None:
+            continue
+        key = (user_id, track_id)
+        if key not in latest_listens or latest_listens[key] < created_at:
+            latest_listens[key] = created_at
+
+    if not latest_listens:
+        return
+
+    track_owners = dict(
+        session.query(Track.track_id, Track.owner_id)
+        .filter(
+            Track.track_id.in_({track_id for _, track_id in latest_listens}),
+            Track.is_current == True,
+            Track.is_delete == False,
+        )
+        .all()
+    )
+
+    for (user_id, track_id), created_at in latest_listens.items():
+        challenge_bus.dispatch(
+            ChallengeEvent.track_listen,
+            slot,
+            created_at,
+            user_id,
+            {"created_at": created_at.timestamp()},
+        )
 
-            # Dispatch track_listen events (for the listener)
+        owner_id = track_owners.get(track_id)
+        if owner_id is not None:
             challenge_bus.dispatch(
-                ChallengeEvent.track_listen,
-                event["slot"],
+                ChallengeEvent.track_played,
+                slot,
                 created_at,
-                event["user_id"],
-                {"created_at": created_at.timestamp()},
-            )
-
-            # Get the track owner ID for the track_played event
-            track = (
-                session.query(Track)
-                .filter(
-                    Track.track_id == event["track_id"],
-                    Track.is_current == True,
-                    Track.is_delete == False,
-                )
-                .first()
+                owner_id,
+                {
+                    "created_at": created_at.timestamp(),
+                    "listener_id": user_id,
+                },
             )
-
-            # Dispatch track_played events (for the track owner)
-            if track:
-                challenge_bus.dispatch(
-                    ChallengeEvent.track_played,
-                    event["slot"],
-                    created_at,
-                    track.owner_id,  # This is the track owner's ID
-                    {
-                        "created_at": created_at.timestamp(),
-                        "listener_id": event["listener_id"],
-                    },
-                )
-
-        listen_dispatch_end = time.time()
-        listen_dispatch_diff = listen_dispatch_end - listen_dispatch_start
-        logger.debug(f"dispatched listen events in {listen_dispatch_diff}")
-
-    return next_slot
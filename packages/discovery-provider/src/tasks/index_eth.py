@@ -4,6 +4,7 @@ import time
 from src.eth_indexing.event_scanner import EventScanner
 from src.tasks.cache_user_balance import get_token_address
 from src.tasks.celery_app import celery
+from src.utils.config import shared_config
 from src.utils.helpers import load_eth_abi_values
 from src.utils.prometheus_metric import save_duration_metric
 from src.utils.redis_constants import index_eth_last_completion_redis_key
@@ -13,6 +14,9 @@ logger = logging.getLogger(__name__)
 
 CHAIN_REORG_SAFETY_BLOCKS = 10
 
+# eth_getLogs block ranges fetched in parallel per scan round
+scan_max_in_flight = int(shared_config["discprov"]["eth_scan_max_in_flight"])
+
 web3 = get_eth_web3()
 
 # Prepare stub ERC-20 contract object
@@ -32,6 +36,7 @@ def index_eth_transfer_events(db, redis_inst):
         contract=AUDIO_TOKEN_CONTRACT,
         event_type=AUDIO_TOKEN_CONTRACT.events.Transfer,
         filters={"address": AUDIO_CHECKSUM_ADDRESS},
+        max_workers=scan_max_in_flight,
     )
     scanner.restore()
 
@@ -1,10 +1,9 @@
 import logging
 import time
-from typing import List
+from typing import Optional
 
-from sqlalchemy import desc, func
+from sqlalchemy import func, text
 
-from src.models.social.hourly_play_counts import HourlyPlayCount
 from src.models.social.play import Play
 from src.tasks.celery_app import celery
 from src.utils.prometheus_metric import save_duration_metric
@@ -16,56 +15,87 @@ from src.utils.update_indexing_checkpoints import (
 logger = logging.getLogger(__name__)
 
 HOURLY_PLAY_COUNTS_TABLE_NAME = "hourly_play_counts"
+TRACK_HOURLY_PLAY_COUNTS_TABLE_NAME = "track_hourly_play_counts"
+
+# Max plays rolled up per track per run, bounds the backfill of a new rollup
+TRACK_HOURLY_PLAY_COUNTS_BATCH_SIZE = 1000000
 
 UPSERT_HOURLY_PLAY_COUNTS_QUERY = """
     INSERT INTO hourly_play_counts (hourly_timestamp, play_count)
-    VALUES(:hourly_timestamp, :play_count)
+    SELECT date_trunc('hour', created_at), count(*)
+    FROM plays
+    WHERE id > :prev_id_checkpoint AND id <= :new_id_checkpoint
+    GROUP BY date_trunc('hour', created_at)
     ON CONFLICT (hourly_timestamp)
     DO UPDATE SET play_count = hourly_play_counts.play_count + EXCLUDED.play_count;
     """
 
-
-def _index_hourly_play_counts(session):
-    # get checkpoints
-    prev_id_checkpoint = get_last_indexed_checkpoint(
-        session, HOURLY_PLAY_COUNTS_TABLE_NAME
+UPSERT_TRACK_HOURLY_PLAY_COUNTS_QUERY = """
+    INSERT INTO track_hourly_play_counts (
+        play_item_id, hourly_timestamp, country, play_count
     )
+    SELECT
+        play_item_id,
+        date_trunc('hour', created_at),
+        coalesce(country, ''),
+        count(*)
+    FROM plays
+    WHERE id > :prev_id_checkpoint AND id <= :new_id_checkpoint
+    GROUP BY play_item_id, date_trunc('hour', created_at), coalesce(country, '')
+    ON CONFLICT (play_item_id, hourly_timestamp, country)
+    DO UPDATE SET
+        play_count = track_hourly_play_counts.play_count + EXCLUDED.play_count;
+    """
 
-    new_id_checkpoint = (session.query(func.max(Play.id))).scalar()
 
-    if not new_id_checkpoint or new_id_checkpoint == prev_id_checkpoint:
+def _index_hourly_play_counts(session):
+    max_id = (session.query(func.max(Play.id))).scalar()
+    if not max_id:
         logger.debug(
-            "index_hourly_play_counts.py | Skip update because there are no new plays"
+            "index_hourly_play_counts.py | Skip update because there are no plays"
         )
         return
 
-    # get play counts in hourly buckets
-    hourly_play_counts: List[HourlyPlayCount] = (
-        session.query(
-            func.date_trunc("hour", Play.created_at).label("hourly_timestamp"),
-            func.count(Play.id).label("play_count"),
-        )
-        .filter(Play.id > prev_id_checkpoint)
-        .filter(Play.id <= new_id_checkpoint)
-        .group_by(func.date_trunc("hour", Play.created_at))
-        .order_by(desc("hourly_timestamp"))
-        .all()
+    # Each hourly bucket is written by one multi-row upsert
+    _upsert_play_counts(
+        session,
+        HOURLY_PLAY_COUNTS_TABLE_NAME,
+        UPSERT_HOURLY_PLAY_COUNTS_QUERY,
+        max_id,
+    )
+    _upsert_play_counts(
+        session,
+        TRACK_HOURLY_PLAY_COUNTS_TABLE_NAME,
+        UPSERT_TRACK_HOURLY_PLAY_COUNTS_QUERY,
+        max_id,
+        TRACK_HOURLY_PLAY_COUNTS_BATCH_SIZE,
     )
 
-    # upsert hourly play count
-    # on first population, this will execute an insert for each hour
-    # subsequent updates should include 1 or 2 upserts
-    for hourly_play_count in hourly_play_counts:
-        session.execute(
-            UPSERT_HOURLY_PLAY_COUNTS_QUERY,
-            {
-                "hourly_timestamp": hourly_play_count.hourly_timestamp,
-                "play_count": hourly_play_count.play_count,
-            },
+
+def _upsert_play_counts(
+    session, tablename: str, query: str, max_id: int, batch_size: Optional[int] = None
+):
+    prev_id_checkpoint = get_last_indexed_checkpoint(session, tablename)
+    new_id_checkpoint = max_id
+    if batch_size:
+        new_id_checkpoint = min(max_id, prev_id_checkpoint + batch_size)
+
+    if new_id_checkpoint <= prev_id_checkpoint:
+        logger.debug(
+            f"index_hourly_play_counts.py | Skip {tablename} update because there are no new plays"
         )
+        return
+
+    session.execute(
+        text(query),
+        {
+            "prev_id_checkpoint": prev_id_checkpoint,
+            "new_id_checkpoint": new_id_checkpoint,
+        },
+    )
 
     # update with new checkpoint
-    save_indexed_checkpoint(session, HOURLY_PLAY_COUNTS_TABLE_NAME, new_id_checkpoint)
+    save_indexed_checkpoint(session, tablename, new_id_checkpoint)
 
 
 # ####### CELERY TASKS ####### #
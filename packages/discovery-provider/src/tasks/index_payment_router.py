@@ -1,4 +1,3 @@
-import concurrent.futures
 import enum
 import json
 import time
@@ -6,7 +5,6 @@ from datetime import datetime, timezone
 from decimal import Decimal
 from typing import List, Optional, Tuple, TypedDict, cast
 
-from redis import Redis
 from solders.instruction import CompiledInstruction
 from solders.message import Message
 from solders.pubkey import Pubkey
@@ -63,7 +61,6 @@ from src.utils.helpers import (
     has_log,
 )
 from src.utils.prometheus_metric import save_duration_metric
-from src.utils.redis_cache import get_solana_transaction_key
 from src.utils.redis_constants import redis_keys
 from src.utils.structured_logger import StructuredLogger
 
@@ -164,22 +161,6 @@ def check_config():
     return True
 
 
-def get_sol_tx_info(
-    solana_client_manager: SolanaClientManager, tx_sig: str, redis: Redis
-):
-    try:
-        existing_tx = redis.get(get_solana_transaction_key(tx_sig))
-        if existing_tx is not None and existing_tx != "":
-            logger.debug(f"index_payment_router.py | Cache hit: {tx_sig}")
-            tx_info = GetTransactionResp.from_json(existing_tx.decode("utf-8"))
-            return (tx_info, tx_sig)
-        logger.debug(f"index_payment_router.py | Cache miss: {tx_sig}")
-        tx_info = solana_client_manager.get_sol_tx_info(tx_sig)
-        return (tx_info, tx_sig)
-    except SolanaTransactionFetchError:
-        return None
-
-
 def get_track_owner_id(session: Session, track_id: int) -> Optional[int]:
     """Gets the owner of a track"""
     track_owner_id = (
@@ -947,24 +928,19 @@ def process_payment_router_txs() -> None:
             batch_start_time = time.time()
 
             tx_infos: List[Tuple[GetTransactionResp, str]] = []
-            with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-                parse_sol_tx_futures = {
-                    executor.submit(
-                        get_sol_tx_info, solana_client_manager, str(tx_sig), redis
-                    ): tx_sig
-                    for tx_sig in tx_sig_batch
-                }
-                for future in concurrent.futures.as_completed(parse_sol_tx_futures):
-                    try:
-                        tx_info = future.result()
-                        if not tx_info:
-                            continue
-                        tx_infos.append(tx_info)
-                    except Exception as exc:
-                        logger.error(
-                            f"index_payment_router.py | error {exc}", exc_info=True
-                        )
-                        raise
+            fetched_tx_infos = solana_client_manager.get_sol_tx_infos(
+                [str(tx_sig) for tx_sig in tx_sig_batch], redis
+            )
+            for tx_sig, tx_info in fetched_tx_infos.items():
+                # Skip transactions that failed on chain
+                if isinstance(tx_info, SolanaTransactionFetchError):
+                    continue
+                if isinstance(tx_info, Exception):
+                    logger.error(
+                        f"index_payment_router.py | error {tx_info}", exc_info=tx_info
+                    )
+                    raise tx_info
+                tx_infos.append((tx_info, tx_sig))
 
             # Sort by slot
             # Note: while it's possible (even likely) to have multiple tx in the same slot,
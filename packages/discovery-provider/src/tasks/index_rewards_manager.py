@@ -1,4 +1,3 @@
-import concurrent.futures
 import logging
 import time
 from datetime import datetime, timezone
@@ -44,7 +43,6 @@ from src.tasks.celery_app import celery
 from src.utils.config import shared_config
 from src.utils.helpers import get_solana_tx_token_balance_changes
 from src.utils.prometheus_metric import save_duration_metric
-from src.utils.redis_cache import get_solana_transaction_key
 from src.utils.redis_constants import redis_keys
 from src.utils.session_manager import SessionManager
 
@@ -207,31 +205,16 @@ def get_valid_instruction(
         return None
 
 
-def get_sol_tx_info(
-    solana_client_manager: SolanaClientManager, tx_sig: str, redis: Redis
-):
-    existing_tx = redis.get(get_solana_transaction_key(tx_sig))
-    if existing_tx is not None and existing_tx != "":
-        logger.debug(f"index_rewards_manager.py | Cache hit: {tx_sig}")
-        tx_info = GetTransactionResp.from_json(existing_tx.decode("utf-8"))
-        return tx_info
-    logger.debug(f"index_rewards_manager.py | Cache miss: {tx_sig}")
-    tx_info = solana_client_manager.get_sol_tx_info(tx_sig)
-    return tx_info
-
-
-def fetch_and_parse_sol_rewards_transfer_instruction(
-    solana_client_manager: SolanaClientManager, tx_sig: str, redis: Redis
+def parse_sol_rewards_transfer_instruction(
+    tx_info: GetTransactionResp, tx_sig: str
 ) -> Optional[RewardManagerTransactionInfo]:
-    """Fetches metadata for rewards transfer transactions and parses data
+    """Parses the metadata of a rewards transfer transaction
 
-    Fetches the transaction metadata from solana using the tx signature
     Checks the metadata for a transfer instruction
     Decodes and parses the transfer instruction metadata
     Validates the metadata fields
     """
     try:
-        tx_info = get_sol_tx_info(solana_client_manager, tx_sig, redis)
         if not tx_info or not tx_info.value:
             raise Exception("Missing txinfo")
         # Create transaction metadata
@@ -556,7 +539,7 @@ def process_transaction_signatures(
     redis: Redis,
     transaction_signatures: List[List[str]],
 ):
-    """Concurrently processes the transactions to update the DB state for reward transfer instructions"""
+    """Processes the transactions to update the DB state for reward transfer instructions"""
     last_tx_sig: Optional[str] = None
     if transaction_signatures and transaction_signatures[-1]:
         last_tx_sig = transaction_signatures[-1][0]
@@ -566,27 +549,19 @@ def process_transaction_signatures(
         batch_start_time = time.time()
 
         transfer_instructions: List[RewardManagerTransactionInfo] = []
-        # Process each batch in parallel
-        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-            parse_sol_tx_futures = {
-                executor.submit(
-                    fetch_and_parse_sol_rewards_transfer_instruction,
-                    solana_client_manager,
-                    tx_sig,
-                    redis,
-                ): tx_sig
-                for tx_sig in tx_sig_batch
-            }
-            for future in concurrent.futures.as_completed(parse_sol_tx_futures):
-                try:
-                    # No return value expected here so we just ensure all futures are resolved
-                    parsed_solana_transfer_instruction = future.result()
-                    if parsed_solana_transfer_instruction is not None:
-                        transfer_instructions.append(parsed_solana_transfer_instruction)
-
-                except Exception as exc:
-                    logger.error(f"index_rewards_manager.py | {exc}")
-                    raise exc
+        fetched_tx_infos = solana_client_manager.get_sol_tx_infos(tx_sig_batch, redis)
+        for tx_sig, tx_info in fetched_tx_infos.items():
+            # Skip transactions that failed on chain
+            if isinstance(tx_info, SolanaTransactionFetchError):
+                continue
+            if isinstance(tx_info, Exception):
+                logger.error(f"index_rewards_manager.py | {tx_info}")
+                raise tx_info
+            parsed_solana_transfer_instruction = parse_sol_rewards_transfer_instruction(
+                tx_info, tx_sig
+            )
+            if parsed_solana_transfer_instruction is not None:
+                transfer_instructions.append(parsed_solana_transfer_instruction)
         with db.scoped_session() as session:
             process_batch_sol_reward_manager_txs(session, transfer_instructions, redis)
         batch_end_time = time.time()
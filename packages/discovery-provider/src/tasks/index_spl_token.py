@@ -1,4 +1,3 @@
-import concurrent.futures
 import logging
 import time
 from datetime import datetime, timezone
@@ -10,7 +9,10 @@ from redis import Redis
 from solders.instruction import CompiledInstruction
 from solders.message import Message
 from solders.pubkey import Pubkey
-from solders.rpc.responses import RpcConfirmedTransactionStatusWithSignature
+from solders.rpc.responses import (
+    GetTransactionResp,
+    RpcConfirmedTransactionStatusWithSignature,
+)
 from solders.transaction import Transaction
 
 from src.exceptions import SolanaTransactionFetchError
@@ -132,15 +134,14 @@ def decode_memo_and_extract_vendor(memo_encoded: str) -> str:
         raise e
 
 
-def parse_spl_token_transaction(
-    solana_client_manager: SolanaClientManager,
+def parse_spl_token_transaction_info(
+    tx_info: GetTransactionResp,
     tx_sig: str,
 ) -> Optional[List[SplTokenTransactionInfo]]:
     # Fork on v0 transaction.
     # If v0 transaction, look for the balance changes with the mint we care about
     # Index those into an array of SplTokenTransactionInfo
     try:
-        tx_info = solana_client_manager.get_sol_tx_info(tx_sig)
         result = tx_info.value
         if not result:
             raise Exception(f"No txinfo value {tx_info}")
@@ -323,11 +324,8 @@ def parse_sol_tx_batch(
     solana_logger: SolanaIndexingLogger,
 ):
     """
-    Parse a batch of solana transactions in parallel by calling parse_spl_token_transaction
-    with a ThreaPoolExecutor
-
-    This function also has a recursive retry upto a certain limit in case a future doesn't complete
-    within the alloted time. It clears the futures thread queue and the batch is retried
+    Parse a batch of solana transactions fetched through the shared solana
+    transaction fetcher with parse_spl_token_transaction_info
     """
     batch_start_time = time.time()
     # Last record in this batch to be cached
@@ -335,37 +333,26 @@ def parse_sol_tx_batch(
     updated_root_accounts: Set[str] = set()
     updated_token_accounts: Set[str] = set()
     spl_token_txs: List[SplTokenTransactionInfo] = []
-    # Process each batch in parallel
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        parse_sol_tx_futures = {
-            executor.submit(
-                parse_spl_token_transaction,
-                solana_client_manager,
-                str(tx_sig.signature),
-            ): tx_sig
-            for tx_sig in tx_sig_batch_records
-        }
+    fetched_tx_infos = solana_client_manager.get_sol_tx_infos(
+        [str(tx_sig.signature) for tx_sig in tx_sig_batch_records], redis
+    )
+    for tx_sig, fetched_tx_info in fetched_tx_infos.items():
+        # Skip transactions that failed on chain
+        if isinstance(fetched_tx_info, SolanaTransactionFetchError):
+            continue
         try:
-            for future in concurrent.futures.as_completed(
-                parse_sol_tx_futures, timeout=45
-            ):
-                try:
-                    tx_infos = future.result()
-                except Exception as e:
-                    logger.error(f"index_spl_token.py | {e}")
-                    continue
-                if not tx_infos:
-                    continue
-                for tx_info in tx_infos:
-                    updated_root_accounts.update(tx_info["root_accounts"])
-                    updated_token_accounts.update(tx_info["token_accounts"])
-                    spl_token_txs.append(tx_info)
-
-        except Exception as exc:
-            logger.error(
-                f"index_spl_token.py | Error parsing sol spl token transaction: {exc}"
-            )
-            raise exc
+            if isinstance(fetched_tx_info, Exception):
+                raise fetched_tx_info
+            tx_infos = parse_spl_token_transaction_info(fetched_tx_info, tx_sig)
+        except Exception as e:
+            logger.error(f"index_spl_token.py | {e}")
+            continue
+        if not tx_infos:
+            continue
+        for tx_info in tx_infos:
+            updated_root_accounts.update(tx_info["root_accounts"])
+            updated_token_accounts.update(tx_info["token_accounts"])
+            spl_token_txs.append(tx_info)
 
     update_user_ids: Set[int] = set()
     with db.scoped_session() as session:
@@ -12,12 +12,20 @@ from src.models.core.core_indexed_blocks import CoreIndexedBlocks
 from src.models.indexing.block import Block
 from src.models.notifications.notification import Notification
 from src.models.tracks.track import Track
+from src.queries.generate_unpopulated_trending_tracks import (
+    materialize_trending_track_ids,
+)
 from src.queries.get_trending_playlists import _get_trending_playlists_with_session
 from src.queries.get_trending_tracks import _get_trending_tracks_with_session
 from src.queries.get_underground_trending import _get_underground_trending_with_session
 from src.tasks.celery_app import celery
 from src.tasks.core.core_client import CoreClient, get_core_instance
 from src.tasks.index_tastemaker import index_tastemaker
+from src.trending_strategies.track_trending_inputs import (
+    is_trending_full_refresh_due,
+    rebuild_track_trending_inputs,
+    update_track_trending_inputs,
+)
 from src.trending_strategies.trending_strategy_factory import TrendingStrategyFactory
 from src.trending_strategies.trending_type_and_version import TrendingType
 from src.utils.config import shared_config
@@ -37,6 +45,8 @@ time_ranges = ["week", "month", "year"]
 UPDATE_TRENDING_DURATION_DIFF_SEC = int(
     shared_config["discprov"]["trending_refresh_seconds"]
 )
+# Materialized trending ids outlive a missed update, after that reads sort the scores
+MATERIALIZED_TRENDING_TTL_SEC = 2 * UPDATE_TRENDING_DURATION_DIFF_SEC
 
 
 def get_genres(session: Session) -> List[str]:
@@ -96,15 +106,35 @@ def index_trending(
             TrendingType.PLAYLISTS
         ).keys()
 
-        update_view(session, AGGREGATE_INTERVAL_PLAYS)
-        update_view(session, TRENDING_PARAMS)
+        # Rescore every track from the refreshed views once in a while,
+        # otherwise only the tracks whose trending inputs changed
+        full_refresh = is_trending_full_refresh_due(session)
+        changed_track_ids: List[int] = []
+        if full_refresh:
+            update_view(session, AGGREGATE_INTERVAL_PLAYS)
+            update_view(session, TRENDING_PARAMS)
+            rebuild_track_trending_inputs(session)
+        else:
+            changed_track_ids = update_track_trending_inputs(session)
 
         # Update trending tracks (used for underground as well)
         for version in trending_track_versions:
             strategy = trending_strategy_factory.get_strategy(
                 TrendingType.TRACKS, version
             )
-            strategy.update_track_score_query(session)
+            if full_refresh:
+                strategy.update_track_score_query(session)
+            else:
+                strategy.update_track_score_query_incremental(
+                    session, changed_track_ids
+                )
+            materialize_trending_track_ids(
+                session,
+                redis,
+                strategy,
+                genres,
+                MATERIALIZED_TRENDING_TTL_SEC,
+            )
 
         # Update trending playlists
         for version in trending_playlist_versions:
@@ -1,4 +1,3 @@
-import concurrent.futures
 import re
 import time
 from datetime import datetime, timezone
@@ -62,7 +61,6 @@ from src.utils.helpers import (
     has_log,
 )
 from src.utils.prometheus_metric import save_duration_metric
-from src.utils.redis_cache import get_solana_transaction_key
 from src.utils.redis_constants import redis_keys
 from src.utils.structured_logger import StructuredLogger
 
@@ -585,22 +583,6 @@ def process_user_bank_tx_details(
         )
 
 
-def get_sol_tx_info(
-    solana_client_manager: SolanaClientManager, tx_sig: str, redis: Redis
-):
-    try:
-        existing_tx = redis.get(get_solana_transaction_key(tx_sig))
-        if existing_tx is not None and existing_tx != "":
-            logger.debug(f"index_user_bank.py | Cache hit: {tx_sig}")
-            tx_info = GetTransactionResp.from_json(existing_tx.decode("utf-8"))
-            return (tx_info, tx_sig)
-        logger.debug(f"index_user_bank.py | Cache miss: {tx_sig}")
-        tx_info = solana_client_manager.get_sol_tx_info(tx_sig)
-        return (tx_info, tx_sig)
-    except SolanaTransactionFetchError:
-        return None
-
-
 def process_user_bank_txs() -> None:
     solana_client_manager: SolanaClientManager = index_user_bank.solana_client_manager
     challenge_bus: ChallengeEventBus = index_user_bank.challenge_event_bus
@@ -712,22 +694,19 @@ def process_user_bank_txs() -> None:
             batch_start_time = time.time()
 
             tx_infos: List[Tuple[GetTransactionResp, str]] = []
-            with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-                parse_sol_tx_futures = {
-                    executor.submit(
-                        get_sol_tx_info, solana_client_manager, str(tx_sig), redis
-                    ): tx_sig
-                    for tx_sig in tx_sig_batch
-                }
-                for future in concurrent.futures.as_completed(parse_sol_tx_futures):
-                    try:
-                        tx_info = future.result()
-                        if not tx_info:
-                            continue
-                        tx_infos.append(tx_info)
-                    except Exception as exc:
-                        logger.error(f"index_user_bank.py | error {exc}", exc_info=True)
-                        raise
+            fetched_tx_infos = solana_client_manager.get_sol_tx_infos(
+                [str(tx_sig) for tx_sig in tx_sig_batch], redis
+            )
+            for tx_sig, tx_info in fetched_tx_infos.items():
+                # Skip transactions that failed on chain
+                if isinstance(tx_info, SolanaTransactionFetchError):
+                    continue
+                if isinstance(tx_info, Exception):
+                    logger.error(
+                        f"index_user_bank.py | error {tx_info}", exc_info=tx_info
+                    )
+                    raise tx_info
+                tx_infos.append((tx_info, tx_sig))
 
             # Sort by slot
             # Note: while it's possible (even likely) to have multiple tx in the same slot,
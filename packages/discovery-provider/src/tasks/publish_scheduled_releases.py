@@ -4,6 +4,8 @@ from src.models.playlists.playlist import Playlist
 from src.models.tracks.track import Track
 from src.tasks.celery_app import celery
 from src.tasks.entity_manager.utils import create_remix_contest_notification
+from src.utils import redis_connection
+from src.utils.redis_cache import invalidate_entity_cache_on_transaction_end
 from src.utils.structured_logger import StructuredLogger, log_duration
 from src.utils.web3_provider import get_eth_web3
 
@@ -29,6 +31,10 @@ def _publish_scheduled_releases(session):
     )
     if len(tracks_to_release) == 0:
         return
+    released_entity_ids = {
+        "Track": {track.track_id for track in tracks_to_release},
+        "Playlist": set(),
+    }
 
     logger.info(f"Found {len(tracks_to_release)} tracks ready for release")
 
@@ -55,6 +61,11 @@ def _publish_scheduled_releases(session):
     for playlist in playlists_to_release:
         logger.debug(f"Releasing album {playlist.playlist_id}")
         playlist.is_private = False
+        released_entity_ids["Playlist"].add(playlist.playlist_id)
+
+    invalidate_entity_cache_on_transaction_end(
+        redis_connection.get_redis(), session, released_entity_ids
+    )
 
 
 # ####### CELERY TASKS ####### #
@@ -13,6 +13,7 @@ from src.tasks.celery_app import celery
 from src.tasks.metadata import is_valid_musical_key
 from src.utils import get_all_nodes
 from src.utils.prometheus_metric import save_duration_metric
+from src.utils.redis_cache import invalidate_entity_cache_on_transaction_end
 from src.utils.structured_logger import StructuredLogger, log_duration
 
 logger = StructuredLogger(__name__)
@@ -128,6 +129,9 @@ def repair(session: Session, redis: Redis):
                 # Update track in a tx
                 try:
                     session.merge(track)
+                    invalidate_entity_cache_on_transaction_end(
+                        redis, session, {"Track": {track.track_id}}
+                    )
                     session.commit()
                     num_tracks_updated += 1
                 except Exception as e:
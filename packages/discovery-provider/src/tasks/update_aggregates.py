@@ -1,8 +1,21 @@
 import logging
 from datetime import datetime
+from typing import List, NamedTuple
 
+from sqlalchemy import text
+
+from src.tasks.aggregates import get_latest_blocknumber
 from src.tasks.celery_app import celery
-from src.utils.prometheus_metric import save_duration_metric
+from src.utils.config import shared_config
+from src.utils.prometheus_metric import (
+    PrometheusMetric,
+    PrometheusMetricNames,
+    save_duration_metric,
+)
+from src.utils.update_indexing_checkpoints import (
+    get_last_indexed_checkpoint,
+    save_indexed_checkpoint,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +30,7 @@ with playlist_saves as (
         s.is_current is true
         and s.is_delete is false
         and (s.save_type = 'playlist' or s.save_type = 'album')
+        and s.save_item_id = any(:ids)
     group by
         save_item_id
 ),
@@ -30,6 +44,7 @@ playlist_reposts as (
         r.is_current is true
         and r.is_delete is false
         and (r.repost_type = 'playlist' or r.repost_type = 'album')
+        and r.repost_item_id = any(:ids)
     group by
         repost_item_id
 ),
@@ -42,6 +57,8 @@ new_aggregate_playlist as (
         aggregate_playlist ap
         left join playlist_saves ps on ap.playlist_id = ps.save_item_id
         left join playlist_reposts pr on ap.playlist_id = pr.repost_item_id
+    where
+        ap.playlist_id = any(:ids)
 )
 update
     aggregate_playlist ap
@@ -66,6 +83,7 @@ with track_saves as (
     s.is_current is true
     and s.is_delete is false
     and s.save_type = 'track'
+    and s.save_item_id = any(:ids)
   group by
     save_item_id
 ),
@@ -79,6 +97,7 @@ track_reposts as (
     r.is_current is true
     and r.is_delete is false
     and r.repost_type = 'track'
+    and r.repost_item_id = any(:ids)
   group by
     repost_item_id
 ),
@@ -92,6 +111,7 @@ track_comments as (
     c.is_delete is false
     and c.is_visible is true 
     and c.entity_type = 'Track'
+    and c.entity_id = any(:ids)
   group by
     comment_entity_id
 ),
@@ -106,6 +126,8 @@ new_aggregate_track as (
     left join track_saves ps on ap.track_id = ps.save_item_id
     left join track_reposts pr on ap.track_id = pr.repost_item_id
     left join track_comments pc on ap.track_id = pc.comment_entity_id
+  where
+    ap.track_id = any(:ids)
 )
 update
   aggregate_track at
@@ -135,6 +157,7 @@ with user_repost as (
   where
     r.is_current IS TRUE
     AND r.is_delete IS FALSE
+    AND r.user_id = any(:ids)
   group by
     user_id
 ),
@@ -148,6 +171,7 @@ user_save as (
     s.is_current IS TRUE
     AND s.is_delete IS FALSE
     AND s.save_type = 'track'
+    AND s.user_id = any(:ids)
   group by
     user_id
 ),
@@ -160,6 +184,7 @@ user_following as (
   where
     is_current = true
     and is_delete = false
+    and follower_user_id = any(:ids)
   group by
     follower_user_id
 ),
@@ -172,6 +197,7 @@ user_follower as (
   where
     is_current = true
     and is_delete = false
+    and followee_user_id = any(:ids)
   group by
     followee_user_id
 ),
@@ -186,6 +212,7 @@ user_album as (
     AND p.is_current IS TRUE
     AND p.is_delete IS FALSE
     AND p.is_private IS FALSE
+    AND p.playlist_owner_id = any(:ids)
   group by
     playlist_owner_id
 ),
@@ -200,6 +227,7 @@ user_playlist as (
     AND p.is_current IS TRUE
     AND p.is_delete IS FALSE
     AND p.is_private IS FALSE
+    AND p.playlist_owner_id = any(:ids)
   group by
     playlist_owner_id
 ),
@@ -215,6 +243,7 @@ user_track as (
     and t.is_unlisted is false
     and t.is_available is true
     and t.stem_of is null
+    and t.owner_id = any(:ids)
   group by
     owner_id
 ),
@@ -232,6 +261,7 @@ genre_counts as (
     and t.is_unlisted is false
     and t.is_available is true
     and t.stem_of is null
+    and t.owner_id = any(:ids)
   group by
     genre, owner_id
 ),
@@ -266,6 +296,8 @@ new_aggregate_user as (
     left join user_save us on ap.user_id = us.user_id
     left join user_repost ur on ap.user_id = ur.user_id
     left join ranked_genres rg on ap.user_id = rg.user_id AND rg.genre_rank = 1
+  where
+    ap.user_id = any(:ids)
 )
 update
   aggregate_user au
@@ -297,6 +329,65 @@ where
 returning au.user_id;
 """
 
+# Upserts as comments only get an aggregate_comment row once reacted to or
+# replied to
+update_aggregate_comment_query = """
+with comment_reacts as (
+  select
+    comment_id,
+    count(*) as react_count
+  from
+    comment_reactions cr
+  where
+    cr.is_delete is false
+    and cr.comment_id = any(:ids)
+  group by
+    comment_id
+),
+comment_replies as (
+  select
+    parent_comment_id,
+    count(*) as reply_count
+  from
+    comment_threads ct
+  where
+    ct.parent_comment_id = any(:ids)
+  group by
+    parent_comment_id
+),
+new_aggregate_comment as (
+  select
+    ids.comment_id,
+    coalesce(cr.react_count, 0) as react_count,
+    coalesce(ct.reply_count, 0) as reply_count
+  from
+    unnest(cast(:ids as integer[])) as ids(comment_id)
+    left join comment_reacts cr on ids.comment_id = cr.comment_id
+    left join comment_replies ct on ids.comment_id = ct.parent_comment_id
+)
+insert into aggregate_comment (comment_id, react_count, reply_count)
+select
+  nac.comment_id,
+  nac.react_count,
+  nac.reply_count
+from
+  new_aggregate_comment nac
+where
+  nac.react_count > 0
+  or nac.reply_count > 0
+  or exists (
+    select 1 from aggregate_comment ac where ac.comment_id = nac.comment_id
+  )
+on conflict (comment_id) do update
+set
+  react_count = excluded.react_count,
+  reply_count = excluded.reply_count
+where
+  aggregate_comment.react_count != excluded.react_count
+  or aggregate_comment.reply_count != excluded.reply_count
+returning aggregate_comment.comment_id;
+"""
+
 update_user_score_query = """
 update aggregate_user
 set score = scores.score
@@ -307,36 +398,209 @@ returning aggregate_user.user_id;
 """
 
 
-def _update_aggregates(session):
-    start_time = datetime.now()
+changed_playlist_ids_query = """
+select save_item_id as id from saves
+where (save_type = 'playlist' or save_type = 'album')
+  and blocknumber > :prev_blocknumber and blocknumber <= :blocknumber
+union
+select repost_item_id from reposts
+where (repost_type = 'playlist' or repost_type = 'album')
+  and blocknumber > :prev_blocknumber and blocknumber <= :blocknumber;
+"""
 
-    logger.debug("update_aggregates.py | updating aggregates...")
-    updated_user_ids = session.execute(update_aggregate_user_query).fetchall()
-    logger.debug(
-        f"update_aggregates.py | updated aggregate_user {updated_user_ids} in {datetime.now() - start_time}"
-    )
+changed_track_ids_query = """
+select save_item_id as id from saves
+where save_type = 'track'
+  and blocknumber > :prev_blocknumber and blocknumber <= :blocknumber
+union
+select repost_item_id from reposts
+where repost_type = 'track'
+  and blocknumber > :prev_blocknumber and blocknumber <= :blocknumber
+union
+select entity_id from comments
+where entity_type = 'Track'
+  and blocknumber > :prev_blocknumber and blocknumber <= :blocknumber;
+"""
 
-    start_time = datetime.now()
+changed_user_ids_query = """
+select user_id as id from saves
+where blocknumber > :prev_blocknumber and blocknumber <= :blocknumber
+union
+select user_id from reposts
+where blocknumber > :prev_blocknumber and blocknumber <= :blocknumber
+union
+select follower_user_id from follows
+where blocknumber > :prev_blocknumber and blocknumber <= :blocknumber
+union
+select followee_user_id from follows
+where blocknumber > :prev_blocknumber and blocknumber <= :blocknumber
+union
+select playlist_owner_id from playlists
+where blocknumber > :prev_blocknumber and blocknumber <= :blocknumber
+union
+select owner_id from tracks
+where blocknumber > :prev_blocknumber and blocknumber <= :blocknumber;
+"""
 
-    logger.debug("update_aggregates.py | updating user scores...")
-    updated_user_ids = session.execute(update_user_score_query).fetchall()
-    logger.debug(
-        f"update_aggregates.py | updated user scores {updated_user_ids} in {datetime.now() - start_time}"
+changed_comment_ids_query = """
+select comment_id as id from comment_reactions
+where blocknumber > :prev_blocknumber and blocknumber <= :blocknumber
+union
+select ct.parent_comment_id from comment_threads ct
+join comments c on c.comment_id = ct.comment_id
+where c.blocknumber > :prev_blocknumber and c.blocknumber <= :blocknumber;
+"""
+
+UPDATE_AGGREGATES_CHECKPOINT = "update_aggregates"
+VERIFY_AGGREGATES_CHECKPOINT_PREFIX = "update_aggregates:verify"
+
+# Changed ids are recomputed in chunks to bound the size of each statement
+DELTA_BATCH_SIZE = 10000
+AGGREGATE_VERIFICATION_BATCH_SIZE = int(
+    shared_config["discprov"]["aggregate_verification_batch_size"]
+)
+
+
+class AggregateTable(NamedTuple):
+    table_name: str
+    id_column: str
+    update_query: str
+    changed_ids_query: str
+
+
+AGGREGATE_TABLES = [
+    AggregateTable(
+        "aggregate_user", "user_id", update_aggregate_user_query, changed_user_ids_query
+    ),
+    AggregateTable(
+        "aggregate_track",
+        "track_id",
+        update_aggregate_track_query,
+        changed_track_ids_query,
+    ),
+    AggregateTable(
+        "aggregate_playlist",
+        "playlist_id",
+        update_aggregate_playlist_query,
+        changed_playlist_ids_query,
+    ),
+    AggregateTable(
+        "aggregate_comment",
+        "comment_id",
+        update_aggregate_comment_query,
+        changed_comment_ids_query,
+    ),
+]
+
+
+def _recompute_aggregates(
+    session, aggregate_table: AggregateTable, ids: List[int], mode: str
+):
+    """Recomputes the aggregate rows of ids and records how many had drifted"""
+    if not ids:
+        return []
+    updated_ids = session.execute(
+        text(aggregate_table.update_query), {"ids": ids}
+    ).fetchall()
+    labels = {"table_name": aggregate_table.table_name, "mode": mode}
+    PrometheusMetric(PrometheusMetricNames.UPDATE_AGGREGATES_ROWS_TOUCHED_TOTAL).save(
+        len(ids), labels
     )
+    PrometheusMetric(PrometheusMetricNames.UPDATE_AGGREGATES_DRIFT_TOTAL).save(
+        len(updated_ids), labels
+    )
+    return updated_ids
 
-    start_time = datetime.now()
 
-    updated_track_ids = session.execute(update_aggregate_track_query).fetchall()
-    logger.debug(
-        f"update_aggregates.py | updated aggregate_track {updated_track_ids} in {datetime.now() - start_time}"
+def _update_changed_aggregates(session, prev_blocknumber: int, blocknumber: int):
+    """Recomputes the aggregates of entities with rows indexed in (prev_blocknumber, blocknumber]"""
+    for aggregate_table in AGGREGATE_TABLES:
+        start_time = datetime.now()
+        changed_ids = [
+            row[0]
+            for row in session.execute(
+                text(aggregate_table.changed_ids_query),
+                {"prev_blocknumber": prev_blocknumber, "blocknumber": blocknumber},
+            )
+        ]
+        updated_ids = []
+        for i in range(0, len(changed_ids), DELTA_BATCH_SIZE):
+            updated_ids += _recompute_aggregates(
+                session,
+                aggregate_table,
+                changed_ids[i : i + DELTA_BATCH_SIZE],
+                "delta",
+            )
+        logger.debug(
+            f"update_aggregates.py | updated {aggregate_table.table_name} {updated_ids} "
+            f"out of {len(changed_ids)} changed in {datetime.now() - start_time}"
+        )
+
+
+def _verify_aggregates(session, batch_size: int):
+    """
+    Recomputes the next batch_size rows of each aggregate table, walking the
+    whole table over successive runs to repair drift the deltas cannot see
+    """
+    for aggregate_table in AGGREGATE_TABLES:
+        start_time = datetime.now()
+        checkpoint_name = (
+            f"{VERIFY_AGGREGATES_CHECKPOINT_PREFIX}:{aggregate_table.table_name}"
+        )
+        cursor = get_last_indexed_checkpoint(session, checkpoint_name)
+        ids = [
+            row[0]
+            for row in session.execute(
+                text(
+                    f"""
+                    select {aggregate_table.id_column} from {aggregate_table.table_name}
+                    where {aggregate_table.id_column} > :cursor
+                    order by {aggregate_table.id_column}
+                    limit :limit
+                    """
+                ),
+                {"cursor": cursor, "limit": batch_size},
+            )
+        ]
+        updated_ids = _recompute_aggregates(session, aggregate_table, ids, "verify")
+        # Start over from the lowest id once the end of the table is reached
+        next_cursor = ids[-1] if len(ids) == batch_size else 0
+        save_indexed_checkpoint(session, checkpoint_name, next_cursor)
+        if updated_ids:
+            logger.warning(
+                f"update_aggregates.py | verification repaired drifted {aggregate_table.table_name} {updated_ids}"
+            )
+        logger.debug(
+            f"update_aggregates.py | verified {aggregate_table.table_name} ids "
+            f"({cursor}, {next_cursor or 'end'}] in {datetime.now() - start_time}"
+        )
+
+
+def _update_aggregates(
+    session, verification_batch_size: int = AGGREGATE_VERIFICATION_BATCH_SIZE
+):
+    prev_blocknumber = get_last_indexed_checkpoint(
+        session, UPDATE_AGGREGATES_CHECKPOINT
     )
+    blocknumber = get_latest_blocknumber(session)
+    if blocknumber is not None and blocknumber > prev_blocknumber:
+        logger.debug(
+            f"update_aggregates.py | updating aggregates for blocks ({prev_blocknumber}, {blocknumber}]..."
+        )
+        _update_changed_aggregates(session, prev_blocknumber, blocknumber)
+        save_indexed_checkpoint(session, UPDATE_AGGREGATES_CHECKPOINT, blocknumber)
 
+    if verification_batch_size > 0:
+        _verify_aggregates(session, verification_batch_size)
+
+    # Scores also depend on plays and challenges, so they are still swept in full
     start_time = datetime.now()
-    updated_playlist_ids = session.execute(update_aggregate_playlist_query).fetchall()
+
+    logger.debug("update_aggregates.py | updating user scores...")
+    updated_user_ids = session.execute(update_user_score_query).fetchall()
     logger.debug(
-        f"update_aggregates.py | updated aggregate_playlist {updated_playlist_ids} in {datetime.now() - start_time}"
+        f"update_aggregates.py | updated user scores {updated_user_ids} in {datetime.now() - start_time}"
     )
-    return
 
 
 # ####### CELERY TASKS ####### #
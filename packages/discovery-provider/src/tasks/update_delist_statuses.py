@@ -15,9 +15,11 @@ from src.queries.get_trusted_notifier_discrepancies import (
     get_user_delist_discrepancies,
 )
 from src.tasks.celery_app import celery
+from src.utils import redis_connection
 from src.utils.auth_helpers import signed_get
 from src.utils.config import shared_config
 from src.utils.prometheus_metric import save_duration_metric
+from src.utils.redis_cache import invalidate_entity_cache_on_transaction_end
 from src.utils.structured_logger import StructuredLogger, log_duration
 
 logger = StructuredLogger(__name__)
@@ -117,6 +119,7 @@ def update_user_is_available_statuses(
             f"update_delist_statuses.py | ignoring delists for missing user ids: {missing_user_ids}, current_block_timestamp: {current_block_timestamp}"
         )
 
+    changed_user_ids = set()
     for user_to_update in users_to_update:
         delisted = user_delist_map[user_to_update.user_id]["delisted"]
         if delisted:
@@ -124,11 +127,16 @@ def update_user_is_available_statuses(
             if user_to_update.is_available:
                 user_to_update.is_available = False
                 user_to_update.is_deactivated = True
+                changed_user_ids.add(user_to_update.user_id)
         else:
             # Re-activate deactivated users that have been un-delisted
             if not user_to_update.is_available:
                 user_to_update.is_available = True
                 user_to_update.is_deactivated = False
+                changed_user_ids.add(user_to_update.user_id)
+    invalidate_entity_cache_on_transaction_end(
+        redis_connection.get_redis(), session, {"User": changed_user_ids}
+    )
 
     users_updated = list(
         map(
@@ -199,6 +207,7 @@ def update_track_is_available_statuses(
             f"update_delist_statuses.py | ignoring delists for missing track ids: {missing_track_ids}, current_block_timestamp: {current_block_timestamp}"
         )
 
+    changed_track_ids = set()
     for track_to_update in tracks_to_update:
         delisted = track_delist_map[track_to_update.track_id]["delisted"]
         if delisted:
@@ -206,11 +215,16 @@ def update_track_is_available_statuses(
             if track_to_update.is_available:
                 track_to_update.is_available = False
                 track_to_update.is_delete = True
+                changed_track_ids.add(track_to_update.track_id)
         else:
             # Relist unavailable tracks that have been relisted
             if not track_to_update.is_available:
                 track_to_update.is_available = True
                 track_to_update.is_delete = False
+                changed_track_ids.add(track_to_update.track_id)
+    invalidate_entity_cache_on_transaction_end(
+        redis_connection.get_redis(), session, {"Track": changed_track_ids}
+    )
     tracks_updated = list(
         map(
             lambda track: {
@@ -396,6 +410,7 @@ def correct_delist_discrepancies(session: Session, redis: Redis):
     # Correct any cases where the indexer has overridden a delist
     # because of the race condition between the async delister and
     # indexer tasks.
+    changed_entity_ids: Dict[str, Set[int]] = {"Track": set(), "User": set()}
     track_delist_discrepancies_str = get_track_delist_discrepancies(session, redis)
     if track_delist_discrepancies_str != "[]":
         logger.info(
@@ -416,6 +431,7 @@ def correct_delist_discrepancies(session: Session, redis: Redis):
                     if track_to_update.is_available:
                         track_to_update.is_available = False
                         track_to_update.is_delete = True
+                        changed_entity_ids["Track"].add(track_id)
                 else:
                     # Relist unavailable tracks that have been relisted
                     logger.debug(
@@ -424,6 +440,7 @@ def correct_delist_discrepancies(session: Session, redis: Redis):
                     if not track_to_update.is_available:
                         track_to_update.is_available = True
                         track_to_update.is_delete = False
+                        changed_entity_ids["Track"].add(track_id)
         logger.info(
             "update_delist_statuses.py | correct_delist_discrepancies | Track delist discrepancies corrected"
         )
@@ -447,6 +464,7 @@ def correct_delist_discrepancies(session: Session, redis: Redis):
                     if user_to_update.is_available:
                         user_to_update.is_available = False
                         user_to_update.is_deactivated = True
+                        changed_entity_ids["User"].add(user_id)
                 else:
                     # Re-activate deactivated users that have been relisted
                     logger.debug(
@@ -455,9 +473,11 @@ def correct_delist_discrepancies(session: Session, redis: Redis):
                     if not user_to_update.is_available:
                         user_to_update.is_available = True
                         user_to_update.is_deactivated = False
+                        changed_entity_ids["User"].add(user_id)
         logger.info(
             "update_delist_statuses.py | correct_delist_discrepancies | User delist discrepancies corrected"
         )
+    invalidate_entity_cache_on_transaction_end(redis, session, changed_entity_ids)
 
 
 # ####### CELERY TASKS ####### #
@@ -1,14 +1,12 @@
 import logging
 import time
 from datetime import datetime
-from typing import DefaultDict
+from typing import Dict, Tuple
 
 import sqlalchemy as sa
 
 from src.models.social.play import Play
-from src.models.users.user_listening_history import UserListeningHistory
 from src.tasks.celery_app import celery
-from src.tasks.user_listening_history.listen_history import ListenHistory
 from src.utils.prometheus_metric import save_duration_metric
 from src.utils.update_indexing_checkpoints import (
     get_last_indexed_checkpoint,
@@ -20,21 +18,33 @@ logger = logging.getLogger(__name__)
 USER_LISTENING_HISTORY_TABLE_NAME = "user_listening_history"
 BATCH_SIZE = 100000  # index 100k plays at most at a time
 
-
-def sort_listening_history_desc_by_timestamp(
-    track_id_to_timestamp, track_id_to_play_count={}, limit=1000
-):
-    # sorts listening history and places a limit
-    deduped_history = []
-    for track_id, timestamp in track_id_to_timestamp.items():
-        play_count = track_id_to_play_count.get(track_id, 1)
-        deduped_history.append(
-            ListenHistory(
-                track_id=track_id, timestamp=timestamp, play_count=play_count
-            ).to_dict()
-        )
-    deduped_history.sort(key=lambda listen: listen["timestamp"], reverse=True)
-    return deduped_history[:limit]
+UPSERT_USER_LISTENING_HISTORY_QUERY = """
+    INSERT INTO user_listening_history_tracks
+        (user_id, track_id, last_listened_at, play_count)
+    SELECT * FROM unnest(
+        CAST(:user_ids AS INTEGER[]),
+        CAST(:track_ids AS INTEGER[]),
+        CAST(:last_listened_ats AS TIMESTAMP[]),
+        CAST(:play_counts AS INTEGER[])
+    )
+    ON CONFLICT (user_id, track_id)
+    DO UPDATE SET
+        last_listened_at = GREATEST(
+            user_listening_history_tracks.last_listened_at,
+            EXCLUDED.last_listened_at
+        ),
+        play_count = user_listening_history_tracks.play_count + EXCLUDED.play_count;
+    """
+
+
+def reduce_new_plays(new_plays) -> Dict[Tuple[int, int], Tuple[datetime, int]]:
+    """Reduces plays to the latest play time and play count of each user and track"""
+    listens: Dict[Tuple[int, int], Tuple[datetime, int]] = {}
+    for new_play in new_plays:
+        key = (new_play.user_id, new_play.play_item_id)
+        last_listened_at, play_count = listens.get(key, (new_play.created_at, 0))
+        listens[key] = (max(last_listened_at, new_play.created_at), play_count + 1)
+    return listens
 
 
 def _index_user_listening_history(session):
@@ -57,110 +67,22 @@ def _index_user_listening_history(session):
         return
     new_checkpoint = new_plays[-1].id  # get the highest play id
 
-    # get existing user listening history for users with new plays
-    users_with_new_plays = {new_play.user_id for new_play in new_plays}
-    existing_user_listening_history = (
-        session.query(UserListeningHistory)
-        .filter(UserListeningHistory.user_id.in_(users_with_new_plays))
-        .all()
-    )
-    existing_users = {
-        user_history.user_id for user_history in existing_user_listening_history
-    }
-
-    # reduce new plays
-    (
-        user_listening_history_dict_to_insert,
-        user_listening_history_dict_to_update,
-    ) = separate_new_plays(new_plays, existing_users)
-
-    # make updates to existing users
-    update_existing_user_listening_histories(
-        existing_user_listening_history, user_listening_history_dict_to_update
-    )
-
-    # insert for new users
-    insert_new_user_listening_histories_to_insert(
-        user_listening_history_dict_to_insert, session
+    # upsert one row per user and track in a single statement
+    listens = reduce_new_plays(new_plays)
+    session.execute(
+        sa.text(UPSERT_USER_LISTENING_HISTORY_QUERY),
+        {
+            "user_ids": [user_id for user_id, _ in listens],
+            "track_ids": [track_id for _, track_id in listens],
+            "last_listened_ats": [listen[0] for listen in listens.values()],
+            "play_counts": [listen[1] for listen in listens.values()],
+        },
     )
 
     # update indexing_checkpoints with the new id
     save_indexed_checkpoint(session, USER_LISTENING_HISTORY_TABLE_NAME, new_checkpoint)
 
 
-def update_existing_user_listening_histories(
-    existing_user_listening_history, user_listening_history_dict_to_update
-):
-    for i, user_history in enumerate(existing_user_listening_history):
-        track_to_latest_timestamp = {}
-        track_to_play_count = DefaultDict(int)
-        for existing_play in user_history.listening_history:
-            track_to_latest_timestamp[existing_play["track_id"]] = existing_play[
-                "timestamp"
-            ]
-            track_to_play_count[existing_play["track_id"]] = existing_play.get(
-                "play_count", 1
-            )
-
-        for new_play in user_listening_history_dict_to_update[user_history.user_id]:
-            current_max_timestamp = track_to_latest_timestamp.get(
-                new_play["track_id"], str(datetime.min)
-            )
-            track_to_latest_timestamp[new_play["track_id"]] = max(
-                current_max_timestamp, new_play["timestamp"]
-            )
-            track_to_play_count[new_play["track_id"]] += 1
-
-        existing_user_listening_history[
-            i
-        ].listening_history = sort_listening_history_desc_by_timestamp(
-            track_to_latest_timestamp, track_to_play_count
-        )
-
-
-def separate_new_plays(new_plays, existing_users):
-    insert_user_listening_history_dict = DefaultDict(list)
-    update_user_listening_history_dict = DefaultDict(list)
-    for new_play in new_plays:
-        listen_history = ListenHistory(
-            new_play.play_item_id, new_play.created_at, play_count=1
-        ).to_dict()
-
-        if new_play.user_id in existing_users:
-            update_user_listening_history_dict[new_play.user_id].append(listen_history)
-        else:
-            insert_user_listening_history_dict[new_play.user_id].append(listen_history)
-    return insert_user_listening_history_dict, update_user_listening_history_dict
-
-
-def insert_new_user_listening_histories_to_insert(
-    insert_user_listening_history_dict, session
-):
-    new_user_listening_history = []
-    for user_id, listening_histories in insert_user_listening_history_dict.items():
-        track_to_play_count = DefaultDict(int)
-        track_to_latest_timestamp = {}
-        for new_play in listening_histories:
-            current_max_timestamp = track_to_latest_timestamp.get(
-                new_play["track_id"], str(datetime.min)
-            )
-            track_to_latest_timestamp[new_play["track_id"]] = max(
-                current_max_timestamp, new_play["timestamp"]
-            )
-            track_to_play_count[new_play["track_id"]] += 1
-
-        new_user_listening_history.append(
-            UserListeningHistory(
-                user_id=user_id,
-                listening_history=sort_listening_history_desc_by_timestamp(
-                    track_to_latest_timestamp, track_to_play_count
-                ),
-            )
-        )
-
-    session.add_all(new_user_listening_history)
-
-
 # ####### CELERY TASKS ####### #
 @celery.task(name="index_user_listening_history", bind=True)
 @save_duration_metric(metric_group="celery_task")
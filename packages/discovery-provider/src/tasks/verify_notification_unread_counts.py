@@ -0,0 +1,153 @@
+import logging
+import time
+from typing import List
+
+from redis import Redis
+from sqlalchemy import text
+
+from src.queries.get_notifications import NOTIFICATION_UNREAD_COUNTS_QUEUE_KEY
+from src.tasks.celery_app import celery
+from src.utils.prometheus_metric import save_duration_metric
+
+logger = logging.getLogger(__name__)
+
+VERIFY_NOTIFICATION_UNREAD_COUNTS_LOCK = "verify_notification_unread_counts_lock"
+
+# Users whose counts are created per run, from the users that asked for them
+CREATE_BATCH_SIZE = 500
+# Users whose counts are recomputed per run, least recently verified first
+VERIFY_BATCH_SIZE = 500
+
+# Waits for notification triggers that incremented the user's counts to commit,
+# and holds off new increments until the recomputed counts are committed. The
+# compute query runs after it, so its snapshot includes those notifications.
+LOCK_UNREAD_COUNTS_QUERY = """
+    SELECT 1 FROM notification_unread_counts WHERE user_id = :user_id FOR UPDATE;
+    """
+
+# Same unread groups as unread_notification_count_sql in get_notifications,
+# without announcements which are counted at read time
+COMPUTE_UNREAD_COUNTS_QUERY = """
+    INSERT INTO notification_unread_counts (user_id, counts, seen_at, verified_at)
+    SELECT
+        :user_id,
+        coalesce(
+            jsonb_object_agg(unread.type, unread.group_count)
+                FILTER (WHERE unread.type IS NOT NULL),
+            '{}'
+        ),
+        seen.seen_at,
+        now()
+    FROM (
+        SELECT coalesce(max(seen_at), '2016-01-01'::timestamp) AS seen_at
+        FROM notification_seen
+        WHERE user_id = :user_id
+    ) seen
+    LEFT JOIN LATERAL (
+        SELECT n.type, count(DISTINCT n.group_id) AS group_count
+        FROM notification n
+        WHERE ARRAY[:user_id] && n.user_ids
+        AND n.type != 'announcement'
+        AND n.timestamp > seen.seen_at
+        GROUP BY n.type
+    ) unread ON TRUE
+    GROUP BY seen.seen_at
+    ON CONFLICT (user_id) DO UPDATE SET
+        counts = EXCLUDED.counts,
+        seen_at = EXCLUDED.seen_at,
+        verified_at = EXCLUDED.verified_at
+    RETURNING counts;
+    """
+
+
+def compute_unread_counts(session, user_id: int) -> dict:
+    """
+    Creates or repairs the unread counts of a user from notification.
+    The counts row stays locked until the session commits.
+    """
+    session.execute(text(LOCK_UNREAD_COUNTS_QUERY), {"user_id": user_id})
+    return session.execute(
+        text(COMPUTE_UNREAD_COUNTS_QUERY), {"user_id": user_id}
+    ).scalar()
+
+
+def _create_unread_counts(session, redis: Redis) -> int:
+    user_ids = [
+        int(user_id)
+        for user_id in redis.spop(
+            NOTIFICATION_UNREAD_COUNTS_QUEUE_KEY, CREATE_BATCH_SIZE
+        )
+        or []
+    ]
+    for user_id in user_ids:
+        compute_unread_counts(session, user_id)
+        # Commit each user so the notification triggers are not held up
+        session.commit()
+    return len(user_ids)
+
+
+def _verify_unread_counts(session) -> int:
+    rows = session.execute(
+        text(
+            """
+            SELECT user_id, counts
+            FROM notification_unread_counts
+            ORDER BY verified_at ASC
+            LIMIT :limit
+            """
+        ),
+        {"limit": VERIFY_BATCH_SIZE},
+    ).fetchall()
+
+    repaired: List[int] = []
+    for user_id, counts in rows:
+        if compute_unread_counts(session, user_id) != counts:
+            repaired.append(user_id)
+        session.commit()
+    if repaired:
+        logger.warning(
+            f"verify_notification_unread_counts.py | Repaired unread counts of {len(repaired)} users: {repaired[:20]}"
+        )
+    return len(rows)
+
+
+# ####### CELERY TASKS ####### #
+@celery.task(name="verify_notification_unread_counts", bind=True)
+@save_duration_metric(metric_group="celery_task")
+def verify_notification_unread_counts(self):
+    # Cache custom task class properties
+    # Details regarding custom task context can be found in wiki
+    # Custom Task definition can be found in src/app.py
+    db = verify_notification_unread_counts.db
+    redis = verify_notification_unread_counts.redis
+    # Define lock acquired boolean
+    have_lock = False
+    # Define redis lock object
+    update_lock = redis.lock(VERIFY_NOTIFICATION_UNREAD_COUNTS_LOCK, timeout=60 * 10)
+    try:
+        # Attempt to acquire lock - do not block if unable to acquire
+        have_lock = update_lock.acquire(blocking=False)
+        if have_lock:
+            start_time = time.time()
+
+            with db.scoped_session() as session:
+                created = _create_unread_counts(session, redis)
+            with db.scoped_session() as session:
+                verified = _verify_unread_counts(session)
+
+            logger.debug(
+                f"verify_notification_unread_counts.py | Created {created} and verified {verified} unread counts in: {time.time()-start_time} sec"
+            )
+        else:
+            logger.debug(
+                f"verify_notification_unread_counts.py | Failed to acquire {VERIFY_NOTIFICATION_UNREAD_COUNTS_LOCK}"
+            )
+    except Exception as e:
+        logger.error(
+            "verify_notification_unread_counts.py | Fatal error in main loop",
+            exc_info=True,
+        )
+        raise e
+    finally:
+        if have_lock:
+            update_lock.release()
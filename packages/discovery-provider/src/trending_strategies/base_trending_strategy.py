@@ -18,3 +18,10 @@ class BaseTrendingStrategy(ABC):
     @abstractmethod
     def get_score_params(self):
         pass
+
+    def update_track_score_query_incremental(self, session, track_ids):
+        """
+        Rescores the tracks whose trending inputs changed. Strategies without
+        an incremental query rescore every track.
+        """
+        self.update_track_score_query(session)
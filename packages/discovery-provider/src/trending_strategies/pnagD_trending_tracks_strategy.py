@@ -4,6 +4,9 @@ import time
 from sqlalchemy.sql import text
 
 from src.trending_strategies.base_trending_strategy import BaseTrendingStrategy
+from src.trending_strategies.track_trending_inputs import (
+    update_track_scores_incremental,
+)
 from src.trending_strategies.trending_type_and_version import (
     TrendingType,
     TrendingVersion,
@@ -197,5 +200,24 @@ class TrendingTracksStrategypnagD(BaseTrendingStrategy):
             },
         )
 
+    def update_track_score_query_incremental(self, session, track_ids):
+        update_track_scores_incremental(
+            session,
+            self,
+            track_ids,
+            "tti.karma",
+            {
+                "week": T["week"],
+                "month": T["month"],
+                "N": N,
+                "F": F,
+                "O": O,
+                "R": R,
+                "i": i,
+                "q": q,
+                "y": y,
+            },
+        )
+
     def get_score_params(self):
         return {"xf": True, "pt": 0, "nm": 5}
@@ -0,0 +1,574 @@
+"""
+Incremental maintenance of track trending scores.
+
+A full trending refresh recomputes the trending_params and
+aggregate_interval_plays materialized views and rescores every track. Between
+full refreshes, index_trending instead keeps the same inputs per track in
+track_trending_inputs, recomputing them only for tracks touched by the plays,
+reposts, saves, tracks, users and follows indexed since the last run (found
+through indexing_checkpoints) or whose plays, reposts and saves aged out of a
+trending window. Those tracks, and tracks whose time decay moved to a new day,
+are rescored and only scores that changed are written. Windowed play counts
+cover the same windows as aggregate_interval_plays: whole hours are read from
+track_hourly_play_counts, which index_hourly_play_counts rolls up from plays,
+and the hour a window starts in is counted from plays.
+"""
+
+import logging
+import time
+from typing import Dict, List
+
+from sqlalchemy import func, text
+from sqlalchemy.orm.session import Session
+
+from src.models.indexing.block import Block
+from src.models.social.play import Play
+from src.tasks.index_hourly_play_counts import (
+    TRACK_HOURLY_PLAY_COUNTS_BATCH_SIZE,
+    TRACK_HOURLY_PLAY_COUNTS_TABLE_NAME,
+)
+from src.trending_strategies.base_trending_strategy import BaseTrendingStrategy
+from src.utils.config import shared_config
+from src.utils.update_indexing_checkpoints import (
+    get_last_indexed_checkpoint,
+    save_indexed_checkpoint,
+)
+
+logger = logging.getLogger(__name__)
+
+TRACK_TRENDING_INPUTS_TABLE_NAME = "track_trending_inputs"
+PLAYS_CHECKPOINT = f"{TRACK_TRENDING_INPUTS_TABLE_NAME}:plays"
+BLOCKS_CHECKPOINT = f"{TRACK_TRENDING_INPUTS_TABLE_NAME}:blocks"
+TIMESTAMP_CHECKPOINT = f"{TRACK_TRENDING_INPUTS_TABLE_NAME}:timestamp"
+FULL_REFRESH_CHECKPOINT = f"{TRACK_TRENDING_INPUTS_TABLE_NAME}:full_refresh"
+
+# Time in seconds between full trending refreshes, 0 refreshes fully every run
+TRENDING_FULL_REFRESH_SEC = int(
+    shared_config["discprov"]["trending_full_refresh_seconds"]
+)
+
+# Days after which the time decay of every trending time range is constant
+MAX_DECAY_DAYS = 62
+
+# Eligibility of a track for trending, same as the trending materialized views
+TRENDING_TRACK_FILTER = """
+    t.is_current IS TRUE AND
+    t.is_delete IS FALSE AND
+    t.is_unlisted IS FALSE AND
+    t.stem_of IS NULL
+"""
+
+INPUT_COLUMNS = """
+    track_id,
+    genre,
+    owner_id,
+    created_at,
+    release_date,
+    play_count,
+    week_listen_counts,
+    month_listen_counts,
+    owner_follower_count,
+    repost_count,
+    save_count,
+    repost_week_count,
+    repost_month_count,
+    save_week_count,
+    save_month_count,
+    karma,
+    updated_at
+"""
+
+REBUILD_TRACK_TRENDING_INPUTS_QUERY = f"""
+    TRUNCATE track_trending_inputs;
+    INSERT INTO track_trending_inputs ({INPUT_COLUMNS})
+    SELECT
+        tp.track_id,
+        tp.genre,
+        tp.owner_id,
+        aip.created_at,
+        tp.release_date,
+        tp.play_count,
+        aip.week_listen_counts,
+        aip.month_listen_counts,
+        tp.owner_follower_count,
+        tp.repost_count,
+        tp.save_count,
+        tp.repost_week_count,
+        tp.repost_month_count,
+        tp.save_week_count,
+        tp.save_month_count,
+        tp.karma,
+        now()
+    FROM trending_params tp
+    INNER JOIN aggregate_interval_plays aip
+        ON tp.track_id = aip.track_id;
+"""
+
+# Rows entering a window are found by the checkpoints, rows leaving it were
+# created between the window start of the last run and that of this run.
+# Plays leaving a window are found from their hourly rollup, by the hours
+# holding either window start.
+CHANGED_TRENDING_TRACKS_QUERY = """
+    WITH changed_users AS (
+        SELECT user_id
+        FROM users
+        WHERE blocknumber > :prev_block AND blocknumber <= :block
+        UNION
+        SELECT followee_user_id
+        FROM follows
+        WHERE blocknumber > :prev_block AND blocknumber <= :block
+    )
+    SELECT play_item_id
+    FROM plays
+    WHERE id > :prev_play_id AND id <= :play_id
+    UNION
+    SELECT play_item_id
+    FROM track_hourly_play_counts
+    WHERE
+        (
+            hourly_timestamp >= date_trunc('hour', to_timestamp(:prev_timestamp) - '7 days'::interval) AND
+            hourly_timestamp <= now() - '7 days'::interval
+        ) OR (
+            hourly_timestamp >= date_trunc('hour', to_timestamp(:prev_timestamp) - '1 mon'::interval) AND
+            hourly_timestamp <= now() - '1 mon'::interval
+        )
+    UNION
+    SELECT repost_item_id
+    FROM reposts
+    WHERE
+        repost_type = 'track' AND
+        blocknumber > :prev_block AND
+        blocknumber <= :block
+    UNION
+    SELECT repost_item_id
+    FROM reposts
+    WHERE
+        repost_type = 'track' AND
+        is_current IS TRUE AND
+        is_delete IS FALSE AND
+        user_id IN (SELECT user_id FROM changed_users)
+    UNION
+    SELECT repost_item_id
+    FROM reposts
+    WHERE
+        repost_type = 'track' AND (
+            (
+                created_at > to_timestamp(:prev_timestamp) - '7 days'::interval AND
+                created_at <= now() - '7 days'::interval
+            ) OR (
+                created_at > to_timestamp(:prev_timestamp) - '1 mon'::interval AND
+                created_at <= now() - '1 mon'::interval
+            )
+        )
+    UNION
+    SELECT save_item_id
+    FROM saves
+    WHERE
+        save_type = 'track' AND
+        blocknumber > :prev_block AND
+        blocknumber <= :block
+    UNION
+    SELECT save_item_id
+    FROM saves
+    WHERE
+        save_type = 'track' AND
+        is_current IS TRUE AND
+        is_delete IS FALSE AND
+        user_id IN (SELECT user_id FROM changed_users)
+    UNION
+    SELECT save_item_id
+    FROM saves
+    WHERE
+        save_type = 'track' AND (
+            (
+                created_at > to_timestamp(:prev_timestamp) - '7 days'::interval AND
+                created_at <= now() - '7 days'::interval
+            ) OR (
+                created_at > to_timestamp(:prev_timestamp) - '1 mon'::interval AND
+                created_at <= now() - '1 mon'::interval
+            )
+        )
+    UNION
+    SELECT track_id
+    FROM tracks
+    WHERE blocknumber > :prev_block AND blocknumber <= :block
+    UNION
+    SELECT track_id
+    FROM tracks
+    WHERE is_current IS TRUE AND owner_id IN (SELECT user_id FROM changed_users)
+    UNION
+    SELECT track_id
+    FROM track_trending_inputs
+    WHERE
+        GREATEST(release_date, created_at) > now() - :max_decay_days * '1 day'::interval AND
+        EXTRACT(DAYS FROM now() - (
+            CASE
+                WHEN release_date > now() THEN created_at
+                ELSE GREATEST(release_date, created_at)
+            END
+        )) <> EXTRACT(DAYS FROM to_timestamp(:prev_timestamp) - (
+            CASE
+                WHEN release_date > to_timestamp(:prev_timestamp) THEN created_at
+                ELSE GREATEST(release_date, created_at)
+            END
+        ));
+"""
+
+# The hour each play window starts in is only partly in the window
+WEEK_START_HOUR_PLAYS = """
+    p.created_at > now() - '7 days'::interval AND
+    p.created_at < date_trunc('hour', now() - '7 days'::interval) + '1 hour'::interval
+"""
+MONTH_START_HOUR_PLAYS = """
+    p.created_at > now() - '1 mon'::interval AND
+    p.created_at < date_trunc('hour', now() - '1 mon'::interval) + '1 hour'::interval
+"""
+
+UPDATE_TRACK_TRENDING_INPUTS_QUERY = f"""
+    DELETE FROM track_trending_inputs tti
+    WHERE
+        tti.track_id = ANY(:track_ids) AND
+        NOT EXISTS (
+            SELECT 1 FROM tracks t
+            WHERE t.track_id = tti.track_id AND {TRENDING_TRACK_FILTER}
+        );
+    WITH start_hour_plays AS (
+        SELECT
+            p.play_item_id,
+            count(*) FILTER (WHERE {WEEK_START_HOUR_PLAYS}) AS week_count,
+            count(*) FILTER (WHERE {MONTH_START_HOUR_PLAYS}) AS month_count
+        FROM plays p
+        WHERE
+            p.play_item_id = ANY(:track_ids) AND
+            (({WEEK_START_HOUR_PLAYS}) OR ({MONTH_START_HOUR_PLAYS}))
+        GROUP BY p.play_item_id
+    )
+    INSERT INTO track_trending_inputs ({INPUT_COLUMNS})
+    SELECT
+        t.track_id,
+        t.genre,
+        t.owner_id,
+        t.created_at,
+        t.release_date,
+        ap.count,
+        coalesce((
+            SELECT sum(thpc.play_count) FROM track_hourly_play_counts thpc
+            WHERE
+                thpc.play_item_id = t.track_id AND
+                thpc.hourly_timestamp > date_trunc('hour', now() - '7 days'::interval)
+        ), 0) + coalesce(shp.week_count, 0),
+        coalesce((
+            SELECT sum(thpc.play_count) FROM track_hourly_play_counts thpc
+            WHERE
+                thpc.play_item_id = t.track_id AND
+                thpc.hourly_timestamp > date_trunc('hour', now() - '1 mon'::interval)
+        ), 0) + coalesce(shp.month_count, 0),
+        au.follower_count,
+        coalesce(agg.repost_count, 0),
+        coalesce(agg.save_count, 0),
+        (
+            SELECT count(*) FROM reposts r
+            WHERE
+                r.repost_item_id = t.track_id AND
+                r.repost_type = 'track' AND
+                r.is_current IS TRUE AND
+                r.is_delete IS FALSE AND
+                r.created_at > now() - '7 days'::interval
+        ),
+        (
+            SELECT count(*) FROM reposts r
+            WHERE
+                r.repost_item_id = t.track_id AND
+                r.repost_type = 'track' AND
+                r.is_current IS TRUE AND
+                r.is_delete IS FALSE AND
+                r.created_at > now() - '1 mon'::interval
+        ),
+        (
+            SELECT count(*) FROM saves s
+            WHERE
+                s.save_item_id = t.track_id AND
+                s.save_type = 'track' AND
+                s.is_current IS TRUE AND
+                s.is_delete IS FALSE AND
+                s.created_at > now() - '7 days'::interval
+        ),
+        (
+            SELECT count(*) FROM saves s
+            WHERE
+                s.save_item_id = t.track_id AND
+                s.save_type = 'track' AND
+                s.is_current IS TRUE AND
+                s.is_delete IS FALSE AND
+                s.created_at > now() - '1 mon'::interval
+        ),
+        coalesce((
+            SELECT sum(au_1.follower_count)
+            FROM (
+                SELECT r.user_id FROM reposts r
+                WHERE
+                    r.repost_item_id = t.track_id AND
+                    r.repost_type = 'track' AND
+                    r.is_current IS TRUE AND
+                    r.is_delete IS FALSE
+                UNION ALL
+                SELECT s.user_id FROM saves s
+                WHERE
+                    s.save_item_id = t.track_id AND
+                    s.save_type = 'track' AND
+                    s.is_current IS TRUE AND
+                    s.is_delete IS FALSE
+            ) r_and_s
+            JOIN users u ON r_and_s.user_id = u.user_id
+            JOIN aggregate_user au_1 ON r_and_s.user_id = au_1.user_id
+            WHERE
+                (u.cover_photo IS NOT NULL OR u.cover_photo_sizes IS NOT NULL) AND
+                (u.profile_picture IS NOT NULL OR u.profile_picture_sizes IS NOT NULL) AND
+                u.bio IS NOT NULL
+        ), 0),
+        now()
+    FROM tracks t
+    LEFT JOIN aggregate_plays ap ON ap.play_item_id = t.track_id
+    LEFT JOIN aggregate_user au ON au.user_id = t.owner_id
+    LEFT JOIN aggregate_track agg ON agg.track_id = t.track_id
+    LEFT JOIN start_hour_plays shp ON shp.play_item_id = t.track_id
+    WHERE t.track_id = ANY(:track_ids) AND {TRENDING_TRACK_FILTER}
+    ON CONFLICT (track_id) DO UPDATE SET
+        genre = EXCLUDED.genre,
+        owner_id = EXCLUDED.owner_id,
+        created_at = EXCLUDED.created_at,
+        release_date = EXCLUDED.release_date,
+        play_count = EXCLUDED.play_count,
+        week_listen_counts = EXCLUDED.week_listen_counts,
+        month_listen_counts = EXCLUDED.month_listen_counts,
+        owner_follower_count = EXCLUDED.owner_follower_count,
+        repost_count = EXCLUDED.repost_count,
+        save_count = EXCLUDED.save_count,
+        repost_week_count = EXCLUDED.repost_week_count,
+        repost_month_count = EXCLUDED.repost_month_count,
+        save_week_count = EXCLUDED.save_week_count,
+        save_month_count = EXCLUDED.save_month_count,
+        karma = EXCLUDED.karma,
+        updated_at = EXCLUDED.updated_at;
+"""
+
+
+def get_decayed_score_sql(
+    time_range: str, listens: str, reposts: str, saves: str, karma: str
+):
+    """Score of the week or month time range, same as update_track_score_query"""
+    days = """EXTRACT(DAYS FROM now() - (
+                CASE
+                    WHEN tti.release_date > now() THEN tti.created_at
+                    ELSE GREATEST(tti.release_date, tti.created_at)
+                END
+            ))"""
+    score = f"""(
+                :N * tti.{listens} +
+                :F * tti.{reposts} +
+                :O * tti.{saves} +
+                :R * tti.repost_count +
+                :i * tti.save_count
+            ) * {karma}"""
+    return f"""
+        CASE
+        WHEN tti.owner_follower_count < :y
+            THEN 0
+        WHEN {days} > :{time_range}
+            THEN GREATEST(
+                1.0 / :q,
+                POW(:q, GREATEST(-10, 1.0 - 1.0 * {days} / :{time_range}))
+            ) * {score}
+        ELSE {score}
+        END
+    """
+
+
+def get_incremental_track_score_query(karma: str):
+    """
+    Upserts the week, month and allTime scores of `:track_ids` computed from
+    track_trending_inputs, skipping unchanged scores, and deletes the scores of
+    tracks that are no longer eligible for trending.
+    `karma` is the SQL expression of the karma multiplier of the strategy.
+    """
+    week_score = get_decayed_score_sql(
+        "week", "week_listen_counts", "repost_week_count", "save_week_count", karma
+    )
+    month_score = get_decayed_score_sql(
+        "month", "month_listen_counts", "repost_month_count", "save_month_count", karma
+    )
+    return f"""
+        INSERT INTO track_trending_scores
+            (track_id, genre, type, version, time_range, score, created_at)
+        SELECT track_id, genre, :type, :version, time_range, score, now()
+        FROM (
+            SELECT tti.track_id, tti.genre, 'week' AS time_range, {week_score} AS score
+            FROM track_trending_inputs tti
+            WHERE tti.track_id = ANY(:track_ids)
+            UNION ALL
+            SELECT tti.track_id, tti.genre, 'month' AS time_range, {month_score} AS score
+            FROM track_trending_inputs tti
+            WHERE tti.track_id = ANY(:track_ids)
+            UNION ALL
+            SELECT
+                tti.track_id,
+                tti.genre,
+                'allTime' AS time_range,
+                CASE
+                WHEN tti.owner_follower_count < :y
+                    THEN 0
+                ELSE (
+                    :N * tti.play_count +
+                    :R * tti.repost_count +
+                    :i * tti.save_count
+                ) * {karma}
+                END AS score
+            FROM track_trending_inputs tti
+            WHERE tti.track_id = ANY(:track_ids) AND tti.play_count IS NOT NULL
+        ) scores
+        ON CONFLICT (track_id, type, version, time_range) DO UPDATE SET
+            genre = EXCLUDED.genre,
+            score = EXCLUDED.score,
+            created_at = EXCLUDED.created_at
+        WHERE
+            track_trending_scores.score IS DISTINCT FROM EXCLUDED.score OR
+            track_trending_scores.genre IS DISTINCT FROM EXCLUDED.genre;
+        DELETE FROM track_trending_scores tts
+        WHERE
+            tts.type = :type AND
+            tts.version = :version AND
+            tts.track_id = ANY(:track_ids) AND
+            NOT EXISTS (
+                SELECT 1 FROM track_trending_inputs tti
+                WHERE
+                    tti.track_id = tts.track_id AND
+                    (tts.time_range <> 'allTime' OR tti.play_count IS NOT NULL)
+            );
+    """
+
+
+def update_track_scores_incremental(
+    session: Session,
+    strategy: BaseTrendingStrategy,
+    track_ids: List[int],
+    karma: str,
+    params: Dict,
+):
+    """Rescores `track_ids` for `strategy` from track_trending_inputs"""
+    start_time = time.time()
+    if track_ids:
+        session.execute(
+            text(get_incremental_track_score_query(karma)),
+            {
+                **params,
+                "type": strategy.trending_type.name,
+                "version": strategy.version.name,
+                "track_ids": track_ids,
+            },
+        )
+    duration = time.time() - start_time
+    logger.info(
+        f"track_trending_inputs.py | Rescored {len(track_ids)} tracks in {duration} seconds",
+        extra={
+            "id": "trending_strategy",
+            "type": strategy.trending_type.name,
+            "version": strategy.version.name,
+            "duration": duration,
+        },
+    )
+
+
+def get_current_checkpoints(session: Session) -> Dict[str, int]:
+    # Only plays already in the hourly rollup count as indexed
+    play_id = get_last_indexed_checkpoint(session, TRACK_HOURLY_PLAY_COUNTS_TABLE_NAME)
+    block = session.query(Block.number).filter(Block.is_current == True).scalar()
+    timestamp = session.execute(
+        text("SELECT CAST(EXTRACT(EPOCH FROM now()) AS INTEGER)")
+    ).scalar()
+    return {
+        PLAYS_CHECKPOINT: play_id or 0,
+        BLOCKS_CHECKPOINT: block or 0,
+        TIMESTAMP_CHECKPOINT: timestamp,
+    }
+
+
+def save_checkpoints(session: Session, checkpoints: Dict[str, int]):
+    for tablename, checkpoint in checkpoints.items():
+        save_indexed_checkpoint(session, tablename, checkpoint)
+
+
+def is_trending_full_refresh_due(session: Session) -> bool:
+    """Whether trending should be recomputed from the materialized views"""
+    last_full_refresh = get_last_indexed_checkpoint(session, FULL_REFRESH_CHECKPOINT)
+    # Windowed play counts are incomplete while the hourly rollup backfills
+    rolled_up_play_id = get_last_indexed_checkpoint(
+        session, TRACK_HOURLY_PLAY_COUNTS_TABLE_NAME
+    )
+    max_play_id = session.query(func.max(Play.id)).scalar() or 0
+    return (
+        TRENDING_FULL_REFRESH_SEC <= 0
+        or not last_full_refresh
+        or time.time() - last_full_refresh >= TRENDING_FULL_REFRESH_SEC
+        or max_play_id - rolled_up_play_id > TRACK_HOURLY_PLAY_COUNTS_BATCH_SIZE
+    )
+
+
+def rebuild_track_trending_inputs(session: Session):
+    """
+    Resets track_trending_inputs from the trending materialized views, which
+    must have been refreshed in the same transaction
+    """
+    checkpoints = get_current_checkpoints(session)
+    session.execute(text(REBUILD_TRACK_TRENDING_INPUTS_QUERY))
+    save_checkpoints(
+        session,
+        {
+            **checkpoints,
+            FULL_REFRESH_CHECKPOINT: checkpoints[TIMESTAMP_CHECKPOINT],
+        },
+    )
+
+
+def update_track_trending_inputs(session: Session) -> List[int]:
+    """
+    Recomputes the trending inputs of the tracks changed since the last run and
+    returns the ids of the tracks to rescore
+    """
+    start_time = time.time()
+    checkpoints = get_current_checkpoints(session)
+    prev_checkpoints = {
+        tablename: get_last_indexed_checkpoint(session, tablename)
+        for tablename in checkpoints
+    }
+
+    track_ids = [
+        row[0]
+        for row in session.execute(
+            text(CHANGED_TRENDING_TRACKS_QUERY),
+            {
+                "prev_play_id": prev_checkpoints[PLAYS_CHECKPOINT],
+                "play_id": checkpoints[PLAYS_CHECKPOINT],
+                "prev_block": prev_checkpoints[BLOCKS_CHECKPOINT],
+                "block": checkpoints[BLOCKS_CHECKPOINT],
+                "prev_timestamp": prev_checkpoints[TIMESTAMP_CHECKPOINT],
+                "max_decay_days": MAX_DECAY_DAYS,
+            },
+        )
+        if row[0] is not None
+    ]
+    if track_ids:
+        session.execute(
+            text(UPDATE_TRACK_TRENDING_INPUTS_QUERY), {"track_ids": track_ids}
+        )
+    save_checkpoints(session, checkpoints)
+
+    duration = time.time() - start_time
+    logger.info(
+        f"track_trending_inputs.py | Updated trending inputs of {len(track_ids)} tracks in {duration} seconds",
+        extra={
+            "job": "index_trending",
+            "changed_tracks": len(track_ids),
+            "duration": duration,
+        },
+    )
+    return track_ids
@@ -1,6 +1,37 @@
 import csv
 from io import StringIO
-from typing import List
+from typing import Iterable, Iterator, List
+
+# Size in characters of the chunks stream_csv yields
+CSV_CHUNK_SIZE = 64 * 1024
+
+
+# Write CSV rows to a string buffer, yielding its contents whenever it fills up.
+# Takes an iterable of dictionaries, where each dictionary represents a row,
+# and uses the keys of the first row as the header. Only one chunk of rows is
+# held in memory, so rows can be streamed from the database to the response.
+# Example:
+#   rows = [{"name": "John", "age": 30}, {"name": "Jane", "age": 25}]
+#   "".join(stream_csv(rows))
+# Returns:
+#    name,age
+#    John,30
+#    Jane,25
+def stream_csv(rows: Iterable[dict]) -> Iterator[str]:
+    output = StringIO()
+    writer = None
+    for row in rows:
+        if writer is None:
+            writer = csv.DictWriter(output, fieldnames=list(row.keys()))
+            writer.writeheader()
+        writer.writerow(row)
+        if output.tell() >= CSV_CHUNK_SIZE:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
+
+    if output.tell():
+        yield output.getvalue()
 
 
 # Write CSV to string buffer before returning the contents of the string.
@@ -13,13 +44,4 @@ from typing import List
 #    John,30
 #    Jane,25
 def write_csv_string(rows: List[dict]):
-    if not rows:
-        return ""
-
-    fieldnames = list(rows[0].keys())
-    output = StringIO()
-    writer = csv.DictWriter(output, fieldnames=fieldnames)
-    writer.writeheader()
-    writer.writerows(rows)
-
-    return output.getvalue()
+    return "".join(stream_csv(rows))
@@ -0,0 +1,34 @@
+from src.utils import csv_writer
+from src.utils.csv_writer import stream_csv, write_csv_string
+
+
+def test_write_csv_string():
+    rows = [{"name": "John", "age": 30}, {"name": "Jane", "age": 25}]
+    assert write_csv_string(rows) == "name,age\r\nJohn,30\r\nJane,25\r\n"
+    assert write_csv_string([]) == ""
+
+
+def test_stream_csv_chunks(monkeypatch):
+    monkeypatch.setattr(csv_writer, "CSV_CHUNK_SIZE", 20)
+    rows = ({"name": f"user {i}", "age": i} for i in range(10))
+
+    chunks = list(stream_csv(rows))
+    assert len(chunks) > 1
+    assert all(len(chunk) < 40 for chunk in chunks)
+    assert "".join(chunks) == "name,age\r\n" + "".join(
+        f"user {i},{i}\r\n" for i in range(10)
+    )
+
+
+def test_stream_csv_is_lazy():
+    consumed = []
+
+    def rows():
+        for i in range(3):
+            consumed.append(i)
+            yield {"id": i}
+
+    chunks = stream_csv(rows())
+    assert consumed == []
+    assert "".join(chunks) == "id\r\n0\r\n1\r\n2\r\n"
+    assert consumed == [0, 1, 2]
@@ -9,7 +9,7 @@ import time
 import unicodedata
 from functools import reduce
 from json.encoder import JSONEncoder
-from typing import List, Optional, TypedDict, cast
+from typing import List, Optional, Tuple, TypedDict, cast
 
 import base58
 import psutil
@@ -23,7 +23,6 @@ from solders.instruction import CompiledInstruction
 from solders.message import Message
 from solders.pubkey import Pubkey
 from solders.transaction_status import UiTransactionStatusMeta
-from sqlalchemy import inspect
 from web3 import Web3
 from web3.auto import w3
 
@@ -89,6 +88,30 @@ def query_result_to_list(query_result):
     return results
 
 
+@functools.lru_cache(maxsize=None)
+def get_model_keys(model_class) -> Tuple[List[str], List[str], List[str]]:
+    """Returns the column, property and relationship keys serialized for a model
+    class by `model_to_dictionary`. Computed once per class.
+    """
+    columns = model_class.__table__.columns.keys()
+    relationships = model_class.__mapper__.relationships.keys()
+    properties = []
+    for key in sorted(set(dir(model_class)) - set(columns) - set(relationships)):
+        attr = getattr(model_class, key)
+        if not callable(attr) and isinstance(attr, property):
+            properties.append(key)
+
+    exclude_keys = getattr(model_class, "exclude_keys", [])
+    assert set(exclude_keys).issubset(set(properties).union(columns))
+
+    def serialized(keys):
+        return [
+            key for key in keys if key not in exclude_keys and not key.startswith("_")
+        ]
+
+    return serialized(columns), serialized(properties), serialized(relationships)
+
+
 def model_to_dictionary(model, exclude_keys=None):
     """Converts the given SQLAlchemy model into a dictionary, primarily used
     for serialization to JSON.
@@ -100,49 +123,52 @@ def model_to_dictionary(model, exclude_keys=None):
     - Excludes any property or attribute with a leading underscore.
     - Excludes unloaded properties expressed in relationships.
     """
-    state = inspect(model)
-    # Collect the model members that are unloaded so we do not
-    # unintentionally cause them to load
-    unloaded = state.unloaded
-    model_dict = {}
-
-    columns = model.__table__.columns.keys()
-    relationships = model.__mapper__.relationships.keys()
-    properties = []
-    for key in list(set(dir(model)) - set(columns) - set(relationships)):
-        if hasattr(type(model), key):
-            attr = getattr(type(model), key)
-            if not callable(attr) and isinstance(attr, property):
-                properties.append(key)
+    columns, properties, relationships = get_model_keys(type(model))
+    if exclude_keys:
+        assert set(exclude_keys).issubset(set(properties).union(columns))
+        columns = [key for key in columns if key not in exclude_keys]
+        properties = [key for key in properties if key not in exclude_keys]
+        relationships = [key for key in relationships if key not in exclude_keys]
 
-    if exclude_keys is None:
-        exclude_keys = []
-    if hasattr(model, "exclude_keys"):
-        exclude_keys.extend(model.exclude_keys)
+    # Collect the relationships that are loaded, i.e. in the instance dict, so we
+    # do not unintentionally cause the others to load
+    loaded_relationships = [key for key in relationships if key in model.__dict__]
 
-    assert set(exclude_keys).issubset(set(properties).union(columns))
-
-    for key in columns:
-        if key not in exclude_keys and not key.startswith("_"):
-            model_dict[key] = getattr(model, key)
+    model_dict = {key: getattr(model, key) for key in columns}
 
     for key in properties:
-        if key not in exclude_keys and not key.startswith("_"):
-            model_dict[key] = getattr(model, key)
-
-    for key in relationships:
-        if key not in exclude_keys and not key.startswith("_"):
-            if key in unloaded:
-                continue
-            attr = getattr(model, key)
-            if isinstance(attr, list):
-                model_dict[key] = query_result_to_list(attr)
-            else:
-                model_dict[key] = model_to_dictionary(attr)
+        model_dict[key] = getattr(model, key)
+
+    for key in loaded_relationships:
+        attr = getattr(model, key)
+        if isinstance(attr, list):
+            model_dict[key] = query_result_to_list(attr)
+        else:
+            model_dict[key] = model_to_dictionary(attr)
 
     return model_dict
 
 
+@functools.lru_cache(maxsize=None)
+def get_model_columns(model_class) -> tuple:
+    """Returns the column attributes of a model class serialized by
+    `model_to_dictionary`, to query plain rows with `session.query(*columns)`.
+    """
+    columns, _, _ = get_model_keys(model_class)
+    return tuple(getattr(model_class, key) for key in columns)
+
+
+def query_result_rows_to_list(query_result) -> List[dict]:
+    """Converts the rows of a column query into dictionaries keyed by column label.
+    Much cheaper than loading ORM objects and calling `model_to_dictionary`.
+    """
+    rows = list(query_result)
+    if not rows:
+        return []
+    keys = rows[0].keys()
+    return [dict(zip(keys, row)) for row in rows]
+
+
 # Convert a tuple of model format into the proper model itself represented as a dictionary.
 # The number of entries in the tuple, must map the model.
 #
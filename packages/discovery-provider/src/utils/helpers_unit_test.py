@@ -1,6 +1,13 @@
 from urllib.parse import unquote
 
-from src.utils.helpers import is_fqdn, sanitize_slug
+from src.models.tracks.track import Track
+from src.utils.helpers import (
+    get_model_columns,
+    get_model_keys,
+    is_fqdn,
+    model_to_dictionary,
+    sanitize_slug,
+)
 
 
 def test_create_track_slug_normal_title():
@@ -81,3 +88,19 @@ def test_is_fqdn_url():
     assert is_fqdn("http://validurl2.subdomain.domain.com") == True
     assert is_fqdn("http://cn2_creator-node_1:4001") == True
     assert is_fqdn("http://www.example.$com\and%26here.html") == False
+
+
+def test_model_to_dictionary():
+    track = Track(track_id=1, owner_id=2, title="title", is_current=True)
+    track_dict = model_to_dictionary(track)
+    columns, properties, relationships = get_model_keys(Track)
+    assert properties == ["permalink"]
+    assert "_routes" not in relationships
+    assert track_dict["track_id"] == 1
+    assert track_dict["title"] == "title"
+    assert track_dict["permalink"] == ""
+    assert set(track_dict.keys()) == set(columns + properties)
+    assert [column.key for column in get_model_columns(Track)] == columns
+
+    track_dict = model_to_dictionary(track, ["title"])
+    assert "title" not in track_dict
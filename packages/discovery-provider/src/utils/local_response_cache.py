@@ -0,0 +1,133 @@
+"""
+Process-local LRU cache of serialized API responses that sits in front of the
+redis response cache.
+
+Entries expire with the redis key they were read from and are evicted in LRU
+order once the cache holds more than `max_bytes` of serialized responses.
+Deleting a key with `invalidate_cached_key` publishes the key over redis pub/sub
+so every process drops its local copy. A key deleted from redis directly stays
+in the local caches until it expires.
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from time import monotonic
+from typing import Optional, Tuple
+
+from src.utils.config import shared_config
+from src.utils.prometheus_metric import PrometheusMetric, PrometheusMetricNames
+
+logger = logging.getLogger(__name__)
+
+local_response_cache_max_bytes = int(
+    shared_config["discprov"]["local_response_cache_max_bytes"]
+)
+local_response_cache_invalidate_channel = "local_response_cache:invalidate"
+
+
+class LocalResponseCache:
+    """Thread-safe TTL + LRU cache of bytes bounded by total size."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        # key -> (expires_at, value)
+        self._entries: OrderedDict[str, Tuple[float, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._metric = PrometheusMetric(
+            PrometheusMetricNames.LOCAL_RESPONSE_CACHE_TOTAL
+        )
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] <= monotonic():
+                self._remove(key)
+                entry = None
+            if entry:
+                self._entries.move_to_end(key)
+        self._metric.save(1, {"result": "hit" if entry else "miss"})
+        return entry[1] if entry else None
+
+    def set(self, key: str, value: bytes, ttl_sec: float):
+        if ttl_sec <= 0 or len(value) > self.max_bytes:
+            return
+        evicted = 0
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (monotonic() + ttl_sec, value)
+            self.size_bytes += len(value)
+            while self.size_bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                evicted += 1
+        if evicted:
+            self._metric.save(evicted, {"result": "eviction"})
+
+    def delete(self, key: str):
+        with self._lock:
+            self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry:
+            self.size_bytes -= len(entry[1])
+
+
+local_response_cache: Optional[LocalResponseCache] = None
+# pid of the process that subscribed to invalidations, gunicorn forks workers
+# after import so each worker needs its own subscriber thread
+subscribed_pid: Optional[int] = None
+
+
+def get_local_response_cache(redis) -> Optional[LocalResponseCache]:
+    """
+    Returns the process-local response cache, or None when it is disabled.
+    Subscribes this process to invalidations on first use.
+    """
+    # pylint: disable=W0603
+    global local_response_cache, subscribed_pid
+    if local_response_cache_max_bytes <= 0:
+        return None
+    if not local_response_cache:
+        local_response_cache = LocalResponseCache(local_response_cache_max_bytes)
+    pid = os.getpid()
+    if subscribed_pid != pid:
+        subscribed_pid = pid
+        # anything cached before a fork may have missed invalidations
+        local_response_cache.clear()
+        subscribe_to_invalidations(redis, local_response_cache)
+    return local_response_cache
+
+
+def subscribe_to_invalidations(redis, cache: LocalResponseCache):
+    def handle_invalidation(message):
+        key = message["data"]
+        cache.delete(key.decode() if isinstance(key, bytes) else key)
+
+    try:
+        pubsub = redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(
+            **{local_response_cache_invalidate_channel: handle_invalidation}
+        )
+        pubsub.run_in_thread(sleep_time=1, daemon=True)
+    except Exception as e:
+        logger.error(f"local_response_cache.py | Unable to subscribe: {e}")
+
+
+def invalidate_cached_key(redis, key: str):
+    """Deletes a cached response from redis and from every process-local cache."""
+    # this process drops its copy right away rather than when the message arrives
+    if local_response_cache:
+        local_response_cache.delete(key)
+    pipe = redis.pipeline()
+    pipe.delete(key)
+    pipe.publish(local_response_cache_invalidate_channel, key)
+    pipe.execute()
@@ -0,0 +1,46 @@
+from time import sleep
+
+from src.utils.local_response_cache import LocalResponseCache
+
+
+def test_local_response_cache_get_set():
+    cache = LocalResponseCache(max_bytes=100)
+    cache.set("key", b"value", 10)
+    assert cache.get("key") == b"value"
+    assert cache.get("missing") is None
+
+
+def test_local_response_cache_expires():
+    cache = LocalResponseCache(max_bytes=100)
+    cache.set("key", b"value", 0.01)
+    sleep(0.02)
+    assert cache.get("key") is None
+    assert cache.size_bytes == 0
+
+
+def test_local_response_cache_evicts_least_recently_used():
+    cache = LocalResponseCache(max_bytes=10)
+    cache.set("a", b"aaaa", 10)
+    cache.set("b", b"bbbb", 10)
+    # touch a so that b is the least recently used
+    assert cache.get("a") == b"aaaa"
+    cache.set("c", b"cccc", 10)
+    assert cache.get("b") is None
+    assert cache.get("a") == b"aaaa"
+    assert cache.get("c") == b"cccc"
+    assert cache.size_bytes == 8
+
+
+def test_local_response_cache_skips_oversized_values():
+    cache = LocalResponseCache(max_bytes=4)
+    cache.set("key", b"too large", 10)
+    assert cache.get("key") is None
+    assert cache.size_bytes == 0
+
+
+def test_local_response_cache_delete():
+    cache = LocalResponseCache(max_bytes=100)
+    cache.set("key", b"value", 10)
+    cache.delete("key")
+    assert cache.get("key") is None
+    assert cache.size_bytes == 0
@@ -1,7 +1,12 @@
 import random
+from typing import Any, Dict, List, Tuple
 
+import requests
 from web3.providers import BaseProvider, HTTPProvider
 
+# seconds to wait on a JSON-RPC batch request before trying the next provider
+BATCH_REQUEST_TIMEOUT_SEC = 30
+
 
 class MultiProvider(BaseProvider):
     """
@@ -25,6 +30,46 @@ class MultiProvider(BaseProvider):
             last_exception if last_exception else Exception("No RPC providers found")
         )
 
+    def make_batch_request(
+        self, calls: List[Tuple[str, List[Any]]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Sends (method, params) calls as a single JSON-RPC batch request.
+        Returns one response per call in the order of the calls, each with
+        either a "result" or an "error".
+        """
+        if not calls:
+            return []
+        payload = [
+            {"jsonrpc": "2.0", "method": method, "params": params, "id": i}
+            for i, (method, params) in enumerate(calls)
+        ]
+        last_exception = None
+        for provider in random.sample(self.providers, k=len(self.providers)):
+            try:
+                response = requests.post(
+                    provider.endpoint_uri,
+                    json=payload,
+                    headers=provider.get_request_headers(),
+                    timeout=BATCH_REQUEST_TIMEOUT_SEC,
+                )
+                response.raise_for_status()
+                responses = response.json()
+                if not isinstance(responses, list):
+                    raise Exception(f"Unexpected batch response {responses}")
+                # Nodes may answer a batch out of order
+                by_id = {r.get("id"): r for r in responses}
+                return [
+                    by_id.get(i, {"error": {"message": "Missing batch response"}})
+                    for i in range(len(calls))
+                ]
+            except Exception as e:
+                last_exception = e
+                continue
+        raise (
+            last_exception if last_exception else Exception("No RPC providers found")
+        )
+
     def isConnected(self):
         return any(provider.isConnected() for provider in self.providers)
 
@@ -0,0 +1,38 @@
+import requests_mock
+
+from src.utils.multi_provider import MultiProvider
+
+
+def test_make_batch_request_orders_responses():
+    provider = MultiProvider("http://eth-1")
+    with requests_mock.Mocker() as m:
+        m.post(
+            "http://eth-1",
+            json=[
+                {"jsonrpc": "2.0", "id": 1, "error": {"message": "reverted"}},
+                {"jsonrpc": "2.0", "id": 0, "result": "0x1"},
+            ],
+        )
+        responses = provider.make_batch_request(
+            [("eth_call", [{"to": "0x1"}, "latest"]), ("eth_blockNumber", [])]
+        )
+
+        assert len(m.request_history) == 1
+        payload = m.request_history[0].json()
+        assert [r["method"] for r in payload] == ["eth_call", "eth_blockNumber"]
+        assert [r["id"] for r in payload] == [0, 1]
+
+    assert responses[0]["result"] == "0x1"
+    assert "error" in responses[1]
+
+
+def test_make_batch_request_falls_back_to_next_provider():
+    provider = MultiProvider("http://eth-1,http://eth-2")
+    with requests_mock.Mocker() as m:
+        m.post("http://eth-1", status_code=503)
+        m.post("http://eth-2", json=[{"jsonrpc": "2.0", "id": 0, "result": "0x2"}])
+
+        responses = provider.make_batch_request([("eth_blockNumber", [])])
+
+    assert responses == [{"jsonrpc": "2.0", "id": 0, "result": "0x2"}]
+    assert provider.make_batch_request([]) == []
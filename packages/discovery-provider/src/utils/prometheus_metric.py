@@ -3,7 +3,7 @@ from functools import wraps
 from time import time
 from typing import Callable, Dict
 
-from prometheus_client import Gauge, Histogram, Summary
+from prometheus_client import Counter, Gauge, Histogram, Summary
 
 logger = logging.getLogger(__name__)
 
@@ -98,12 +98,18 @@ class PrometheusMetricNames:
     FLASK_ROUTE_DURATION_SECONDS = "flask_route_duration_seconds"
     HEALTH_CHECK = "health_check"
     INDEX_BLOCKS_DURATION_SECONDS = "index_blocks_duration_seconds"
+    INDEX_CORE_BLOCKS_PER_SECOND = "index_core_blocks_per_second"
+    INDEX_CORE_PLAYS_PER_SECOND = "index_core_plays_per_second"
     INDEX_METRICS_DURATION_SECONDS = "index_metrics_duration_seconds"
     INDEX_TRENDING_DURATION_SECONDS = "index_trending_duration_seconds"
+    LOCAL_RESPONSE_CACHE_TOTAL = "local_response_cache_total"
     UPDATE_AGGREGATE_TABLE_DURATION_SECONDS = "update_aggregate_table_duration_seconds"
+    UPDATE_AGGREGATES_DRIFT_TOTAL = "update_aggregates_drift_total"
+    UPDATE_AGGREGATES_ROWS_TOUCHED_TOTAL = "update_aggregates_rows_touched_total"
     UPDATE_TRENDING_VIEW_DURATION_SECONDS = "update_trending_view_duration_seconds"
     ENTITY_MANAGER_UPDATE_CHANGED_LATEST = "entity_manager_update_changed_latest"
     ENTITY_MANAGER_UPDATE_DURATION_SECONDS = "entity_manager_update_duration_seconds"
+    ENTITY_MANAGER_HANDLER_DURATION_SECONDS = "entity_manager_handler_duration_seconds"
     ENTITY_MANAGER_UPDATE_ERRORS = "entity_manager_update_errors"
 
 
@@ -179,6 +185,17 @@ PrometheusRegistry = {
         "Runtimes for src.task.index:index_blocks()",
         ("scope",),
     ),
+    PrometheusMetricNames.INDEX_CORE_BLOCKS_PER_SECOND: Gauge(
+        f"{METRIC_PREFIX}_{PrometheusMetricNames.INDEX_CORE_BLOCKS_PER_SECOND}",
+        "Core blocks indexed per second by the last src.task.index_core:index_core() run",
+        ("mode",),
+        multiprocess_mode="liveall",
+    ),
+    PrometheusMetricNames.INDEX_CORE_PLAYS_PER_SECOND: Gauge(
+        f"{METRIC_PREFIX}_{PrometheusMetricNames.INDEX_CORE_PLAYS_PER_SECOND}",
+        "Plays ingested per second by the last src.task.index_core_plays:index_core_plays() block",
+        multiprocess_mode="liveall",
+    ),
     PrometheusMetricNames.INDEX_METRICS_DURATION_SECONDS: Histogram(
         f"{METRIC_PREFIX}_{PrometheusMetricNames.INDEX_METRICS_DURATION_SECONDS}",
         "Runtimes for src.task.index_metrics:celery.task()",
@@ -188,6 +205,11 @@ PrometheusRegistry = {
         f"{METRIC_PREFIX}_{PrometheusMetricNames.INDEX_TRENDING_DURATION_SECONDS}",
         "Runtimes for src.task.index_trending:index_trending()",
     ),
+    PrometheusMetricNames.LOCAL_RESPONSE_CACHE_TOTAL: Counter(
+        f"{METRIC_PREFIX}_{PrometheusMetricNames.LOCAL_RESPONSE_CACHE_TOTAL}",
+        "Hits, misses and evictions of the process-local response cache",
+        ("result",),
+    ),
     PrometheusMetricNames.UPDATE_AGGREGATE_TABLE_DURATION_SECONDS: Histogram(
         f"{METRIC_PREFIX}_{PrometheusMetricNames.UPDATE_AGGREGATE_TABLE_DURATION_SECONDS}",
         "Runtimes for src.task.aggregates:update_aggregate_table()",
@@ -196,6 +218,16 @@ PrometheusRegistry = {
             "task_name",
         ),
     ),
+    PrometheusMetricNames.UPDATE_AGGREGATES_DRIFT_TOTAL: Counter(
+        f"{METRIC_PREFIX}_{PrometheusMetricNames.UPDATE_AGGREGATES_DRIFT_TOTAL}",
+        "Aggregate rows src.task.update_aggregates found out of date and corrected",
+        ("table_name", "mode"),
+    ),
+    PrometheusMetricNames.UPDATE_AGGREGATES_ROWS_TOUCHED_TOTAL: Counter(
+        f"{METRIC_PREFIX}_{PrometheusMetricNames.UPDATE_AGGREGATES_ROWS_TOUCHED_TOTAL}",
+        "Aggregate rows src.task.update_aggregates recomputed",
+        ("table_name", "mode"),
+    ),
     PrometheusMetricNames.UPDATE_TRENDING_VIEW_DURATION_SECONDS: Histogram(
         f"{METRIC_PREFIX}_{PrometheusMetricNames.UPDATE_TRENDING_VIEW_DURATION_SECONDS}",
         "Runtimes for src.task.index_trending:update_view()",
@@ -217,6 +249,11 @@ PrometheusRegistry = {
         "Duration for entity manager updates",
         ("scope",),
     ),
+    PrometheusMetricNames.ENTITY_MANAGER_HANDLER_DURATION_SECONDS: Histogram(
+        f"{METRIC_PREFIX}_{PrometheusMetricNames.ENTITY_MANAGER_HANDLER_DURATION_SECONDS}",
+        "Duration and call count of each entity manager action handler",
+        ("handler",),
+    ),
 }
 
 
@@ -251,6 +288,8 @@ class PrometheusMetric:
             this_metric.set(value)
         elif isinstance(this_metric, Summary):
             this_metric.observe(value)
+        elif isinstance(this_metric, Counter):
+            this_metric.inc(value)
 
     @classmethod
     def register_collector(cls, name, collector_func):
@@ -1,11 +1,20 @@
 import functools
 import json
 import logging
-from typing import Any, List  # pylint: disable=C0302
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Set  # pylint: disable=C0302
 
 from flask.globals import request
+from sqlalchemy import event as sa_event
 
 from src.utils import redis_connection
+from src.utils.config import shared_config
+from src.utils.local_response_cache import (
+    get_local_response_cache,
+    invalidate_cached_key,
+)
 from src.utils.query_params import stringify_query_params
 
 logger = logging.getLogger(__name__)
@@ -16,6 +25,13 @@ logger = logging.getLogger(__name__)
 internal_api_cache_prefix = "INTERNAL_API"
 cache_prefix = "API_V1_ROUTE"
 default_ttl_sec = 60
+# single flight lock held by the process recomputing an expired response
+recompute_lock_ttl_sec = 10
+# how long other processes wait for the recomputed response when nothing stale is cached
+recompute_wait_sec = 2
+recompute_poll_interval_sec = 0.05
+# how long unpopulated track/user/playlist rows stay in the entity cache, 0 disables
+entity_cache_ttl_sec = int(shared_config["discprov"]["entity_cache_ttl_sec"])
 
 
 def extract_key(path, arg_items, cache_prefix_override=None):
@@ -43,6 +59,10 @@ def get_json_cached_key(redis, key: str) -> Any:
     Gets a JSON serialized value from the cache.
     """
     cached_value = redis.get(key)
+    return deserialize_cached_value(redis, key, cached_value)
+
+
+def deserialize_cached_value(redis, key: str, cached_value) -> Any:
     if cached_value:
         logger.debug(f"Redis Cache - hit {key}")
         try:
@@ -52,12 +72,33 @@ def get_json_cached_key(redis, key: str) -> Any:
             logger.warning(f"Unable to deserialize json cached response: {e}")
             # In the case we are unable to deserialize, delete the key so that
             # it may be properly re-cached.
-            redis.delete(key)
+            invalidate_cached_key(redis, key)
             return None
     logger.debug(f"Redis Cache - miss {key}")
     return None
 
 
+def get_cached_response(redis, key: str) -> Any:
+    """
+    Gets a cached API response, checking the process-local cache before redis.
+    Responses read from redis are kept locally until their redis key expires.
+    Each read deserializes a new response, so callers may mutate it.
+    """
+    local_cache = get_local_response_cache(redis)
+    if not local_cache:
+        return get_json_cached_key(redis, key)
+
+    cached_value = local_cache.get(key)
+    if cached_value is None:
+        pipe = redis.pipeline()
+        pipe.get(key)
+        pipe.pttl(key)
+        cached_value, ttl_ms = pipe.execute()
+        if cached_value and ttl_ms and ttl_ms > 0:
+            local_cache.set(key, cached_value, ttl_ms / 1000)
+    return deserialize_cached_value(redis, key, cached_value)
+
+
 def get_all_json_cached_key(redis, keys: List[str]) -> List[Any]:
     """
     Gets all the JSON serialized values from the cache for provided keys.
@@ -91,6 +132,23 @@ def set_json_cached_key(redis, key, obj, ttl=None):
     # Default converts datetime and other unparseables to str.
     serialized = json.dumps(obj, default=str)
     redis.set(key, serialized, ttl)
+    return serialized
+
+
+def set_cached_response(redis, key, obj, ttl_sec, stale_ttl_sec=0):
+    """
+    Caches an API response in redis and in the process-local cache.
+    With `stale_ttl_sec` a stale copy is kept for that long past `ttl_sec` to be
+    served while the response is recomputed.
+    """
+    pipe = redis.pipeline()
+    serialized = set_json_cached_key(pipe, key, obj, ttl_sec)
+    if stale_ttl_sec:
+        pipe.set(get_stale_cache_key(key), serialized, ttl_sec + stale_ttl_sec)
+    pipe.execute()
+    local_cache = get_local_response_cache(redis)
+    if local_cache:
+        local_cache.set(key, serialized.encode(), ttl_sec)
 
 
 def cache(**kwargs):
@@ -100,7 +158,11 @@ def cache(**kwargs):
 
     Arguments:
         ttl_sec: optional,number The time in seconds to cache the response if
-            status code < 400
+            status code < 400. Responses are also kept in the process-local
+            response cache when `local_response_cache_max_bytes` is set.
+        stale_ttl_sec: optional,number How long past `ttl_sec` the expired response
+            may be served to other requests while one request recomputes it.
+            Keeps a second copy of every response, so only set it on hot routes
         transform: optional,func The transform function of the wrapped function
             to convert the function response to request response
         cache_prefix_override: optional,the prefix for the cache key to use
@@ -127,6 +189,7 @@ def cache(**kwargs):
     `func` rather than `inner_wrap`.
     """
     ttl_sec = kwargs["ttl_sec"] if "ttl_sec" in kwargs else default_ttl_sec
+    stale_ttl_sec = kwargs["stale_ttl_sec"] if "stale_ttl_sec" in kwargs else 0
     transform = kwargs["transform"] if "transform" in kwargs else None
     cache_prefix_override = (
         kwargs["cache_prefix_override"] if "cache_prefix_override" in kwargs else None
@@ -134,6 +197,11 @@ def cache(**kwargs):
     redis = redis_connection.get_redis()
 
     def outer_wrap(func):
+        def cached_response(cached_resp):
+            if transform is not None:
+                return transform(cached_resp)
+            return cached_resp, 200
+
         @functools.wraps(func)
         def inner_wrap(*args, **kwargs):
             has_user_id = (
@@ -141,26 +209,50 @@ def cache(**kwargs):
             )
             key = extract_key(request.path, request.args.items(), cache_prefix_override)
             # only read cache responses w/o user id because only those are inserted
-            if not has_user_id:
-                cached_resp = get_json_cached_key(redis, key)
-                if cached_resp:
-                    if transform is not None:
-                        return transform(cached_resp)
+            if has_user_id:
+                return compute_response(key, False, *args, **kwargs)
 
-                    return cached_resp, 200
+            cached_resp = get_cached_response(redis, key)
+            if cached_resp:
+                return cached_response(cached_resp)
 
+            # single flight: one process recomputes an expired key while the
+            # others serve the stale copy or wait briefly for the new value
+            lock_key = get_recompute_lock_key(key)
+            lock_token = uuid.uuid4().hex
+            try:
+                have_lock = redis.set(
+                    lock_key, lock_token, nx=True, ex=recompute_lock_ttl_sec
+                )
+            except Exception as e:
+                logger.warning(f"Redis Cache - unable to lock {key}: {e}")
+                return compute_response(key, True, *args, **kwargs)
+            if have_lock:
+                try:
+                    return compute_response(key, True, *args, **kwargs)
+                finally:
+                    release_recompute_lock(redis, lock_key, lock_token)
+
+            cached_resp = get_stale_or_wait_for_response(
+                redis, key, bool(stale_ttl_sec)
+            )
+            if cached_resp:
+                return cached_response(cached_resp)
+            return compute_response(key, True, *args, **kwargs)
+
+        def compute_response(key, should_cache, *args, **kwargs):
             response = func(*args, **kwargs)
 
             if len(response) == 2:
                 resp, status_code = response
                 # only cache responses w/o user id because only those are read
-                if status_code < 400 and not has_user_id:
-                    set_json_cached_key(redis, key, resp, ttl_sec)
+                if status_code < 400 and should_cache:
+                    set_cached_response(redis, key, resp, ttl_sec, stale_ttl_sec)
 
                 return resp, status_code
             # only cache responses w/o user id because only those are read
-            if not has_user_id:
-                set_json_cached_key(redis, key, response, ttl_sec)
+            if should_cache:
+                set_cached_response(redis, key, response, ttl_sec, stale_ttl_sec)
 
             return transform(response)
 
@@ -169,6 +261,51 @@ def cache(**kwargs):
     return outer_wrap
 
 
+def get_recompute_lock_key(key):
+    return f"{key}:lock"
+
+
+def release_recompute_lock(redis, lock_key: str, lock_token: str):
+    """
+    Deletes the recompute lock if it still holds `lock_token`. The lock may have
+    expired and been taken by another process while the response was computed.
+    """
+    try:
+        with redis.pipeline() as pipe:
+            pipe.watch(lock_key)
+            if pipe.get(lock_key) == lock_token.encode():
+                pipe.multi()
+                pipe.delete(lock_key)
+                pipe.execute()
+    except Exception as e:
+        logger.warning(f"Redis Cache - unable to release lock {lock_key}: {e}")
+
+
+def get_stale_cache_key(key):
+    return f"{key}:stale"
+
+
+def get_stale_or_wait_for_response(redis, key: str, has_stale: bool) -> Any:
+    """
+    Called while another process recomputes `key`. Returns the stale copy if the
+    route keeps one and it is still within its grace window, otherwise polls for
+    the fresh value for up to `recompute_wait_sec`. Returns None if neither
+    shows up.
+    """
+    if has_stale:
+        stale_resp = get_json_cached_key(redis, get_stale_cache_key(key))
+        if stale_resp:
+            return stale_resp
+
+    wait_until = time.monotonic() + recompute_wait_sec
+    while time.monotonic() < wait_until:
+        time.sleep(recompute_poll_interval_sec)
+        cached_resp = get_cached_response(redis, key)
+        if cached_resp:
+            return cached_resp
+    return None
+
+
 def get_user_id_cache_key(id):
     return f"user:id:{id}"
 
@@ -181,6 +318,103 @@ def get_playlist_id_cache_key(id):
     return f"playlist:id:{id}"
 
 
+entity_cache_key_getters: Dict[str, Callable[[int], str]] = {
+    "Track": get_track_id_cache_key,
+    "User": get_user_id_cache_key,
+    "Playlist": get_playlist_id_cache_key,
+}
+
+
+def get_cached_entities(
+    redis,
+    entity_type: str,
+    ids: Iterable[int],
+    datetime_fields: List[str],
+    fetch_entities: Callable[[List[int]], List[dict]],
+) -> Dict[int, dict]:
+    """
+    Write-through cache of unpopulated entities.
+    Reads `ids` from redis in one MGET, calls `fetch_entities` with the misses and
+    caches what it returns in one pipeline. Returns a map of id to entity.
+    """
+    unique_ids = list(dict.fromkeys(ids))
+    if not unique_ids:
+        return {}
+    if entity_cache_ttl_sec <= 0:
+        return index_entities(entity_type, fetch_entities(unique_ids))
+
+    get_key = entity_cache_key_getters[entity_type]
+    entities: Dict[int, dict] = {}
+    try:
+        cached_entities = get_all_json_cached_key(
+            redis, [get_key(id) for id in unique_ids]
+        )
+        for id, entity in zip(unique_ids, cached_entities):
+            if entity:
+                for field in datetime_fields:
+                    if entity.get(field):
+                        entity[field] = datetime.fromisoformat(entity[field])
+                entities[id] = entity
+    except Exception as e:
+        logger.warning(f"Redis Cache - unable to read {entity_type} cache: {e}")
+        return index_entities(entity_type, fetch_entities(unique_ids))
+
+    missing_ids = [id for id in unique_ids if id not in entities]
+    if not missing_ids:
+        return entities
+
+    fetched_entities = index_entities(entity_type, fetch_entities(missing_ids))
+    try:
+        pipe = redis.pipeline()
+        for id, entity in fetched_entities.items():
+            set_json_cached_key(pipe, get_key(id), entity, entity_cache_ttl_sec)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Redis Cache - unable to write {entity_type} cache: {e}")
+    entities.update(fetched_entities)
+    return entities
+
+
+def index_entities(entity_type: str, entities: List[dict]) -> Dict[int, dict]:
+    id_field = f"{entity_type.lower()}_id"
+    return {entity[id_field]: entity for entity in entities}
+
+
+def invalidate_entity_cache(redis, changed_entity_ids: Dict[str, Set[int]]):
+    """Deletes the cached entities for the changed track, user and playlist ids."""
+    keys = [
+        get_key(id)
+        for entity_type, get_key in entity_cache_key_getters.items()
+        for id in changed_entity_ids.get(entity_type, ())
+    ]
+    if not keys or entity_cache_ttl_sec <= 0:
+        return
+    try:
+        redis.delete(*keys)
+    except Exception as e:
+        logger.error(f"Redis Cache - unable to invalidate entities: {e}")
+
+
+def invalidate_entity_cache_on_transaction_end(
+    redis, session, changed_entity_ids: Dict[str, Set[int]]
+):
+    """
+    Drops changed tracks, users and playlists from the entity cache now and
+    again once the session commits or rolls back, since a read in between can
+    cache the previous rows or rows that are never committed.
+    """
+    if not any(changed_entity_ids.values()):
+        return
+    invalidate_entity_cache(redis, changed_entity_ids)
+    for event_name in ("after_commit", "after_rollback"):
+        sa_event.listen(
+            session,
+            event_name,
+            lambda _: invalidate_entity_cache(redis, changed_entity_ids),
+            once=True,
+        )
+
+
 def get_cn_sp_id_key(id):
     return f"sp:cn:id:{id}"
 
@@ -4,12 +4,21 @@ from time import sleep
 from unittest.mock import patch
 
 import flask
+import pytest
 from dateutil import parser
+from sqlalchemy.orm import Session
 
+from src.utils import local_response_cache
+from src.utils.local_response_cache import invalidate_cached_key
 from src.utils.redis_cache import (
     cache,
     get_all_json_cached_key,
+    get_cached_entities,
+    get_cached_response,
     get_json_cached_key,
+    get_track_id_cache_key,
+    invalidate_entity_cache,
+    invalidate_entity_cache_on_transaction_end,
     set_json_cached_key,
 )
 
@@ -77,6 +86,8 @@ def test_cache_decorator(redis_mock):
             cached_resp = redis_mock.get(mock_key_1)
             deserialized = json.loads(cached_resp)
             assert deserialized == {"name": "joe"}
+            # stale copies are only kept for routes that set stale_ttl_sec
+            assert redis_mock.get(f"{mock_key_1}:stale") is None
 
             # This should call the function and return the cached response
             res = mock_func()
@@ -115,3 +126,180 @@ def test_cache_decorator(redis_mock):
             assert cached_resp is None
 
     get_mock_cache()  # pylint: disable=no-value-for-parameter
+
+
+def test_cache_decorator_serves_stale_while_recomputing(redis_mock):
+    """Test that only the lock holder recomputes and others get the stale copy"""
+
+    @patch("src.utils.redis_cache.extract_key")
+    def get_mock_cache(extract_key):
+        app = flask.Flask(__name__)
+        with app.test_request_context("/"):
+            mock_key = "mock_key"
+            extract_key.return_value = mock_key
+            calls = []
+
+            @cache(ttl_sec=1, stale_ttl_sec=10)
+            def mock_func():
+                calls.append(1)
+                return {"count": len(calls)}, 200
+
+            assert mock_func()[0] == {"count": 1}
+            assert redis_mock.get(f"{mock_key}:stale") is not None
+
+            # expire the fresh copy while another process holds the lock
+            redis_mock.delete(mock_key)
+            redis_mock.set(f"{mock_key}:lock", 1)
+            assert mock_func()[0] == {"count": 1}
+            assert len(calls) == 1
+
+            # once the lock is released the next request recomputes
+            redis_mock.delete(f"{mock_key}:lock")
+            assert mock_func()[0] == {"count": 2}
+            assert redis_mock.get(f"{mock_key}:lock") is None
+
+    get_mock_cache()  # pylint: disable=no-value-for-parameter
+
+
+def test_cache_decorator_keeps_lock_taken_over_while_recomputing(redis_mock):
+    """Test that an expired lock taken by another process is not released"""
+
+    @patch("src.utils.redis_cache.extract_key")
+    def get_mock_cache(extract_key):
+        app = flask.Flask(__name__)
+        with app.test_request_context("/"):
+            mock_key = "mock_key"
+            extract_key.return_value = mock_key
+
+            @cache(ttl_sec=1)
+            def mock_func():
+                # the lock expires and another process takes it
+                redis_mock.set(f"{mock_key}:lock", "other")
+                return {"name": "joe"}, 200
+
+            assert mock_func()[0] == {"name": "joe"}
+            assert redis_mock.get(f"{mock_key}:lock") == b"other"
+
+    get_mock_cache()  # pylint: disable=no-value-for-parameter
+
+
+def test_cache_decorator_returns_response_when_release_fails(redis_mock):
+    """Test that a redis error releasing the lock does not fail the request"""
+
+    @patch("src.utils.redis_cache.extract_key")
+    def get_mock_cache(extract_key):
+        app = flask.Flask(__name__)
+        with app.test_request_context("/"):
+            extract_key.return_value = "mock_key"
+
+            @cache(ttl_sec=1)
+            def mock_func():
+                return {"name": "joe"}, 200
+
+            with patch("redis.client.Pipeline.watch", side_effect=Exception("down")):
+                assert mock_func()[0] == {"name": "joe"}
+            assert redis_mock.get("mock_key") is not None
+
+    get_mock_cache()  # pylint: disable=no-value-for-parameter
+
+
+def test_cache_decorator_waits_for_recompute(redis_mock):
+    """Test that requests wait for the lock holder when nothing stale is cached"""
+
+    @patch("src.utils.redis_cache.recompute_wait_sec", 0.2)
+    @patch("src.utils.redis_cache.extract_key")
+    def get_mock_cache(extract_key):
+        app = flask.Flask(__name__)
+        with app.test_request_context("/"):
+            mock_key = "mock_key"
+            extract_key.return_value = mock_key
+            calls = []
+
+            @cache(ttl_sec=1)
+            def mock_func():
+                calls.append(1)
+                return {"name": "recomputed"}, 200
+
+            redis_mock.set(f"{mock_key}:lock", 1)
+            # the lock holder never finishes, so fall back to computing
+            assert mock_func()[0] == {"name": "recomputed"}
+            assert len(calls) == 1
+
+            # the lock holder has cached the response
+            set_json_cached_key(redis_mock, mock_key, {"name": "joe"}, 1)
+            assert mock_func()[0] == {"name": "joe"}
+            assert len(calls) == 1
+
+    get_mock_cache()  # pylint: disable=no-value-for-parameter
+
+
+def test_get_cached_entities(redis_mock):
+    """Test that only cache misses are fetched and changed entities are invalidated"""
+    fetched_ids = []
+
+    def fetch_tracks(ids):
+        fetched_ids.append(ids)
+        return [
+            {"track_id": id, "created_at": datetime(2024, 1, id)}
+            for id in ids
+            if id != 3
+        ]
+
+    tracks = get_cached_entities(
+        redis_mock, "Track", [1, 2, 3], ["created_at"], fetch_tracks
+    )
+    assert tracks == {
+        1: {"track_id": 1, "created_at": datetime(2024, 1, 1)},
+        2: {"track_id": 2, "created_at": datetime(2024, 1, 2)},
+    }
+    assert fetched_ids == [[1, 2, 3]]
+
+    # cached tracks are deserialized with their datetime fields
+    tracks = get_cached_entities(
+        redis_mock, "Track", [2, 1, 2], ["created_at"], fetch_tracks
+    )
+    assert tracks == {
+        2: {"track_id": 2, "created_at": datetime(2024, 1, 2)},
+        1: {"track_id": 1, "created_at": datetime(2024, 1, 1)},
+    }
+    assert fetched_ids == [[1, 2, 3]]
+
+    invalidate_entity_cache(redis_mock, {"Track": {2}, "User": {1}})
+    get_cached_entities(redis_mock, "Track", [1, 2], ["created_at"], fetch_tracks)
+    assert fetched_ids == [[1, 2, 3], [2]]
+
+
+@pytest.mark.parametrize("end_transaction", ["commit", "rollback"])
+def test_invalidate_entity_cache_on_transaction_end(redis_mock, end_transaction):
+    session = Session()
+    key = get_track_id_cache_key(1)
+    redis_mock.set(key, "{}")
+
+    invalidate_entity_cache_on_transaction_end(redis_mock, session, {"Track": {1}})
+    assert redis_mock.get(key) is None
+
+    # A read before the transaction ends caches the track again
+    redis_mock.set(key, "{}")
+    getattr(session, end_transaction)()
+    assert redis_mock.get(key) is None
+
+
+def test_get_cached_response_local_cache(redis_mock, monkeypatch):
+    """Test that local cache hits skip redis and return a new response each time"""
+    monkeypatch.setattr(local_response_cache, "local_response_cache_max_bytes", 1000)
+    monkeypatch.setattr(local_response_cache, "local_response_cache", None)
+    monkeypatch.setattr(local_response_cache, "subscribed_pid", None)
+
+    set_json_cached_key(redis_mock, "key", {"name": "joe"}, 10)
+    cached_resp = get_cached_response(redis_mock, "key")
+    assert cached_resp == {"name": "joe"}
+    cached_resp["name"] = "bob"
+
+    with patch.object(redis_mock, "pipeline") as pipeline:
+        assert get_cached_response(redis_mock, "key") == {"name": "joe"}
+        pipeline.assert_not_called()
+
+    # Invalidating drops the local copy along with the redis key
+    invalidate_cached_key(redis_mock, "key")
+    assert redis_mock.get("key") is None
+    assert get_cached_response(redis_mock, "key") is None
@@ -75,6 +75,25 @@ def get_rounded_date_time():
     return datetime.utcnow().replace(minute=0, second=0, microsecond=0)
 
 
+# Personal metrics are kept per minute for two metrics intervals
+personal_metrics_ttl = METRICS_INTERVAL * 2 * 60
+# Unique IPs are kept in HyperLogLogs through the next day or month
+summed_unique_daily_ttl = 2 * 24 * 60 * 60
+summed_unique_monthly_ttl = 32 * 24 * 60 * 60
+
+
+def get_personal_metrics_key(metric_type, timestamp):
+    return f"{metric_type}:{timestamp}"
+
+
+def get_summed_unique_daily_key(day):
+    return f"{summed_unique_daily_metrics}:{day}"
+
+
+def get_summed_unique_monthly_key(month):
+    return f"{summed_unique_monthly_metrics}:{month}"
+
+
 def format_ip(ip):
     # Replace the `:` character with an `_`  because we use : as the redis key delimiter
     return ip.strip().replace(":", "_")
@@ -556,19 +575,29 @@ def merge_app_metrics(metrics, end_time, db):
 
 
 def get_redis_metrics(redis_handle, start_time, metric_type):
-    redis_metrics_str = redis_handle.get(metric_type)
-    metrics = json.loads(redis_metrics_str) if redis_metrics_str else {}
-    if not metrics:
-        return {}
-
+    """
+    Sums the personal metrics recorded in the minutes after start_time that are
+    still cached. Returns a map of value to count.
+    """
     # if route metrics, value and count would be an IP and the number of requests from it
     # otherwise, value and count would be an app and the number of requests from it
+    now = datetime.utcnow().replace(second=0, microsecond=0)
+    oldest = now - timedelta(seconds=personal_metrics_ttl)
+    pipe = redis_handle.pipeline(transaction=False)
+    minute = now
+    while minute > start_time and minute >= oldest:
+        pipe.hgetall(
+            get_personal_metrics_key(
+                metric_type, minute.strftime(datetime_format_secondary)
+            )
+        )
+        minute -= timedelta(minutes=1)
+
     result = {}
-    for datetime_str, value_counts in metrics.items():
-        datetime_obj = datetime.strptime(datetime_str, datetime_format_secondary)
-        if datetime_obj > start_time:
-            for value, count in value_counts.items():
-                result[value] = result[value] + count if value in result else count
+    for value_counts in pipe.execute():
+        for value, count in value_counts.items():
+            value = value.decode() if isinstance(value, bytes) else value
+            result[value] = result.get(value, 0) + int(count)
 
     return result
 
@@ -585,29 +614,10 @@ def get_summed_unique_metrics(start_time):
     day = start_time.strftime(day_format)
     month = f"{day[:7]}/01"
 
-    summed_unique_daily_metrics_str = REDIS.get(summed_unique_daily_metrics)
-    summed_unique_daily_metrics_obj = (
-        json.loads(summed_unique_daily_metrics_str)
-        if summed_unique_daily_metrics_str
-        else {}
-    )
-    summed_unique_daily_count = (
-        len(summed_unique_daily_metrics_obj[day])
-        if day in summed_unique_daily_metrics_obj
-        else 0
-    )
-
-    summed_unique_monthly_metrics_str = REDIS.get(summed_unique_monthly_metrics)
-    summed_unique_monthly_metrics_obj = (
-        json.loads(summed_unique_monthly_metrics_str)
-        if summed_unique_monthly_metrics_str
-        else {}
-    )
-    summed_unique_monthly_count = (
-        len(summed_unique_monthly_metrics_obj[month])
-        if month in summed_unique_monthly_metrics_obj
-        else 0
-    )
+    pipe = REDIS.pipeline()
+    pipe.pfcount(get_summed_unique_daily_key(day))
+    pipe.pfcount(get_summed_unique_monthly_key(month))
+    summed_unique_daily_count, summed_unique_monthly_count = pipe.execute()
 
     return {"daily": summed_unique_daily_count, "monthly": summed_unique_monthly_count}
 
@@ -617,96 +627,39 @@ def get_aggregate_metrics_info():
     return json.loads(info_str) if info_str else {}
 
 
-def update_personal_metrics(key, old_timestamp, timestamp, value, metric_type):
-    values_str = REDIS.get(key)
-    values = json.loads(values_str) if values_str else {}
-    if timestamp in values:
-        values[timestamp][value] = (
-            values[timestamp][value] + 1 if value in values[timestamp] else 1
-        )
-    else:
-        values[timestamp] = {value: 1}
-
-    # clean up and update cached metrics
-    updated_metrics = {
-        timestamp: metrics
-        for timestamp, metrics in values.items()
-        if timestamp > old_timestamp
-    }
-    if updated_metrics:
-        REDIS.set(key, json.dumps(updated_metrics))
-    logger.debug(f"updated cached personal {metric_type} metrics")
+def update_personal_metrics(pipe, metric_type, timestamp, value):
+    key = get_personal_metrics_key(metric_type, timestamp)
+    pipe.hincrby(key, value, 1)
+    pipe.expire(key, personal_metrics_ttl)
 
 
-def update_summed_unique_metrics(now, ip):
-    thirty_one_days_ago = now - timedelta(days=31)
-    thirty_one_days_ago_str = thirty_one_days_ago.strftime(day_format)
-    yesterday = now - timedelta(days=1)
-    yesterday_str = yesterday.strftime(day_format)
+def update_summed_unique_metrics(pipe, now, ip):
     today_str = now.strftime(day_format)
     this_month_str = f"{today_str[:7]}/01"
 
-    summed_unique_daily_metrics_str = REDIS.get(summed_unique_daily_metrics)
-    summed_unique_daily_metrics_obj = (
-        json.loads(summed_unique_daily_metrics_str)
-        if summed_unique_daily_metrics_str
-        else {}
-    )
-    if today_str not in summed_unique_daily_metrics_obj:
-        summed_unique_daily_metrics_obj[today_str] = [ip]
-    elif ip not in summed_unique_daily_metrics_obj[today_str]:
-        summed_unique_daily_metrics_obj[today_str] = summed_unique_daily_metrics_obj[
-            today_str
-        ] + [ip]
-    summed_unique_daily_metrics_obj = {
-        timestamp: ips
-        for timestamp, ips in summed_unique_daily_metrics_obj.items()
-        if timestamp >= yesterday_str
-    }
-    REDIS.set(summed_unique_daily_metrics, json.dumps(summed_unique_daily_metrics_obj))
+    daily_key = get_summed_unique_daily_key(today_str)
+    pipe.pfadd(daily_key, ip)
+    pipe.expire(daily_key, summed_unique_daily_ttl)
 
-    summed_unique_monthly_metrics_str = REDIS.get(summed_unique_monthly_metrics)
-    summed_unique_monthly_metrics_obj = (
-        json.loads(summed_unique_monthly_metrics_str)
-        if summed_unique_monthly_metrics_str
-        else {}
-    )
-    if this_month_str not in summed_unique_monthly_metrics_obj:
-        summed_unique_monthly_metrics_obj[this_month_str] = [ip]
-    elif ip not in summed_unique_monthly_metrics_obj[this_month_str]:
-        summed_unique_monthly_metrics_obj[
-            this_month_str
-        ] = summed_unique_monthly_metrics_obj[this_month_str] + [ip]
-    summed_unique_monthly_metrics_obj = {
-        timestamp: ips
-        for timestamp, ips in summed_unique_monthly_metrics_obj.items()
-        if timestamp >= thirty_one_days_ago_str
-    }
-    REDIS.set(
-        summed_unique_monthly_metrics,
-        json.dumps(summed_unique_monthly_metrics_obj),
-    )
+    monthly_key = get_summed_unique_monthly_key(this_month_str)
+    pipe.pfadd(monthly_key, ip)
+    pipe.expire(monthly_key, summed_unique_monthly_ttl)
 
 
 def record_aggregate_metrics():
     now = datetime.utcnow()
     timestamp = now.strftime(datetime_format_secondary)
-    old_timestamp = (now - timedelta(minutes=METRICS_INTERVAL * 2)).strftime(
-        datetime_format_secondary
-    )
     ip = get_request_ip(request)
 
-    update_summed_unique_metrics(now, ip)
-
-    update_personal_metrics(
-        personal_route_metrics, old_timestamp, timestamp, ip, "route"
-    )
+    # every per-request write goes out in one round trip
+    pipe = REDIS.pipeline(transaction=False)
+    update_summed_unique_metrics(pipe, now, ip)
+    update_personal_metrics(pipe, personal_route_metrics, timestamp, ip)
 
     application_name = request.args.get(app_name_param, type=str, default=None)
     if application_name:
-        update_personal_metrics(
-            personal_app_metrics, old_timestamp, timestamp, application_name, "app"
-        )
+        update_personal_metrics(pipe, personal_app_metrics, timestamp, application_name)
+    pipe.execute()
 
 
 # Metrics decorator.
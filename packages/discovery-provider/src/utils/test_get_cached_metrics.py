@@ -1,11 +1,14 @@
-import json
 from datetime import datetime, timedelta
+from unittest.mock import patch
 
 from src.utils.redis_metrics import (
     datetime_format_secondary,
+    get_personal_metrics_key,
     get_redis_metrics,
+    get_summed_unique_metrics,
     personal_app_metrics,
     personal_route_metrics,
+    update_summed_unique_metrics,
 )
 
 now = datetime.utcnow()
@@ -16,6 +19,13 @@ start_time = int((now - timedelta(minutes=3)).timestamp())
 start_time_obj = datetime.fromtimestamp(start_time)
 
 
+def cache_personal_metrics(redis, metric_type, metrics):
+    for timestamp, value_counts in metrics.items():
+        key = get_personal_metrics_key(metric_type, timestamp)
+        for value, count in value_counts.items():
+            redis.hincrby(key, value, count)
+
+
 def test_get_cached_route_metrics(redis_mock):
     metrics = {
         old_time.strftime(datetime_format_secondary): {"some-ip": 1, "other-ip": 2},
@@ -29,7 +39,7 @@ def test_get_cached_route_metrics(redis_mock):
             "another-ip": 3,
         },
     }
-    redis_mock.set(personal_route_metrics, json.dumps(metrics))
+    cache_personal_metrics(redis_mock, personal_route_metrics, metrics)
 
     result = get_redis_metrics(redis_mock, start_time_obj, personal_route_metrics)
 
@@ -53,7 +63,7 @@ def test_get_cached_app_metrics(redis_mock):
             "another-app": 3,
         },
     }
-    redis_mock.set(personal_app_metrics, json.dumps(metrics))
+    cache_personal_metrics(redis_mock, personal_app_metrics, metrics)
 
     result = get_redis_metrics(redis_mock, start_time_obj, personal_app_metrics)
 
@@ -62,3 +72,18 @@ def test_get_cached_app_metrics(redis_mock):
     assert result["some-other-app"] == 2
     assert result["top-app"] == 1
     assert result["some-app"] == 2
+
+
+def test_get_summed_unique_metrics(redis_mock):
+    yesterday = now - timedelta(days=1)
+    pipe = redis_mock.pipeline()
+    for ip in ["1.2.3.4", "5.6.7.8", "1.2.3.4"]:
+        update_summed_unique_metrics(pipe, now, ip)
+    update_summed_unique_metrics(pipe, yesterday, "9.9.9.9")
+    pipe.execute()
+
+    with patch("src.utils.redis_metrics.REDIS", redis_mock):
+        result = get_summed_unique_metrics(now)
+
+    assert result["daily"] == 2
+    assert result["monthly"] == (3 if yesterday.month == now.month else 2)